@@ -4,12 +4,47 @@ import asyncio
 import re
 from processor import DatathonProcessor
 
+
+class CompiledPatterns:
+    """
+    {이름: 패턴 문자열 또는 (패턴 문자열, flags)}를 클래스 정의 시 한 번 컴파일해 속성/키로 꺼내 쓰는 모음
+    행마다 re.search/re.sub에 문자열 패턴을 넘겨 re 모듈 내부 캐시를 거치지 않도록 합니다.
+    """
+
+    def __init__(self, patterns):
+        self._compiled = {name: re.compile(spec) if isinstance(spec, str) else re.compile(*spec)
+                          for name, spec in patterns.items()}
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['_compiled'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name):
+        return self._compiled[name]
+
 # TaskA Processor (앞서 작성한 최적화 버전)
 
 
 class TaskAProcessor(DatathonProcessor):
     """Task A: Brief Hospital Course 작성"""
 
+    # 전처리 정규식 (클래스 정의 시 한 번 컴파일)
+    PATTERNS = CompiledPatterns({
+        'chief_complaint': r'Chief Complaint:\s*([^\n]+)',
+        'service': r'Service:\s*([^\n]+)',
+        'admission_type': (r'admission_type[\'\"]*:\s*[\'\"]*([^\'\"\\n,]+)', re.IGNORECASE),
+        'hpi': (r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|Physical Exam|$)', re.DOTALL),
+        'procedures': (r'Major Surgical or Invasive Procedure:\s*(.*?)(?=\n\n|History of Present|$)', re.DOTALL),
+        'vitals': r'(?:VS|Vitals):\s*([^\n]+)',
+        'lab_lines': (r'((?:Labs?|Laboratory|Blood)\s*[:\-]\s*[^\n]{20,200})', re.IGNORECASE),
+        'past_medical_history': (r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)', re.DOTALL),
+        'physical_exam': (r'(?:Physical Exam|PHYSICAL EXAM):\s*(.*?)(?=\n\n|Pertinent Results|$)', re.DOTALL),
+        'redacted': r'___+',
+        'whitespace': r'\s+',
+    })
+
     def get_model_name(self) -> str:
         return "meta-llama/Llama-3.1-8B-Instruct"
         # LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct-AWQ
@@ -49,8 +84,6 @@ BRIEF HOSPITAL COURSE:"""
 
     async def preprocess_data(self, data: Any) -> Dict[str, Any]:
         """의료 기록을 Brief Hospital Course 작성을 위해 전처리 - OSS-120B 최적화"""
-        import re
-        import pandas as pd
 
         try:
             medical_record = data.get('medical record', '')
@@ -64,8 +97,7 @@ BRIEF HOSPITAL COURSE:"""
 
             # Chief Complaint & Admission Details
             if 'Chief Complaint:' in medical_record:
-                cc_match = re.search(
-                    r'Chief Complaint:\s*([^\n]+)', medical_record)
+                cc_match = self.PATTERNS.chief_complaint.search(medical_record)
                 if cc_match and cc_match.group(1).strip():
                     processed_sections.append(
                         f"Chief Complaint: {cc_match.group(1).strip()}")
@@ -73,15 +105,13 @@ BRIEF HOSPITAL COURSE:"""
             # Service & Admission Type
             service_info = []
             if 'Service:' in medical_record:
-                service_match = re.search(
-                    r'Service:\s*([^\n]+)', medical_record)
+                service_match = self.PATTERNS.service.search(medical_record)
                 if service_match and service_match.group(1).strip():
                     service_info.append(
                         f"Service: {service_match.group(1).strip()}")
 
             # Admission Type (OSS-120B values context)
-            admission_type_match = re.search(
-                r'admission_type[\'\"]*:\s*[\'\"]*([^\'\"\\n,]+)', medical_record, re.IGNORECASE)
+            admission_type_match = self.PATTERNS.admission_type.search(medical_record)
             if admission_type_match:
                 service_info.append(
                     f"Admission Type: {admission_type_match.group(1).strip()}")
@@ -91,16 +121,14 @@ BRIEF HOSPITAL COURSE:"""
 
             # Enhanced History with Clinical Context
             if 'History of Present Illness:' in medical_record:
-                hpi_match = re.search(r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|Physical Exam|$)',
-                                      medical_record, re.DOTALL)
+                hpi_match = self.PATTERNS.hpi.search(medical_record)
                 if hpi_match and hpi_match.group(1).strip():
                     hpi = hpi_match.group(1).strip()[:1200]  # 더 많은 컨텍스트
                     processed_sections.append(f"Clinical Presentation: {hpi}")
 
             # Major Procedures with Details
             if 'Major Surgical or Invasive Procedure:' in medical_record:
-                proc_match = re.search(r'Major Surgical or Invasive Procedure:\s*(.*?)(?=\n\n|History of Present|$)',
-                                       medical_record, re.DOTALL)
+                proc_match = self.PATTERNS.procedures.search(medical_record)
                 if proc_match:
                     proc = proc_match.group(1).strip()
                     if proc and proc.lower() not in ['none', 'none.', '']:
@@ -108,31 +136,27 @@ BRIEF HOSPITAL COURSE:"""
 
             # Vital Signs & Lab Values (OSS-120B values specificity)
             if 'VS:' in medical_record or 'Vitals:' in medical_record:
-                vitals_match = re.search(
-                    r'(?:VS|Vitals):\s*([^\n]+)', medical_record)
+                vitals_match = self.PATTERNS.vitals.search(medical_record)
                 if vitals_match:
                     processed_sections.append(
                         f"Admission Vitals: {vitals_match.group(1).strip()}")
 
             # Key Laboratory Results
-            lab_sections = re.findall(
-                r'((?:Labs?|Laboratory|Blood)\s*[:\-]\s*[^\n]{20,200})', medical_record, re.IGNORECASE)
+            lab_sections = self.PATTERNS.lab_lines.findall(medical_record)
             if lab_sections:
                 for i, lab in enumerate(lab_sections[:2]):
                     processed_sections.append(f"Key Labs {i+1}: {lab.strip()}")
 
             # Past Medical History (Essential Context)
             if 'Past Medical History:' in medical_record:
-                pmh_match = re.search(r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)',
-                                      medical_record, re.DOTALL)
+                pmh_match = self.PATTERNS.past_medical_history.search(medical_record)
                 if pmh_match and pmh_match.group(1).strip():
                     pmh = pmh_match.group(1).strip()[:600]  # 더 상세히
                     processed_sections.append(f"Past Medical History: {pmh}")
 
             # Physical Exam Key Findings
             if 'Physical Exam:' in medical_record or 'PHYSICAL EXAM:' in medical_record:
-                pe_match = re.search(r'(?:Physical Exam|PHYSICAL EXAM):\s*(.*?)(?=\n\n|Pertinent Results|$)',
-                                     medical_record, re.DOTALL)
+                pe_match = self.PATTERNS.physical_exam.search(medical_record)
                 if pe_match:
                     pe = pe_match.group(1).strip()[:800]
                     processed_sections.append(f"Physical Examination: {pe}")
@@ -143,9 +167,9 @@ BRIEF HOSPITAL COURSE:"""
                 processed_text = medical_record[:3500]  # 더 많은 원본 데이터
 
             # 텍스트 정제 (덜 aggressive)
-            processed_text = re.sub(
-                r'___+', '[REDACTED]', processed_text)  # 완전 제거 대신 표시
-            processed_text = re.sub(r'\s+', ' ', processed_text)
+            processed_text = self.PATTERNS.redacted.sub(
+                '[REDACTED]', processed_text)  # 완전 제거 대신 표시
+            processed_text = self.PATTERNS.whitespace.sub(' ', processed_text)
             processed_text = processed_text.strip()[:4000]  # 더 많은 정보 허용
 
             return {'user_input': processed_text if processed_text else 'Patient admitted for comprehensive medical evaluation and management.'}
@@ -156,7 +180,6 @@ BRIEF HOSPITAL COURSE:"""
 
     async def postprocess_result(self, result: str) -> str:
         """결과 정리 및 최적화 - OSS-120B 평가 기준 반영"""
-        import re
 
         try:
             if not result or not isinstance(result, str):
@@ -258,6 +281,13 @@ BRIEF HOSPITAL COURSE:"""
 class TaskBProcessor(DatathonProcessor):
     """Task B: Radiology Impression 요약"""
 
+    # 전처리 정규식 (클래스 정의 시 한 번 컴파일)
+    PATTERNS = CompiledPatterns({
+        'leading_colon': r'^[:\s]*',
+        'redacted': r'\b___\b',
+        'whitespace': r'\s+',
+    })
+
     def get_model_name(self) -> str:
         return "meta-llama/Llama-3.1-8B-Instruct"
 
@@ -291,8 +321,6 @@ IMPRESSION:"""
 
     async def preprocess_data(self, data: Any) -> Dict[str, Any]:
         """방사선 보고서를 IMPRESSION 작성을 위해 전처리"""
-        import re
-        import pandas as pd
 
         try:
             radiology_text = data.get('radiology report', '')
@@ -314,9 +342,9 @@ IMPRESSION:"""
                 findings_text = findings.strip()
 
             # Clean text
-            findings_text = re.sub(r'^[:\s]*', '', findings_text)
-            findings_text = re.sub(r'\b___\b', '', findings_text)
-            findings_text = re.sub(r'\s+', ' ', findings_text)
+            findings_text = self.PATTERNS.leading_colon.sub('', findings_text)
+            findings_text = self.PATTERNS.redacted.sub('', findings_text)
+            findings_text = self.PATTERNS.whitespace.sub(' ', findings_text)
             findings_text = findings_text.strip()
 
             return {'user_input': findings_text if findings_text else 'Normal examination.'}
@@ -327,7 +355,6 @@ IMPRESSION:"""
 
     async def postprocess_result(self, result: str) -> str:
         """간소화된 후처리"""
-        import re
 
         try:
             if not result or not isinstance(result, str):
@@ -370,6 +397,37 @@ IMPRESSION:"""
 class TaskCProcessor(DatathonProcessor):
     """개선된 TaskCProcessor - DatathonProcessor 기반"""
 
+    # 전/후처리 정규식 (클래스 정의 시 한 번 컴파일)
+    # - deid_marker: '[** ... **]' 안에는 '['가 없으므로 다음 '['에서 멈춤 (닫히지 않은 표시가 많아도 선형 시간)
+    PATTERNS = CompiledPatterns({
+        'redacted': r"___+",
+        'deid_marker': r"\[\*+[^\[\n]*?\*+\]",
+        'whitespace': r"\s+",
+        'discharge_diagnosis': (
+            r"(?:Discharge|Primary|Principal|Final)\s*Diagnos[ei]s?:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
+            re.IGNORECASE | re.DOTALL),
+        'diagnosis_at_discharge': (
+            r"Diagnos[ei]s\s*(?:on\s*discharge|at\s*discharge):\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
+            re.IGNORECASE | re.DOTALL),
+        'chief_complaint': (r"Chief Complaint:\s*([^\n]+)", re.IGNORECASE),
+        'assessment': (r"(?:Assessment|Impression)(?:\s*and\s*Plan)?:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
+                       re.IGNORECASE | re.DOTALL),
+        'a_and_p': (r"A&P:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)", re.IGNORECASE | re.DOTALL),
+        'hpi': (r"History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|\nReview of|$)",
+                re.IGNORECASE | re.DOTALL),
+        'hospital_course': (r"Hospital Course:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)", re.IGNORECASE | re.DOTALL),
+        'sentence_break': r"[.!?]+",
+        'non_code': r"[^A-Z0-9]",
+        # 출력에서 코드 후보를 찾는 패턴 (ICD_CANDIDATES 순서로 적용)
+        'icd_code': r"\b[A-TV-Z]\d{2}[A-Z0-9]*\b",
+        'icd_letter_extension': r"\b[A-TV-Z]\d{2}[A-Z]\d+[A-Z]*\b",
+        'icd_frequent_chapter': r"\b[IJKLMNRS]\d{3,4}[A-Z0-9]*\b",
+        'valid_code': r"^[A-TV-Z]\d{2}[A-Z0-9]*$",
+    })
+    DIAGNOSIS_PATTERNS = ('discharge_diagnosis', 'diagnosis_at_discharge')
+    ASSESSMENT_PATTERNS = ('assessment', 'a_and_p')
+    ICD_CANDIDATES = ('icd_code', 'icd_letter_extension', 'icd_frequent_chapter')
+
     def __init__(self, api_key, train_df=None):
         # 부모 초기화
         super().__init__(api_key)
@@ -381,14 +439,12 @@ class TaskCProcessor(DatathonProcessor):
 
     def _build_training_insights(self, train_df):
         """훈련 데이터에서 코드 빈도 분석"""
-        import re
-        import pandas as pd
 
         def parse_codes(s):
             if pd.isna(s) or not str(s).strip():
                 return []
             return [
-                re.sub(r"[^A-Z0-9]", "", c.strip().upper())
+                self.PATTERNS.non_code.sub("", c.strip().upper())
                 for c in str(s).split(",") if c.strip()
             ]
 
@@ -440,8 +496,6 @@ PRIMARY ICD-10-CM CODES:"""
 
     async def preprocess_data(self, data):
         """향상된 전처리 - 핵심 의료 정보 추출"""
-        import re
-        import pandas as pd
 
         try:
             hospital_course = (
@@ -454,59 +508,42 @@ PRIMARY ICD-10-CM CODES:"""
                 return {"user_input": "Patient admitted for routine medical care."}
 
             # 텍스트 정리
-            text = re.sub(r"___+", " ", hospital_course)
-            text = re.sub(r"\[\*+.*?\*+\]", " ", text)
-            text = re.sub(r"\s+", " ", text).strip()
+            text = self.PATTERNS.redacted.sub(" ", hospital_course)
+            text = self.PATTERNS.deid_marker.sub(" ", text)
+            text = self.PATTERNS.whitespace.sub(" ", text).strip()
 
             # 핵심 섹션 추출
             sections = []
 
             # Discharge Diagnosis
-            dd_patterns = [
-                r"(?:Discharge|Primary|Principal|Final)\s*Diagnos[ei]s?:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-                r"Diagnos[ei]s\s*(?:on\s*discharge|at\s*discharge):\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-            ]
-            for pattern in dd_patterns:
-                match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+            for name in self.DIAGNOSIS_PATTERNS:
+                match = self.PATTERNS[name].search(text)
                 if match and match.group(1).strip():
                     sections.append(
                         f"DISCHARGE DIAGNOSIS: {match.group(1).strip()[:400]}")
                     break
 
             # Chief Complaint
-            cc_match = re.search(
-                r"Chief Complaint:\s*([^\n]+)", text, re.IGNORECASE)
+            cc_match = self.PATTERNS.chief_complaint.search(text)
             if cc_match and cc_match.group(1).strip():
                 sections.append(
                     f"CHIEF COMPLAINT: {cc_match.group(1).strip()}")
 
             # Assessment/Impression
-            assess_patterns = [
-                r"(?:Assessment|Impression)(?:\s*and\s*Plan)?:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-                r"A&P:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-            ]
-            for pattern in assess_patterns:
-                match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+            for name in self.ASSESSMENT_PATTERNS:
+                match = self.PATTERNS[name].search(text)
                 if match and match.group(1).strip():
                     sections.append(
                         f"ASSESSMENT: {match.group(1).strip()[:300]}")
                     break
 
             # HPI
-            hpi_match = re.search(
-                r"History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|\nReview of|$)",
-                text,
-                re.IGNORECASE | re.DOTALL,
-            )
+            hpi_match = self.PATTERNS.hpi.search(text)
             if hpi_match and hpi_match.group(1).strip():
                 sections.append(f"HISTORY: {hpi_match.group(1).strip()[:400]}")
 
             # Hospital Course
-            hc_match = re.search(
-                r"Hospital Course:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-                text,
-                re.IGNORECASE | re.DOTALL,
-            )
+            hc_match = self.PATTERNS.hospital_course.search(text)
             if hc_match and hc_match.group(1).strip():
                 sections.append(
                     f"HOSPITAL COURSE: {hc_match.group(1).strip()[:500]}")
@@ -529,7 +566,6 @@ PRIMARY ICD-10-CM CODES:"""
 
     def _extract_key_medical_content(self, text):
         """비구조적 텍스트에서 핵심 의료 내용 추출"""
-        import re
 
         priority_terms = [
             "chest pain", "myocardial infarction", "troponin", "stemi", "nstemi",
@@ -543,7 +579,7 @@ PRIMARY ICD-10-CM CODES:"""
             "fall", "trauma", "fracture", "head injury",
         ]
 
-        sentences = re.split(r"[.!?]+", text)
+        sentences = self.PATTERNS.sentence_break.split(text)
         important_sentences = []
 
         for sentence in sentences:
@@ -559,7 +595,6 @@ PRIMARY ICD-10-CM CODES:"""
 
     async def postprocess_result(self, result):
         """향상된 후처리 - ICD 코드 추출 및 검증"""
-        import re
 
         try:
             if not result or not isinstance(result, str):
@@ -581,24 +616,19 @@ PRIMARY ICD-10-CM CODES:"""
 
             # 점 제거 후 패턴 매칭
             result_no_dots = result_clean.replace(".", "")
-            icd_patterns = [
-                r"\b[A-TV-Z]\d{2}[A-Z0-9]*\b",
-                r"\b[A-TV-Z]\d{2}[A-Z]\d+[A-Z]*\b",
-                r"\b[IJKLMNRS]\d{3,4}[A-Z0-9]*\b",
-            ]
 
             all_codes = []
-            for pattern in icd_patterns:
-                all_codes.extend(re.findall(pattern, result_no_dots))
+            for name in self.ICD_CANDIDATES:
+                all_codes.extend(self.PATTERNS[name].findall(result_no_dots))
 
             valid_codes, seen = [], set()
             for code in all_codes:
-                clean_code = re.sub(r"[^A-Z0-9]", "", code.upper())
+                clean_code = self.PATTERNS.non_code.sub("", code.upper())
                 if (
                     3 <= len(clean_code) <= 8
                     and clean_code not in seen
                     and not clean_code.startswith("U")
-                    and re.match(r"^[A-TV-Z]\d{2}[A-Z0-9]*$", clean_code)
+                    and self.PATTERNS.valid_code.match(clean_code)
                     and not clean_code.endswith("000")
                 ):
                     valid_codes.append(clean_code)
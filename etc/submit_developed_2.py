@@ -4,12 +4,79 @@ import asyncio
 import re
 from processor import DatathonProcessor
 
+
+class CompiledPatterns:
+    """
+    {이름: 패턴 문자열 또는 (패턴 문자열, flags)}를 클래스 정의 시 한 번 컴파일해 속성/키로 꺼내 쓰는 모음
+    행마다 re.search/re.sub에 문자열 패턴을 넘겨 re 모듈 내부 캐시를 거치지 않도록 합니다.
+    """
+
+    def __init__(self, patterns):
+        self._compiled = {name: re.compile(spec) if isinstance(spec, str) else re.compile(*spec)
+                          for name, spec in patterns.items()}
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['_compiled'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name):
+        return self._compiled[name]
+
+
+class KeywordSet:
+    """
+    키워드 목록을 전방탐색 alternation 정규식 하나로 컴파일해 문장을 한 번만 훑습니다.
+    문장마다 'term in sentence.lower()'를 용어 수만큼 반복하는 것과 같은 결과 (부분 문자열 기준)
+    """
+
+    def __init__(self, terms):
+        self.terms = list(dict.fromkeys(term.lower() for term in terms))
+        longest_first = sorted(self.terms, key=len, reverse=True)
+        self.pattern = re.compile('(?=(' + '|'.join(re.escape(term) for term in longest_first) + '))')
+        # 같은 위치에서는 가장 긴 용어만 잡히므로, 그 용어의 접두사인 용어도 함께 나온 것으로 셈
+        self._prefixes = {term: {other for other in self.terms if term.startswith(other)} for term in self.terms}
+
+    def found(self, text):
+        """text에 나오는 용어 집합"""
+        found = set()
+        for term in set(self.pattern.findall(text.lower())):
+            found |= self._prefixes[term]
+        return found
+
+    def contains_any(self, text):
+        return self.pattern.search(text.lower()) is not None
+
+
 # TaskA Processor (앞서 작성한 최적화 버전)
 
 
 class TaskAProcessor(DatathonProcessor):
     """Task A: Brief Hospital Course 작성"""
 
+    # 전처리 정규식 (클래스 정의 시 한 번 컴파일)
+    PATTERNS = CompiledPatterns({
+        'chief_complaint': r'Chief Complaint:\s*([^\n]+)',
+        'service': r'Service:\s*([^\n]+)',
+        'admission_type': (r'admission_type[\'\"]*:\s*[\'\"]*([^\'\"\\n,]+)', re.IGNORECASE),
+        'hpi': (r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|Physical Exam|$)', re.DOTALL),
+        'procedures': (r'Major Surgical or Invasive Procedure:\s*(.*?)(?=\n\n|History of Present|$)', re.DOTALL),
+        'vitals': r'(?:VS|Vitals):\s*([^\n]+)',
+        'lab_lines': (r'((?:Labs?|Laboratory|Blood)\s*[:\-]\s*[^\n]{20,200})', re.IGNORECASE),
+        'past_medical_history': (r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)', re.DOTALL),
+        'physical_exam': (r'(?:Physical Exam|PHYSICAL EXAM):\s*(.*?)(?=\n\n|Pertinent Results|$)', re.DOTALL),
+        'redacted': r'___+',
+        'whitespace': r'\s+',
+    })
+
+    # 출력 축약 시 문장 점수를 더하는 핵심 키워드 (키워드당 1점)
+    PRIORITY_KEYWORDS = KeywordSet([
+        'admitted', 'diagnosis', 'treated', 'underwent', 'developed',
+        'improved', 'discharged', 'course', 'complication', 'surgery',
+        'therapy', 'management', 'stable', 'condition'
+    ])
+
     def get_model_name(self) -> str:
         return "meta-llama/Llama-3.1-8B-Instruct"
         # LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct-AWQ
@@ -49,8 +116,6 @@ BRIEF HOSPITAL COURSE:"""
 
     async def preprocess_data(self, data: Any) -> Dict[str, Any]:
         """의료 기록을 Brief Hospital Course 작성을 위해 전처리 - OSS-120B 최적화"""
-        import re
-        import pandas as pd
 
         try:
             medical_record = data.get('medical record', '')
@@ -64,8 +129,7 @@ BRIEF HOSPITAL COURSE:"""
 
             # Chief Complaint & Admission Details
             if 'Chief Complaint:' in medical_record:
-                cc_match = re.search(
-                    r'Chief Complaint:\s*([^\n]+)', medical_record)
+                cc_match = self.PATTERNS.chief_complaint.search(medical_record)
                 if cc_match and cc_match.group(1).strip():
                     processed_sections.append(
                         f"Chief Complaint: {cc_match.group(1).strip()}")
@@ -73,15 +137,13 @@ BRIEF HOSPITAL COURSE:"""
             # Service & Admission Type
             service_info = []
             if 'Service:' in medical_record:
-                service_match = re.search(
-                    r'Service:\s*([^\n]+)', medical_record)
+                service_match = self.PATTERNS.service.search(medical_record)
                 if service_match and service_match.group(1).strip():
                     service_info.append(
                         f"Service: {service_match.group(1).strip()}")
 
             # Admission Type (OSS-120B values context)
-            admission_type_match = re.search(
-                r'admission_type[\'\"]*:\s*[\'\"]*([^\'\"\\n,]+)', medical_record, re.IGNORECASE)
+            admission_type_match = self.PATTERNS.admission_type.search(medical_record)
             if admission_type_match:
                 service_info.append(
                     f"Admission Type: {admission_type_match.group(1).strip()}")
@@ -91,16 +153,14 @@ BRIEF HOSPITAL COURSE:"""
 
             # Enhanced History with Clinical Context
             if 'History of Present Illness:' in medical_record:
-                hpi_match = re.search(r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|Physical Exam|$)',
-                                      medical_record, re.DOTALL)
+                hpi_match = self.PATTERNS.hpi.search(medical_record)
                 if hpi_match and hpi_match.group(1).strip():
                     hpi = hpi_match.group(1).strip()[:1200]  # 더 많은 컨텍스트
                     processed_sections.append(f"Clinical Presentation: {hpi}")
 
             # Major Procedures with Details
             if 'Major Surgical or Invasive Procedure:' in medical_record:
-                proc_match = re.search(r'Major Surgical or Invasive Procedure:\s*(.*?)(?=\n\n|History of Present|$)',
-                                       medical_record, re.DOTALL)
+                proc_match = self.PATTERNS.procedures.search(medical_record)
                 if proc_match:
                     proc = proc_match.group(1).strip()
                     if proc and proc.lower() not in ['none', 'none.', '']:
@@ -108,31 +168,27 @@ BRIEF HOSPITAL COURSE:"""
 
             # Vital Signs & Lab Values (OSS-120B values specificity)
             if 'VS:' in medical_record or 'Vitals:' in medical_record:
-                vitals_match = re.search(
-                    r'(?:VS|Vitals):\s*([^\n]+)', medical_record)
+                vitals_match = self.PATTERNS.vitals.search(medical_record)
                 if vitals_match:
                     processed_sections.append(
                         f"Admission Vitals: {vitals_match.group(1).strip()}")
 
             # Key Laboratory Results
-            lab_sections = re.findall(
-                r'((?:Labs?|Laboratory|Blood)\s*[:\-]\s*[^\n]{20,200})', medical_record, re.IGNORECASE)
+            lab_sections = self.PATTERNS.lab_lines.findall(medical_record)
             if lab_sections:
                 for i, lab in enumerate(lab_sections[:2]):
                     processed_sections.append(f"Key Labs {i+1}: {lab.strip()}")
 
             # Past Medical History (Essential Context)
             if 'Past Medical History:' in medical_record:
-                pmh_match = re.search(r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)',
-                                      medical_record, re.DOTALL)
+                pmh_match = self.PATTERNS.past_medical_history.search(medical_record)
                 if pmh_match and pmh_match.group(1).strip():
                     pmh = pmh_match.group(1).strip()[:600]  # 더 상세히
                     processed_sections.append(f"Past Medical History: {pmh}")
 
             # Physical Exam Key Findings
             if 'Physical Exam:' in medical_record or 'PHYSICAL EXAM:' in medical_record:
-                pe_match = re.search(r'(?:Physical Exam|PHYSICAL EXAM):\s*(.*?)(?=\n\n|Pertinent Results|$)',
-                                     medical_record, re.DOTALL)
+                pe_match = self.PATTERNS.physical_exam.search(medical_record)
                 if pe_match:
                     pe = pe_match.group(1).strip()[:800]
                     processed_sections.append(f"Physical Examination: {pe}")
@@ -143,9 +199,9 @@ BRIEF HOSPITAL COURSE:"""
                 processed_text = medical_record[:3500]  # 더 많은 원본 데이터
 
             # 텍스트 정제 (덜 aggressive)
-            processed_text = re.sub(
-                r'___+', '[REDACTED]', processed_text)  # 완전 제거 대신 표시
-            processed_text = re.sub(r'\s+', ' ', processed_text)
+            processed_text = self.PATTERNS.redacted.sub(
+                '[REDACTED]', processed_text)  # 완전 제거 대신 표시
+            processed_text = self.PATTERNS.whitespace.sub(' ', processed_text)
             processed_text = processed_text.strip()[:4000]  # 더 많은 정보 허용
 
             return {'user_input': processed_text if processed_text else 'Patient admitted for comprehensive medical evaluation and management.'}
@@ -156,7 +212,6 @@ BRIEF HOSPITAL COURSE:"""
 
     async def postprocess_result(self, result: str) -> str:
         """결과 정리 및 최적화 - OSS-120B 평가 기준 반영"""
-        import re
 
         try:
             if not result or not isinstance(result, str):
@@ -191,14 +246,9 @@ BRIEF HOSPITAL COURSE:"""
                 sentences = [s.strip() for s in result.split('.') if s.strip()]
                 if sentences:
                     # OSS-120B가 선호하는 핵심 의료 키워드 우선 보존
-                    priority_keywords = ['admitted', 'diagnosis', 'treated', 'underwent', 'developed',
-                                         'improved', 'discharged', 'course', 'complication', 'surgery',
-                                         'therapy', 'management', 'stable', 'condition']
-
                     scored_sentences = []
                     for sentence in sentences:
-                        score = sum(
-                            1 for keyword in priority_keywords if keyword in sentence.lower())
+                        score = len(self.PRIORITY_KEYWORDS.found(sentence))
                         scored_sentences.append((sentence, score))
 
                     # 점수 기준 정렬 후 상위 선택
@@ -258,6 +308,63 @@ BRIEF HOSPITAL COURSE:"""
 class TaskBProcessor(DatathonProcessor):
     """Task B: Radiology Impression 요약 - 극한 최적화"""
 
+    # FINDINGS가 짧을 때 본문에서 고를 문장의 의료 용어
+    MEDICAL_TERMS = KeywordSet([
+        'normal', 'abnormal', 'mass', 'lesion', 'consolidation', 'effusion',
+        'edema', 'hemorrhage', 'fracture', 'dislocation', 'stenosis',
+        'dilatation', 'enhancement', 'atelectasis', 'pneumonia', 'cardiomegaly',
+        'opacity', 'density', 'nodule', 'calcification'
+    ])
+    # 출력 축약 시 문장 점수를 더하는 핵심 소견 (용어당 2점)
+    PRIORITY_TERMS = KeywordSet([
+        'fracture', 'mass', 'tumor', 'hemorrhage', 'infarction', 'pneumonia',
+        'effusion', 'pneumothorax', 'cardiomegaly', 'consolidation', 'embolism',
+        'stenosis', 'occlusion', 'aneurysm', 'dissection', 'malignancy'
+    ])
+
+    # 전/후처리 정규식 (클래스 정의 시 한 번 컴파일)
+    # - bracket_redaction: 표시 안에는 '['가 없으므로 다음 '['에서 멈춤 (닫히지 않은 표시가 많아도 선형 시간)
+    # - space_before_punct: 공백 연속의 첫 칸에서만 시작 (긴 공백에서 시작 위치마다 다시 훑지 않도록)
+    PATTERNS = CompiledPatterns({
+        'leading_colon': r'^[:\s]*',
+        'redacted': r'\b___+\b',
+        'bracket_redaction': r'\[\*+[^\[\]]*\*+\]',
+        'whitespace': r'\s+',
+        'sentence_break': r'[.!?]+',
+        'space_before_punct': r'(?<!\s)\s+([,.])',
+        'punct_before_capital': r'([,.])([A-Z])',
+    })
+    # 장황한 표현 -> 간결한 표현 (표 순서대로 적용, 대소문자 무시)
+    CONCISENESS_REPLACEMENTS = {
+        # Verbose medical expressions to concise equivalents
+        r'there (?:is|are) evidence of': '',
+        r'findings (?:are )?consistent with(?:\s+and\s+compatible\s+with)?': '',
+        r'(?:appears to|seems to) (?:be|demonstrate|show)': '',
+        r'compatible with(?:\s+a\s+diagnosis\s+of)?': '',
+        r'suggestive of(?:\s+the\s+presence\s+of)?': '',
+        r'concerning for(?:\s+the\s+possibility\s+of)?': 'concerning for',
+        r'no evidence of(?:\s+any)?': 'no',
+        r'there is no(?:\s+evidence\s+of)?': 'no',
+        r'demonstrates?(?:\s+evidence\s+of)?': '',
+        r'shows?(?:\s+signs\s+of)?': '',
+        r'reveals?(?:\s+the\s+presence\s+of)?': '',
+        r'indicates?(?:\s+the\s+presence\s+of)?': '',
+        r'mild(?:\s+degree\s+of)?': 'mild',
+        r'moderate(?:\s+degree\s+of)?': 'moderate',
+        r'severe(?:\s+degree\s+of)?': 'severe',
+        r'small(?:\s+amount\s+of)?': 'small',
+        r'large(?:\s+amount\s+of)?': 'large',
+        r'(?:some\s+)?degree\s+of\s+': '',
+        r'(?:a\s+)?finding\s+of\s+': '',
+        r'presence\s+of\s+': '',
+        r'(?:most\s+)?likely\s+represents?': 'likely',
+        r'probably\s+represents?': 'probably',
+        r'possibly\s+represents?': 'possibly',
+    }
+    CONCISENESS = CompiledPatterns({
+        pattern: (pattern, re.IGNORECASE) for pattern in CONCISENESS_REPLACEMENTS
+    })
+
     def get_model_name(self) -> str:
         return "LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct-AWQ"
 
@@ -313,8 +420,6 @@ IMPRESSION:"""
 
     async def preprocess_data(self, data: Any) -> Dict[str, Any]:
         """방사선 보고서 전처리 - 정확도 및 공정성 최적화"""
-        import re
-        import pandas as pd
 
         try:
             radiology_text = data.get('radiology report', '')
@@ -353,32 +458,24 @@ IMPRESSION:"""
                 findings_text = findings_section.strip()
 
             # Aggressive text cleaning for accuracy
-            findings_text = re.sub(r'^[:\s]*', '', findings_text)
+            findings_text = self.PATTERNS.leading_colon.sub('', findings_text)
             # Preserve redacted info pattern
-            findings_text = re.sub(r'\b___+\b', '[REDACTED]', findings_text)
+            findings_text = self.PATTERNS.redacted.sub('[REDACTED]', findings_text)
             # Remove bracketed redactions
-            findings_text = re.sub(
-                r'\[\*+[^\]]*\*+\]', '[REDACTED]', findings_text)
+            findings_text = self.PATTERNS.bracket_redaction.sub('[REDACTED]', findings_text)
             # Normalize whitespace
-            findings_text = re.sub(r'\s+', ' ', findings_text)
+            findings_text = self.PATTERNS.whitespace.sub(' ', findings_text)
             findings_text = findings_text.strip()
 
             # Quality control - ensure substantial findings content
             if len(findings_text) < 20:
                 # Try to extract from full text if FINDINGS section too short
-                sentences = re.split(r'[.!?]+', radiology_text)
+                sentences = self.PATTERNS.sentence_break.split(radiology_text)
                 medical_sentences = []
 
-                medical_terms = [
-                    'normal', 'abnormal', 'mass', 'lesion', 'consolidation', 'effusion',
-                    'edema', 'hemorrhage', 'fracture', 'dislocation', 'stenosis',
-                    'dilatation', 'enhancement', 'atelectasis', 'pneumonia', 'cardiomegaly',
-                    'opacity', 'density', 'nodule', 'calcification'
-                ]
-
                 for sentence in sentences:
                     sentence = sentence.strip()
-                    if len(sentence) > 15 and any(term in sentence.lower() for term in medical_terms):
+                    if len(sentence) > 15 and self.MEDICAL_TERMS.contains_any(sentence):
                         medical_sentences.append(sentence)
                         if len(' '.join(medical_sentences)) > 400:
                             break
@@ -393,7 +490,7 @@ IMPRESSION:"""
             fallback_text = str(data.get('radiology report', ''))
             if fallback_text.strip():
                 # Extract first meaningful sentence as fallback
-                sentences = re.split(r'[.!?]+', fallback_text)
+                sentences = self.PATTERNS.sentence_break.split(fallback_text)
                 for sentence in sentences[:3]:
                     if len(sentence.strip()) > 20:
                         return {'user_input': sentence.strip()}
@@ -401,7 +498,6 @@ IMPRESSION:"""
 
     async def postprocess_result(self, result: str) -> str:
         """후처리 최적화 - Conciseness 및 Clinical Clarity 강화"""
-        import re
 
         try:
             if not result or not isinstance(result, str):
@@ -427,43 +523,15 @@ IMPRESSION:"""
                 result += '.'
 
             # CONCISENESS OPTIMIZATION - Remove verbose phrases
-            conciseness_replacements = {
-                # Verbose medical expressions to concise equivalents
-                r'there (?:is|are) evidence of': '',
-                r'findings (?:are )?consistent with(?:\s+and\s+compatible\s+with)?': '',
-                r'(?:appears to|seems to) (?:be|demonstrate|show)': '',
-                r'compatible with(?:\s+a\s+diagnosis\s+of)?': '',
-                r'suggestive of(?:\s+the\s+presence\s+of)?': '',
-                r'concerning for(?:\s+the\s+possibility\s+of)?': 'concerning for',
-                r'no evidence of(?:\s+any)?': 'no',
-                r'there is no(?:\s+evidence\s+of)?': 'no',
-                r'demonstrates?(?:\s+evidence\s+of)?': '',
-                r'shows?(?:\s+signs\s+of)?': '',
-                r'reveals?(?:\s+the\s+presence\s+of)?': '',
-                r'indicates?(?:\s+the\s+presence\s+of)?': '',
-                r'mild(?:\s+degree\s+of)?': 'mild',
-                r'moderate(?:\s+degree\s+of)?': 'moderate',
-                r'severe(?:\s+degree\s+of)?': 'severe',
-                r'small(?:\s+amount\s+of)?': 'small',
-                r'large(?:\s+amount\s+of)?': 'large',
-                r'(?:some\s+)?degree\s+of\s+': '',
-                r'(?:a\s+)?finding\s+of\s+': '',
-                r'presence\s+of\s+': '',
-                r'(?:most\s+)?likely\s+represents?': 'likely',
-                r'probably\s+represents?': 'probably',
-                r'possibly\s+represents?': 'possibly',
-            }
-
-            for pattern, replacement in conciseness_replacements.items():
-                result = re.sub(pattern, replacement,
-                                result, flags=re.IGNORECASE)
+            for pattern, replacement in self.CONCISENESS_REPLACEMENTS.items():
+                result = self.CONCISENESS[pattern].sub(replacement, result)
 
             # Clean up extra spaces and punctuation
-            result = re.sub(r'\s+', ' ', result)
+            result = self.PATTERNS.whitespace.sub(' ', result)
             # Remove space before punctuation
-            result = re.sub(r'\s+([,.])', r'\1', result)
+            result = self.PATTERNS.space_before_punct.sub(r'\1', result)
             # Add space after punctuation before capital
-            result = re.sub(r'([,.])([A-Z])', r'\1 \2', result)
+            result = self.PATTERNS.punct_before_capital.sub(r'\1 \2', result)
 
             # CLINICAL CLARITY - Standardize medical terminology
             medical_standardizations = {
@@ -511,16 +579,9 @@ IMPRESSION:"""
                 sentences = [s.strip() for s in result.split('.') if s.strip()]
                 if sentences:
                     # Priority scoring for medical relevance
-                    priority_terms = [
-                        'fracture', 'mass', 'tumor', 'hemorrhage', 'infarction', 'pneumonia',
-                        'effusion', 'pneumothorax', 'cardiomegaly', 'consolidation', 'embolism',
-                        'stenosis', 'occlusion', 'aneurysm', 'dissection', 'malignancy'
-                    ]
-
                     scored_sentences = []
                     for sentence in sentences:
-                        score = sum(
-                            2 for term in priority_terms if term in sentence.lower())
+                        score = 2 * len(self.PRIORITY_TERMS.found(sentence))
                         # Medical terms tend to be longer
                         score += len([w for w in sentence.split()
                                      if len(w) > 6])
@@ -558,6 +619,50 @@ IMPRESSION:"""
 class TaskCProcessor(DatathonProcessor):
     """개선된 TaskCProcessor - DatathonProcessor 기반"""
 
+    # 전/후처리 정규식 (클래스 정의 시 한 번 컴파일)
+    # - deid_marker: '[** ... **]' 안에는 '['가 없으므로 다음 '['에서 멈춤 (닫히지 않은 표시가 많아도 선형 시간)
+    PATTERNS = CompiledPatterns({
+        'redacted': r"___+",
+        'deid_marker': r"\[\*+[^\[\n]*?\*+\]",
+        'whitespace': r"\s+",
+        'discharge_diagnosis': (
+            r"(?:Discharge|Primary|Principal|Final)\s*Diagnos[ei]s?:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
+            re.IGNORECASE | re.DOTALL),
+        'diagnosis_at_discharge': (
+            r"Diagnos[ei]s\s*(?:on\s*discharge|at\s*discharge):\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
+            re.IGNORECASE | re.DOTALL),
+        'chief_complaint': (r"Chief Complaint:\s*([^\n]+)", re.IGNORECASE),
+        'assessment': (r"(?:Assessment|Impression)(?:\s*and\s*Plan)?:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
+                       re.IGNORECASE | re.DOTALL),
+        'a_and_p': (r"A&P:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)", re.IGNORECASE | re.DOTALL),
+        'hpi': (r"History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|\nReview of|$)",
+                re.IGNORECASE | re.DOTALL),
+        'hospital_course': (r"Hospital Course:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)", re.IGNORECASE | re.DOTALL),
+        'sentence_break': r"[.!?]+",
+        'non_code': r"[^A-Z0-9]",
+        # 출력에서 코드 후보를 찾는 패턴 (ICD_CANDIDATES 순서로 적용)
+        'icd_code': r"\b[A-TV-Z]\d{2}[A-Z0-9]*\b",
+        'icd_letter_extension': r"\b[A-TV-Z]\d{2}[A-Z]\d+[A-Z]*\b",
+        'icd_frequent_chapter': r"\b[IJKLMNRS]\d{3,4}[A-Z0-9]*\b",
+        'valid_code': r"^[A-TV-Z]\d{2}[A-Z0-9]*$",
+    })
+    DIAGNOSIS_PATTERNS = ('discharge_diagnosis', 'diagnosis_at_discharge')
+    ASSESSMENT_PATTERNS = ('assessment', 'a_and_p')
+    ICD_CANDIDATES = ('icd_code', 'icd_letter_extension', 'icd_frequent_chapter')
+
+    # 비구조적 텍스트에서 핵심 문장을 고르는 우선 용어
+    PRIORITY_TERMS = KeywordSet([
+        "chest pain", "myocardial infarction", "troponin", "stemi", "nstemi",
+        "atrial fibrillation", "afib", "heart failure", "chf",
+        "deep vein thrombosis", "dvt", "pulmonary embolism",
+        "stroke", "cerebral infarction", "intracranial hemorrhage",
+        "respiratory failure", "pneumonia", "copd exacerbation",
+        "acute kidney", "renal failure", "aki", "creatinine",
+        "syncope", "seizure", "altered mental status",
+        "cirrhosis", "liver", "ascites", "pancreatitis",
+        "fall", "trauma", "fracture", "head injury",
+    ])
+
     def __init__(self, api_key, train_df=None):
         # 부모 초기화
         super().__init__(api_key)
@@ -569,14 +674,12 @@ class TaskCProcessor(DatathonProcessor):
 
     def _build_training_insights(self, train_df):
         """훈련 데이터에서 코드 빈도 분석"""
-        import re
-        import pandas as pd
 
         def parse_codes(s):
             if pd.isna(s) or not str(s).strip():
                 return []
             return [
-                re.sub(r"[^A-Z0-9]", "", c.strip().upper())
+                self.PATTERNS.non_code.sub("", c.strip().upper())
                 for c in str(s).split(",") if c.strip()
             ]
 
@@ -628,8 +731,6 @@ PRIMARY ICD-10-CM CODES:"""
 
     async def preprocess_data(self, data):
         """향상된 전처리 - 핵심 의료 정보 추출"""
-        import re
-        import pandas as pd
 
         try:
             hospital_course = (
@@ -642,59 +743,42 @@ PRIMARY ICD-10-CM CODES:"""
                 return {"user_input": "Patient admitted for routine medical care."}
 
             # 텍스트 정리
-            text = re.sub(r"___+", " ", hospital_course)
-            text = re.sub(r"\[\*+.*?\*+\]", " ", text)
-            text = re.sub(r"\s+", " ", text).strip()
+            text = self.PATTERNS.redacted.sub(" ", hospital_course)
+            text = self.PATTERNS.deid_marker.sub(" ", text)
+            text = self.PATTERNS.whitespace.sub(" ", text).strip()
 
             # 핵심 섹션 추출
             sections = []
 
             # Discharge Diagnosis
-            dd_patterns = [
-                r"(?:Discharge|Primary|Principal|Final)\s*Diagnos[ei]s?:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-                r"Diagnos[ei]s\s*(?:on\s*discharge|at\s*discharge):\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-            ]
-            for pattern in dd_patterns:
-                match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+            for name in self.DIAGNOSIS_PATTERNS:
+                match = self.PATTERNS[name].search(text)
                 if match and match.group(1).strip():
                     sections.append(
                         f"DISCHARGE DIAGNOSIS: {match.group(1).strip()[:400]}")
                     break
 
             # Chief Complaint
-            cc_match = re.search(
-                r"Chief Complaint:\s*([^\n]+)", text, re.IGNORECASE)
+            cc_match = self.PATTERNS.chief_complaint.search(text)
             if cc_match and cc_match.group(1).strip():
                 sections.append(
                     f"CHIEF COMPLAINT: {cc_match.group(1).strip()}")
 
             # Assessment/Impression
-            assess_patterns = [
-                r"(?:Assessment|Impression)(?:\s*and\s*Plan)?:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-                r"A&P:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-            ]
-            for pattern in assess_patterns:
-                match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+            for name in self.ASSESSMENT_PATTERNS:
+                match = self.PATTERNS[name].search(text)
                 if match and match.group(1).strip():
                     sections.append(
                         f"ASSESSMENT: {match.group(1).strip()[:300]}")
                     break
 
             # HPI
-            hpi_match = re.search(
-                r"History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|\nReview of|$)",
-                text,
-                re.IGNORECASE | re.DOTALL,
-            )
+            hpi_match = self.PATTERNS.hpi.search(text)
             if hpi_match and hpi_match.group(1).strip():
                 sections.append(f"HISTORY: {hpi_match.group(1).strip()[:400]}")
 
             # Hospital Course
-            hc_match = re.search(
-                r"Hospital Course:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-                text,
-                re.IGNORECASE | re.DOTALL,
-            )
+            hc_match = self.PATTERNS.hospital_course.search(text)
             if hc_match and hc_match.group(1).strip():
                 sections.append(
                     f"HOSPITAL COURSE: {hc_match.group(1).strip()[:500]}")
@@ -717,28 +801,15 @@ PRIMARY ICD-10-CM CODES:"""
 
     def _extract_key_medical_content(self, text):
         """비구조적 텍스트에서 핵심 의료 내용 추출"""
-        import re
-
-        priority_terms = [
-            "chest pain", "myocardial infarction", "troponin", "stemi", "nstemi",
-            "atrial fibrillation", "afib", "heart failure", "chf",
-            "deep vein thrombosis", "dvt", "pulmonary embolism",
-            "stroke", "cerebral infarction", "intracranial hemorrhage",
-            "respiratory failure", "pneumonia", "copd exacerbation",
-            "acute kidney", "renal failure", "aki", "creatinine",
-            "syncope", "seizure", "altered mental status",
-            "cirrhosis", "liver", "ascites", "pancreatitis",
-            "fall", "trauma", "fracture", "head injury",
-        ]
-
-        sentences = re.split(r"[.!?]+", text)
+
+        sentences = self.PATTERNS.sentence_break.split(text)
         important_sentences = []
 
         for sentence in sentences:
             s = sentence.strip()
             if len(s) < 10:
                 continue
-            if any(term in s.lower() for term in priority_terms):
+            if self.PRIORITY_TERMS.contains_any(s):
                 important_sentences.append(s)
                 if len(important_sentences) >= 15:
                     break
@@ -747,7 +818,6 @@ PRIMARY ICD-10-CM CODES:"""
 
     async def postprocess_result(self, result):
         """향상된 후처리 - ICD 코드 추출 및 검증"""
-        import re
 
         try:
             if not result or not isinstance(result, str):
@@ -769,24 +839,19 @@ PRIMARY ICD-10-CM CODES:"""
 
             # 점 제거 후 패턴 매칭
             result_no_dots = result_clean.replace(".", "")
-            icd_patterns = [
-                r"\b[A-TV-Z]\d{2}[A-Z0-9]*\b",
-                r"\b[A-TV-Z]\d{2}[A-Z]\d+[A-Z]*\b",
-                r"\b[IJKLMNRS]\d{3,4}[A-Z0-9]*\b",
-            ]
 
             all_codes = []
-            for pattern in icd_patterns:
-                all_codes.extend(re.findall(pattern, result_no_dots))
+            for name in self.ICD_CANDIDATES:
+                all_codes.extend(self.PATTERNS[name].findall(result_no_dots))
 
             valid_codes, seen = [], set()
             for code in all_codes:
-                clean_code = re.sub(r"[^A-Z0-9]", "", code.upper())
+                clean_code = self.PATTERNS.non_code.sub("", code.upper())
                 if (
                     3 <= len(clean_code) <= 8
                     and clean_code not in seen
                     and not clean_code.startswith("U")
-                    and re.match(r"^[A-TV-Z]\d{2}[A-Z0-9]*$", clean_code)
+                    and self.PATTERNS.valid_code.match(clean_code)
                     and not clean_code.endswith("000")
                 ):
                     valid_codes.append(clean_code)
@@ -1,12 +1,45 @@
-from typing import Any
+from typing import Any, Dict
 import pandas as pd
 import asyncio
+import re
 from processor import DatathonProcessor
 
 
+class CompiledPatterns:
+    """
+    {이름: 패턴 문자열 또는 (패턴 문자열, flags)}를 클래스 정의 시 한 번 컴파일해 속성/키로 꺼내 쓰는 모음
+    행마다 re.search/re.sub에 문자열 패턴을 넘겨 re 모듈 내부 캐시를 거치지 않도록 합니다.
+    """
+
+    def __init__(self, patterns):
+        self._compiled = {name: re.compile(spec) if isinstance(spec, str) else re.compile(*spec)
+                          for name, spec in patterns.items()}
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['_compiled'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name):
+        return self._compiled[name]
+
+
 class TaskAProcessor(DatathonProcessor):
     """Task A: Brief Hospital Course 작성"""
 
+    # 전처리 정규식 (클래스 정의 시 한 번 컴파일)
+    PATTERNS = CompiledPatterns({
+        'chief_complaint': r'Chief Complaint:\s*([^\n]+)',
+        'service': r'Service:\s*([^\n]+)',
+        'hpi': (r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|Physical Exam|$)', re.DOTALL),
+        'procedures': (r'Major Surgical or Invasive Procedure:\s*(.*?)(?=\n\n|History of Present|$)', re.DOTALL),
+        'past_medical_history': (r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)', re.DOTALL),
+        'imaging_impression': (r'IMPRESSION:\s*(.*?)(?=\n\n|\n[A-Z_]|\Z)', re.DOTALL),
+        'redacted': r'___+',
+        'whitespace': r'\s+',
+    })
+
     def get_model_name(self) -> str:
         return "LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct-AWQ"  # 성능 최적화
         # return "meta-llama/Llama-3.1-8B-Instruct"  # 베이스라인 모델
@@ -46,9 +79,6 @@ BRIEF HOSPITAL COURSE:"""
     # ✅ 정확한 반환 타입
     async def preprocess_data(self, data: Any) -> Dict[str, Any]:
         """의료 기록을 Brief Hospital Course 작성을 위해 전처리"""
-        import re
-        import pandas as pd
-
         medical_record = data['medical record']
 
         if pd.isna(medical_record) or not isinstance(medical_record, str):
@@ -58,30 +88,27 @@ BRIEF HOSPITAL COURSE:"""
 
         # Chief Complaint & Service
         if 'Chief Complaint:' in medical_record:
-            cc_match = re.search(
-                r'Chief Complaint:\s*([^\n]+)', medical_record)
+            cc_match = self.PATTERNS.chief_complaint.search(medical_record)
             if cc_match:
                 processed_sections.append(
                     f"Chief Complaint: {cc_match.group(1).strip()}")
 
         if 'Service:' in medical_record:
-            service_match = re.search(r'Service:\s*([^\n]+)', medical_record)
+            service_match = self.PATTERNS.service.search(medical_record)
             if service_match:
                 processed_sections.append(
                     f"Service: {service_match.group(1).strip()}")
 
         # History of Present Illness
         if 'History of Present Illness:' in medical_record:
-            hpi_match = re.search(r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|Physical Exam|$)',
-                                  medical_record, re.DOTALL)
+            hpi_match = self.PATTERNS.hpi.search(medical_record)
             if hpi_match:
                 hpi = hpi_match.group(1).strip()[:800]
                 processed_sections.append(f"History: {hpi}")
 
         # Major Procedures
         if 'Major Surgical or Invasive Procedure:' in medical_record:
-            proc_match = re.search(r'Major Surgical or Invasive Procedure:\s*(.*?)(?=\n\n|History of Present|$)',
-                                   medical_record, re.DOTALL)
+            proc_match = self.PATTERNS.procedures.search(medical_record)
             if proc_match:
                 proc = proc_match.group(1).strip()
                 if proc.lower() not in ['none', 'none.']:
@@ -89,31 +116,27 @@ BRIEF HOSPITAL COURSE:"""
 
         # Past Medical History
         if 'Past Medical History:' in medical_record:
-            pmh_match = re.search(r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)',
-                                  medical_record, re.DOTALL)
+            pmh_match = self.PATTERNS.past_medical_history.search(medical_record)
             if pmh_match:
                 pmh = pmh_match.group(1).strip()[:400]
                 processed_sections.append(f"Past Medical History: {pmh}")
 
         # Imaging IMPRESSION
-        impressions = re.findall(
-            r'IMPRESSION:\s*(.*?)(?=\n\n|\n[A-Z_]|\Z)', medical_record, re.DOTALL)
+        impressions = self.PATTERNS.imaging_impression.findall(medical_record)
         if impressions:
             for i, imp in enumerate(impressions[:2]):
                 processed_sections.append(
                     f"Imaging {i+1}: {imp.strip()[:200]}")
 
         processed_text = '\n\n'.join(processed_sections)
-        processed_text = re.sub(r'___+', '[REDACTED]', processed_text)
-        processed_text = re.sub(r'\s+', ' ', processed_text)
+        processed_text = self.PATTERNS.redacted.sub('[REDACTED]', processed_text)
+        processed_text = self.PATTERNS.whitespace.sub(' ', processed_text)
         processed_text = processed_text[:3000]
 
         return {'user_input': processed_text.strip()}
 
     async def postprocess_result(self, result: str) -> str:
         """결과 정리 및 최적화"""
-        import re
-
         result = result.strip()
 
         # "BRIEF HOSPITAL COURSE:" 제거
@@ -163,6 +186,16 @@ BRIEF HOSPITAL COURSE:"""
 class TaskBProcessor(DatathonProcessor):
     """Task B: Radiology Impression 요약"""
 
+    # 전/후처리 정규식 (클래스 정의 시 한 번 컴파일)
+    # - dose_report: 'DLP ... mGy-cm' 선량 문구는 짧으므로(데이터 최대 25자) 80자까지만 찾음 (같은 줄에 DLP가 많아도 선형 시간)
+    PATTERNS = CompiledPatterns({
+        'leading_colon': r'^[:\s]*',
+        'redacted': r'\b___\b',
+        'dose_report': r'\bDLP[^\n]{0,80}?mGy-cm\b',
+        'whitespace': r'\s+',
+        'numbered': r'^\d+\.',
+    })
+
     def get_model_name(self) -> str:
         return "meta-llama/Llama-3.1-8B-Instruct"  # 라마 성능이 더 나았음
 
@@ -207,9 +240,6 @@ class TaskBProcessor(DatathonProcessor):
 
     async def preprocess_data(self, data: Any) -> Dict[str, Any]:
         """방사선 보고서를 IMPRESSION 작성을 위해 전처리 - NaN 안전 처리"""
-        import re
-        import pandas as pd
-
         # 방사선 보고서 텍스트 추출
         radiology_text = data['radiology report']
 
@@ -232,18 +262,15 @@ class TaskBProcessor(DatathonProcessor):
             findings_text = radiology_text
 
         # 텍스트 정제
-        findings_text = re.sub(r'^[:\s]*', '', findings_text)
-        findings_text = re.sub(r'\b___\b', '', findings_text)  # 익명화 마커
-        findings_text = re.sub(r'\bDLP.*?mGy-cm\b', '',
-                               findings_text)  # 방사선량 정보
-        findings_text = re.sub(r'\s+', ' ', findings_text)  # 여러 공백을 하나로
+        findings_text = self.PATTERNS.leading_colon.sub('', findings_text)
+        findings_text = self.PATTERNS.redacted.sub('', findings_text)  # 익명화 마커
+        findings_text = self.PATTERNS.dose_report.sub('', findings_text)  # 방사선량 정보
+        findings_text = self.PATTERNS.whitespace.sub(' ', findings_text)  # 여러 공백을 하나로
 
         return {'user_input': findings_text.strip()}
 
     async def postprocess_result(self, result: str) -> str:
         """간소화된 후처리 (시간 최적화)"""
-        import re
-
         result = result.strip()
 
         # IMPRESSION: 제거
@@ -255,7 +282,7 @@ class TaskBProcessor(DatathonProcessor):
             result += '.'
 
         # 간단한 번호 매김
-        if not re.match(r'^\d+\.', result) and '. ' in result:
+        if not self.PATTERNS.numbered.match(result) and '. ' in result:
             sentences = [s.strip() for s in result.split('.') if s.strip()]
             if len(sentences) >= 2:
                 result = '. '.join(
@@ -267,6 +294,20 @@ class TaskBProcessor(DatathonProcessor):
 class TaskCProcessor(DatathonProcessor):
     """Task C: ICD 코드 예측"""
 
+    # 전/후처리 정규식 (클래스 정의 시 한 번 컴파일)
+    # - icd_fallback: 영문자 연속의 첫 글자에서만 시작 (긴 영문자 연속에서 시작 위치마다 다시 훑지 않도록)
+    PATTERNS = CompiledPatterns({
+        'chief_complaint': r'Chief Complaint:\s*([^\n]+)',
+        'service': r'Service:\s*([^\n]+)',
+        'hpi': (r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|$)', re.DOTALL),
+        'past_medical_history': (r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)', re.DOTALL),
+        'imaging_impression': (r'IMPRESSION:\s*(.*?)(?=\n\n|\n[A-Z_]|\Z)', re.DOTALL),
+        'redacted': r'___+',
+        'whitespace': r'\s+',
+        'icd_code': r'[A-Z]\d{2}[A-Z0-9]*',
+        'icd_fallback': r'(?<![A-Z])[A-Z]+\d+[A-Z0-9]*',
+    })
+
     def get_model_name(self) -> str:
         return "LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct-AWQ"
 
@@ -321,9 +362,6 @@ CODES:"""
     # ✅ 정확한 반환 타입
     async def preprocess_data(self, data: Any) -> Dict[str, Any]:
         """퇴원 요약을 ICD 코드 예측을 위해 전처리"""
-        import re
-        import pandas as pd
-
         hospital_course = data['hospital_course']
 
         if pd.isna(hospital_course) or not isinstance(hospital_course, str):
@@ -333,54 +371,48 @@ CODES:"""
 
         # Chief Complaint 추출
         if 'Chief Complaint:' in hospital_course:
-            cc_match = re.search(
-                r'Chief Complaint:\s*([^\n]+)', hospital_course)
+            cc_match = self.PATTERNS.chief_complaint.search(hospital_course)
             if cc_match:
                 important_sections.append(
                     f"Chief Complaint: {cc_match.group(1).strip()}")
 
         # Service 추출
         if 'Service:' in hospital_course:
-            service_match = re.search(r'Service:\s*([^\n]+)', hospital_course)
+            service_match = self.PATTERNS.service.search(hospital_course)
             if service_match:
                 important_sections.append(
                     f"Service: {service_match.group(1).strip()}")
 
         # History of Present Illness 추출
         if 'History of Present Illness:' in hospital_course:
-            hpi_match = re.search(r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|$)',
-                                  hospital_course, re.DOTALL)
+            hpi_match = self.PATTERNS.hpi.search(hospital_course)
             if hpi_match:
                 hpi = hpi_match.group(1).strip()[:500]
                 important_sections.append(f"History: {hpi}")
 
         # Past Medical History 추출
         if 'Past Medical History:' in hospital_course:
-            pmh_match = re.search(r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)',
-                                  hospital_course, re.DOTALL)
+            pmh_match = self.PATTERNS.past_medical_history.search(hospital_course)
             if pmh_match:
                 pmh = pmh_match.group(1).strip()[:300]
                 important_sections.append(f"Past Medical History: {pmh}")
 
         # Imaging IMPRESSION 추출
-        impressions = re.findall(
-            r'IMPRESSION:\s*(.*?)(?=\n\n|\n[A-Z_]|\Z)', hospital_course, re.DOTALL)
+        impressions = self.PATTERNS.imaging_impression.findall(hospital_course)
         if impressions:
             for i, imp in enumerate(impressions[:2]):
                 important_sections.append(
                     f"Imaging {i+1}: {imp.strip()[:200]}")
 
         processed_text = '\n\n'.join(important_sections)
-        processed_text = re.sub(r'___+', '[REDACTED]', processed_text)
-        processed_text = re.sub(r'\s+', ' ', processed_text)
+        processed_text = self.PATTERNS.redacted.sub('[REDACTED]', processed_text)
+        processed_text = self.PATTERNS.whitespace.sub(' ', processed_text)
         processed_text = processed_text[:2000]
 
         return {'user_input': processed_text.strip()}
 
     async def postprocess_result(self, result: str) -> str:
         """결과 정리 및 ICD 코드 추출"""
-        import re
-
         result = result.strip()
 
         # "CODES:" 제거
@@ -388,14 +420,12 @@ CODES:"""
             result = result.split(':', 1)[1].strip()
 
         # ICD 코드 정규식 패턴 매칭
-        icd_pattern = r'[A-Z]\d{2}[A-Z0-9]*'
-        codes = re.findall(icd_pattern, result.upper())
+        codes = self.PATTERNS.icd_code.findall(result.upper())
         unique_codes = list(dict.fromkeys(codes))  # 중복 제거하면서 순서 유지
 
         # 코드가 없으면 fallback 패턴 시도
         if not unique_codes:
-            fallback_pattern = r'[A-Z]+\d+[A-Z0-9]*'
-            codes = re.findall(fallback_pattern, result.upper())
+            codes = self.PATTERNS.icd_fallback.findall(result.upper())
             unique_codes = list(dict.fromkeys(codes))[:3]
 
         # 최대 5개 코드로 제한
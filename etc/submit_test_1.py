@@ -1,10 +1,43 @@
 from typing import Any, Dict
  import pandas as pd
+ import re
   from processor import DatathonProcessor
 
+
+   class CompiledPatterns:
+       """
+       {이름: 패턴 문자열 또는 (패턴 문자열, flags)}를 클래스 정의 시 한 번 컴파일해 속성/키로 꺼내 쓰는 모음
+       행마다 re.search/re.sub에 문자열 패턴을 넘겨 re 모듈 내부 캐시를 거치지 않도록 합니다.
+       """
+
+       def __init__(self, patterns):
+           self._compiled = {name: re.compile(spec) if isinstance(spec, str) else re.compile(*spec)
+                             for name, spec in patterns.items()}
+
+       def __getattr__(self, name):
+           try:
+               return self.__dict__['_compiled'][name]
+           except KeyError:
+               raise AttributeError(name) from None
+
+       def __getitem__(self, name):
+           return self._compiled[name]
+
+
    class TaskAProcessor(DatathonProcessor):
         """Task A: Brief Hospital Course 작성"""
 
+        # 전처리 정규식 (클래스 정의 시 한 번 컴파일)
+        PATTERNS = CompiledPatterns({
+            'chief_complaint': r'Chief Complaint:\s*([^\n]+)',
+            'service': r'Service:\s*([^\n]+)',
+            'hpi': (r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|Physical Exam|$)', re.DOTALL),
+            'procedures': (r'Major Surgical or Invasive Procedure:\s*(.*?)(?=\n\n|History of Present|$)', re.DOTALL),
+            'past_medical_history': (r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)', re.DOTALL),
+            'redacted': r'___+',
+            'whitespace': r'\s+',
+        })
+
         def get_model_name(self) -> str:
             return "meta-llama/Llama-3.1-8B-Instruct"
 
@@ -42,9 +75,6 @@ from typing import Any, Dict
 
         async def preprocess_data(self, data: Any) -> Dict[str, Any]:
             """의료 기록을 Brief Hospital Course 작성을 위해 전처리"""
-            import re
-            import pandas as pd
-
             try:
                 medical_record = data.get('medical record', '')
 
@@ -55,32 +85,28 @@ from typing import Any, Dict
 
                 # Chief Complaint
                 if 'Chief Complaint:' in medical_record:
-                    cc_match = re.search(
-                        r'Chief Complaint:\s*([^\n]+)', medical_record)
+                    cc_match = self.PATTERNS.chief_complaint.search(medical_record)
                     if cc_match and cc_match.group(1).strip():
                         processed_sections.append(
                             f"Chief Complaint: {cc_match.group(1).strip()}")
 
                 # Service
                 if 'Service:' in medical_record:
-                    service_match = re.search(
-                        r'Service:\s*([^\n]+)', medical_record)
+                    service_match = self.PATTERNS.service.search(medical_record)
                     if service_match and service_match.group(1).strip():
                         processed_sections.append(
                             f"Service: {service_match.group(1).strip()}")
 
                 # History
                 if 'History of Present Illness:' in medical_record:
-                    hpi_match = re.search(r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|Physical Exam|$)',
-                                          medical_record, re.DOTALL)
+                    hpi_match = self.PATTERNS.hpi.search(medical_record)
                     if hpi_match and hpi_match.group(1).strip():
                         hpi = hpi_match.group(1).strip()[:800]
                         processed_sections.append(f"History: {hpi}")
 
                 # Major Procedures
                 if 'Major Surgical or Invasive Procedure:' in medical_record:
-                    proc_match = re.search(r'Major Surgical or Invasive Procedure:\s*(.*?)(?=\n\n|History of Present|$)',
-                                           medical_record, re.DOTALL)
+                    proc_match = self.PATTERNS.procedures.search(medical_record)
                     if proc_match:
                         proc = proc_match.group(1).strip()
                         if proc and proc.lower() not in ['none', 'none.', '']:
@@ -89,8 +115,7 @@ from typing import Any, Dict
 
                 # Past Medical History
                 if 'Past Medical History:' in medical_record:
-                    pmh_match = re.search(r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)',
-                                          medical_record, re.DOTALL)
+                    pmh_match = self.PATTERNS.past_medical_history.search(medical_record)
                     if pmh_match and pmh_match.group(1).strip():
                         pmh = pmh_match.group(1).strip()[:400]
                         processed_sections.append(
@@ -101,8 +126,8 @@ from typing import Any, Dict
                 else:
                     processed_text = medical_record[:2000]  # 원본 데이터 사용
 
-                processed_text = re.sub(r'___+', '', processed_text)
-                processed_text = re.sub(r'\s+', ' ', processed_text)
+                processed_text = self.PATTERNS.redacted.sub('', processed_text)
+                processed_text = self.PATTERNS.whitespace.sub(' ', processed_text)
                 processed_text = processed_text.strip()[:3000]
 
                 return {'user_input': processed_text if processed_text else 'Patient admitted for medical care.'}
@@ -113,8 +138,6 @@ from typing import Any, Dict
 
         async def postprocess_result(self, result: str) -> str:
             """결과 정리 및 최적화"""
-            import re
-
             try:
                 if not result or not isinstance(result, str):
                     return "Brief hospital course documented."
@@ -175,6 +198,13 @@ from typing import Any, Dict
     class TaskBProcessor(DatathonProcessor):
         """Task B: Radiology Impression 요약"""
 
+        # 전처리 정규식 (클래스 정의 시 한 번 컴파일)
+        PATTERNS = CompiledPatterns({
+            'leading_colon': r'^[:\s]*',
+            'redacted': r'\b___\b',
+            'whitespace': r'\s+',
+        })
+
         def get_model_name(self) -> str:
             return "meta-llama/Llama-3.1-8B-Instruct"
 
@@ -208,9 +238,6 @@ from typing import Any, Dict
 
         async def preprocess_data(self, data: Any) -> Dict[str, Any]:
             """방사선 보고서를 IMPRESSION 작성을 위해 전처리"""
-            import re
-            import pandas as pd
-
             try:
                 radiology_text = data.get('radiology report', '')
 
@@ -231,9 +258,9 @@ from typing import Any, Dict
                     findings_text = findings.strip()
 
                 # Clean text
-                findings_text = re.sub(r'^[:\s]*', '', findings_text)
-                findings_text = re.sub(r'\b___\b', '', findings_text)
-                findings_text = re.sub(r'\s+', ' ', findings_text)
+                findings_text = self.PATTERNS.leading_colon.sub('', findings_text)
+                findings_text = self.PATTERNS.redacted.sub('', findings_text)
+                findings_text = self.PATTERNS.whitespace.sub(' ', findings_text)
                 findings_text = findings_text.strip()
 
                 return {'user_input': findings_text if findings_text else 'Normal examination.'}
@@ -244,8 +271,6 @@ from typing import Any, Dict
 
         async def postprocess_result(self, result: str) -> str:
             """간소화된 후처리"""
-            import re
-
             try:
                 if not result or not isinstance(result, str):
                     return "No acute findings."
@@ -287,6 +312,18 @@ from typing import Any, Dict
     class TaskCProcessor(DatathonProcessor):
         """Task C: ICD 코드 예측"""
 
+        # 전/후처리 정규식 (클래스 정의 시 한 번 컴파일)
+        # - icd_fallback: 영문자 연속의 첫 글자에서만 시작 (긴 영문자 연속에서 시작 위치마다 다시 훑지 않도록)
+        PATTERNS = CompiledPatterns({
+            'chief_complaint': r'Chief Complaint:\s*([^\n]+)',
+            'service': r'Service:\s*([^\n]+)',
+            'hpi': (r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|$)', re.DOTALL),
+            'redacted': r'___+',
+            'whitespace': r'\s+',
+            'icd_code': r'[A-Z]\d{2}[A-Z0-9]*',
+            'icd_fallback': r'(?<![A-Z])[A-Z]+\d+[A-Z0-9]*',
+        })
+
         def get_model_name(self) -> str:
             return "LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct-AWQ"
 
@@ -329,9 +366,6 @@ from typing import Any, Dict
 
         async def preprocess_data(self, data: Any) -> Dict[str, Any]:
             """퇴원 요약을 ICD 코드 예측을 위해 전처리"""
-            import re
-            import pandas as pd
-
             try:
                 hospital_course = data.get('hospital_course', '')
 
@@ -342,24 +376,21 @@ from typing import Any, Dict
 
                 # Chief Complaint
                 if 'Chief Complaint:' in hospital_course:
-                    cc_match = re.search(
-                        r'Chief Complaint:\s*([^\n]+)', hospital_course)
+                    cc_match = self.PATTERNS.chief_complaint.search(hospital_course)
                     if cc_match and cc_match.group(1).strip():
                         important_sections.append(
                             f"Chief Complaint: {cc_match.group(1).strip()}")
 
                 # Service
                 if 'Service:' in hospital_course:
-                    service_match = re.search(
-                        r'Service:\s*([^\n]+)', hospital_course)
+                    service_match = self.PATTERNS.service.search(hospital_course)
                     if service_match and service_match.group(1).strip():
                         important_sections.append(
                             f"Service: {service_match.group(1).strip()}")
 
                 # History
                 if 'History of Present Illness:' in hospital_course:
-                    hpi_match = re.search(r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|$)',
-                                          hospital_course, re.DOTALL)
+                    hpi_match = self.PATTERNS.hpi.search(hospital_course)
                     if hpi_match and hpi_match.group(1).strip():
                         hpi = hpi_match.group(1).strip()[:500]
                         important_sections.append(f"History: {hpi}")
@@ -369,8 +400,8 @@ from typing import Any, Dict
                 else:
                     processed_text = hospital_course[:1500]  # 원본 사용
 
-                processed_text = re.sub(r'___+', '', processed_text)
-                processed_text = re.sub(r'\s+', ' ', processed_text)
+                processed_text = self.PATTERNS.redacted.sub('', processed_text)
+                processed_text = self.PATTERNS.whitespace.sub(' ', processed_text)
                 processed_text = processed_text.strip()[:2000]
 
                 return {'user_input': processed_text if processed_text else 'Patient admitted for medical evaluation.'}
@@ -381,8 +412,6 @@ from typing import Any, Dict
 
         async def postprocess_result(self, result: str) -> str:
             """결과 정리 및 ICD 코드 추출"""
-            import re
-
             try:
                 if not result or not isinstance(result, str):
                     return 'Z515'
@@ -396,8 +425,7 @@ from typing import Any, Dict
                     return 'Z515'
 
                 # ICD code extraction
-                icd_pattern = r'[A-Z]\d{2}[A-Z0-9]*'
-                codes = re.findall(icd_pattern, result.upper())
+                codes = self.PATTERNS.icd_code.findall(result.upper())
                 unique_codes = []
                 seen = set()
                 for code in codes:
@@ -406,8 +434,7 @@ from typing import Any, Dict
                         seen.add(code)
 
                 if not unique_codes:
-                    fallback_pattern = r'[A-Z]+\d+[A-Z0-9]*'
-                    codes = re.findall(fallback_pattern, result.upper())
+                    codes = self.PATTERNS.icd_fallback.findall(result.upper())
                     unique_codes = []
                     seen = set()
                     for code in codes[:3]:  # 최대 3개만
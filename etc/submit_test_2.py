@@ -6,9 +6,40 @@ import asyncio
 from processor import DatathonProcessor
 
 
+class CompiledPatterns:
+    """
+    {이름: 패턴 문자열 또는 (패턴 문자열, flags)}를 클래스 정의 시 한 번 컴파일해 속성/키로 꺼내 쓰는 모음
+    행마다 re.search/re.sub에 문자열 패턴을 넘겨 re 모듈 내부 캐시를 거치지 않도록 합니다.
+    """
+
+    def __init__(self, patterns):
+        self._compiled = {name: re.compile(spec) if isinstance(spec, str) else re.compile(*spec)
+                          for name, spec in patterns.items()}
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['_compiled'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name):
+        return self._compiled[name]
+
+
 class TaskAProcessor(DatathonProcessor):
     """Task A: Brief Hospital Course 작성"""
 
+    # 전처리 정규식 (클래스 정의 시 한 번 컴파일)
+    PATTERNS = CompiledPatterns({
+        'chief_complaint': r'Chief Complaint:\s*([^\n]+)',
+        'service': r'Service:\s*([^\n]+)',
+        'hpi': (r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|Physical Exam|$)', re.DOTALL),
+        'procedures': (r'Major Surgical or Invasive Procedure:\s*(.*?)(?=\n\n|History of Present|$)', re.DOTALL),
+        'past_medical_history': (r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)', re.DOTALL),
+        'redacted': r'___+',
+        'whitespace': r'\s+',
+    })
+
     def get_model_name(self) -> str:
         return "meta-llama/Llama-3.1-8B-Instruct"
 
@@ -46,9 +77,6 @@ BRIEF HOSPITAL COURSE:"""
 
     async def preprocess_data(self, data: Any) -> Dict[str, Any]:
         """의료 기록을 Brief Hospital Course 작성을 위해 전처리"""
-        import re
-        import pandas as pd
-
         try:
             medical_record = data.get('medical record', '')
 
@@ -59,32 +87,28 @@ BRIEF HOSPITAL COURSE:"""
 
             # Chief Complaint
             if 'Chief Complaint:' in medical_record:
-                cc_match = re.search(
-                    r'Chief Complaint:\s*([^\n]+)', medical_record)
+                cc_match = self.PATTERNS.chief_complaint.search(medical_record)
                 if cc_match:
                     processed_sections.append(
                         f"Chief Complaint: {cc_match.group(1).strip()}")
 
             # Service
             if 'Service:' in medical_record:
-                service_match = re.search(
-                    r'Service:\s*([^\n]+)', medical_record)
+                service_match = self.PATTERNS.service.search(medical_record)
                 if service_match:
                     processed_sections.append(
                         f"Service: {service_match.group(1).strip()}")
 
             # History
             if 'History of Present Illness:' in medical_record:
-                hpi_match = re.search(r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|Physical Exam|$)',
-                                      medical_record, re.DOTALL)
+                hpi_match = self.PATTERNS.hpi.search(medical_record)
                 if hpi_match:
                     hpi = hpi_match.group(1).strip()[:800]
                     processed_sections.append(f"History: {hpi}")
 
             # Major Procedures
             if 'Major Surgical or Invasive Procedure:' in medical_record:
-                proc_match = re.search(r'Major Surgical or Invasive Procedure:\s*(.*?)(?=\n\n|History of Present|$)',
-                                       medical_record, re.DOTALL)
+                proc_match = self.PATTERNS.procedures.search(medical_record)
                 if proc_match:
                     proc = proc_match.group(1).strip()
                     if proc.lower() not in ['none', 'none.', '']:
@@ -92,16 +116,15 @@ BRIEF HOSPITAL COURSE:"""
 
             # Past Medical History
             if 'Past Medical History:' in medical_record:
-                pmh_match = re.search(r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)',
-                                      medical_record, re.DOTALL)
+                pmh_match = self.PATTERNS.past_medical_history.search(medical_record)
                 if pmh_match:
                     pmh = pmh_match.group(1).strip()[:400]
                     processed_sections.append(f"Past Medical History: {pmh}")
 
             processed_text = '\n\n'.join(
                 processed_sections) if processed_sections else medical_record
-            processed_text = re.sub(r'___+', '', processed_text)
-            processed_text = re.sub(r'\s+', ' ', processed_text)
+            processed_text = self.PATTERNS.redacted.sub('', processed_text)
+            processed_text = self.PATTERNS.whitespace.sub(' ', processed_text)
             processed_text = processed_text[:3000]
 
             return {'user_input': processed_text.strip()}
@@ -111,8 +134,6 @@ BRIEF HOSPITAL COURSE:"""
 
     async def postprocess_result(self, result: str) -> str:
         """결과 정리 및 최적화"""
-        import re
-
         try:
             result = result.strip()
 
@@ -165,6 +186,14 @@ BRIEF HOSPITAL COURSE:"""
 class TaskBProcessor(DatathonProcessor):
     """Task B: Radiology Impression 요약"""
 
+    # 전/후처리 정규식 (클래스 정의 시 한 번 컴파일)
+    PATTERNS = CompiledPatterns({
+        'leading_colon': r'^[:\s]*',
+        'redacted': r'\b___\b',
+        'whitespace': r'\s+',
+        'numbered': r'^\d+\.',
+    })
+
     def get_model_name(self) -> str:
         return "meta-llama/Llama-3.1-8B-Instruct"
 
@@ -198,9 +227,6 @@ IMPRESSION:"""
 
     async def preprocess_data(self, data: Any) -> Dict[str, Any]:
         """방사선 보고서를 IMPRESSION 작성을 위해 전처리"""
-        import re
-        import pandas as pd
-
         try:
             radiology_text = data.get('radiology report', '')
 
@@ -222,9 +248,9 @@ IMPRESSION:"""
                 findings_text = radiology_text
 
             # Clean text
-            findings_text = re.sub(r'^[:\s]*', '', findings_text)
-            findings_text = re.sub(r'\b___\b', '', findings_text)
-            findings_text = re.sub(r'\s+', ' ', findings_text)
+            findings_text = self.PATTERNS.leading_colon.sub('', findings_text)
+            findings_text = self.PATTERNS.redacted.sub('', findings_text)
+            findings_text = self.PATTERNS.whitespace.sub(' ', findings_text)
 
             return {'user_input': findings_text.strip()}
 
@@ -233,8 +259,6 @@ IMPRESSION:"""
 
     async def postprocess_result(self, result: str) -> str:
         """간소화된 후처리"""
-        import re
-
         try:
             result = result.strip()
 
@@ -245,7 +269,7 @@ IMPRESSION:"""
                 result += '.'
 
             # Simple numbering
-            if not re.match(r'^\d+\.', result) and '. ' in result:
+            if not self.PATTERNS.numbered.match(result) and '. ' in result:
                 sentences = [s.strip() for s in result.split('.') if s.strip()]
                 if len(sentences) >= 2:
                     result = '. '.join(
@@ -273,6 +297,15 @@ class TaskCProcessor(DatathonProcessor):
         "W1830XA", "S066X1A", "M5489", "E2740"
     }
 
+    # 전/후처리 정규식 (클래스 정의 시 한 번 컴파일)
+    # - redaction: '[** ... **]' 안에는 '['가 없으므로 다음 '['에서 멈춤 (닫히지 않은 표시가 많아도 선형 시간)
+    PATTERNS = CompiledPatterns({
+        'redaction': r"\[\*+[^\[\n]*?\*+\]|_{3,}",
+        'whitespace': r"\s+",
+        'code_candidate': r"\b[A-Z][0-9][0-9A-Z]{1,6}X?A?\b",
+        'non_code': r"[^A-Z0-9]",
+    })
+
     def __init__(self, api_key: str, train_df: pd.DataFrame = None):
         super().__init__(api_key=api_key)
         self.code_freq: Dict[str, int] = {}
@@ -292,7 +325,7 @@ class TaskCProcessor(DatathonProcessor):
             if pd.isna(s) or not str(s).strip():
                 return []
             return [
-                re.sub(r'[^A-Z0-9]', '', c.strip().upper())
+                TaskCProcessor.PATTERNS.non_code.sub('', c.strip().upper())
                 for c in str(s).split(',') if c.strip()
             ]
 
@@ -362,8 +395,8 @@ class TaskCProcessor(DatathonProcessor):
             return {"user_input": "No medical data available"}
 
         # 약한 정리
-        text = re.sub(r"\[\*+.*?\*+\]|_{3,}", " ", text)
-        text = re.sub(r"\s+", " ", text).strip()
+        text = self.PATTERNS.redaction.sub(" ", text)
+        text = self.PATTERNS.whitespace.sub(" ", text).strip()
 
         # 핵심 섹션 위주 슬라이스
         U = text.upper()
@@ -398,14 +431,13 @@ class TaskCProcessor(DatathonProcessor):
         t = result.strip().upper()
 
         # 1) 허용 코드만 추출
-        raw_codes = re.findall(
-            r"\b[A-Z][0-9][0-9A-Z]{1,6}X?A?\b", t.replace(".", ""))
+        raw_codes = self.PATTERNS.code_candidate.findall(t.replace(".", ""))
 
         # 2) 정제 & 허용셋 필터링
         valid_codes: List[str] = []
         seen: Set[str] = set()
         for c in raw_codes:
-            c = re.sub(r"[^A-Z0-9]", "", c)
+            c = self.PATTERNS.non_code.sub("", c)
             if c in self.ALLOWED_CODES and c not in seen:
                 valid_codes.append(c)
                 seen.add(c)
@@ -0,0 +1,148 @@
+"""
+오프라인 batch 작업 도구
+1. export : 데이터셋을 OpenAI batch 형식 요청 JSONL로 저장 (custom_id = sample_id)
+2. run    : 요청 JSONL을 rpm 제한 안에서 순차 처리해 결과 JSONL에 추가 (중단 후 재실행 시 이어서 처리)
+3. ingest : 결과 JSONL에 postprocess_result를 적용해 제출 CSV 생성
+
+사용법:
+    python batch_job.py export --task A --data ../../data/taskA_test.csv --out taskA_requests.jsonl [--train ../../data/taskA_train.csv]
+    python batch_job.py run taskA_requests.jsonl taskA_results.jsonl --api-key KEY --rpm 10
+    python batch_job.py ingest --task A --data ../../data/taskA_test.csv --results taskA_results.jsonl --out submission_taskA.csv
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Optional, Set
+
+import pandas as pd
+
+from dataset_cache import load_csv_cached
+from processor import DatathonProcessor
+
+
+def _done_ids(output_path: str) -> Set[str]:
+    """이미 성공적으로 처리된 custom_id 목록"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not record.get('error'):
+                done.add(str(record['custom_id']))
+    return done
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    api_key: str,
+    api_base: Optional[str] = None,
+    rpm: Optional[int] = None,
+    max_retries: int = 3,
+) -> int:
+    """
+    요청 JSONL을 rpm 제한을 지키며 처리하고 결과를 OpenAI batch 결과 형식으로 output_path에 추가합니다.
+    이미 처리된 custom_id는 건너뛰며, 새로 처리한 요청 수를 반환합니다.
+    """
+    from langchain_core.rate_limiters import InMemoryRateLimiter
+    from openai import AsyncOpenAI
+
+    config = DatathonProcessor.DEFAULT_MODEL_CONFIG
+    rpm = rpm or config['rpm']
+    client = AsyncOpenAI(base_url=api_base or config['api_base'], api_key=api_key, max_retries=max_retries)
+    limiter = InMemoryRateLimiter(requests_per_second=rpm / 60, check_every_n_seconds=0.1, max_bucket_size=1)
+
+    done = _done_ids(output_path)
+    with open(input_path, encoding='utf-8') as f:
+        requests = [json.loads(line) for line in f if line.strip()]
+    pending = [r for r in requests if str(r['custom_id']) not in done]
+
+    async def call(request):
+        await limiter.aacquire()
+        try:
+            response = await client.chat.completions.create(**request['body'])
+            return {
+                'id': f"batch_req_{request['custom_id']}",
+                'custom_id': request['custom_id'],
+                'response': {'status_code': 200, 'request_id': response.id, 'body': response.model_dump()},
+                'error': None,
+            }
+        except Exception as e:
+            return {
+                'id': f"batch_req_{request['custom_id']}",
+                'custom_id': request['custom_id'],
+                'response': None,
+                'error': {'message': str(e), 'type': type(e).__name__},
+            }
+
+    # 완료되는 순서대로 즉시 기록해 중단되더라도 진행분이 보존되도록 함
+    start = time.perf_counter()
+    with open(output_path, 'a', encoding='utf-8') as out:
+        for i, finished in enumerate(asyncio.as_completed([call(r) for r in pending]), 1):
+            record = await finished
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            if i % 10 == 0 or i == len(pending):
+                print(f"[batch] {i}/{len(pending)} 완료 ({time.perf_counter() - start:.0f}s)")
+    return len(pending)
+
+
+def _load_processor(task: str, api_key: str, train_path: Optional[str] = None) -> DatathonProcessor:
+    from main import TaskAProcessor, TaskBProcessor, TaskCProcessor
+
+    if task == 'A':
+        return TaskAProcessor(api_key=api_key)
+    if task == 'B':
+        return TaskBProcessor(api_key=api_key)
+    train_df = pd.read_csv(train_path) if train_path else None
+    return TaskCProcessor(api_key=api_key, train_df=train_df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 batch 작업 도구")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export = sub.add_parser('export', help='요청 JSONL 생성')
+    export.add_argument('--task', choices=['A', 'B', 'C'], required=True)
+    export.add_argument('--data', required=True)
+    export.add_argument('--out', required=True)
+    export.add_argument('--train', help='Task A few-shot 예시 검색용 train CSV (없으면 고정 예시 사용)')
+
+    run = sub.add_parser('run', help='요청 JSONL을 rpm 제한 안에서 처리')
+    run.add_argument('input')
+    run.add_argument('output')
+    run.add_argument('--api-key', required=True)
+    run.add_argument('--api-base')
+    run.add_argument('--rpm', type=int)
+
+    ingest = sub.add_parser('ingest', help='결과 JSONL로 제출 CSV 생성')
+    ingest.add_argument('--task', choices=['A', 'B', 'C'], required=True)
+    ingest.add_argument('--data', required=True)
+    ingest.add_argument('--results', required=True)
+    ingest.add_argument('--out', required=True)
+    ingest.add_argument('--train', help='Task C 코드 빈도 분석용 train CSV')
+
+    args = parser.parse_args()
+    if args.command == 'export':
+        processor = _load_processor(args.task, api_key='offline')
+        if args.task == 'A' and args.train:
+            asyncio.run(processor.load_fewshot_index(args.train))
+        count = asyncio.run(processor.export_batch_requests(load_csv_cached(args.data, processor.INPUT_COLUMNS), args.out))
+        print(f"[batch] 요청 {count}건 저장: {args.out}")
+    elif args.command == 'run':
+        count = asyncio.run(run_batch(args.input, args.output, args.api_key, args.api_base, args.rpm))
+        print(f"[batch] 새로 처리한 요청 {count}건: {args.output}")
+    else:
+        processor = _load_processor(args.task, api_key='offline', train_path=args.train)
+        asyncio.run(processor.ingest_batch_results(
+            load_csv_cached(args.data, processor.INPUT_COLUMNS), args.results, args.out))
+        print(f"[batch] {processor.metrics['batch']} -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
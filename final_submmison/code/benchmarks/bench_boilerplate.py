@@ -0,0 +1,59 @@
+"""
+머리말/저가치 섹션 제거(NOTE_COMPRESSOR)의 task별 토큰 절감량 측정 (task CSV 사용)
+
+- note       : 원본 노트 전체의 추정 토큰 수 (압축 전/후)
+- user_input : 프로세서 전처리 결과(실제 프롬프트 입력)의 추정 토큰 수 (압축기 없음/있음)
+
+사용법: python benchmarks/bench_boilerplate.py
+"""
+import asyncio
+import pathlib
+import sys
+import time
+
+import pandas as pd
+
+CODE_DIR = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = CODE_DIR.parents[1] / "data"
+sys.path.insert(0, str(CODE_DIR))
+
+from main import TaskAProcessor, TaskCProcessor  # noqa: E402
+from tokens import estimate_tokens  # noqa: E402
+
+
+def total_tokens(texts, model_name):
+    return sum(estimate_tokens(text, model_name) for text in texts if isinstance(text, str))
+
+
+async def measure(processor_class, file_name):
+    data = pd.read_csv(DATA_DIR / file_name)
+    processor = processor_class("unused")
+    compressor, column = processor.NOTE_COMPRESSOR, processor.NOTE_COLUMN
+    model_name = processor.config['model_name']
+
+    start = time.perf_counter()
+    compressed = compressor.compress_series(data[column])
+    elapsed = time.perf_counter() - start
+
+    with_compressor = await processor.preprocess_all(data)
+    processor.NOTE_COMPRESSOR = None
+    without_compressor = await processor.preprocess_all(data)
+
+    rows = [
+        ("note", total_tokens(data[column], model_name), total_tokens(compressed, model_name)),
+        ("user_input", total_tokens([v['user_input'] for v in without_compressor], model_name),
+         total_tokens([v['user_input'] for v in with_compressor], model_name)),
+    ]
+    print(f"[{processor_class.__name__}] rows={len(data)}  compress {elapsed / len(data) * 1000:.3f} ms/note")
+    print(f"  {'':<12}{'before':>10}{'after':>10}{'saved':>9}  (avg tokens/row)")
+    for label, before, after in rows:
+        print(f"  {label:<12}{before / len(data):>10.0f}{after / len(data):>10.0f}{1 - after / before:>9.1%}")
+
+
+async def main():
+    await measure(TaskAProcessor, "taskA_test.csv")
+    await measure(TaskCProcessor, "taskC_test.csv")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""
+TaskA 추출 요약 단계의 입력 토큰 감소량과 BERTScore 변화 비교
+
+EXTRACTIVE_RATIO별로 표본 행을 전처리해 입력 토큰 수를 비교하고 BERTScore(F1)를 계산합니다.
+- --api-key 없음 : 축약 입력 vs 원래 입력 (정보 보존 정도의 근사)
+- --api-key 있음 : 각 설정의 모델 출력 vs 기준 (target 컬럼이 있으면 target, 없으면 축약 없는 설정의 출력)
+
+BERTScore는 대회 평가와 같은 bert_score.BERTScorer(distilbert-base-uncased)를 사용하며,
+설치되어 있지 않으면 토큰 수만 출력합니다.
+
+사용법: python benchmarks/bench_extractive.py --sample 20 --ratios 0.7 0.5 0.3
+"""
+import argparse
+import asyncio
+import pathlib
+import statistics
+import sys
+
+import pandas as pd
+
+CODE_DIR = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = CODE_DIR.parents[1] / "data"
+sys.path.insert(0, str(CODE_DIR))
+
+from main import TaskAProcessor  # noqa: E402
+from tokens import estimate_tokens  # noqa: E402
+
+
+def load_scorer():
+    try:
+        from bert_score import BERTScorer
+    except ImportError:
+        print("bert_score가 설치되어 있지 않아 BERTScore는 생략합니다.")
+        return None
+    scorer = BERTScorer(model_type="distilbert-base-uncased", batch_size=16)
+    return lambda refs, hyps: scorer.score(cands=hyps, refs=refs, verbose=False, batch_size=8)[2].tolist()
+
+
+async def run_setting(processor, sample, ratio, method, generate):
+    processor.EXTRACTIVE_RATIO = ratio
+    processor.EXTRACTIVE_METHOD = method
+    inputs = [v['user_input'] for v in await processor.preprocess_all(sample)]
+    outputs = await processor.summarize(sample) if generate else None
+    return inputs, outputs
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=str(DATA_DIR / "taskA_test.csv"))
+    parser.add_argument("--sample", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=777)
+    parser.add_argument("--ratios", type=float, nargs="+", default=[0.7, 0.5, 0.3])
+    parser.add_argument("--method", choices=["textrank", "tfidf"], default="textrank")
+    parser.add_argument("--api-key")
+    parser.add_argument("--api-base")
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.data)
+    sample = data.sample(n=min(args.sample, len(data)), random_state=args.seed)
+    config = {'api_base': args.api_base} if args.api_base else None
+    processor = TaskAProcessor(args.api_key or "unused", config=config)
+    model_name = processor.config['model_name']
+    generate = bool(args.api_key)
+    score = load_scorer()
+
+    base_inputs, base_outputs = await run_setting(processor, sample, None, args.method, generate)
+    base_tokens = sum(estimate_tokens(text, model_name) for text in base_inputs)
+    if generate and 'target' in sample.columns:
+        references, label = list(sample['target'].astype(str)), "outputs vs target"
+    elif generate:
+        references, label = base_outputs, "outputs vs full-input outputs"
+    else:
+        references, label = base_inputs, "extracted input vs full input"
+
+    print(f"rows={len(sample)}  method={args.method}  BERTScore: {label}")
+    print(f"{'ratio':>6}{'input tokens':>14}{'reduction':>11}{'BERTScore F1':>14}")
+    for ratio in [None] + args.ratios:
+        inputs, outputs = (base_inputs, base_outputs) if ratio is None else \
+            await run_setting(processor, sample, ratio, args.method, generate)
+        tokens = sum(estimate_tokens(text, model_name) for text in inputs)
+        candidates = outputs if generate else inputs
+        f1 = "-"
+        if score is not None and not (ratio is None and references is candidates):
+            f1 = f"{statistics.mean(score(references, candidates)):.4f}"
+        print(f"{'full' if ratio is None else ratio:>6}{tokens / len(sample):>14.0f}"
+              f"{1 - tokens / base_tokens:>11.1%}{f1:>14}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+TaskA 검색 few-shot 인덱스의 생성/로드 시간, 행별 검색 지연, 예시 토큰 수 측정
+
+- build/load : 인덱스를 처음 만들 때와 저장된 인덱스를 memory map으로 열 때의 시간
+- query      : 행별 예시 선택(토큰화 + BM25 점수 + 예산 안 선택) 지연 (ms, p50/p99)
+- tokens     : 행별 예시 토큰 수 평균 vs 고정 예시(system prompt)의 토큰 수
+
+taskA_train CSV(sample_id, medical record, target)가 필요합니다. 없으면 안내만 출력하고 종료합니다.
+
+사용법: python benchmarks/bench_fewshot.py --train ../../data/taskA_train.csv
+"""
+import argparse
+import asyncio
+import pathlib
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+CODE_DIR = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = CODE_DIR.parents[1] / "data"
+sys.path.insert(0, str(CODE_DIR))
+
+from main import TaskAProcessor  # noqa: E402
+from tokens import estimate_tokens  # noqa: E402
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--train", default=str(DATA_DIR / "taskA_train.csv"))
+    parser.add_argument("--data", default=str(DATA_DIR / "taskA_test.csv"))
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--rebuild", action="store_true", help="저장된 인덱스를 지우고 다시 생성")
+    args = parser.parse_args()
+
+    if not pathlib.Path(args.train).exists():
+        print(f"train 파일이 없습니다: {args.train} (TaskA는 고정 예시를 사용합니다)")
+        return
+
+    processor = TaskAProcessor("unused")
+    model_name = processor.config['model_name']
+    if args.rebuild:
+        cache_dir = pathlib.Path(args.cache_dir) if args.cache_dir else pathlib.Path(args.train).parent / ".dataset_cache"
+        for stale in cache_dir.glob(f"{pathlib.Path(args.train).stem}-*.fewshot"):
+            shutil.rmtree(stale)
+
+    start = time.perf_counter()
+    await processor.load_fewshot_index(args.train, args.cache_dir)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reloaded = TaskAProcessor("unused")
+    await reloaded.load_fewshot_index(args.train, args.cache_dir)
+    load = time.perf_counter() - start
+    index = reloaded.fewshot_index
+    print(f"index: {len(index)} examples, {index.meta['terms']} terms  "
+          f"first call {first:.2f}s  reload {load * 1000:.1f} ms")
+
+    data = pd.read_csv(args.data)
+    reloaded.fewshot_index = None
+    inputs = [v['user_input'] for v in await reloaded.preprocess_all(data)]
+    reloaded.fewshot_index = index
+
+    latencies, tokens, counts = [], [], []
+    for text in inputs:
+        start = time.perf_counter()
+        chosen = index.select(text, reloaded.FEWSHOT_TOKEN_BUDGET, reloaded.FEWSHOT_MAX_EXAMPLES)
+        latencies.append(time.perf_counter() - start)
+        tokens.append(sum(e.tokens for e in chosen))
+        counts.append(len(chosen))
+
+    fixed = estimate_tokens(reloaded.DEFAULT_EXAMPLE, model_name)
+    print(f"query: p50 {np.percentile(latencies, 50) * 1000:.3f} ms  p99 {np.percentile(latencies, 99) * 1000:.3f} ms")
+    print(f"examples/row {np.mean(counts):.2f}  example tokens/row {np.mean(tokens):.0f} (fixed example {fixed})  "
+          f"rows without match {sum(1 for c in counts if c == 0)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
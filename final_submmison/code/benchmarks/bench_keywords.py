@@ -0,0 +1,84 @@
+"""
+문장별 키워드 루프('term in sentence.lower()') vs KeywordMatcher 한 번 스캔 비교 (task CSV 사용)
+
+- TaskC PRIORITY_TERMS : 'hospital_course' 문장 중 우선 용어가 나온 문장 선택 (_extract_key_medical_content)
+- TaskA PRIORITY_KEYWORDS : 'medical record' 문장별 키워드 점수 (긴 출력 축약 시 문장 점수와 같은 계산)
+- --scale : 노트에 자주 나오는 6자 이상 단어로 사전을 늘려 사전 크기에 따른 시간 변화 확인
+두 방식의 결과(선택 문장/점수)가 다른 행 수도 함께 출력합니다.
+
+사용법: python benchmarks/bench_keywords.py --repeat 3 --scale 200 1000
+"""
+import argparse
+import collections
+import pathlib
+import re
+import sys
+import time
+
+import pandas as pd
+
+CODE_DIR = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = CODE_DIR.parents[1] / "data"
+sys.path.insert(0, str(CODE_DIR))
+
+from keywords import KeywordMatcher  # noqa: E402
+from main import TaskAProcessor, TaskCProcessor  # noqa: E402
+
+
+def split_sentences(text):
+    return [s for s in (s.strip() for s in re.split(r"[.!?]+", text)) if len(s) >= 10]
+
+
+def loop_scores(sentences, terms):
+    """기존 방식: 문장마다 용어 수만큼 부분 문자열 검사"""
+    return [sum(1 for term in terms if term in sentence.lower()) for sentence in sentences]
+
+
+def matcher_scores(sentences, matcher):
+    return matcher.score_sentences(sentences).astype(int).tolist()
+
+
+def timed(function, items, repeat):
+    best, outputs = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [function(item) for item in items]
+        best = min(best, time.perf_counter() - start)
+    return best, outputs
+
+
+def report(label, documents, matcher, repeat):
+    base_time, base_out = timed(lambda s: loop_scores(s, matcher.terms), documents, repeat)
+    new_time, new_out = timed(lambda s: matcher_scores(s, matcher), documents, repeat)
+    differs = sum(1 for a, b in zip(base_out, new_out) if a != b)
+    sentences = sum(map(len, documents)) / len(documents)
+    print(f"[{label}] terms={len(matcher.terms)}  rows={len(documents)}  avg sentences={sentences:.0f}")
+    print(f"  loop     {base_time / len(documents) * 1e6:>9.1f} us/row")
+    print(f"  matcher  {new_time / len(documents) * 1e6:>9.1f} us/row  ({base_time / new_time:.1f}x)  "
+          f"different rows={differs}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=int, nargs="*", default=[])
+    args = parser.parse_args()
+
+    courses = pd.read_csv(DATA_DIR / "taskC_test.csv")["hospital_course"].dropna().astype(str)
+    notes = pd.read_csv(DATA_DIR / "taskA_test.csv")["medical record"].dropna().astype(str)
+    course_sentences = [split_sentences(text) for text in courses]
+    note_sentences = [split_sentences(text) for text in notes]
+
+    report("TaskC priority terms", course_sentences, TaskCProcessor.PRIORITY_TERMS, args.repeat)
+    report("TaskA priority keywords", note_sentences, TaskAProcessor.PRIORITY_KEYWORDS, args.repeat)
+
+    # 임상 용어 사전을 흉내 내기 위해 6자 이상 단어만 사용 (짧은 일반 단어는 거의 모든 위치에서 일치)
+    counts = collections.Counter(word.lower() for text in notes for word in text.split()
+                                 if word.isalpha() and len(word) >= 6)
+    for size in args.scale:
+        lexicon = KeywordMatcher([word for word, _ in counts.most_common(size)])
+        report(f"lexicon {size}", note_sentences, lexicon, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
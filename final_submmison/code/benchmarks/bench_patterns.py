@@ -0,0 +1,90 @@
+"""
+태스크별 정규식 레지스트리(PATTERNS)의 패턴별 비용과 자체 점검 결과 출력 (task CSV 사용)
+
+- rows      : 전/후처리를 전체 행에 실행한 뒤 패턴별 호출 수, 누적/평균/최대 시간, 최대 입력 길이
+- self-test : 병적인 입력에서의 1KB당 최악 비용(us)과 입력 길이 4배일 때의 시간 증가율 (선형이면 약 4배)
+- rewritten : 역추적 때문에 이차 시간이 걸리던 기존 패턴과 바꾼 패턴의 병적인 입력 시간 비교 (--chars 길이)
+
+사용법: python benchmarks/bench_patterns.py --chars 2000 8000
+"""
+import argparse
+import asyncio
+import pathlib
+import re
+import sys
+import time
+
+import pandas as pd
+
+CODE_DIR = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = CODE_DIR.parents[1] / "data"
+sys.path.insert(0, str(CODE_DIR))
+
+from main import TaskAProcessor, TaskBProcessor, TaskCProcessor  # noqa: E402
+
+TASKS = [
+    (TaskAProcessor, "taskA_test.csv", "medical record"),
+    (TaskBProcessor, "taskB_test.csv", "radiology report"),
+    (TaskCProcessor, "taskC_test.csv", "hospital_course"),
+]
+
+# (이름, 기존 패턴, flags, 병적인 입력 단위, 바꾼 패턴 (registry, 이름))
+REWRITTEN = [
+    ("TaskB.item_marker", r'\[\[ITEM\s+([^\]]+?)\s*\]\]', 0, '[[ITEM a', (TaskBProcessor, 'item_marker')),
+    ("TaskB.end_marker", r'\[\[END\b[^\]]*\]\]', 0, '[[END a', (TaskBProcessor, 'end_marker')),
+    ("TaskC.deid_marker", r"\[\*+.*?\*+\]", 0, '[**a', (TaskCProcessor, 'deid_marker')),
+    ("TaskC.json_object", r"\{.*\}", re.DOTALL, '{', (TaskCProcessor, 'json_object')),
+    ("TaskC.json_pairs", r'"?([\w\-]+)"?\s*:\s*\[?([^\]\n}]*)', 0, '_', (TaskCProcessor, 'json_pairs')),
+]
+
+
+def best(function, text, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+async def run_rows():
+    for cls, file_name, column in TASKS:
+        data = pd.read_csv(DATA_DIR / file_name)
+        processor = cls("unused")
+        cls.PATTERNS.reset()
+        rows = processor.prepare_batch(data)
+        for _, row in rows.iterrows():
+            await processor.preprocess_data(row)
+        for text in data[column].astype(str):
+            await processor.postprocess_result(text)
+
+        print(f"[{cls.__name__}] rows={len(data)}  patterns={len(cls.PATTERNS)}")
+        print(f"  {'pattern':<22}{'calls':>7}{'total ms':>10}{'mean us':>9}{'max ms':>8}{'max chars':>10}"
+              f"{'worst us/KB':>13}{'growth':>8}")
+        tested = cls.PATTERNS.self_test()
+        for name, stat in sorted(cls.PATTERNS.stats().items(), key=lambda item: -item[1]['total_ms']):
+            print(f"  {name:<22}{stat['calls']:>7}{stat['total_ms']:>10.2f}{stat['mean_us']:>9.1f}"
+                  f"{stat['max_ms']:>8.2f}{stat['max_chars']:>10}{stat['worst_us_per_kb']:>13.0f}"
+                  f"{tested[name]['growth']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chars", type=int, nargs="*", default=[2000, 8000])
+    args = parser.parse_args()
+
+    asyncio.run(run_rows())
+
+    print("[rewritten patterns] pathological input time (ms): before -> after")
+    for name, source, flags, unit, (cls, key) in REWRITTEN:
+        before, after = re.compile(source, flags), cls.PATTERNS[key].pattern
+        cells = []
+        for chars in args.chars:
+            text = unit * (chars // len(unit))
+            cells.append(f"{chars} chars {best(before.findall, text) * 1000:8.2f} -> "
+                         f"{best(after.findall, text) * 1000:6.3f}")
+        print(f"  {name:<20}{unit!r:<12}" + "   ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+후처리 치환 규칙: 규칙별 str.replace/키워드 루프 vs 단일 패스 Rewriter 비교 (task CSV 사용)
+
+- TaskA OUTPUT_REWRITER : 'medical record' 본문을 모델 출력 대신 입력으로 사용 (약어가 많아 치환이 실제로 일어남)
+- TaskC FALLBACK_CODES  : 대문자로 바꾼 'hospital_course' 본문에서 대체 코드 선택
+- --scale                : 노트에 자주 나오는 단어로 규칙 표를 늘려 규칙 수에 따른 시간 변화 확인
+                           (규칙별 루프는 규칙 수에 비례, Rewriter는 거의 일정)
+결과가 다른 행은 규칙별 루프에서 앞선 치환 결과가 다른 규칙에 다시 걸린(연쇄 치환) 경우입니다.
+
+사용법: python benchmarks/bench_rewriter.py --repeat 5 --scale 50 200 1000
+"""
+import argparse
+import collections
+import pathlib
+import sys
+import time
+
+import pandas as pd
+
+CODE_DIR = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = CODE_DIR.parents[1] / "data"
+sys.path.insert(0, str(CODE_DIR))
+
+from main import TaskAProcessor, TaskCProcessor  # noqa: E402
+from rewriter import Rewriter  # noqa: E402
+
+
+def replace_loop(text, *tables):
+    """기존 방식: 규칙마다 전체 텍스트를 다시 훑는 str.replace"""
+    for table in tables:
+        for source, target in table.items():
+            text = text.replace(source, target)
+    return text
+
+
+def keyword_loop(text, mapping):
+    """기존 방식: 키워드마다 포함 여부 확인"""
+    for keyword, code in mapping.items():
+        if keyword in text:
+            return code
+    return None
+
+
+def timed(function, texts, repeat):
+    best, outputs = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [function(text) for text in texts]
+        best = min(best, time.perf_counter() - start)
+    return best, outputs
+
+
+def report(label, texts, baseline, compiled, repeat):
+    base_time, base_out = timed(baseline, texts, repeat)
+    new_time, new_out = timed(compiled, texts, repeat)
+    differs = sum(1 for a, b in zip(base_out, new_out) if a != b)
+    print(f"[{label}] rows={len(texts)}  avg chars={sum(map(len, texts)) / len(texts):.0f}")
+    print(f"  loop     {base_time / len(texts) * 1e6:>9.1f} us/row")
+    print(f"  rewriter {new_time / len(texts) * 1e6:>9.1f} us/row  ({base_time / new_time:.1f}x)  "
+          f"different outputs={differs}")
+
+
+def lexicon(texts, size):
+    """노트에 자주 나오는 단어(뒤 공백 포함) size개 -> 대문자 치환 규칙"""
+    counts = collections.Counter(word for text in texts for word in text.split() if word.isalpha())
+    return {f"{word} ": f"{word.upper()} " for word, _ in counts.most_common(size)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=int, nargs="*", default=[])
+    args = parser.parse_args()
+
+    notes = pd.read_csv(DATA_DIR / "taskA_test.csv")["medical record"].dropna().astype(str).tolist()
+    rewriter = TaskAProcessor.OUTPUT_REWRITER
+    tables = (TaskAProcessor.MEDICAL_CORRECTIONS, TaskAProcessor.CLINICAL_ENHANCEMENTS)
+    report("TaskA rewrite", notes, lambda text: replace_loop(text, *tables), rewriter.rewrite, args.repeat)
+
+    for size in args.scale:
+        table = lexicon(notes, size)
+        report(f"{len(table)} rules", notes, lambda text: replace_loop(text, table), Rewriter(table).rewrite,
+               args.repeat)
+
+    courses = pd.read_csv(DATA_DIR / "taskC_test.csv")["hospital_course"].dropna().astype(str).str.upper().tolist()
+    fallback = TaskCProcessor.FALLBACK_CODES
+    report("TaskC fallback", courses, lambda text: keyword_loop(text, fallback.rules), fallback.first, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
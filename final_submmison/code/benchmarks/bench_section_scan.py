@@ -0,0 +1,142 @@
+"""
+섹션 추출 방식 비교 (task CSV 사용)
+
+- legacy  : 섹션마다 별도 정규식(lazy (.*?) + lookahead, DOTALL)으로 노트를 다시 훑는 기존 방식
+            TaskC는 공백을 모두 합친 텍스트에서 찾으므로 매 패턴이 노트 끝까지 훑음
+- scanner : section_index.index_sections로 노트를 한 번 훑어 모든 섹션 오프셋을 만든 뒤 조회
+- sidecar : 미리 저장한 오프셋 인덱스로 조회만 수행 (두 번째 실행부터의 비용)
+
+노트당 처리 시간과, 각 task가 찾는 섹션의 recall(찾은 노트 수)을 비교합니다.
+
+사용법: python benchmarks/bench_section_scan.py --repeat 5
+"""
+import argparse
+import pathlib
+import re
+import sys
+import time
+
+import pandas as pd
+
+CODE_DIR = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = CODE_DIR.parents[1] / "data"
+sys.path.insert(0, str(CODE_DIR))
+
+from section_index import index_sections, NoteSections  # noqa: E402
+
+# 기존 TaskA 전처리의 섹션 정규식
+LEGACY_A = {
+    "Chief Complaint": re.compile(r'Chief Complaint:\s*([^\n]+)'),
+    "Service": re.compile(r'Service:\s*([^\n]+)'),
+    "History of Present Illness": re.compile(
+        r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|Physical Exam|$)', re.DOTALL),
+    "Major Surgical or Invasive Procedure": re.compile(
+        r'Major Surgical or Invasive Procedure:\s*(.*?)(?=\n\n|History of Present|$)', re.DOTALL),
+    "Past Medical History": re.compile(
+        r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)', re.DOTALL),
+    "Physical Exam": re.compile(r'(?:Physical Exam|PHYSICAL EXAM):\s*(.*?)(?=\n\n|Pertinent Results|$)', re.DOTALL),
+}
+
+# 기존 TaskC 전처리의 섹션 정규식 (공백을 합친 텍스트에 적용)
+_C_END = r"(?=\n\n|\n[A-Z][a-z]+:|$)"
+LEGACY_C = {
+    "Discharge Diagnosis": [
+        re.compile(r"(?:Discharge|Primary|Principal|Final)\s*Diagnos[ei]s?:\s*(.*?)" + _C_END, re.I | re.S),
+        re.compile(r"Diagnos[ei]s\s*(?:on\s*discharge|at\s*discharge):\s*(.*?)" + _C_END, re.I | re.S),
+    ],
+    "Chief Complaint": [re.compile(r"Chief Complaint:\s*([^\n]+)", re.I)],
+    "Assessment": [
+        re.compile(r"(?:Assessment|Impression)(?:\s*and\s*Plan)?:\s*(.*?)" + _C_END, re.I | re.S),
+        re.compile(r"A&P:\s*(.*?)" + _C_END, re.I | re.S),
+    ],
+    "History of Present Illness": [
+        re.compile(r"History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|\nReview of|$)", re.I | re.S)],
+    "Hospital Course": [re.compile(r"Hospital Course:\s*(.*?)" + _C_END, re.I | re.S)],
+}
+
+# scanner에서 각 task 섹션에 대응하는 섹션 이름
+SCANNER_C = {
+    "Discharge Diagnosis": ("Discharge Diagnosis", "Diagnosis at Discharge"),
+    "Chief Complaint": ("Chief Complaint",),
+    "Assessment": ("Assessment", "A&P"),
+    "History of Present Illness": ("History of Present Illness",),
+    "Hospital Course": ("Brief Hospital Course", "Hospital Course"),
+}
+
+
+def clean_c(text: str) -> str:
+    text = re.sub(r"___+", " ", text)
+    text = re.sub(r"\[\*+.*?\*+\]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def legacy_a(note: str) -> set:
+    found = set()
+    for name, pattern in LEGACY_A.items():
+        match = pattern.search(note)
+        if match and match.group(1).strip():
+            found.add(name)
+    return found
+
+
+def legacy_c(note: str) -> set:
+    text = clean_c(note)
+    found = set()
+    for name, patterns in LEGACY_C.items():
+        for pattern in patterns:
+            match = pattern.search(text)
+            if match and match.group(1).strip():
+                found.add(name)
+                break
+    return found
+
+
+def scanner_a(note: str, spans=None) -> set:
+    sections = NoteSections(note, index_sections(note) if spans is None else spans)
+    return {name for name in LEGACY_A if (sections.after(name) or "").strip()}
+
+
+def scanner_c(note: str, spans=None) -> set:
+    sections = NoteSections(note, index_sections(note) if spans is None else spans)
+    return {name for name, names in SCANNER_C.items() if (sections.after(*names) or "").strip()}
+
+
+def measure(function, notes, repeat):
+    best, results = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [function(note) for note in notes]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        ("A", "taskA_test.csv", "medical record", legacy_a, scanner_a, list(LEGACY_A)),
+        ("C", "taskC_test.csv", "hospital_course", legacy_c, scanner_c, list(LEGACY_C)),
+    ]
+    for task, file_name, column, legacy, scanner, names in cases:
+        notes = [n for n in pd.read_csv(DATA_DIR / file_name)[column] if isinstance(n, str)]
+        legacy_time, legacy_found = measure(legacy, notes, args.repeat)
+        scanner_time, scanner_found = measure(scanner, notes, args.repeat)
+        index = {id(note): index_sections(note) for note in notes}
+        sidecar_time, _ = measure(lambda note: scanner(note, index[id(note)]), notes, args.repeat)
+
+        print(f"[Task {task}] notes={len(notes)}  avg chars={sum(map(len, notes)) / len(notes):.0f}")
+        print(f"  legacy  : {legacy_time / len(notes) * 1000:.3f} ms/note")
+        print(f"  scanner : {scanner_time / len(notes) * 1000:.3f} ms/note  "
+              f"(x{legacy_time / scanner_time:.1f})")
+        print(f"  sidecar : {sidecar_time / len(notes) * 1000:.3f} ms/note  "
+              f"(x{legacy_time / sidecar_time:.1f})")
+        print(f"  {'section':<40}{'legacy':>8}{'scanner':>9}")
+        for name in names:
+            print(f"  {name:<40}{sum(name in f for f in legacy_found):>8}"
+                  f"{sum(name in f for f in scanner_found):>9}")
+
+
+if __name__ == "__main__":
+    main()
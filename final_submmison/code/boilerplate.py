@@ -0,0 +1,78 @@
+"""
+MIMIC 형식 노트의 상투 문구/저가치 섹션 제거
+모든 퇴원 노트 앞부분의 비식별화된 머리말('Name: ___ Unit No: ___', 입·퇴원일, 'Attending: ___',
+알레르기 없음 표기)과, 요약/코딩에 도움이 되지 않는 긴 섹션(퇴원 안내, 약물 목록 등)을 결정적으로 제거합니다.
+머리말은 정규식 한 번, 섹션은 section_index의 한 번 스캔으로 찾은 오프셋으로 잘라냅니다.
+"""
+import re
+from typing import Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from section_index import index_sections
+
+# 제거할 머리말 줄 (줄바꿈 포함). sex 그룹이 있으면 'Sex: M'만 남김
+# 알레르기 없음처럼 정보가 없는 헤더도 함께 제거 (다른 섹션의 종료 조건으로 쓰이는 헤더는 남김)
+BOILERPLATE_LINES: List[str] = [
+    r'^Name:[ \t]*_+\.?[ \t]*Unit No:[^\n]*\n?',
+    r'^Admission Date:[^\n]*Discharge Date:[^\n]*\n?',
+    r'^Date of Birth:[ \t]*_+[ \t]*Sex:[ \t]*(?P<sex>[A-Z])[ \t]*\n?',
+    r'^Attending:[ \t]*_+\.?[ \t]*\n?',
+    r'^Allergies:[ \t]*\n(?:Patient recorded as having )?No Known Allergies[^\n]*\n?',
+]
+
+# 기본으로 제거하는 저가치 섹션 (section_index.SECTION_HEADERS 이름)
+LOW_VALUE_SECTIONS: Tuple[str, ...] = (
+    'Medications on Admission',
+    'Discharge Medications',
+    'Discharge Instructions',
+    'Followup Instructions',
+)
+
+# 인덱스에 없는 헤더 줄 (예: 'Physical ___:') - 제거 범위가 다음 섹션까지 번지지 않도록 여기서 멈춤
+_HEADER_LIKE = re.compile(r'^[ \t]*[A-Z][A-Za-z/&_ ]{2,40}:[ \t]*$', re.MULTILINE)
+
+
+class NoteCompressor:
+    """
+    머리말 줄과 지정한 섹션을 제거하는 노트 압축기
+    drop_sections: 제거할 섹션 이름 (헤더부터 다음 섹션 헤더 직전까지)
+    drop_lines: 제거할 줄 정규식 목록 (MULTILINE로 결합)
+    """
+
+    def __init__(self, drop_sections: Iterable[str] = LOW_VALUE_SECTIONS,
+                 drop_lines: Optional[List[str]] = None):
+        self.drop_sections = frozenset(drop_sections)
+        patterns = BOILERPLATE_LINES if drop_lines is None else drop_lines
+        self._lines = re.compile('|'.join(f'(?:{p})' for p in patterns), re.MULTILINE) if patterns else None
+
+    def __repr__(self) -> str:
+        # 섹션 sidecar 구분자와 전처리 캐시 키에 쓰일 수 있도록 설정 내용으로 표현
+        lines = self._lines.pattern if self._lines is not None else None
+        return f"NoteCompressor({sorted(self.drop_sections)!r}, {lines!r})"
+
+    def _replace_line(self, match: 're.Match') -> str:
+        sex = match.groupdict().get('sex')
+        return f"Sex: {sex}\n" if sex else ''
+
+    def compress(self, text: str) -> str:
+        """노트 한 건 압축 (문자열이 아니면 그대로 반환)"""
+        if not isinstance(text, str):
+            return text
+        if self._lines is not None:
+            text = self._lines.sub(self._replace_line, text)
+        if not self.drop_sections:
+            return text
+
+        kept, position = [], 0
+        for name, start, body_start, end in index_sections(text):
+            if name in self.drop_sections:
+                unknown_header = _HEADER_LIKE.search(text, body_start, end)
+                kept.append(text[position:start])
+                position = unknown_header.start() if unknown_header else end
+        kept.append(text[position:])
+        return ''.join(kept)
+
+    def compress_series(self, notes: pd.Series) -> pd.Series:
+        """노트 컬럼 전체 압축"""
+        return notes.map(self.compress)
@@ -0,0 +1,118 @@
+"""
+OpenAI 호환 /completions 프롬프트 배열 전송
+chat 메시지를 모델별 chat template으로 raw 프롬프트로 렌더링한 뒤,
+K개의 프롬프트를 한 번의 HTTP 요청(prompt 배열)으로 보내 서버(vLLM 등)가 GPU에서 함께 처리하게 합니다.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Llama-3.1 chat template이 system 메시지 앞에 붙이는 기본 헤더
+LLAMA3_SYSTEM_HEADER = "Cutting Knowledge Date: December 2023\nToday Date: 26 Jul 2024\n\n"
+
+_ROLE_NAMES = {'human': 'user', 'ai': 'assistant', 'system': 'system', 'user': 'user', 'assistant': 'assistant'}
+
+
+def _role(message: Any) -> str:
+    role = getattr(message, 'type', None) or getattr(message, 'role', None) or 'user'
+    return _ROLE_NAMES.get(role, role)
+
+
+def to_openai_messages(messages: List[Any]) -> List[Dict[str, str]]:
+    """langchain 메시지를 OpenAI chat 형식 dict 목록으로 변환"""
+    return [{'role': _role(m), 'content': str(m.content)} for m in messages]
+
+
+def render_llama3(messages: List[Any]) -> str:
+    """Llama-3.1 Instruct chat template (BOS는 서버 토크나이저가 추가하므로 제외)"""
+    parts = []
+    system = [m for m in messages if _role(m) == 'system']
+    system_text = LLAMA3_SYSTEM_HEADER + (str(system[0].content) if system else '')
+    parts.append(f"<|start_header_id|>system<|end_header_id|>\n\n{system_text}<|eot_id|>")
+    for message in messages:
+        role = _role(message)
+        if role == 'system':
+            continue
+        parts.append(f"<|start_header_id|>{role}<|end_header_id|>\n\n{str(message.content).strip()}<|eot_id|>")
+    parts.append("<|start_header_id|>assistant<|end_header_id|>\n\n")
+    return "".join(parts)
+
+
+def render_exaone(messages: List[Any]) -> str:
+    """EXAONE-3.5 Instruct chat template"""
+    parts = []
+    if not messages or _role(messages[0]) != 'system':
+        parts.append("[|system|][|endofturn|]\n")
+    for message in messages:
+        role = _role(message)
+        parts.append(f"[|{role}|]{message.content}")
+        parts.append("\n" if role == 'user' else "[|endofturn|]\n")
+    parts.append("[|assistant|]")
+    return "".join(parts)
+
+
+CHAT_RENDERERS: Dict[str, Callable[[List[Any]], str]] = {
+    'meta-llama/Llama-3.1-8B-Instruct': render_llama3,
+    'LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct-AWQ': render_exaone,
+}
+
+
+def render_raw_prompt(messages: List[Any], model_name: str, tokenizer: Any = None) -> str:
+    """
+    chat 메시지를 raw completion 프롬프트로 렌더링합니다.
+    tokenizer(transformers)를 주면 모델에 내장된 chat template을 그대로 사용합니다.
+    """
+    if tokenizer is not None:
+        return tokenizer.apply_chat_template(
+            to_openai_messages(messages),
+            tokenize=False, add_generation_prompt=True)
+    renderer = CHAT_RENDERERS.get(model_name)
+    if renderer is None:
+        raise ValueError(f"{model_name}: 등록된 chat template이 없습니다. tokenizer를 지정해주세요.")
+    return renderer(messages)
+
+
+class CompletionsClient:
+    """prompt 배열을 한 요청으로 보내는 /completions 클라이언트 (rate limit은 호출하는 쪽에서 요청 전에 획득)"""
+
+    def __init__(
+        self,
+        api_base: str,
+        api_key: str,
+        model_name: str,
+        max_tokens: int,
+        temperature: float = 0,
+        seed: Optional[int] = None,
+        max_retries: int = 3,
+    ):
+        from openai import AsyncOpenAI
+
+        self.client = AsyncOpenAI(base_url=api_base, api_key=api_key, max_retries=max_retries)
+        self.model_name = model_name
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.seed = seed
+
+    async def complete(self, prompts: List[str]) -> Tuple[List[Optional[str]], Dict[str, int]]:
+        """
+        프롬프트 목록을 한 번에 보내고 choice.index 기준으로 원래 순서에 맞춰 반환합니다.
+        응답에 빠진 index는 None으로 채웁니다.
+        """
+        response = await self.client.completions.create(
+            model=self.model_name,
+            prompt=prompts,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            seed=self.seed,
+        )
+
+        texts: List[Optional[str]] = [None] * len(prompts)
+        for choice in response.choices:
+            if 0 <= choice.index < len(prompts):
+                texts[choice.index] = choice.text
+
+        usage = response.usage
+        details = getattr(usage, 'prompt_tokens_details', None)
+        return texts, {
+            'prompt_tokens': getattr(usage, 'prompt_tokens', 0) or 0,
+            'completion_tokens': getattr(usage, 'completion_tokens', 0) or 0,
+            'cached_tokens': getattr(details, 'cached_tokens', 0) or 0,
+        }
@@ -0,0 +1,130 @@
+"""
+task CSV 컬럼형 캐시 로더
+여러 줄에 걸친 인용 필드가 많은 CSV를 한 번만 파싱해 Arrow(Feather, 비압축) 파일로 저장하고,
+이후에는 memory map으로 필요한 컬럼만 읽습니다. 캐시는 원본 파일 내용 해시로 구분되어
+원본이 바뀌면 자동으로 다시 만들어집니다. pyarrow가 없으면 pd.read_csv(usecols=...)로 대체합니다.
+"""
+import hashlib
+import json
+import os
+import pathlib
+import warnings
+from typing import Iterator, List, Optional, Union
+
+import pandas as pd
+
+TASK_FILE_PATTERN = 'task{task}_{split}.csv'
+
+DEFAULT_CACHE_DIR = '.dataset_cache'
+
+PathLike = Union[str, pathlib.Path]
+
+
+def file_hash(file_path: PathLike, chunk_size: int = 1 << 20) -> str:
+    """원본 파일 내용 해시"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def cached_file_hash(file_path: pathlib.Path, cache_dir: pathlib.Path) -> str:
+    """(경로, 크기, 수정 시각)이 같으면 이전에 계산한 해시를 재사용"""
+    index_path = cache_dir / 'index.json'
+    try:
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        index = {}
+
+    stat = file_path.stat()
+    entry = index.get(str(file_path.resolve()))
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['hash']
+
+    digest = file_hash(file_path)
+    index[str(file_path.resolve())] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest}
+    index_path.write_text(json.dumps(index, indent=1), encoding='utf-8')
+    return digest
+
+
+def load_csv_cached(
+    file_path: PathLike,
+    columns: Optional[List[str]] = None,
+    cache_dir: Optional[PathLike] = None,
+) -> pd.DataFrame:
+    """
+    CSV를 컬럼형 캐시를 거쳐 읽습니다. columns를 주면 해당 컬럼만 읽습니다.
+    cache_dir 기본값은 원본 파일 옆의 .dataset_cache 디렉토리입니다.
+    """
+    file_path = pathlib.Path(file_path)
+    try:
+        import pyarrow as pa
+        from pyarrow import feather
+    except ImportError:
+        warnings.warn("pyarrow가 없어 컬럼형 캐시 없이 CSV를 직접 읽습니다.")
+        return pd.read_csv(file_path, usecols=columns)
+
+    cache_dir = pathlib.Path(cache_dir) if cache_dir else file_path.parent / DEFAULT_CACHE_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_path = cache_dir / f"{file_path.stem}-{cached_file_hash(file_path, cache_dir)}.arrow"
+
+    if not cache_path.exists():
+        # 파싱 결과(dtype 포함)를 기존 pd.read_csv와 동일하게 유지
+        table = pa.Table.from_pandas(pd.read_csv(file_path), preserve_index=False)
+        tmp_path = cache_path.with_suffix('.tmp')
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, cache_path)
+        # 같은 원본의 이전 버전 캐시 정리
+        for stale in cache_dir.glob(f"{file_path.stem}-*.arrow"):
+            if stale != cache_path:
+                stale.unlink()
+
+    return feather.read_table(cache_path, columns=columns, memory_map=True).to_pandas()
+
+
+def load_task_data(
+    task: str,
+    data_dir: PathLike,
+    split: str = 'test',
+    columns: Optional[List[str]] = None,
+    cache_dir: Optional[PathLike] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    노트북의 load_task_*_data와 같은 규칙으로 task 데이터를 읽습니다. (파일이 없으면 None)
+    프로세서의 INPUT_COLUMNS를 columns로 넘기면 전처리에 필요한 컬럼만 읽습니다.
+    """
+    file_path = pathlib.Path(data_dir) / TASK_FILE_PATTERN.format(task=task, split=split)
+    if not file_path.exists():
+        print(f"파일을 찾을 수 없습니다: {file_path}")
+        return None
+    return load_csv_cached(file_path, columns, cache_dir)
+
+
+def iter_csv_chunks(
+    file_path: PathLike,
+    chunksize: int = 256,
+    columns: Optional[List[str]] = None,
+    cache_dir: Optional[PathLike] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    CSV를 chunksize 행씩 읽는 이터레이터 (DatathonProcessor.summarize_stream 입력용)
+    컬럼형 캐시가 이미 있으면 memory map에서 잘라 읽고, 없으면 pd.read_csv(chunksize=...)로 읽습니다.
+    """
+    file_path = pathlib.Path(file_path)
+    cache_dir = pathlib.Path(cache_dir) if cache_dir else file_path.parent / DEFAULT_CACHE_DIR
+    cache_path = None
+    try:
+        from pyarrow import feather
+        if cache_dir.exists():
+            cache_path = cache_dir / f"{file_path.stem}-{cached_file_hash(file_path, cache_dir)}.arrow"
+    except ImportError:
+        pass
+
+    if cache_path is not None and cache_path.exists():
+        table = feather.read_table(cache_path, columns=columns, memory_map=True)
+        for start in range(0, table.num_rows, chunksize):
+            yield table.slice(start, chunksize).to_pandas()
+        return
+
+    yield from pd.read_csv(file_path, usecols=columns, chunksize=chunksize)
@@ -0,0 +1,127 @@
+"""
+로컬 추출 요약 (LLM 호출 전 입력 축소)
+노트 구간을 문장 단위로 나눠 TF-IDF 코사인 유사도 그래프에서 중심성(TextRank 또는 유사도 합)을 계산하고,
+토큰 예산 안에서 점수가 높은 문장을 골라 원래(시간) 순서대로 이어 붙입니다.
+수치/약물/시술이 언급된 문장은 보호 문장으로 먼저 채웁니다.
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from tokens import estimate_tokens
+
+# 문장 경계: 빈 줄/줄바꿈 뒤 목록 기호, 또는 마침표 뒤 대문자
+_SENTENCE_BOUNDARY = re.compile(r'\n\s*\n|\n(?=\s*(?:[-*•]|\d+[.)])\s)|(?<=[.!?])\s+(?=[A-Z\[(])')
+_WORD = re.compile(r'[a-z][a-z0-9\-]+')
+
+# 보호 문장 패턴 - 수치, 약물(용량/투여 경로/빈도), 시술
+PROTECTED_PATTERNS = {
+    'number': re.compile(r'\d'),
+    'medication': re.compile(
+        r'\b(?:mg|mcg|units?|meq|ml|tablets?|capsules?|po|iv|im|sq|subq|prn|daily|bid|tid|qid|q\d+h|qhs'
+        r'|dose[ds]?|infusion|drip|started on|restarted|discontinued)\b', re.IGNORECASE),
+    'procedure': re.compile(
+        r'\b\w*(?:ectomy|otomy|ostomy|plasty|scopy|graphy|centesis)\b|\b(?:biopsy|intubat\w*|extubat\w*|catheter\w*'
+        r'|stent\w*|surgery|procedure|repair|drain\w*|transfus\w*|dialysis|ablation|graft\w*)\b', re.IGNORECASE),
+}
+
+STOPWORDS = frozenset(
+    'the and was were with for from that this there have has had his her she him they them not but are'
+    ' been into also which who per pt patient on of in to at as by an or be is it a'.split()
+)
+
+
+class Extract(NamedTuple):
+    text: str
+    sentences: int  # 원래 문장 수
+    kept: int  # 남긴 문장 수
+    tokens_before: int
+    tokens_after: int
+
+
+def split_sentences(text: str) -> List[str]:
+    """노트 텍스트를 문장(또는 목록 항목) 단위로 분할"""
+    return [s.strip() for s in _SENTENCE_BOUNDARY.split(text) if s and s.strip()]
+
+
+def is_protected(sentence: str) -> bool:
+    return any(pattern.search(sentence) for pattern in PROTECTED_PATTERNS.values())
+
+
+def tfidf_matrix(sentences: List[str]) -> np.ndarray:
+    """문장별 L2 정규화 TF-IDF 행렬 (문장 수 x 어휘 수)"""
+    docs = [[w for w in _WORD.findall(s.lower()) if w not in STOPWORDS] for s in sentences]
+    vocabulary: Dict[str, int] = {}
+    for doc in docs:
+        for word in doc:
+            vocabulary.setdefault(word, len(vocabulary))
+    matrix = np.zeros((len(docs), max(len(vocabulary), 1)))
+    for i, doc in enumerate(docs):
+        for word, count in Counter(doc).items():
+            matrix[i, vocabulary[word]] = 1 + math.log(count)
+    document_frequency = (matrix > 0).sum(axis=0)
+    matrix *= np.log((1 + len(docs)) / (1 + document_frequency)) + 1
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def centrality(sentences: List[str], method: str = 'textrank', damping: float = 0.85,
+               iterations: int = 50, tolerance: float = 1e-6) -> np.ndarray:
+    """
+    문장 중심성 점수. 'textrank'는 유사도 그래프의 PageRank,
+    'tfidf'는 다른 문장과의 코사인 유사도 합입니다.
+    """
+    if method not in ('textrank', 'tfidf'):
+        raise ValueError(f"지원하지 않는 method입니다: {method}")
+    matrix = tfidf_matrix(sentences)
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    if method == 'tfidf':
+        return similarity.sum(axis=1)
+
+    n = len(sentences)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # 연결이 없는 문장은 모든 문장으로 균등하게 이동
+    transition = np.where(out_weight > 0, similarity / np.where(out_weight == 0, 1, out_weight), 1.0 / n)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * transition.T @ scores
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def extract(
+    text: str,
+    max_tokens: int,
+    model_name: Optional[str] = None,
+    method: str = 'textrank',
+    protect: bool = True,
+) -> Extract:
+    """
+    text를 max_tokens 이하로 줄인 추출 요약. 보호 문장을 점수 순으로 먼저 채우고
+    남은 예산을 나머지 문장으로 채운 뒤, 선택한 문장을 원래 순서로 이어 붙입니다.
+    """
+    tokens_before = estimate_tokens(text, model_name)
+    sentences = split_sentences(text)
+    if tokens_before <= max_tokens or len(sentences) < 2:
+        return Extract(text, len(sentences), len(sentences), tokens_before, tokens_before)
+
+    scores = centrality(sentences, method)
+    costs = [estimate_tokens(s, model_name) + 1 for s in sentences]
+    protected = [protect and is_protected(s) for s in sentences]
+    # 보호 문장 우선, 같은 그룹 안에서는 점수 높은 순 (동점이면 앞 문장)
+    order = sorted(range(len(sentences)), key=lambda i: (not protected[i], -scores[i], i))
+
+    kept, used = [], 0
+    for i in order:
+        if used + costs[i] <= max_tokens:
+            kept.append(i)
+            used += costs[i]
+    kept.sort()
+    summary = ' '.join(sentences[i] for i in kept)
+    return Extract(summary, len(sentences), len(kept), tokens_before, estimate_tokens(summary, model_name))
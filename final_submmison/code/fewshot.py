@@ -0,0 +1,146 @@
+"""
+few-shot 예시 검색 인덱스 (BM25)
+train 데이터의 (입력, 정답) 쌍을 BM25 역색인으로 만들어 디스크에 저장하고, 실행 시에는 numpy memory map으로 열어
+행마다 가장 비슷한 예시를 토큰 예산 안에서 고릅니다. 역색인은 CSR 형식(용어별 문서 번호/가중치 배열)이며
+BM25 가중치를 미리 계산해 두므로 질의는 질의 용어의 postings를 더하는 bincount 한 번입니다.
+"""
+import json
+import math
+import pathlib
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+PathLike = Union[str, pathlib.Path]
+
+_TOKEN = re.compile(r'[a-z][a-z0-9]+')
+# 검색에 도움이 되지 않는 일반 단어와 비식별화 표시
+STOPWORDS = frozenset("""
+and the was were with for from this that had has have his her she him are but not patient pt
+on in of to at by as an be or is it no yes which who will there their they been also than then
+redacted
+""".split())
+
+# 인덱스 파일 이름
+_ARRAYS = ('indptr', 'docs', 'weights')
+_META = 'meta.json'
+_VOCAB = 'vocab.json'
+_EXAMPLES = 'examples.json'
+
+
+def tokenize(text: str) -> List[str]:
+    """소문자 영숫자 단어 (2자 이상, 불용어 제외)"""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class Example(NamedTuple):
+    key: str
+    record: str  # 프롬프트에 넣을 축약 입력
+    target: str
+    tokens: int  # format_example 결과의 추정 토큰 수
+
+
+def format_example(record: str, target: str) -> str:
+    """프롬프트에 넣는 예시 한 건"""
+    return f"MEDICAL RECORD: {record}\nBRIEF HOSPITAL COURSE: {target}"
+
+
+def build_index(
+    path: PathLike,
+    documents: Sequence[str],
+    examples: Sequence[Example],
+    k1: float = 1.5,
+    b: float = 0.75,
+    max_df: float = 0.5,
+    meta: Optional[Dict] = None,
+) -> pathlib.Path:
+    """
+    documents(검색 대상 텍스트)로 BM25 역색인을 만들어 path 디렉토리에 저장합니다.
+    문서의 max_df 비율 넘게 나오는 용어는 변별력이 거의 없어 색인하지 않습니다. (질의 시간 단축)
+    """
+    path = pathlib.Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    counts = [Counter(tokenize(document)) for document in documents]
+    lengths = np.array([sum(c.values()) for c in counts], dtype=float)
+    avg_length = float(lengths.mean()) if len(lengths) and lengths.mean() > 0 else 1.0
+    document_frequency = Counter(term for c in counts for term in c)
+    limit = max(1, int(max_df * len(documents)))
+    vocab = {term: i for i, term in enumerate(sorted(t for t, df in document_frequency.items() if df <= limit))}
+
+    postings: List[List[Tuple[int, float]]] = [[] for _ in vocab]
+    for doc, (c, length) in enumerate(zip(counts, lengths)):
+        norm = k1 * (1 - b + b * length / avg_length)
+        for term, tf in c.items():
+            term_id = vocab.get(term)
+            if term_id is None:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+            postings[term_id].append((doc, idf * tf * (k1 + 1) / (tf + norm)))
+
+    indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(p) for p in postings])
+    docs = np.fromiter((doc for p in postings for doc, _ in p), dtype=np.int32, count=int(indptr[-1]))
+    weights = np.fromiter((w for p in postings for _, w in p), dtype=np.float32, count=int(indptr[-1]))
+    for name, array in zip(_ARRAYS, (indptr, docs, weights)):
+        np.save(path / f"{name}.npy", array)
+
+    (path / _VOCAB).write_text(json.dumps(vocab), encoding='utf-8')
+    (path / _EXAMPLES).write_text(json.dumps([list(e) for e in examples], ensure_ascii=False), encoding='utf-8')
+    (path / _META).write_text(json.dumps({**(meta or {}), 'documents': len(documents), 'k1': k1, 'b': b,
+                                          'max_df': max_df, 'terms': len(vocab)}), encoding='utf-8')
+    return path
+
+
+class FewShotIndex:
+    """저장된 BM25 인덱스 (배열은 memory map으로 열어 필요한 postings만 읽음)"""
+
+    def __init__(self, path: PathLike):
+        self.path = pathlib.Path(path)
+        self.meta = json.loads((self.path / _META).read_text(encoding='utf-8'))
+        self.vocab: Dict[str, int] = json.loads((self.path / _VOCAB).read_text(encoding='utf-8'))
+        self.examples = [Example(*e) for e in json.loads((self.path / _EXAMPLES).read_text(encoding='utf-8'))]
+        self.indptr, self.docs, self.weights = (
+            np.load(self.path / f"{name}.npy", mmap_mode='r') for name in _ARRAYS)
+        # 용어별 postings 위치는 질의마다 여러 번 읽으므로 메모리에 복사 (용어 수 + 1 크기)
+        self._indptr = np.array(self.indptr)
+
+    @staticmethod
+    def exists(path: PathLike) -> bool:
+        path = pathlib.Path(path)
+        return all((path / name).exists() for name in (_META, _VOCAB, _EXAMPLES, *(f"{a}.npy" for a in _ARRAYS)))
+
+    def __len__(self) -> int:
+        return len(self.examples)
+
+    def scores(self, text: str, max_query_terms: int = 64) -> np.ndarray:
+        """문서별 BM25 점수. 질의 용어가 많으면 postings가 짧은(희귀한) 용어 max_query_terms개만 사용"""
+        term_ids = np.fromiter({self.vocab[t] for t in tokenize(text) if t in self.vocab}, dtype=np.int64)
+        if not len(term_ids):
+            return np.zeros(len(self.examples), dtype=np.float64)
+        starts, ends = self._indptr[term_ids], self._indptr[term_ids + 1]
+        keep = np.argsort(ends - starts, kind='stable')[:max_query_terms]
+        starts, lengths = starts[keep], (ends - starts)[keep]
+        # 선택한 용어들의 postings 위치를 한 번에 만들어 memory map에서 한 번에 읽음
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return np.bincount(self.docs[positions], weights=self.weights[positions], minlength=len(self.examples))
+
+    def select(self, text: str, token_budget: int, max_examples: int = 2,
+               exclude: Optional[Set[str]] = None, candidates: int = 10) -> List[Example]:
+        """점수가 높은 후보부터 토큰 예산에 들어가는 예시를 max_examples개까지 (exclude: 제외할 key)"""
+        scores = self.scores(text)
+        top = np.argpartition(-scores, candidates)[:candidates] if len(scores) > candidates else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        chosen, remaining = [], token_budget
+        for doc in top:
+            if scores[doc] <= 0 or len(chosen) >= max_examples:
+                break
+            example = self.examples[doc]
+            if (exclude and example.key in exclude) or example.tokens > remaining:
+                continue
+            chosen.append(example)
+            remaining -= example.tokens
+        return chosen
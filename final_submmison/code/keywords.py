@@ -0,0 +1,98 @@
+"""
+키워드 사전 매칭 및 문장 점수화
+용어 목록(가중치 선택)을 접두사 트리 정규식 하나로 컴파일해 텍스트를 한 번 훑으며 모든 용어 출현을 찾습니다.
+문장마다 'term in sentence.lower()'를 용어 수만큼 반복하던 루프 대신, 문장들을 이어 붙인 텍스트를 한 번 스캔해
+(문장 x 용어) 출현 행렬과 가중치 점수를 만듭니다. 스캔 비용은 용어 수에 거의 영향을 받지 않아
+더 큰 임상 용어 사전으로 늘려도 됩니다. 매칭은 기존 루프와 같은 부분 문자열 기준입니다.
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+
+from rewriter import trie_pattern
+
+# 문장 사이 구분 문자 (용어에 포함될 수 없어 문장 경계를 넘는 일치가 생기지 않음)
+_SENTENCE_JOINER = '\x00'
+
+
+class KeywordMatcher:
+    """
+    용어 사전 매처
+    vocabulary: 용어 목록(가중치 1) 또는 {용어: 가중치}
+    ignore_case: 텍스트를 소문자로 바꿔 맞춤 (용어도 소문자로 정규화)
+    """
+
+    def __init__(self, vocabulary: Union[Iterable[str], Dict[str, float]], ignore_case: bool = True):
+        weighted = vocabulary if isinstance(vocabulary, dict) else {term: 1.0 for term in vocabulary}
+        self.ignore_case = ignore_case
+        merged: Dict[str, float] = {}
+        for term, weight in weighted.items():
+            term = term.lower() if ignore_case else term
+            if term and term not in merged:
+                merged[term] = float(weight)
+        self.terms: List[str] = list(merged)
+        self.weights = np.array(list(merged.values()), dtype=float)
+        self._index = {term: i for i, term in enumerate(self.terms)}
+        # 같은 위치에서 시작하는 더 짧은 용어 (예: 'liver'와 'liver failure')도 함께 세기 위한 접두사 목록
+        self._prefixes = {term: [self._index[other] for other in self.terms if term.startswith(other)]
+                          for term in self.terms}
+        # 모든 시작 위치에서 가장 긴 용어를 찾도록 전방 탐색으로 감쌈 (겹치는 출현도 모두 찾음)
+        self._pattern = re.compile(f"(?=({trie_pattern(self.terms)}))") if self.terms else None
+
+    def __repr__(self) -> str:
+        # 전처리 캐시 키(PREPROCESS_SETTINGS)에 쓰일 수 있도록 사전 내용으로 표현
+        return f"KeywordMatcher({dict(zip(self.terms, self.weights.tolist()))!r}, ignore_case={self.ignore_case})"
+
+    def _normalize(self, text: str) -> str:
+        return text.lower() if self.ignore_case else text
+
+    def _scan(self, normalized: str) -> Iterator[Tuple[int, int]]:
+        for match in self._pattern.finditer(normalized):
+            for term in self._prefixes[match.group(1)]:
+                yield match.start(), term
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(시작 위치, 용어 번호)를 텍스트 순서대로 (위치는 소문자 변환 후 텍스트 기준)"""
+        if self._pattern is None or not text:
+            return iter(())
+        return self._scan(self._normalize(text))
+
+    def counts(self, text: str) -> np.ndarray:
+        """용어별 출현 횟수 벡터"""
+        counts = np.zeros(len(self.terms), dtype=int)
+        for _, term in self.finditer(text):
+            counts[term] += 1
+        return counts
+
+    def contains_any(self, text: str) -> bool:
+        """용어가 하나라도 나오는지 (첫 일치에서 중단)"""
+        return self._pattern is not None and bool(text) and self._pattern.search(self._normalize(text)) is not None
+
+    def sentence_counts(self, sentences: List[str]) -> np.ndarray:
+        """(문장 x 용어) 출현 횟수 행렬 - 문장들을 이어 붙여 한 번만 스캔"""
+        matrix = np.zeros((len(sentences), len(self.terms)), dtype=int)
+        if not sentences or self._pattern is None:
+            return matrix
+        # 소문자 변환으로 길이가 바뀌는 문자가 있어도 오프셋이 맞도록 문장별로 먼저 변환
+        normalized = [self._normalize(sentence) for sentence in sentences]
+        starts = np.cumsum([0] + [len(sentence) + len(_SENTENCE_JOINER) for sentence in normalized[:-1]])
+        found = [(match.start(), match.group(1))
+                 for match in self._pattern.finditer(_SENTENCE_JOINER.join(normalized))]
+        if not found:
+            return matrix
+        positions = [start for start, matched in found for _ in self._prefixes[matched]]
+        terms = [term for _, matched in found for term in self._prefixes[matched]]
+        rows = np.searchsorted(starts, positions, side='right') - 1
+        np.add.at(matrix, (rows, terms), 1)
+        return matrix
+
+    def score_sentences(self, sentences: List[str], distinct: bool = True) -> np.ndarray:
+        """
+        문장별 가중치 점수. distinct=True이면 문장에 나온 용어마다 한 번씩 (기존 'term in sentence' 합과 같음),
+        False이면 출현 횟수만큼 가중치를 더합니다.
+        """
+        matrix = self.sentence_counts(sentences)
+        if distinct:
+            matrix = matrix > 0
+        return matrix @ self.weights
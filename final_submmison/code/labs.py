@@ -0,0 +1,138 @@
+"""
+검사 수치 추출 및 압축 표
+'Pertinent Results'의 시각별 검사 줄(예: '___ 07:00AM BLOOD WBC-5.1 RBC-4.23* Hgb-12.9*')에서
+(검사 항목, 값, 단위, 시각) 튜플을 한 번에 추출하고, 항목별 첫 값/가장 비정상 값/마지막 값만 남긴
+짧은 표로 바꿉니다. 같은 항목이 여러 시각에 반복되는 원문 대신 이 표를 프롬프트에 넣습니다.
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# 정규화된 항목 이름 -> (별칭(소문자), 단위, 참고 범위 하한, 상한) - 표에 나오는 순서
+LAB_ANALYTES: Dict[str, Tuple[Tuple[str, ...], str, float, float]] = {
+    'WBC': (('wbc',), 'K/uL', 4.0, 11.0),
+    'Hgb': (('hgb',), 'g/dL', 12.0, 17.5),
+    'Hct': (('hct',), '%', 36.0, 50.0),
+    'Plt': (('plt', 'plt count', 'plt ct'), 'K/uL', 150, 400),
+    'Neuts': (('neuts',), '%', 40.0, 75.0),
+    'Na': (('na', 'sodium'), 'mEq/L', 135, 145),
+    'K': (('k', 'potassium'), 'mEq/L', 3.5, 5.1),
+    'Cl': (('cl', 'chloride'), 'mEq/L', 96, 108),
+    'HCO3': (('hco3', 'total co2'), 'mEq/L', 22, 32),
+    'AnGap': (('angap', 'anion gap'), 'mEq/L', 8, 20),
+    'BUN': (('urean', 'urea n'), 'mg/dL', 6, 20),
+    'Cr': (('creat',), 'mg/dL', 0.5, 1.2),
+    'Glucose': (('glucose',), 'mg/dL', 70, 100),
+    'Ca': (('calcium',), 'mg/dL', 8.4, 10.3),
+    'Mg': (('mg', 'magnesium'), 'mg/dL', 1.6, 2.6),
+    'Phos': (('phos', 'phosphate'), 'mg/dL', 2.7, 4.5),
+    'ALT': (('alt', 'alt(sgpt)'), 'IU/L', 0, 40),
+    'AST': (('ast', 'ast(sgot)'), 'IU/L', 0, 40),
+    'AlkPhos': (('alkphos', 'alk phos'), 'IU/L', 40, 130),
+    'TBili': (('totbili', 'tot bili', 'bili'), 'mg/dL', 0, 1.5),
+    'Albumin': (('albumin',), 'g/dL', 3.5, 5.2),
+    'Lipase': (('lipase',), 'IU/L', 0, 60),
+    'CK': (('ck(cpk)', 'ck'), 'IU/L', 0, 200),
+    'TropT': (('ctropnt',), 'ng/mL', 0, 0.01),
+    'proBNP': (('probnp',), 'pg/mL', 0, 450),
+    'Lactate': (('lactate',), 'mmol/L', 0.5, 2.0),
+    'PT': (('pt',), 'sec', 9.4, 12.5),
+    'PTT': (('ptt',), 'sec', 25.0, 36.5),
+    'INR': (('inr(pt)', 'inr'), '', 0.9, 1.1),
+    'pH': (('ph',), '', 7.35, 7.45),
+    'pCO2': (('pco2',), 'mmHg', 35, 45),
+    'pO2': (('po2',), 'mmHg', 85, 105),
+    'TSH': (('tsh',), 'uIU/mL', 0.27, 4.2),
+    'CRP': (('crp',), 'mg/L', 0, 5.0),
+    'HbA1c': (('%hba1c', 'hba1c'), '%', 4.0, 6.0),
+}
+_ALIASES = {alias: name for name, (aliases, *_) in LAB_ANALYTES.items() for alias in aliases}
+_ORDER = {name: i for i, name in enumerate(LAB_ANALYTES)}
+
+# 혈액 외 검체 (소변/체액 수치는 혈액 참고 범위와 맞지 않아 제외)
+OTHER_SPECIMENS = ('URINE', 'ASCITES', 'PLEURAL', 'CSF', 'JOINT', 'FLUID', 'STOOL', 'OTHER')
+
+# 시각으로 시작하는 검사 줄과 뒤따르는 이어지는 줄 (다음 시각 줄이나 빈 줄 전까지)
+_LAB_BLOCK = re.compile(
+    r'^[_\d/\-\s]*?(\d{1,2}:\d{2}\s?[AP]M)[ \t]+([^\n]*(?:\n(?![_\d/\-\s]*?\d{1,2}:\d{2}\s?[AP]M)[^\n]*\S[^\n]*)*)',
+    re.MULTILINE)
+# 항목-값 (예: 'UREA N-18', 'Creat-5.1*#', 'TotBili-<0.2', 'INR(PT)-1.1')
+_LAB_VALUE = re.compile(
+    r'(?<![\w\-(])(%?[A-Za-z][A-Za-z0-9]*(?:\([A-Za-z]+\))?(?: [A-Za-z][A-Za-z0-9]*)?)-([<>])?(\d+(?:\.\d+)?)([*#]*)')
+
+
+class LabValue(NamedTuple):
+    analyte: str
+    value: float
+    text: str  # 원문 값 ('<0.2' 등)
+    unit: str
+    time: str  # 시각 (날짜는 비식별화되어 있어 문서 내 순서를 시간 순으로 사용)
+    flagged: bool  # 원문에 비정상 표시(*)가 있는지 (성별/연령별 기준이 반영된 원문 판정)
+
+
+def _canonical(name: str) -> Optional[str]:
+    lowered = name.lower()
+    if lowered in _ALIASES:
+        return _ALIASES[lowered]
+    # 'BLOOD WBC'처럼 검체 이름이 붙은 경우 마지막 단어로 다시 확인
+    return _ALIASES.get(lowered.rsplit(' ', 1)[-1]) if ' ' in lowered else None
+
+
+def parse_labs(text: str) -> List[LabValue]:
+    """텍스트의 모든 혈액 검사 줄에서 (항목, 값, 단위, 시각)을 문서 순서대로 추출"""
+    values = []
+    for block in _LAB_BLOCK.finditer(text):
+        time, body = block.group(1), block.group(2)
+        if body.lstrip().startswith(OTHER_SPECIMENS):
+            continue
+        for match in _LAB_VALUE.finditer(body):
+            analyte = _canonical(match.group(1))
+            if analyte is None:
+                continue
+            sign, number = match.group(2) or '', match.group(3)
+            values.append(LabValue(analyte, float(number), sign + number, LAB_ANALYTES[analyte][1], time,
+                                   '*' in match.group(4)))
+    return values
+
+
+def deviation(value: LabValue) -> float:
+    """참고 범위를 벗어난 정도 (범위 폭 기준, 범위 안이면 0)"""
+    _, _, low, high = LAB_ANALYTES[value.analyte]
+    width = (high - low) or 1.0
+    if value.value < low:
+        return (low - value.value) / width
+    if value.value > high:
+        return (value.value - high) / width
+    return 0.0
+
+
+def _format(value: LabValue) -> str:
+    """값 + 비정상 표시 (참고 범위 밖이거나 원문에 * 표시가 있으면 범위 중앙 기준 H/L)"""
+    _, _, low, high = LAB_ANALYTES[value.analyte]
+    if not value.flagged and low <= value.value <= high:
+        return value.text
+    return value.text + ('H' if value.value > (low + high) / 2 else 'L')
+
+
+def lab_table(values: List[LabValue]) -> str:
+    """
+    항목별 '첫 값->마지막 값 (worst 가장 비정상 값) 단위' 형식의 한 줄 표.
+    값이 하나면 그 값만, 가장 비정상 값이 첫/마지막 값과 같거나 모두 정상이면 worst는 생략합니다.
+    """
+    by_analyte: Dict[str, List[LabValue]] = {}
+    for value in values:
+        by_analyte.setdefault(value.analyte, []).append(value)
+
+    entries = []
+    for analyte in sorted(by_analyte, key=_ORDER.get):
+        series = by_analyte[analyte]
+        first, last = series[0], series[-1]
+        entry = f"{analyte} {_format(first)}"
+        if len(series) > 1:
+            entry += f"->{_format(last)}"
+            worst_index = max(range(len(series)), key=lambda i: deviation(series[i]))
+            if deviation(series[worst_index]) > 0 and 0 < worst_index < len(series) - 1:
+                entry += f" (worst {_format(series[worst_index])})"
+        if first.unit:
+            entry += f" {first.unit}"
+        entries.append(entry)
+    return '; '.join(entries)
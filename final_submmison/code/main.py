@@ -1,8 +1,24 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 import pandas as pd
 import asyncio
+import json
+import pathlib
 import re
+import shutil
+import warnings
 from processor import DatathonProcessor
+from dataset_cache import DEFAULT_CACHE_DIR, cached_file_hash, load_csv_cached
+from fewshot import Example, FewShotIndex, build_index, format_example
+from keywords import KeywordMatcher
+from patterns import PatternRegistry
+from rewriter import Rewriter
+from section_index import cut_at
+from boilerplate import LOW_VALUE_SECTIONS, NoteCompressor
+from extractive import extract
+from labs import lab_table, parse_labs
+from section_packer import pack_sections, priority_weights, truncate_to_tokens
+from tokens import estimate_tokens
+from triage import TRIAGE_COLUMNS, triage_header
 
 # TaskA Processor (앞서 작성한 최적화 버전)
 
@@ -10,12 +26,66 @@ from processor import DatathonProcessor
 class TaskAProcessor(DatathonProcessor):
     """Task A: Brief Hospital Course 작성"""
 
-    def get_model_name(self) -> str:
-        return "meta-llama/Llama-3.1-8B-Instruct"
-        # LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct-AWQ
-
-    def get_prompt_template(self) -> str:
-        return """You are a senior attending physician creating a Brief Hospital Course for medical documentation. Write a comprehensive yet concise summary following standard medical documentation practices.
+    # context 초과 시 보존 우선순위 (높은 순)
+    SECTION_PRIORITY = ['Chief Complaint', 'Triage', 'Service', 'Procedures', 'Clinical Presentation',
+                        'Key Labs', 'Past Medical History', 'Physical Examination']
+    INPUT_COLUMNS = ['sample_id', 'medical record'] + TRIAGE_COLUMNS
+    NOTE_COLUMN = 'medical record'
+    # 머리말과 약물 목록/퇴원 안내 섹션 제거 (퇴원 상태/장소는 경과 요약에 쓰이므로 유지)
+    NOTE_COMPRESSOR = NoteCompressor()
+    # 행별 입력(user_input) 토큰 예산 - SECTION_PRIORITY 가중치로 섹션을 골라 채움
+    INPUT_TOKEN_BUDGET = 1000
+    # 추출 요약 단계 (None이면 사용 안 함): EXTRACTIVE_MIN_TOKENS보다 긴 섹션 본문을
+    # EXTRACTIVE_RATIO 비율의 토큰으로 줄인 뒤 패킹 (EXTRACTIVE_METHOD: 'textrank' 또는 'tfidf')
+    EXTRACTIVE_RATIO: Optional[float] = None
+    EXTRACTIVE_MIN_TOKENS = 120
+    EXTRACTIVE_METHOD = 'textrank'
+    # map-reduce 모드에서 노트 전체를 청크별로 요약할 행 (압축 후 노트가 입력 예산의 2배를 넘는 긴 입원)
+    MAP_REDUCE_MIN_TOKENS = 2000
+    MAP_CHUNK_TOKENS = 1500
+    # 검색 few-shot (load_fewshot_index 사용 시): 행마다 비슷한 train 예시를 FEWSHOT_TOKEN_BUDGET 안에서
+    # 최대 FEWSHOT_MAX_EXAMPLES개 선택. 예시 입력은 전처리 결과를 FEWSHOT_RECORD_TOKENS로 줄여 사용
+    FEWSHOT_TOKEN_BUDGET = 900
+    FEWSHOT_MAX_EXAMPLES = 2
+    FEWSHOT_RECORD_TOKENS = 150
+    PREPROCESS_DEPENDENCIES = ['_pack_sections', '_extract_section', '_with_examples']
+    PREPROCESS_SETTINGS = ['INPUT_TOKEN_BUDGET', 'SECTION_PRIORITY', 'EXTRACTIVE_RATIO',
+                           'EXTRACTIVE_MIN_TOKENS', 'EXTRACTIVE_METHOD', 'fewshot_signature',
+                           'FEWSHOT_TOKEN_BUDGET', 'FEWSHOT_MAX_EXAMPLES', 'PATTERNS']
+    # 전처리 정규식 (클래스 정의 시 한 번 컴파일, 패턴별 호출 시간 기록)
+    PATTERNS = PatternRegistry('TaskA', {
+        'redacted': r'___+',
+        'whitespace': r'\s+',
+        'lab_lines': (r'((?:Labs?|Laboratory|Blood)\s*[:\-]\s*[^\n]{20,200})', re.IGNORECASE),
+    })
+    # 후처리 치환 규칙 (약어 표준화, 선호 표현) - 클래스 정의 시 한 번 컴파일
+    MEDICAL_CORRECTIONS = {
+        'pt ': 'patient ',
+        'w/ ': 'with ',
+        'w/o ': 'without ',
+        'h/o ': 'history of ',
+        'pt.': 'patient',
+        'dx ': 'diagnosis ',
+        'tx ': 'treatment ',
+        'meds ': 'medications ',
+        'labs ': 'laboratory studies '
+    }
+    CLINICAL_ENHANCEMENTS = {
+        'was given': 'received',
+        'got better': 'showed clinical improvement',
+        'felt better': 'reported symptomatic improvement',
+        'went home': 'was discharged home',
+        'came in': 'presented to the hospital'
+    }
+    OUTPUT_REWRITER = Rewriter({**MEDICAL_CORRECTIONS, **CLINICAL_ENHANCEMENTS})
+    # 후처리 키워드 사전: 경과 서술 여부 확인, 긴 출력 축약 시 문장 점수 (OSS-120B가 선호하는 핵심 의료 키워드)
+    COURSE_TERMS = KeywordMatcher(['admitted', 'course', 'treatment', 'discharge'])
+    PRIORITY_KEYWORDS = KeywordMatcher(['admitted', 'diagnosis', 'treated', 'underwent', 'developed',
+                                        'improved', 'discharged', 'course', 'complication', 'surgery',
+                                        'therapy', 'management', 'stable', 'condition'])
+
+    # 공통 지시문과 기본 few-shot 예시 (few-shot 인덱스가 없을 때 system prompt에 고정)
+    SYSTEM_INSTRUCTIONS = """You are a senior attending physician creating a Brief Hospital Course for medical documentation. Write a comprehensive yet concise summary following standard medical documentation practices.
 
 CRITICAL REQUIREMENTS FOR OSS-120B EVALUATION:
 - Write 250-400 words with precise medical terminology
@@ -30,134 +100,297 @@ DOCUMENTATION STRUCTURE:
 2. CLINICAL COURSE: Chronological progression with specific interventions
 3. KEY FINDINGS: Laboratory results, imaging, diagnostic conclusions
 4. TREATMENT RESPONSE: Patient improvement/complications with timeline
-5. DISPOSITION: Discharge status, follow-up plans, final condition
-
-EXAMPLES WITH OSS-120B OPTIMIZATION:
-
-MEDICAL RECORD: [Gynecologic oncology case...]
+5. DISPOSITION: Discharge status, follow-up plans, final condition"""
+    DEFAULT_EXAMPLE = """MEDICAL RECORD: [Gynecologic oncology case...]
 BRIEF HOSPITAL COURSE: Ms. ___ was admitted to the gynecologic oncology service on [DATE] for planned surgical intervention. She underwent diagnostic laparoscopy which was converted to exploratory laparotomy due to extensive disease burden. The procedure included total abdominal hysterectomy, bilateral salpingo-oophrectomy, omentectomy, pelvic and para-aortic lymph node dissection, and optimal tumor debulking for Stage IIIC ovarian carcinoma.
 
 Her postoperative course was complicated by prolonged ileus requiring nasogastric decompression for 5 days and temporary total parenteral nutrition support. On postoperative day 5, she developed a superficial surgical site infection which was promptly treated with targeted antibiotic therapy and specialized wound care protocols. Pain management transitioned from patient-controlled analgesia with morphine to oral analgesics by postoperative day 4.
 
-Laboratory parameters normalized progressively with hemoglobin stabilizing at 10.2 g/dL and white blood cell count returning to normal limits. She was extensively counseled regarding her diagnosis and the importance of adjuvant chemotherapy planning with oncology. Patient was discharged home on postoperative day 8 in stable condition with visiting nurse services coordinated for ongoing wound assessment and surgical follow-up scheduled within one week.
+Laboratory parameters normalized progressively with hemoglobin stabilizing at 10.2 g/dL and white blood cell count returning to normal limits. She was extensively counseled regarding her diagnosis and the importance of adjuvant chemotherapy planning with oncology. Patient was discharged home on postoperative day 8 in stable condition with visiting nurse services coordinated for ongoing wound assessment and surgical follow-up scheduled within one week."""
+
+    def __init__(self, *args, **kwargs):
+        # 행별 few-shot 예시 검색 인덱스 (load_fewshot_index로 불러옴, 프롬프트 구성 전에 필요)
+        self.fewshot_index: Optional[FewShotIndex] = None
+        self.fewshot_signature: Optional[str] = None
+        super().__init__(*args, **kwargs)
+        # sample_id -> {'tokens', 'dropped', 'truncated', 'extracted_saved'} (전처리 캐시 적중 행은 기록되지 않음)
+        self.section_packing: Dict[str, Dict[str, Any]] = {}
+
+    def prepare_batch(self, data: pd.DataFrame) -> pd.DataFrame:
+        """구조화된 입원/트리아지 컬럼을 전체 행에 대해 한 번에 'Triage: ...' 헤더로 변환"""
+        data = super().prepare_batch(data)
+        return data.assign(triage_header=triage_header(data))
+
+    def _extract_section(self, text: str) -> Tuple[str, int]:
+        """'라벨: 본문' 섹션의 본문을 추출 요약으로 줄임. (섹션, 줄어든 토큰 수) 반환"""
+        label, _, body = text.partition(': ')
+        model_name = self.config['model_name']
+        tokens = estimate_tokens(body, model_name)
+        if not self.EXTRACTIVE_RATIO or tokens <= self.EXTRACTIVE_MIN_TOKENS:
+            return text, 0
+        extracted = extract(body, int(tokens * self.EXTRACTIVE_RATIO), model_name, self.EXTRACTIVE_METHOD)
+        return f"{label}: {extracted.text}", extracted.tokens_before - extracted.tokens_after
+
+    def _pack_sections(self, data: Any, sections: List[Tuple[str, str]]) -> str:
+        """정제한 섹션을 INPUT_TOKEN_BUDGET 안에서 우선순위 가중치가 최대가 되도록 골라 이어 붙임"""
+        cleaned, saved = [], 0
+        for name, text in sections:
+            # 추출 요약은 줄바꿈(문장/목록 경계)이 남아 있는 정제 전 텍스트에 적용
+            text, section_saved = self._extract_section(text)
+            saved += section_saved
+            text = self.PATTERNS.redacted.sub('[REDACTED]', text)  # 완전 제거 대신 표시
+            text = self.PATTERNS.whitespace.sub(' ', text).strip()
+            if text:
+                cleaned.append((name, text))
+
+        packed = pack_sections(cleaned, self.INPUT_TOKEN_BUDGET, priority_weights(self.SECTION_PRIORITY),
+                               self.config['model_name'])
+        key = data.get('sample_id') if hasattr(data, 'get') else None
+        if key is not None:
+            self.section_packing[str(key)] = {'tokens': packed.tokens, 'dropped': packed.dropped,
+                                              'truncated': packed.truncated, 'extracted_saved': saved}
+        return ' '.join(text for _, text in packed.sections)
+
+    def section_packing_report(self) -> pd.DataFrame:
+        """행별 패킹 결과와 섹션별 제외/축약 횟수를 metrics['section_packing']에 기록하고 반환"""
+        report = pd.DataFrame(
+            [(key, v['tokens'], ', '.join(v['dropped']), ', '.join(v['truncated']))
+             for key, v in self.section_packing.items()],
+            columns=['sample_id', 'tokens', 'dropped', 'truncated'])
+
+        def counts(field):
+            names = [name for v in self.section_packing.values() for name in v[field]]
+            return pd.Series(names, dtype=object).value_counts().to_dict()
+
+        self.metrics['section_packing'] = {
+            'task': type(self).__name__,
+            'rows': len(report),
+            'budget': self.INPUT_TOKEN_BUDGET,
+            'avg_tokens': round(float(report['tokens'].mean()), 1) if len(report) else 0.0,
+            'max_tokens': int(report['tokens'].max()) if len(report) else 0,
+            'extractive_ratio': self.EXTRACTIVE_RATIO,
+            'extracted_saved_tokens': sum(v['extracted_saved'] for v in self.section_packing.values()),
+            'dropped': counts('dropped'),
+            'truncated': counts('truncated'),
+        }
+        return report
+
+    async def load_fewshot_index(self, train_path: str, cache_dir: Optional[str] = None) -> bool:
+        """
+        train CSV의 (medical record, target) 쌍으로 few-shot 검색 인덱스를 만들거나(처음 한 번) 저장된 인덱스를 열고,
+        프롬프트를 고정 예시 대신 행별 검색 예시를 넣는 형식으로 바꿉니다.
+        인덱스 문서는 이 프로세서의 전처리 결과이므로 (원본 해시, 전처리 코드 해시)별로 데이터셋 옆 캐시 디렉토리에 저장합니다.
+        train 파일이 없으면 경고 후 고정 예시를 그대로 사용하고 False를 반환합니다.
+        """
+        train_path = pathlib.Path(train_path)
+        if not train_path.exists():
+            warnings.warn(f"{type(self).__name__}: few-shot train 파일이 없어 고정 예시를 사용합니다: {train_path}")
+            return False
+        cache_dir = pathlib.Path(cache_dir) if cache_dir else train_path.parent / DEFAULT_CACHE_DIR
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # 인덱스 문서(train 전처리 결과)에는 예시를 넣지 않음
+        self.fewshot_index, self.fewshot_signature = None, None
+        signature = f"{cached_file_hash(train_path, cache_dir)}-{self.preprocess_code_hash()}"
+        path = cache_dir / f"{train_path.stem}-{signature}.fewshot"
+        if not FewShotIndex.exists(path):
+            train = load_csv_cached(train_path, cache_dir=cache_dir)
+            train = train[train['target'].notna() & train[self.NOTE_COLUMN].notna()].reset_index(drop=True)
+            packing = self.section_packing
+            documents = [vars['user_input'] for vars in await self.preprocess_all(train)]
+            self.section_packing = packing
+
+            model_name = self.config['model_name']
+            keys = self._row_keys(train)
+            examples = []
+            for key, document, target in zip(keys, documents, train['target'].astype(str)):
+                record = truncate_to_tokens(document, self.FEWSHOT_RECORD_TOKENS, model_name)
+                target = target.strip()
+                examples.append(Example(key, record, target,
+                                        estimate_tokens(format_example(record, target), model_name)))
+            build_index(path, documents, examples, meta={'source': train_path.name, 'signature': signature})
+            # 같은 원본의 이전 버전 인덱스 정리
+            for stale in cache_dir.glob(f"{train_path.stem}-*.fewshot"):
+                if stale != path:
+                    shutil.rmtree(stale, ignore_errors=True)
+
+        self.fewshot_index = FewShotIndex(path)
+        self.fewshot_signature = signature
+        self.prompt_template = self.build_prompt(self.get_prompt_template(), self.get_system_prompt())
+        self.chain = self.prompt_template | self.llm
+        return True
+
+    def _with_examples(self, data: Any, vars: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        few-shot 인덱스가 있으면 user_input과 가장 비슷한 train 예시를 examples 변수로 추가
+        train과 test의 sample_id는 서로 다른 번호 체계이므로 행의 sample_id로 예시를 제외하지 않습니다.
+        """
+        if self.fewshot_index is None:
+            return vars
+        chosen = self.fewshot_index.select(vars['user_input'], self.FEWSHOT_TOKEN_BUDGET, self.FEWSHOT_MAX_EXAMPLES)
+        examples = [format_example(e.record, e.target) for e in chosen] or [self.DEFAULT_EXAMPLE]
+        return dict(vars, examples='\n\n'.join(f"EXAMPLE {i}:\n{text}" for i, text in enumerate(examples, 1)))
+
+    def get_model_name(self) -> str:
+        return "meta-llama/Llama-3.1-8B-Instruct"
+        # LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct-AWQ
+
+    def get_system_prompt(self) -> str:
+        """
+        모든 행에 공통인 지시문과 few-shot 예시 (서버 prefix cache 대상)
+        few-shot 인덱스를 불러왔으면 예시는 행별로 검색해 user 메시지에 넣으므로 지시문만 반환합니다.
+        """
+        if self.fewshot_index is not None:
+            return self.SYSTEM_INSTRUCTIONS
+        return f"{self.SYSTEM_INSTRUCTIONS}\n\nEXAMPLES WITH OSS-120B OPTIMIZATION:\n\n{self.DEFAULT_EXAMPLE}"
+
+    def get_prompt_template(self) -> str:
+        if self.fewshot_index is not None:
+            return """Similar cases for reference:
+
+{examples}
 
 Now create a Brief Hospital Course for:
 
 MEDICAL RECORD: {user_input}
 
 BRIEF HOSPITAL COURSE:"""
+        return """Now create a Brief Hospital Course for:
+
+MEDICAL RECORD: {user_input}
+
+BRIEF HOSPITAL COURSE:"""
+
+    def get_cascade_prompt_template(self) -> str:
+        """cascade 1차 호출용 축약 프롬프트 (few-shot 예시 제외)"""
+        return """You are a senior attending physician. Write a Brief Hospital Course (250-400 words) in chronological narrative: admission reason, clinical course with specific interventions, key findings, treatment response, and discharge disposition. Use precise medical terminology.
+
+MEDICAL RECORD: {user_input}
+
+BRIEF HOSPITAL COURSE:"""
+
+    def get_map_prompt_template(self) -> str:
+        """map-reduce 청크 요약 프롬프트 (청크 해시로 캐시되므로 청크 외 변수는 넣지 않음)"""
+        return """You are a physician condensing one part of a long discharge note. The summaries of all parts will later be combined into a Brief Hospital Course.
+
+Summarize this part in at most 150 words. Keep diagnoses, procedures with dates or hospital days, medications with doses, abnormal lab and imaging results, complications, and the order of events. Do not add information that is not in the text.
+
+NOTE PART: {user_input}
+
+SUMMARY:"""
+
+    def format_reduce_input(self, data: Any, vars: Dict[str, Any], summaries: List[str]) -> Dict[str, Any]:
+        """트리아지 헤더와 주호소를 앞에 두고 청크 요약을 순서대로 이어 붙인 reduce 입력"""
+        parts = []
+        triage = data.get('triage_header')
+        if isinstance(triage, str) and triage:
+            parts.append(triage)
+        cc = self.note_sections(data, data.get(self.NOTE_COLUMN, '')).after(
+            'Chief Complaint', literal='Chief Complaint:')
+        cc = cc.lstrip().split('\n', 1)[0].strip() if cc is not None else ''
+        if cc:
+            parts.append(f"Chief Complaint: {cc}")
+        parts.extend(f"Note Part {i}/{len(summaries)}: {summary}" for i, summary in enumerate(summaries, 1))
+        return dict(vars, user_input='\n\n'.join(parts))
+
+    async def validate_result(self, inputs: Dict[str, Any], raw: str, result: str) -> bool:
+        """축약 프롬프트 결과가 최소 분량과 핵심 경과 서술을 갖췄는지 검증"""
+        if not raw or not raw.strip():
+            return False
+        lowered = result.lower()
+        return len(result.split()) >= 120 and any(term in lowered for term in ['admitted', 'discharge'])
 
     async def preprocess_data(self, data: Any) -> Dict[str, Any]:
         """의료 기록을 Brief Hospital Course 작성을 위해 전처리 - OSS-120B 최적화"""
-        import re
-        import pandas as pd
-
         try:
             medical_record = data.get('medical record', '')
 
             if pd.isna(medical_record) or not isinstance(medical_record, str) or not medical_record.strip():
-                return {'user_input': 'Patient admitted for comprehensive medical evaluation and management.'}
+                return self._with_examples(
+                    data, {'user_input': 'Patient admitted for comprehensive medical evaluation and management.'})
 
             processed_sections = []
+            # 섹션 위치는 sidecar 오프셋 인덱스(없으면 1회 인덱싱)에서 바로 조회
+            sections = self.note_sections(data, medical_record)
 
             # 더 상세한 정보 추출 (OSS-120B 선호)
 
             # Chief Complaint & Admission Details
-            if 'Chief Complaint:' in medical_record:
-                cc_match = re.search(
-                    r'Chief Complaint:\s*([^\n]+)', medical_record)
-                if cc_match and cc_match.group(1).strip():
+            cc = sections.after('Chief Complaint', literal='Chief Complaint:')
+            if cc is not None:
+                cc = cc.lstrip().split('\n', 1)[0]
+                if cc.strip():
                     processed_sections.append(
-                        f"Chief Complaint: {cc_match.group(1).strip()}")
-
-            # Service & Admission Type
-            service_info = []
-            if 'Service:' in medical_record:
-                service_match = re.search(
-                    r'Service:\s*([^\n]+)', medical_record)
-                if service_match and service_match.group(1).strip():
-                    service_info.append(
-                        f"Service: {service_match.group(1).strip()}")
-
-            # Admission Type (OSS-120B values context)
-            admission_type_match = re.search(
-                r'admission_type[\'\"]*:\s*[\'\"]*([^\'\"\\n,]+)', medical_record, re.IGNORECASE)
-            if admission_type_match:
-                service_info.append(
-                    f"Admission Type: {admission_type_match.group(1).strip()}")
-
-            if service_info:
-                processed_sections.append(' | '.join(service_info))
+                        ('Chief Complaint', f"Chief Complaint: {cc.strip()}"))
+
+            # 입원 유형/트리아지 활력징후/재원 기간 (구조화 컬럼, prepare_batch에서 전체 행에 대해 미리 계산)
+            triage = data.get('triage_header')
+            if triage is None:
+                triage = triage_header(pd.DataFrame([data])).iloc[0]
+            if isinstance(triage, str) and triage:
+                processed_sections.append(('Triage', triage))
+
+            # Service
+            service = sections.after('Service', literal='Service:')
+            if service is not None:
+                service = service.lstrip().split('\n', 1)[0]
+                if service.strip():
+                    processed_sections.append(('Service', f"Service: {service.strip()}"))
 
             # Enhanced History with Clinical Context
-            if 'History of Present Illness:' in medical_record:
-                hpi_match = re.search(r'History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|Physical Exam|$)',
-                                      medical_record, re.DOTALL)
-                if hpi_match and hpi_match.group(1).strip():
-                    hpi = hpi_match.group(1).strip()[:1200]  # 더 많은 컨텍스트
-                    processed_sections.append(f"Clinical Presentation: {hpi}")
+            hpi = sections.after('History of Present Illness', literal='History of Present Illness:')
+            if hpi is not None:
+                hpi = cut_at(hpi.lstrip(), '\n\n', '\nPast Medical', 'Physical Exam')
+                if hpi.strip():
+                    processed_sections.append(('Clinical Presentation', f"Clinical Presentation: {hpi.strip()}"))
 
             # Major Procedures with Details
-            if 'Major Surgical or Invasive Procedure:' in medical_record:
-                proc_match = re.search(r'Major Surgical or Invasive Procedure:\s*(.*?)(?=\n\n|History of Present|$)',
-                                       medical_record, re.DOTALL)
-                if proc_match:
-                    proc = proc_match.group(1).strip()
-                    if proc and proc.lower() not in ['none', 'none.', '']:
-                        processed_sections.append(f"Procedures: {proc}")
-
-            # Vital Signs & Lab Values (OSS-120B values specificity)
-            if 'VS:' in medical_record or 'Vitals:' in medical_record:
-                vitals_match = re.search(
-                    r'(?:VS|Vitals):\s*([^\n]+)', medical_record)
-                if vitals_match:
-                    processed_sections.append(
-                        f"Admission Vitals: {vitals_match.group(1).strip()}")
-
-            # Key Laboratory Results
-            lab_sections = re.findall(
-                r'((?:Labs?|Laboratory|Blood)\s*[:\-]\s*[^\n]{20,200})', medical_record, re.IGNORECASE)
-            if lab_sections:
+            proc = sections.after('Major Surgical or Invasive Procedure',
+                                  literal='Major Surgical or Invasive Procedure:')
+            if proc is not None:
+                proc = cut_at(proc.lstrip(), '\n\n', 'History of Present').strip()
+                if proc and proc.lower() not in ['none', 'none.', '']:
+                    processed_sections.append(('Procedures', f"Procedures: {proc}"))
+
+            # Key Laboratory Results - 시각별 검사 줄을 항목별 첫 값/가장 비정상 값/마지막 값 표로 압축
+            lab_values = parse_labs(sections.section('Pertinent Results') or medical_record)
+            if lab_values:
+                processed_sections.append(('Key Labs', f"Key Labs: {lab_table(lab_values)}"))
+            else:
+                lab_sections = self.PATTERNS.lab_lines.findall(medical_record)
                 for i, lab in enumerate(lab_sections[:2]):
-                    processed_sections.append(f"Key Labs {i+1}: {lab.strip()}")
+                    processed_sections.append((f"Key Labs {i+1}", f"Key Labs {i+1}: {lab.strip()}"))
 
             # Past Medical History (Essential Context)
-            if 'Past Medical History:' in medical_record:
-                pmh_match = re.search(r'Past Medical History:\s*(.*?)(?=\n\n|PAST SURGICAL|Social History|$)',
-                                      medical_record, re.DOTALL)
-                if pmh_match and pmh_match.group(1).strip():
-                    pmh = pmh_match.group(1).strip()[:600]  # 더 상세히
-                    processed_sections.append(f"Past Medical History: {pmh}")
+            pmh = sections.after('Past Medical History', literal='Past Medical History:')
+            if pmh is not None:
+                pmh = cut_at(pmh.lstrip(), '\n\n', 'PAST SURGICAL', 'Social History')
+                if pmh.strip():
+                    processed_sections.append(('Past Medical History', f"Past Medical History: {pmh.strip()}"))
 
             # Physical Exam Key Findings
-            if 'Physical Exam:' in medical_record or 'PHYSICAL EXAM:' in medical_record:
-                pe_match = re.search(r'(?:Physical Exam|PHYSICAL EXAM):\s*(.*?)(?=\n\n|Pertinent Results|$)',
-                                     medical_record, re.DOTALL)
-                if pe_match:
-                    pe = pe_match.group(1).strip()[:800]
-                    processed_sections.append(f"Physical Examination: {pe}")
+            pe = sections.after('Physical Exam', literal=('Physical Exam:', 'PHYSICAL EXAM:'))
+            if pe is not None:
+                pe = cut_at(pe.lstrip(), '\n\n', 'Pertinent Results').strip()
+                processed_sections.append(('Physical Examination', f"Physical Examination: {pe}"))
 
+            # 섹션별 고정 문자 수 제한 대신 토큰 예산 안에서 우선순위가 높은 섹션부터 채움
             if processed_sections:
-                processed_text = '\n\n'.join(processed_sections)
+                processed_text = self._pack_sections(data, processed_sections)
             else:
-                processed_text = medical_record[:3500]  # 더 많은 원본 데이터
+                # 섹션을 찾지 못하면 원본 앞부분을 예산만큼 사용
+                processed_text = self.PATTERNS.redacted.sub('[REDACTED]', medical_record)
+                processed_text = self.PATTERNS.whitespace.sub(' ', processed_text).strip()
+                processed_text = truncate_to_tokens(processed_text, self.INPUT_TOKEN_BUDGET, self.config['model_name'])
 
-            # 텍스트 정제 (덜 aggressive)
-            processed_text = re.sub(
-                r'___+', '[REDACTED]', processed_text)  # 완전 제거 대신 표시
-            processed_text = re.sub(r'\s+', ' ', processed_text)
-            processed_text = processed_text.strip()[:4000]  # 더 많은 정보 허용
-
-            return {'user_input': processed_text if processed_text else 'Patient admitted for comprehensive medical evaluation and management.'}
+            return self._with_examples(data, {'user_input': processed_text if processed_text else 'Patient admitted for comprehensive medical evaluation and management.'})
 
         except Exception as e:
             fallback_text = str(data.get('medical record', ''))
-            return {'user_input': fallback_text if fallback_text.strip() else 'Patient admitted for comprehensive medical evaluation and management.'}
+            return self._with_examples(data, {'user_input': fallback_text if fallback_text.strip() else 'Patient admitted for comprehensive medical evaluation and management.'})
 
     async def postprocess_result(self, result: str) -> str:
         """결과 정리 및 최적화 - OSS-120B 평가 기준 반영"""
-        import re
-
         try:
             if not result or not isinstance(result, str):
                 return "Patient was admitted for medical care. Clinical course was monitored with appropriate interventions. Patient achieved stable condition for discharge."
@@ -183,7 +416,7 @@ BRIEF HOSPITAL COURSE:"""
 
             # 너무 짧으면 확장 (Clinical Clarity 향상)
             if len(words) < 200:
-                if not any(term in result.lower() for term in ['admitted', 'course', 'treatment', 'discharge']):
+                if not self.COURSE_TERMS.contains_any(result):
                     result = f"The patient was admitted for evaluation and management. {result}"
 
             # 너무 길면 핵심 정보 유지하며 축약 (Conciseness 향상)
@@ -191,15 +424,8 @@ BRIEF HOSPITAL COURSE:"""
                 sentences = [s.strip() for s in result.split('.') if s.strip()]
                 if sentences:
                     # OSS-120B가 선호하는 핵심 의료 키워드 우선 보존
-                    priority_keywords = ['admitted', 'diagnosis', 'treated', 'underwent', 'developed',
-                                         'improved', 'discharged', 'course', 'complication', 'surgery',
-                                         'therapy', 'management', 'stable', 'condition']
-
-                    scored_sentences = []
-                    for sentence in sentences:
-                        score = sum(
-                            1 for keyword in priority_keywords if keyword in sentence.lower())
-                        scored_sentences.append((sentence, score))
+                    scores = self.PRIORITY_KEYWORDS.score_sentences(sentences)
+                    scored_sentences = list(zip(sentences, scores))
 
                     # 점수 기준 정렬 후 상위 선택
                     scored_sentences.sort(key=lambda x: x[1], reverse=True)
@@ -221,33 +447,8 @@ BRIEF HOSPITAL COURSE:"""
                         if not result.endswith('.'):
                             result += '.'
 
-            # Medical term standardization (Accuracy 향상)
-            medical_corrections = {
-                'pt ': 'patient ',
-                'w/ ': 'with ',
-                'w/o ': 'without ',
-                'h/o ': 'history of ',
-                'pt.': 'patient',
-                'dx ': 'diagnosis ',
-                'tx ': 'treatment ',
-                'meds ': 'medications ',
-                'labs ': 'laboratory studies '
-            }
-
-            for wrong, correct in medical_corrections.items():
-                result = result.replace(wrong, correct)
-
-            # OSS-120B 선호 표현 강화
-            clinical_enhancements = {
-                'was given': 'received',
-                'got better': 'showed clinical improvement',
-                'felt better': 'reported symptomatic improvement',
-                'went home': 'was discharged home',
-                'came in': 'presented to the hospital'
-            }
-
-            for casual, formal in clinical_enhancements.items():
-                result = result.replace(casual, formal)
+            # 용어 표준화(Accuracy 향상)와 OSS-120B 선호 표현 강화 - 규칙 표 전체를 한 번의 스캔으로 치환
+            result = self.OUTPUT_REWRITER.rewrite(result)
 
             return result if result.strip() else "Patient was admitted for medical care. Clinical course was monitored with appropriate interventions. Patient achieved stable condition for discharge."
 
@@ -258,10 +459,29 @@ BRIEF HOSPITAL COURSE:"""
 class TaskBProcessor(DatathonProcessor):
     """Task B: Radiology Impression 요약"""
 
+    INPUT_COLUMNS = ['sample_id', 'radiology report']
+    PREPROCESS_SETTINGS = ['PATTERNS']
+    # 전/후처리 정규식 (클래스 정의 시 한 번 컴파일, 패턴별 호출 시간 기록)
+    # ITEM/END 구분자 안에는 '['가 없으므로 다음 '['에서 멈춤 (닫히지 않은 구분자가 많아도 선형 시간)
+    PATTERNS = PatternRegistry('TaskB', {
+        'item_marker': r'\[\[ITEM\s+([^\[\]]+?)\s*\]\]',
+        'end_marker': r'\[\[END\b[^\[\]]*\]\]',
+        'sentence_break': r'[.;\n]',
+        'impression_label': (r'^\s*impression:?', re.IGNORECASE),
+        'leading_colon': r'^[:\s]*',
+        'redacted': r'\b___\b',
+        'whitespace': r'\s+',
+        # 소견 앞의 부정 표현 (단어 경계로 매칭해 'piano ', 'techno ' 등의 부분 문자열은 제외)
+        'negation_cue': r'\b(?:no|without|negative\s+for|free\s+of|resolved)\b',
+        # 소견 뒤에서 문장을 끝내는 부정 답변 ('Pneumothorax: no.', 'effusion - none')
+        'negated_answer': r'^\s*(?:[:\-]\s*)?(?:no|none|absent|negative)\s*$',
+    }, inputs=('[[ITEM ', '[[END a', 'FINDINGS: ', 'IMPRESSION: '))
+
     def get_model_name(self) -> str:
         return "meta-llama/Llama-3.1-8B-Instruct"
 
-    def get_prompt_template(self) -> str:
+    def get_system_prompt(self) -> str:
+        """모든 행에 공통인 지시문과 few-shot 예시 (서버 prefix cache 대상)"""
         return """You are a board-certified radiologist with 15+ years of experience. Generate a precise and comprehensive IMPRESSION from the given FINDINGS.
 
 CRITICAL REQUIREMENTS:
@@ -283,17 +503,100 @@ IMPRESSION: 1. Enhancing right frontal extra-axial mass compatible with meningio
 CHEST X-RAY:
 FINDINGS: Mild enlargement of the cardiac silhouette with mild interstitial pulmonary edema. There is mild bibasilar atelectasis, but no focal consolidations to suggest pneumonia. Possible small bilateral pleural effusions. No pneumothorax.
 IMPRESSION: 1. Mild cardiomegaly and mild interstitial pulmonary edema. Possible small bilateral pleural effusions.
-2. Bibasilar atelectasis, but no focal consolidations to suggest pneumonia.
+2. Bibasilar atelectasis, but no focal consolidations to suggest pneumonia."""
+
+    def get_prompt_template(self) -> str:
+        return """Now generate IMPRESSION for:
+FINDINGS: {user_input}
+IMPRESSION:"""
+
+    # packing 모드: IMPRESSION은 대부분 20-80 단어이므로 한 요청에 최대 10건
+    PACK_MAX_ITEMS = 10
+    PACK_OUTPUT_TOKENS_PER_ITEM = 160
+
+    def get_packed_prompt_template(self) -> str:
+        """여러 FINDINGS를 한 요청으로 처리하는 packing 프롬프트"""
+        return """Now generate an IMPRESSION for each of the following {count} FINDINGS.
+Each item is wrapped in [[ITEM id]] ... [[END id]]. Treat every item independently.
+Answer every item in the same order using exactly this format, with nothing else:
+[[ITEM id]]
+IMPRESSION text
+[[END id]]
+
+{items}"""
+
+    def format_packed_items(self, items) -> str:
+        """(sample_id, 전처리 결과) 목록을 ID 구분자로 감싼 FINDINGS 블록으로 변환"""
+        return '\n\n'.join(
+            f"[[ITEM {item_id}]]\nFINDINGS: {vars['user_input']}\n[[END {item_id}]]"
+            for item_id, vars in items)
+
+    def parse_packed_result(self, raw: str, ids) -> Dict[str, str]:
+        """[[ITEM id]] 구분자 기준으로 응답을 sample_id별 IMPRESSION으로 분리"""
+        wanted = set(ids)
+        markers = list(self.PATTERNS.item_marker.finditer(raw))
+        parsed = {}
+        for i, marker in enumerate(markers):
+            item_id = marker.group(1).strip()
+            if item_id not in wanted or item_id in parsed:
+                continue
+            end = markers[i + 1].start() if i + 1 < len(markers) else len(raw)
+            body = raw[marker.end():end]
+            body = self.PATTERNS.end_marker.split(body, 1)[0]
+            parsed[item_id] = body.strip()
+        return parsed
+
+    async def validate_packed_item(self, inputs: Dict[str, Any], raw: str) -> bool:
+        """비어 있거나 FINDINGS를 그대로 되풀이했거나 FINDINGS와 모순되면 개별 재호출"""
+        if raw.lstrip().upper().startswith('FINDINGS:'):
+            return False
+        return await self.validate_result(inputs, raw, raw)
+
+    def get_cascade_prompt_template(self) -> str:
+        """cascade 1차 호출용 축약 프롬프트 (few-shot 예시 제외)"""
+        return """You are a board-certified radiologist. Write a concise IMPRESSION (20-80 words) consistent with the FINDINGS, using numbered points for multiple findings.
 
-Now generate IMPRESSION for:
 FINDINGS: {user_input}
 IMPRESSION:"""
 
+    # FINDINGS/IMPRESSION 간 극성 비교 대상 소견
+    CONTRADICTION_TERMS = [
+        'pneumothorax', 'effusion', 'consolidation', 'pneumonia', 'edema',
+        'hemorrhage', 'infarct', 'fracture', 'mass', 'obstruction',
+        'atelectasis', 'cardiomegaly', 'embolism', 'dislocation', 'free air',
+    ]
+
+    def _term_polarity(self, text: str, term: str) -> Optional[bool]:
+        """문장 단위로 term 언급 여부를 판단 (True: 양성, False: 부정, None: 언급 없음)"""
+        polarity = None
+        for sentence in self.PATTERNS.sentence_break.split(text.lower()):
+            idx = sentence.find(term)
+            if idx < 0:
+                continue
+            negated = (self.PATTERNS.negation_cue.search(sentence[:idx]) is not None
+                       or self.PATTERNS.negated_answer.search(sentence[idx + len(term):]) is not None)
+            if not negated:
+                return True
+            polarity = False
+        return polarity
+
+    def _contradicts_findings(self, findings: str, impression: str) -> bool:
+        """IMPRESSION이 FINDINGS와 반대 극성으로 소견을 서술하는지 확인"""
+        for term in self.CONTRADICTION_TERMS:
+            in_findings = self._term_polarity(findings, term)
+            in_impression = self._term_polarity(impression, term)
+            if in_findings is not None and in_impression is not None and in_findings != in_impression:
+                return True
+        return False
+
+    async def validate_result(self, inputs: Dict[str, Any], raw: str, result: str) -> bool:
+        """IMPRESSION이 비어 있거나 FINDINGS와 모순되면 escalation"""
+        if not raw or not self.PATTERNS.impression_label.sub('', raw).strip():
+            return False
+        return not self._contradicts_findings(inputs.get('user_input', ''), result)
+
     async def preprocess_data(self, data: Any) -> Dict[str, Any]:
         """방사선 보고서를 IMPRESSION 작성을 위해 전처리"""
-        import re
-        import pandas as pd
-
         try:
             radiology_text = data.get('radiology report', '')
 
@@ -314,9 +617,9 @@ IMPRESSION:"""
                 findings_text = findings.strip()
 
             # Clean text
-            findings_text = re.sub(r'^[:\s]*', '', findings_text)
-            findings_text = re.sub(r'\b___\b', '', findings_text)
-            findings_text = re.sub(r'\s+', ' ', findings_text)
+            findings_text = self.PATTERNS.leading_colon.sub('', findings_text)
+            findings_text = self.PATTERNS.redacted.sub('', findings_text)
+            findings_text = self.PATTERNS.whitespace.sub(' ', findings_text)
             findings_text = findings_text.strip()
 
             return {'user_input': findings_text if findings_text else 'Normal examination.'}
@@ -327,8 +630,6 @@ IMPRESSION:"""
 
     async def postprocess_result(self, result: str) -> str:
         """간소화된 후처리"""
-        import re
-
         try:
             if not result or not isinstance(result, str):
                 return "No acute findings."
@@ -370,9 +671,56 @@ IMPRESSION:"""
 class TaskCProcessor(DatathonProcessor):
     """개선된 TaskCProcessor - DatathonProcessor 기반"""
 
-    def __init__(self, api_key, train_df=None):
+    # context 초과 시 보존 우선순위 (높은 순)
+    SECTION_PRIORITY = ['DISCHARGE DIAGNOSIS', 'CHIEF COMPLAINT', 'ASSESSMENT', 'HOSPITAL COURSE', 'HISTORY']
+    INPUT_COLUMNS = ['sample_id', 'hospital_course']
+    NOTE_COLUMN = 'hospital_course'
+    # 머리말, 가족력/약물 목록/퇴원 안내/퇴원 상태 섹션 제거 (코딩에 쓰이지 않고 섹션 뒤 고정 길이 창만 차지함)
+    NOTE_COMPRESSOR = NoteCompressor(
+        LOW_VALUE_SECTIONS + ('Family History', 'Discharge Disposition', 'Discharge Condition'))
+    PREPROCESS_DEPENDENCIES = ['_extract_key_medical_content']
+    PREPROCESS_SETTINGS = ['PRIORITY_TERMS', 'PATTERNS']
+    # 전/후처리 정규식 (클래스 정의 시 한 번 컴파일, 패턴별 호출 시간 기록)
+    # - deid_marker: '[** ... **]' 안에는 '['가 없으므로 다음 '['에서 멈춤 (닫히지 않은 표시가 많아도 선형 시간)
+    # - json_object: 첫 '{'부터 마지막 '}'까지 (첫 '{'에서만 시도, 기존 '\{.*\}' 검색과 같은 범위)
+    # - json_pairs: 단어 중간에서는 시작하지 않음 (긴 단어에서 시작 위치마다 다시 훑지 않도록)
+    PATTERNS = PatternRegistry('TaskC', {
+        'redacted': r"___+",
+        'deid_marker': r"\[\*+[^\[\n]*?\*+\]",
+        'whitespace': r"\s+",
+        'sentence_break': r"[.!?]+",
+        'json_object': (r"\A[^{]*(\{.*\})", re.DOTALL),
+        'json_pairs': r'"?(?<![\w\-])([\w\-]+)"?\s*:\s*\[?([^\]\n}]*)',
+        'non_code': r"[^A-Z0-9]",
+        # 출력에서 코드 후보를 찾는 패턴 (ICD_CANDIDATES 순서로 적용)
+        'icd_code': r"\b[A-TV-Z]\d{2}[A-Z0-9]*\b",
+        'icd_letter_extension': r"\b[A-TV-Z]\d{2}[A-Z]\d+[A-Z]*\b",
+        'icd_frequent_chapter': r"\b[IJKLMNRS]\d{3,4}[A-Z0-9]*\b",
+        'valid_code': r"^[A-TV-Z]\d{2}[A-Z0-9]*$",
+    }, inputs=('[**', '[** a **', 'I21.4, ', 'S066X1A ', '{"12": ["I214", '))
+    ICD_CANDIDATES = ('icd_code', 'icd_letter_extension', 'icd_frequent_chapter')
+    # 핵심 내용 추출에서 문장을 고르는 우선 용어
+    PRIORITY_TERMS = KeywordMatcher([
+        "chest pain", "myocardial infarction", "troponin", "stemi", "nstemi",
+        "atrial fibrillation", "afib", "heart failure", "chf",
+        "deep vein thrombosis", "dvt", "pulmonary embolism",
+        "stroke", "cerebral infarction", "intracranial hemorrhage",
+        "respiratory failure", "pneumonia", "copd exacerbation",
+        "acute kidney", "renal failure", "aki", "creatinine",
+        "syncope", "seizure", "altered mental status",
+        "cirrhosis", "liver", "ascites", "pancreatitis",
+        "fall", "trauma", "fracture", "head injury",
+    ])
+    # 출력에서 코드를 찾지 못했을 때 증상 키워드 -> 대체 코드 (표 순서가 우선순위)
+    FALLBACK_CODES = Rewriter({
+        "CHEST PAIN": "R079", "DYSPNEA": "R0600", "SYNCOPE": "R531",
+        "NAUSEA": "R11", "DIARRHEA": "K5900", "FEVER": "R5090",
+        "HEADACHE": "R51", "CONFUSION": "R410"
+    })
+
+    def __init__(self, api_key, train_df=None, **kwargs):
         # 부모 초기화
-        super().__init__(api_key)
+        super().__init__(api_key, **kwargs)
 
         # 훈련 데이터 분석
         self.code_freq = {}
@@ -381,14 +729,11 @@ class TaskCProcessor(DatathonProcessor):
 
     def _build_training_insights(self, train_df):
         """훈련 데이터에서 코드 빈도 분석"""
-        import re
-        import pandas as pd
-
         def parse_codes(s):
             if pd.isna(s) or not str(s).strip():
                 return []
             return [
-                re.sub(r"[^A-Z0-9]", "", c.strip().upper())
+                self.PATTERNS.non_code.sub("", c.strip().upper())
                 for c in str(s).split(",") if c.strip()
             ]
 
@@ -406,7 +751,8 @@ class TaskCProcessor(DatathonProcessor):
     def get_model_name(self) -> str:
         return "LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct-AWQ"
 
-    def get_prompt_template(self):
+    def get_system_prompt(self):
+        """모든 행에 공통인 코딩 지시문과 빈도 패턴 (서버 prefix cache 대상)"""
         return """You are an expert medical coder with 20+ years of ICD-10 coding experience specializing in acute care settings.
 
 CRITICAL INSTRUCTIONS:
@@ -432,17 +778,78 @@ TOP FREQUENCY PATTERNS (use these when clinically appropriate):
 - Fall (initial encounter) → W1830XA
 - Head injury (initial) → S066X1A
 - Low back pain → M5489
-- Primary hyperaldosteronism → E2740
+- Primary hyperaldosteronism → E2740"""
+
+    def get_prompt_template(self):
+        return """HOSPITAL COURSE: {user_input}
+
+PRIMARY ICD-10-CM CODES:"""
+
+    # 배치 코딩 모드: 출력은 sample_id당 코드 3개 내외
+    PACK_MAX_ITEMS = 8
+    PACK_OUTPUT_TOKENS_PER_ITEM = 40
+
+    def get_packed_prompt_template(self):
+        """여러 hospital course를 한 요청으로 코딩하는 배치 프롬프트"""
+        return """Code each of the following {count} hospital courses independently.
+Each record starts with [[RECORD id]].
+Return ONLY a JSON object mapping every record id to a list of at most 3 ICD-10-CM codes (UPPERCASE, NO DOTS), e.g. {{"12": ["I214", "N179"], "13": ["R079"]}}
+
+{items}
+
+JSON:"""
+
+    def format_packed_items(self, items):
+        """(sample_id, 전처리 결과) 목록을 공백을 압축한 레코드 블록으로 변환"""
+        blocks = []
+        for item_id, vars in items:
+            condensed = self.PATTERNS.whitespace.sub(" ", str(vars["user_input"])).strip()
+            blocks.append(f"[[RECORD {item_id}]]\n{condensed}")
+        return "\n\n".join(blocks)
+
+    def parse_packed_result(self, raw, ids):
+        """JSON 매핑 응답을 sample_id별 코드 문자열로 분리 (JSON이 깨지면 줄 단위로 복구)"""
+        wanted = set(ids)
+        mapping = {}
+        match = self.PATTERNS.json_object.match(raw)
+        if match:
+            try:
+                mapping = json.loads(match.group(1))
+            except ValueError:
+                mapping = {}
+        if not isinstance(mapping, dict) or not mapping:
+            mapping = dict(self.PATTERNS.json_pairs.findall(raw))
+
+        parsed = {}
+        for item_id, codes in mapping.items():
+            item_id = str(item_id).strip()
+            if item_id not in wanted:
+                continue
+            if isinstance(codes, (list, tuple)):
+                codes = ", ".join(str(c) for c in codes)
+            parsed[item_id] = str(codes).replace('"', "").strip()
+        return parsed
+
+    async def validate_packed_item(self, inputs, raw):
+        """기존 postprocess 추출 로직으로 유효한 코드가 없으면 개별 재호출"""
+        return await self.validate_result(inputs, raw, raw)
+
+    def get_cascade_prompt_template(self):
+        """cascade 1차 호출용 축약 프롬프트 (빈도 패턴 목록 제외)"""
+        return """You are an expert ICD-10-CM coder. List the PRIMARY discharge diagnoses actively treated during this hospitalization as ICD-10-CM codes (UPPERCASE, NO DOTS), comma-separated, maximum 3 codes. Output ONLY the codes.
 
 HOSPITAL COURSE: {user_input}
 
 PRIMARY ICD-10-CM CODES:"""
 
+    async def validate_result(self, inputs, raw, result):
+        """유효한 ICD 코드를 하나도 추출하지 못하면 escalation"""
+        if not raw or not isinstance(raw, str):
+            return False
+        return bool(self._extract_codes(self._strip_code_prefix(raw.strip().upper())))
+
     async def preprocess_data(self, data):
         """향상된 전처리 - 핵심 의료 정보 추출"""
-        import re
-        import pandas as pd
-
         try:
             hospital_course = (
                 data.get("hospital_course", "")
@@ -454,65 +861,68 @@ PRIMARY ICD-10-CM CODES:"""
                 return {"user_input": "Patient admitted for routine medical care."}
 
             # 텍스트 정리
-            text = re.sub(r"___+", " ", hospital_course)
-            text = re.sub(r"\[\*+.*?\*+\]", " ", text)
-            text = re.sub(r"\s+", " ", text).strip()
+            def clean(raw):
+                raw = self.PATTERNS.redacted.sub(" ", raw)
+                raw = self.PATTERNS.deid_marker.sub(" ", raw)
+                return self.PATTERNS.whitespace.sub(" ", raw).strip()
+
+            # 섹션 위치는 sidecar 오프셋 인덱스(없으면 1회 인덱싱)에서 바로 조회
+            # 정리된 텍스트에는 줄바꿈이 없으므로 각 섹션은 헤더 뒤부터 노트 끝까지 이어지지만,
+            # 앞 limit자만 쓰므로 줄 단위로 필요한 만큼만 정리 (___ / [** **] 는 줄을 넘지 않음)
+            note = self.note_sections(data, hospital_course)
+
+            def after(*names, limit):
+                rest = note.after(*names)
+                if rest is None:
+                    return ""
+                size = limit * 2
+                while True:
+                    cut = rest.find("\n", size)
+                    if cut < 0:
+                        return clean(rest)[:limit]
+                    cleaned = clean(rest[:cut])
+                    if len(cleaned) >= limit:
+                        return cleaned[:limit]
+                    size *= 2
 
             # 핵심 섹션 추출
             sections = []
 
             # Discharge Diagnosis
-            dd_patterns = [
-                r"(?:Discharge|Primary|Principal|Final)\s*Diagnos[ei]s?:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-                r"Diagnos[ei]s\s*(?:on\s*discharge|at\s*discharge):\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-            ]
-            for pattern in dd_patterns:
-                match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-                if match and match.group(1).strip():
+            for name in ("Discharge Diagnosis", "Diagnosis at Discharge"):
+                diagnosis = after(name, limit=400)
+                if diagnosis:
                     sections.append(
-                        f"DISCHARGE DIAGNOSIS: {match.group(1).strip()[:400]}")
+                        f"DISCHARGE DIAGNOSIS: {diagnosis}")
                     break
 
-            # Chief Complaint
-            cc_match = re.search(
-                r"Chief Complaint:\s*([^\n]+)", text, re.IGNORECASE)
-            if cc_match and cc_match.group(1).strip():
+            # Chief Complaint (전체 길이 상한 2200자 안에서만 의미가 있음)
+            complaint = after("Chief Complaint", limit=2200)
+            if complaint:
                 sections.append(
-                    f"CHIEF COMPLAINT: {cc_match.group(1).strip()}")
+                    f"CHIEF COMPLAINT: {complaint}")
 
             # Assessment/Impression
-            assess_patterns = [
-                r"(?:Assessment|Impression)(?:\s*and\s*Plan)?:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-                r"A&P:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-            ]
-            for pattern in assess_patterns:
-                match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-                if match and match.group(1).strip():
+            for name in ("Assessment", "A&P"):
+                assessment = after(name, limit=300)
+                if assessment:
                     sections.append(
-                        f"ASSESSMENT: {match.group(1).strip()[:300]}")
+                        f"ASSESSMENT: {assessment}")
                     break
 
             # HPI
-            hpi_match = re.search(
-                r"History of Present Illness:\s*(.*?)(?=\n\n|\nPast Medical|\nReview of|$)",
-                text,
-                re.IGNORECASE | re.DOTALL,
-            )
-            if hpi_match and hpi_match.group(1).strip():
-                sections.append(f"HISTORY: {hpi_match.group(1).strip()[:400]}")
+            history = after("History of Present Illness", limit=400)
+            if history:
+                sections.append(f"HISTORY: {history}")
 
             # Hospital Course
-            hc_match = re.search(
-                r"Hospital Course:\s*(.*?)(?=\n\n|\n[A-Z][a-z]+:|$)",
-                text,
-                re.IGNORECASE | re.DOTALL,
-            )
-            if hc_match and hc_match.group(1).strip():
+            course = after("Brief Hospital Course", "Hospital Course", limit=500)
+            if course:
                 sections.append(
-                    f"HOSPITAL COURSE: {hc_match.group(1).strip()[:500]}")
+                    f"HOSPITAL COURSE: {course}")
 
             processed_text = "\n\n".join(
-                sections) if sections else self._extract_key_medical_content(text)
+                sections) if sections else self._extract_key_medical_content(clean(hospital_course))
 
             if len(processed_text) > 2200:
                 processed_text = processed_text[:2200]
@@ -529,111 +939,84 @@ PRIMARY ICD-10-CM CODES:"""
 
     def _extract_key_medical_content(self, text):
         """비구조적 텍스트에서 핵심 의료 내용 추출"""
-        import re
-
-        priority_terms = [
-            "chest pain", "myocardial infarction", "troponin", "stemi", "nstemi",
-            "atrial fibrillation", "afib", "heart failure", "chf",
-            "deep vein thrombosis", "dvt", "pulmonary embolism",
-            "stroke", "cerebral infarction", "intracranial hemorrhage",
-            "respiratory failure", "pneumonia", "copd exacerbation",
-            "acute kidney", "renal failure", "aki", "creatinine",
-            "syncope", "seizure", "altered mental status",
-            "cirrhosis", "liver", "ascites", "pancreatitis",
-            "fall", "trauma", "fracture", "head injury",
-        ]
-
-        sentences = re.split(r"[.!?]+", text)
-        important_sentences = []
-
-        for sentence in sentences:
-            s = sentence.strip()
-            if len(s) < 10:
-                continue
-            if any(term in s.lower() for term in priority_terms):
-                important_sentences.append(s)
-                if len(important_sentences) >= 15:
-                    break
+        sentences = [s.strip() for s in self.PATTERNS.sentence_break.split(text)]
+        sentences = [s for s in sentences if len(s) >= 10]
+        # 우선 용어가 나온 문장 (문장 전체를 한 번에 스캔)
+        hits = self.PRIORITY_TERMS.sentence_counts(sentences).any(axis=1)
+        important_sentences = [s for s, hit in zip(sentences, hits) if hit][:15]
 
         return ". ".join(important_sentences) if important_sentences else text[:1200]
 
+    def _strip_code_prefix(self, result_clean):
+        """모델 출력 앞의 안내 문구 제거"""
+        for prefix in [
+            "PRIMARY ICD-10-CM CODES:", "PRIMARY ICD-10 CODES:", "ICD-10-CM CODES:",
+            "ICD-10 CODES:", "CODES:", "OUTPUT:", "DIAGNOSIS CODES:", "PRIMARY:"
+        ]:
+            if result_clean.startswith(prefix):
+                return result_clean[len(prefix):].strip()
+        return result_clean
+
+    def _extract_codes(self, result_clean):
+        """출력에서 유효한 ICD 코드를 추출하고 빈도 기반으로 정렬"""
+        # 점 제거 후 패턴 매칭
+        result_no_dots = result_clean.replace(".", "")
+
+        all_codes = []
+        for name in self.ICD_CANDIDATES:
+            all_codes.extend(self.PATTERNS[name].findall(result_no_dots))
+
+        valid_codes, seen = [], set()
+        for code in all_codes:
+            clean_code = self.PATTERNS.non_code.sub("", code.upper())
+            if (
+                3 <= len(clean_code) <= 8
+                and clean_code not in seen
+                and not clean_code.startswith("U")
+                and self.PATTERNS.valid_code.match(clean_code)
+                and not clean_code.endswith("000")
+            ):
+                valid_codes.append(clean_code)
+                seen.add(clean_code)
+
+        # 빈도 기반 정렬
+        if self.code_freq and valid_codes:
+            def score_code(c):
+                base_freq = self.code_freq.get(c, 0)
+                if c.startswith("I"):
+                    return base_freq + 1000
+                if c.startswith("R"):
+                    return base_freq + 800
+                if c.startswith("N"):
+                    return base_freq + 700
+                if c.startswith("K"):
+                    return base_freq + 600
+                if c.startswith("J"):
+                    return base_freq + 500
+                return base_freq
+            valid_codes.sort(key=score_code, reverse=True)
+
+        return valid_codes
+
     async def postprocess_result(self, result):
         """향상된 후처리 - ICD 코드 추출 및 검증"""
-        import re
-
         try:
             if not result or not isinstance(result, str):
                 return "R6889"
 
-            result_clean = result.strip().upper()
-
-            # 프리픽스 제거
-            for prefix in [
-                "PRIMARY ICD-10-CM CODES:", "PRIMARY ICD-10 CODES:", "ICD-10-CM CODES:",
-                "ICD-10 CODES:", "CODES:", "OUTPUT:", "DIAGNOSIS CODES:", "PRIMARY:"
-            ]:
-                if result_clean.startswith(prefix):
-                    result_clean = result_clean[len(prefix):].strip()
-                    break
+            result_clean = self._strip_code_prefix(result.strip().upper())
 
             if not result_clean:
                 return "R6889"
 
-            # 점 제거 후 패턴 매칭
-            result_no_dots = result_clean.replace(".", "")
-            icd_patterns = [
-                r"\b[A-TV-Z]\d{2}[A-Z0-9]*\b",
-                r"\b[A-TV-Z]\d{2}[A-Z]\d+[A-Z]*\b",
-                r"\b[IJKLMNRS]\d{3,4}[A-Z0-9]*\b",
-            ]
-
-            all_codes = []
-            for pattern in icd_patterns:
-                all_codes.extend(re.findall(pattern, result_no_dots))
-
-            valid_codes, seen = [], set()
-            for code in all_codes:
-                clean_code = re.sub(r"[^A-Z0-9]", "", code.upper())
-                if (
-                    3 <= len(clean_code) <= 8
-                    and clean_code not in seen
-                    and not clean_code.startswith("U")
-                    and re.match(r"^[A-TV-Z]\d{2}[A-Z0-9]*$", clean_code)
-                    and not clean_code.endswith("000")
-                ):
-                    valid_codes.append(clean_code)
-                    seen.add(clean_code)
-
-            # 빈도 기반 정렬
-            if self.code_freq and valid_codes:
-                def score_code(c):
-                    base_freq = self.code_freq.get(c, 0)
-                    if c.startswith("I"):
-                        return base_freq + 1000
-                    if c.startswith("R"):
-                        return base_freq + 800
-                    if c.startswith("N"):
-                        return base_freq + 700
-                    if c.startswith("K"):
-                        return base_freq + 600
-                    if c.startswith("J"):
-                        return base_freq + 500
-                    return base_freq
-                valid_codes.sort(key=score_code, reverse=True)
+            valid_codes = self._extract_codes(result_clean)
 
             final_codes = valid_codes[:3]
 
             # fallback
             if not final_codes:
-                mapping = {
-                    "CHEST PAIN": "R079", "DYSPNEA": "R0600", "SYNCOPE": "R531",
-                    "NAUSEA": "R11", "DIARRHEA": "K5900", "FEVER": "R5090",
-                    "HEADACHE": "R51", "CONFUSION": "R410"
-                }
-                for keyword, code in mapping.items():
-                    if keyword in result_clean:
-                        return code
-                return "R6889"
+                # 출력에 나온 증상 키워드 중 규칙 표 순서가 가장 앞선 키워드의 코드
+                return self.FALLBACK_CODES.first(result_clean) or "R6889"
 
             return ", ".join(final_codes)
 
@@ -0,0 +1,67 @@
+"""
+긴 노트 map-reduce 요약용 청크 분할
+노트를 section_index의 섹션 경계에서 잘라 연속된 섹션을 토큰 상한(max_tokens)까지 한 청크로 묶습니다.
+한 섹션이 상한보다 길면 문단 -> 줄 -> 단어 순으로 더 잘게 나눕니다.
+청크 요약은 청크 텍스트 해시(chunk_key)로 캐시해, 겹치는 노트나 재실행에서 같은 청크를 다시 요약하지 않습니다.
+"""
+import hashlib
+import re
+from typing import List, Optional
+
+from section_index import index_sections
+from tokens import estimate_tokens, token_cost
+
+# 청크 하나의 기본 토큰 상한
+MAP_CHUNK_TOKENS = 1500
+
+# 섹션보다 작은 분할 단위 (문단: 빈 줄 또는 공백만 있는 줄, 줄, 단어)
+_PARAGRAPH = re.compile(r'(?<=\n)(?=[ \t]*\n)')
+_LINE = re.compile(r'(?<=\n)')
+_WORD = re.compile(r'(?<=\s)(?=\S)')
+
+
+def chunk_key(text: str) -> str:
+    """청크 요약 캐시 키 (청크 텍스트 해시)"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def section_pieces(text: str) -> List[str]:
+    """노트를 섹션 헤더 시작 위치에서 나눈 조각 (첫 헤더 앞 머리말 포함, 이어 붙이면 원문)"""
+    bounds = sorted({0, *(start for _, start, _, _ in index_sections(text)), len(text)})
+    return [text[a:b] for a, b in zip(bounds, bounds[1:]) if a < b]
+
+
+def _split(piece: str, max_tokens: int, model_name: Optional[str], levels=(_PARAGRAPH, _LINE, _WORD)) -> List[str]:
+    """상한을 넘는 조각을 더 작은 단위로 나눠 상한 이하 조각 목록으로 만듦"""
+    if estimate_tokens(piece, model_name) <= max_tokens or not levels:
+        return [piece]
+    parts = [part for part in levels[0].split(piece) if part]
+    if len(parts) == 1:
+        return _split(piece, max_tokens, model_name, levels[1:])
+    return _group([p for part in parts for p in _split(part, max_tokens, model_name, levels[1:])],
+                  max_tokens, model_name)
+
+
+def _group(pieces: List[str], max_tokens: int, model_name: Optional[str]) -> List[str]:
+    """연속된 조각을 순서대로 상한까지 이어 붙임"""
+    chunks, current, current_tokens = [], '', 0.0
+    for piece in pieces:
+        # 조각별 반올림 추정치를 더하면 짧은 조각(단어)이 많을 때 상한을 넘으므로 반올림 전 값으로 합산
+        tokens = token_cost(piece, model_name)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = '', 0.0
+        current += piece
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_note(text: str, max_tokens: int = MAP_CHUNK_TOKENS, model_name: Optional[str] = None) -> List[str]:
+    """
+    섹션 경계에 맞춘 청크 목록 (앞뒤 공백 제거, 빈 청크 제외).
+    섹션을 중간에서 자르는 경우는 한 섹션이 max_tokens보다 길 때뿐입니다.
+    """
+    pieces = [p for piece in section_pieces(text) for p in _split(piece, max_tokens, model_name)]
+    return [chunk.strip() for chunk in _group(pieces, max_tokens, model_name) if chunk.strip()]
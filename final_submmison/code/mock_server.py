@@ -0,0 +1,217 @@
+"""
+OpenAI 호환 mock LLM 서버 (로컬 테스트/벤치마크용)
+vLLM처럼 블록 단위 prefix(KV) cache를 흉내 내어 usage.prompt_tokens_details.cached_tokens를 보고하고,
+context 길이를 넘는 요청은 vLLM과 같은 형식의 400 오류로 거절합니다.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+# 간이 토크나이저 (단어/기호/공백 단위)
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]|\s+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text)
+
+
+def render_chat(messages: List[Dict[str, Any]]) -> str:
+    """Llama-3 형식 chat template으로 메시지를 하나의 프롬프트로 렌더링"""
+    parts = ["<|begin_of_text|>"]
+    for message in messages:
+        parts.append(f"<|start_header_id|>{message['role']}<|end_header_id|>\n\n{message['content']}<|eot_id|>")
+    parts.append("<|start_header_id|>assistant<|end_header_id|>\n\n")
+    return "".join(parts)
+
+
+def default_responder(prompt: str, model: str) -> str:
+    return "1. No acute cardiopulmonary process."
+
+
+class PrefixCache:
+    """블록 해시 체인 기반 prefix cache (LRU)"""
+
+    def __init__(self, block_size: int = 16, capacity: int = 4096):
+        self.block_size = block_size
+        self.capacity = capacity
+        self._blocks: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup_and_insert(self, tokens: List[str]) -> int:
+        """앞에서부터 연속으로 cache된 토큰 수를 반환하고, 전체 블록을 cache에 추가"""
+        cached, prefix_hit = 0, True
+        parent = ""
+        with self._lock:
+            for start in range(0, len(tokens) - self.block_size + 1, self.block_size):
+                block = "".join(tokens[start:start + self.block_size])
+                key = hashlib.sha1((parent + "\x00" + block).encode("utf-8")).hexdigest()
+                if prefix_hit and key in self._blocks:
+                    cached += self.block_size
+                    self._blocks.move_to_end(key)
+                else:
+                    prefix_hit = False
+                    self._blocks[key] = None
+                    if len(self._blocks) > self.capacity:
+                        self._blocks.popitem(last=False)
+                parent = key
+        return cached
+
+
+class MockLLMServer:
+    """
+    /v1/chat/completions 와 prompt 배열을 받는 /v1/completions 를 제공하는 mock 서버
+    with MockLLMServer() as server: 형태로 쓰고 server.base_url을 api_base로 넘깁니다.
+    """
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[str, str], str]] = None,
+        max_model_len: int = 131072,
+        block_size: int = 16,
+        cache_capacity: int = 4096,
+        prefill_ms_per_token: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.responder = responder or default_responder
+        self.max_model_len = max_model_len
+        self.cache = PrefixCache(block_size, cache_capacity)
+        self.prefill_ms_per_token = prefill_ms_per_token
+        self.stats = {"http_requests": 0, "requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+        self._stats_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _complete(self, prompt: str, model: str, max_tokens: int) -> Dict[str, Any]:
+        """프롬프트 하나를 처리하고 (text, usage)를 반환. context 초과 시 ValueError"""
+        tokens = tokenize(prompt)
+        if len(tokens) + max_tokens > self.max_model_len:
+            raise ValueError(
+                f"This model's maximum context length is {self.max_model_len} tokens. "
+                f"However, you requested {len(tokens) + max_tokens} tokens "
+                f"({len(tokens)} in the messages, {max_tokens} in the completion). "
+                f"Please reduce the length of the messages or completion.")
+
+        cached = self.cache.lookup_and_insert(tokens)
+        if self.prefill_ms_per_token:
+            time.sleep((len(tokens) - cached) * self.prefill_ms_per_token / 1000)
+
+        text = self.responder(prompt, model)
+        completion_tokens = len(tokenize(text))
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["prompt_tokens"] += len(tokens)
+            self.stats["cached_tokens"] += cached
+            self.stats["completion_tokens"] += completion_tokens
+        return {
+            "text": text,
+            "usage": {
+                "prompt_tokens": len(tokens),
+                "completion_tokens": completion_tokens,
+                "total_tokens": len(tokens) + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached},
+            },
+        }
+
+    def handle_chat(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        model = body.get("model", "mock")
+        prompt = render_chat(body.get("messages", []))
+        out = self._complete(prompt, model, int(body.get("max_tokens") or 0))
+        return {
+            "id": f"chatcmpl-mock-{self.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": out["text"]},
+                "finish_reason": "stop",
+            }],
+            "usage": out["usage"],
+        }
+
+    def handle_completions(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """prompt가 문자열 또는 배열인 /completions 요청 (choice.index로 순서 표시)"""
+        model = body.get("model", "mock")
+        prompts = body.get("prompt", "")
+        if isinstance(prompts, str):
+            prompts = [prompts]
+        max_tokens = int(body.get("max_tokens") or 0)
+
+        outputs = [self._complete(prompt, model, max_tokens) for prompt in prompts]
+        usage = {
+            "prompt_tokens": sum(o["usage"]["prompt_tokens"] for o in outputs),
+            "completion_tokens": sum(o["usage"]["completion_tokens"] for o in outputs),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        usage["prompt_tokens_details"] = {
+            "cached_tokens": sum(o["usage"]["prompt_tokens_details"]["cached_tokens"] for o in outputs)}
+        return {
+            "id": f"cmpl-mock-{self.stats['requests']}",
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {"index": i, "text": o["text"], "logprobs": None, "finish_reason": "stop"}
+                for i, o in enumerate(outputs)
+            ],
+            "usage": usage,
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, payload: Dict[str, Any]):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                with server._stats_lock:
+                    server.stats["http_requests"] += 1
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                try:
+                    if self.path.endswith("/chat/completions"):
+                        self._send(200, server.handle_chat(body))
+                    elif self.path.endswith("/completions"):
+                        self._send(200, server.handle_completions(body))
+                    else:
+                        self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+                except ValueError as e:
+                    self._send(400, {"error": {"message": str(e), "type": "BadRequestError",
+                                               "code": "context_length_exceeded"}})
+
+        return Handler
@@ -0,0 +1,143 @@
+"""
+MinHash/LSH 기반 유사 중복 입력 탐지
+재전송된 보고서나 템플릿형 정상 판독문처럼 비식별화 표기/공백만 다른 입력을 찾아
+이미 처리한 가장 가까운 행의 결과를 재사용할 수 있게 합니다.
+"""
+import hashlib
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# MinHash 해시 함수 (a * x + b) mod p 에 사용하는 소수 (2^32 미만)
+_PRIME = 4294967291
+_REDACTION = re.compile(r"\[\*+.*?\*+\]|_{2,}")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# 한 단어 차이로 의미가 뒤집히는 용어 (좌우/부정/변화). 두 입력에서 개수가 다르면 재사용하지 않음
+GUARD_TERMS = frozenset({
+    'left', 'right', 'bilateral', 'no', 'not', 'without', 'negative', 'positive',
+    'new', 'increased', 'decreased', 'improved', 'worsened', 'unchanged', 'resolved',
+})
+
+
+def shingles(text: str, size: int = 3) -> Set[int]:
+    """비식별화 표기/공백/대소문자를 정규화한 단어 size-gram 해시 집합"""
+    tokens = _TOKEN.findall(_REDACTION.sub(" ", str(text).lower()))
+    if len(tokens) < size:
+        tokens = tokens + [""] * (size - len(tokens))
+    grams = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return {int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little") for g in grams}
+
+
+def guard_counts(text: str, terms: Iterable[str] = GUARD_TERMS) -> Dict[str, int]:
+    """입력에 나오는 보호 용어별 개수"""
+    terms = set(terms)
+    counts: Dict[str, int] = {}
+    for token in _TOKEN.findall(_REDACTION.sub(" ", str(text).lower())):
+        if token in terms:
+            counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    (band 수, band당 행 수) 중 후보가 되는 Jaccard 경계 (1/b)^(1/r)가 threshold에 가장 가까운 조합
+    경계가 threshold보다 약간 낮은 쪽을 택해 놓치는 중복을 줄이고, 최종 판정은 signature 유사도로 합니다.
+    """
+    best = (num_perm, 1)
+    best_gap = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        gap = threshold - (1 / bands) ** (1 / rows)
+        if 0 <= gap < best_gap:
+            best, best_gap = (bands, rows), gap
+    return best
+
+
+class NearDuplicateIndex:
+    """MinHash signature와 LSH band 버킷으로 유사 중복 후보를 찾는 인덱스"""
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64, shingle_size: int = 3, seed: int = 777):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold는 (0, 1] 범위여야 합니다.")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    def signature(self, text: str) -> np.ndarray:
+        values = np.fromiter(shingles(text, self.shingle_size), dtype=np.uint64)
+        if values.size == 0:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        hashed = (np.outer(values, self._a) + self._b) % _PRIME
+        return hashed.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[bytes]:
+        for band in range(self.bands):
+            yield signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key: str, text: str, signature: Optional[np.ndarray] = None):
+        signature = self.signature(text) if signature is None else signature
+        self._signatures[key] = signature
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band_key, []).append(key)
+
+    def query(
+        self,
+        text: str,
+        signature: Optional[np.ndarray] = None,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> Optional[Tuple[str, float]]:
+        """threshold 이상인 가장 유사한 (key, 추정 Jaccard). accept로 후보를 추가로 거를 수 있음. 없으면 None"""
+        signature = self.signature(text) if signature is None else signature
+        candidates = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+
+        best = None
+        for key in candidates:
+            if accept is not None and not accept(key):
+                continue
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+
+def plan_reuse(
+    items: List[Tuple[str, str]],
+    threshold: float = 0.9,
+    num_perm: int = 64,
+    sources: Optional[List[Tuple[str, str]]] = None,
+    guard_terms: Iterable[str] = GUARD_TERMS,
+) -> Dict[str, Tuple[str, float]]:
+    """
+    (key, text) 목록에서 앞서 나온 행과 유사 중복인 행을 찾아 {key: (재사용할 key, 추정 Jaccard)}를 반환합니다.
+    sources(이미 결과가 있는 행)는 재사용 대상으로만 쓰입니다. 재사용 행은 다시 대상이 되지 않아
+    연쇄적으로 멀어지는 재사용은 생기지 않으며, guard_terms 개수가 다른 쌍(예: left/right)은 제외합니다.
+    """
+    index = NearDuplicateIndex(threshold, num_perm)
+    guards: Dict[str, Dict[str, int]] = {}
+    for key, text in sources or []:
+        index.add(key, text)
+        guards[key] = guard_counts(text, guard_terms)
+
+    reuse: Dict[str, Tuple[str, float]] = {}
+    for key, text in items:
+        signature = index.signature(text)
+        guard = guard_counts(text, guard_terms)
+        match = index.query(text, signature, accept=lambda other: guards[other] == guard)
+        if match is not None:
+            reuse[key] = match
+        else:
+            index.add(key, text, signature)
+            guards[key] = guard
+    return reuse
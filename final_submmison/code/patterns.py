@@ -0,0 +1,205 @@
+"""
+태스크별 정규식 패턴 레지스트리
+전/후처리에서 행마다 re.search/re.sub에 문자열 패턴을 넘기면 re 모듈의 내부 캐시(크기 제한)에 의존해
+매번 캐시 조회(경우에 따라 재컴파일)를 거칩니다. 태스크 클래스 정의 시(import 시점) 패턴을 한 번만 컴파일해
+클래스 속성 PATTERNS로 두고, 패턴별 호출 수/누적 시간/최대 시간과 최대 입력 길이를 기록합니다.
+
+self_test()는 병적인 입력(긴 공백/밑줄 연속, 닫히지 않는 괄호, 반복 헤더 등)으로 패턴을 점검해
+입력 길이를 4배로 늘렸을 때 시간이 선형보다 크게 늘어나는(역추적 폭발) 패턴이나
+1KB당 비용이 예산을 넘는 패턴이 있으면 경고합니다. 점검 결과의 1KB당 최악 비용으로 행별 정규식 비용의 상한을 알 수 있습니다.
+시간 측정이므로 import 시점에는 실행하지 않고 벤치마크(benchmarks/bench_patterns.py)에서 명시적으로 호출합니다.
+"""
+import re
+import time
+import warnings
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# 자체 점검 입력: 단위 문자열을 길이만큼 반복 (정규식에서 흔한 역추적 유발 형태)
+PATHOLOGICAL_UNITS: Tuple[str, ...] = (
+    ' ', '\n', '\n\n', '_', '_ ', 'a', 'a.', 'a ', ': ', '[*', '[**a', '[[', '[[ITEM a',
+    '{', '{"a": [', '"a": ', 'A12', 'A12.', 'I2140 ', 'Labs: ', 'History of Present Illness: ',
+)
+SELF_TEST_CHARS = 500
+# 입력 길이 4배에서 시간이 이 배수를 넘으면 선형보다 크게 늘어난 것으로 판단 (이차 증가는 약 16배)
+SUPERLINEAR_RATIO = 8.0
+# 이 시간(초)보다 짧은 측정은 잡음이 커서 증가율 판단에서 제외
+MIN_MEASURABLE = 5e-5
+# 1KB당 최악 비용 예산 (마이크로초)
+BUDGET_US_PER_KB = 500.0
+
+PatternSpec = Union[str, Tuple[str, int]]
+
+
+class TimedPattern:
+    """컴파일된 패턴과 호출 카운터 (re.Pattern과 같은 메서드 이름)"""
+
+    __slots__ = ('name', 'pattern', 'calls', 'seconds', 'max_seconds', 'max_chars')
+
+    def __init__(self, name: str, pattern: 're.Pattern'):
+        self.name = name
+        self.pattern = pattern
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.max_chars = 0
+
+    def __repr__(self) -> str:
+        # 전처리 캐시 키(PREPROCESS_SETTINGS)에 쓰일 수 있도록 패턴 내용으로 표현
+        return f"TimedPattern({self.name!r}, {self.pattern.pattern!r}, flags={self.pattern.flags})"
+
+    def _record(self, seconds: float, chars: int) -> None:
+        self.calls += 1
+        self.seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        if chars > self.max_chars:
+            self.max_chars = chars
+
+    def _timed(self, method: Callable, string: str, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return method(string, *args, **kwargs)
+        finally:
+            self._record(time.perf_counter() - start, len(string))
+
+    def search(self, string: str, *args: Any) -> Optional['re.Match']:
+        return self._timed(self.pattern.search, string, *args)
+
+    def match(self, string: str, *args: Any) -> Optional['re.Match']:
+        return self._timed(self.pattern.match, string, *args)
+
+    def fullmatch(self, string: str, *args: Any) -> Optional['re.Match']:
+        return self._timed(self.pattern.fullmatch, string, *args)
+
+    def findall(self, string: str, *args: Any) -> List[Any]:
+        return self._timed(self.pattern.findall, string, *args)
+
+    def split(self, string: str, maxsplit: int = 0) -> List[str]:
+        return self._timed(self.pattern.split, string, maxsplit)
+
+    def sub(self, repl: Union[str, Callable], string: str, count: int = 0) -> str:
+        """치환 (repl이 함수이면 그 실행 시간도 포함)"""
+        start = time.perf_counter()
+        try:
+            return self.pattern.sub(repl, string, count)
+        finally:
+            self._record(time.perf_counter() - start, len(string))
+
+    def finditer(self, string: str, *args: Any) -> Iterator['re.Match']:
+        """일치 순회 - 다음 일치를 찾는 시간만 합산해 순회가 끝날 때(또는 중단 시) 한 번 기록"""
+        matches = self.pattern.finditer(string, *args)
+        seconds = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                match = next(matches, None)
+                seconds += time.perf_counter() - start
+                if match is None:
+                    return
+                yield match
+        finally:
+            self._record(seconds, len(string))
+
+    def reset(self) -> None:
+        self.calls, self.seconds, self.max_seconds, self.max_chars = 0, 0.0, 0.0, 0
+
+
+class PatternRegistry:
+    """
+    태스크 하나의 정규식 패턴 모음
+    task: 통계/경고에 쓰일 이름
+    patterns: {이름: 패턴 문자열 또는 (패턴 문자열, flags)} - 속성(registry.이름)으로 접근
+    inputs: 태스크 입력에 맞춘 추가 자체 점검 단위 문자열
+    self_test: 생성 시 자체 점검 실행 여부 (기본값 False - 필요할 때 self_test() 호출)
+    """
+
+    def __init__(self, task: str, patterns: Dict[str, PatternSpec], inputs: Iterable[str] = (),
+                 self_test: bool = False):
+        self.task = task
+        self._patterns: Dict[str, TimedPattern] = {}
+        for name, spec in patterns.items():
+            source, flags = (spec, 0) if isinstance(spec, str) else spec
+            self._patterns[name] = TimedPattern(name, re.compile(source, flags))
+        self.inputs = tuple(PATHOLOGICAL_UNITS) + tuple(inputs)
+        self.self_test_results: Dict[str, Dict[str, Any]] = {}
+        if self_test:
+            self.self_test()
+
+    def __getattr__(self, name: str) -> TimedPattern:
+        try:
+            return self.__dict__['_patterns'][name]
+        except KeyError:
+            raise AttributeError(f"{self.__dict__.get('task')} 패턴 레지스트리에 '{name}' 패턴이 없습니다.") from None
+
+    def __getitem__(self, name: str) -> TimedPattern:
+        return self._patterns[name]
+
+    def __iter__(self) -> Iterator[TimedPattern]:
+        return iter(self._patterns.values())
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def __repr__(self) -> str:
+        return f"PatternRegistry({self.task!r}, {list(self._patterns.values())!r})"
+
+    def self_test(self, chars: int = SELF_TEST_CHARS, budget_us_per_kb: float = BUDGET_US_PER_KB,
+                  repeat: int = 2) -> Dict[str, Dict[str, Any]]:
+        """
+        패턴마다 병적인 입력을 chars자와 4배 길이로 만들어 전체 스캔(findall) 시간을 측정합니다.
+        패턴별 최악 입력, 1KB당 최악 비용(us), 4배 길이에서의 시간 증가율을 반환하고 기준을 넘으면 경고합니다.
+        (측정용 호출은 호출 카운터에 포함되지 않음)
+        """
+        texts = [(unit, unit * max(1, chars // len(unit)), unit * max(1, 4 * chars // len(unit)))
+                 for unit in self.inputs]
+        results = {}
+        for timed in self._patterns.values():
+            worst = {'input': '', 'us_per_kb': 0.0, 'growth': 1.0}
+            for unit, small, large in texts:
+                small_seconds = _best_time(timed.pattern.findall, small, repeat)
+                large_seconds = _best_time(timed.pattern.findall, large, repeat)
+                us_per_kb = large_seconds * 1e6 / (len(large) / 1000)
+                growth = large_seconds / small_seconds if large_seconds >= MIN_MEASURABLE else 1.0
+                if us_per_kb > worst['us_per_kb']:
+                    worst.update(input=unit, us_per_kb=us_per_kb)
+                if growth > worst['growth']:
+                    worst['growth'] = growth
+            worst['superlinear'] = worst['growth'] > SUPERLINEAR_RATIO
+            worst['over_budget'] = worst['us_per_kb'] > budget_us_per_kb
+            results[timed.name] = worst
+            if worst['superlinear'] or worst['over_budget']:
+                warnings.warn(
+                    f"{self.task}.{timed.name} 정규식이 병적인 입력({worst['input']!r} 반복)에서 "
+                    f"{worst['us_per_kb']:.0f}us/KB, 길이 4배에 시간 {worst['growth']:.1f}배입니다: "
+                    f"{timed.pattern.pattern!r}", RuntimeWarning, stacklevel=2)
+        self.self_test_results = results
+        return results
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """패턴별 호출 수, 누적/평균/최대 시간(ms), 최대 입력 길이, 자체 점검 1KB당 최악 비용(us)"""
+        stats = {}
+        for timed in self._patterns.values():
+            tested = self.self_test_results.get(timed.name, {})
+            stats[timed.name] = {
+                'calls': timed.calls,
+                'total_ms': timed.seconds * 1000,
+                'mean_us': timed.seconds * 1e6 / timed.calls if timed.calls else 0.0,
+                'max_ms': timed.max_seconds * 1000,
+                'max_chars': timed.max_chars,
+                'worst_us_per_kb': tested.get('us_per_kb'),
+            }
+        return stats
+
+    def reset(self) -> None:
+        """호출 카운터 초기화"""
+        for timed in self._patterns.values():
+            timed.reset()
+
+
+def _best_time(function: Callable, text: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,1389 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import warnings
+from typing import Any, AsyncIterator, Iterable, List, Dict, Optional, Set, Tuple
+from abc import ABC, abstractmethod
+import pandas as pd
+from langchain.prompts import ChatPromptTemplate, HumanMessagePromptTemplate  # 프롬프트 템플릿 처리용
+from langchain_core.messages import SystemMessage
+from langevaluate.config import ModelConfig  # LLM 설정용
+from langevaluate.llmfactory import LLMFactory  # LLM 팩토리용
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from tqdm.asyncio import tqdm_asyncio
+from boilerplate import NoteCompressor
+from completions import CompletionsClient, render_raw_prompt, to_openai_messages
+from map_reduce import MAP_CHUNK_TOKENS, chunk_key, chunk_note
+from near_duplicates import plan_reuse
+from patterns import PatternRegistry
+from section_index import NoteSections, build_section_index, note_sections
+from stage_cache import StageCache, code_hash, local_modules, row_hash
+from tokens import (
+    chars_for_tokens, estimate_prompt_tokens, estimate_tokens, extract_cached_tokens, extract_usage,
+    get_profile, is_context_overflow, reported_lengths, summarize_usage,
+)
+
+
+# 원본 출력 archive 컬럼 (reused_from: 유사 중복으로 결과를 재사용한 행의 원본 행, 아니면 빈 문자열)
+ARCHIVE_COLUMNS = ['sample_id', 'prompt_hash', 'model', 'raw', 'reused_from']
+
+
+class TokenBudgetExceeded(Exception):
+    """토큰 예산 소진으로 더 이상 요청을 보낼 수 없을 때 발생"""
+    pass
+
+
+class DatathonProcessor(ABC):
+    """
+    데이터톤용 AI 처리 통합 클래스
+    쿼리, 평가, 임베딩을 일괄 처리할 수 있습니다.
+    사용자는 이 클래스를 상속받아 특정 메서드만 구현하면 됩니다.
+    """
+    # LLM 설정 상수들
+
+    DEFAULT_MODEL_CONFIG = {
+        'model_name': 'LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct-AWQ',
+        'api_base': 'https://api.snubhai.org/api/v1/llm',
+        'max_tokens': 2000,
+        'seed': 777,
+        'temperature': 0,
+        'rpm': 10
+    }
+
+    # user_input 섹션 라벨 (우선순위 높은 순). context 초과 시 낮은 순위부터 축약/제거
+    SECTION_PRIORITY: List[str] = []
+
+    # 토큰 추정 오차를 감안한 context 여유분 비율
+    CONTEXT_SAFETY_MARGIN = 0.05
+    TRUNCATION_MARKER = ' ... '
+
+    # 여러 행을 한 요청에 묶는 packing 설정 (get_packed_prompt_template을 구현한 task만 사용)
+    PACK_MAX_ITEMS = 8
+    PACK_OUTPUT_TOKENS_PER_ITEM = 200
+
+    # summarize(checkpoint_path=...)에서 새로 완료된 행이 이만큼 쌓일 때마다 체크포인트를 기록
+    CHECKPOINT_EVERY = 50
+
+    # preprocess_data가 호출하는 메서드 이름 (전처리 캐시 키의 코드 해시에 포함)
+    PREPROCESS_DEPENDENCIES: List[str] = []
+
+    # preprocess_data 결과에 영향을 주는 속성 이름 (값이 전처리 캐시 키에 포함됨)
+    PREPROCESS_SETTINGS: List[str] = []
+
+    # 전처리에 필요한 입력 컬럼 (컬럼형 캐시에서 이 컬럼만 읽음, None이면 전체)
+    INPUT_COLUMNS: Optional[List[str]] = None
+
+    # 섹션 오프셋 인덱스를 만들 노트 컬럼 (load_section_index 사용 시)
+    NOTE_COLUMN: Optional[str] = None
+
+    # preprocess_data 전에 NOTE_COLUMN의 머리말/저가치 섹션을 제거하는 압축기 (None이면 사용 안 함)
+    NOTE_COMPRESSOR: Optional[NoteCompressor] = None
+
+    # map-reduce 요약 설정 (get_map_prompt_template을 구현한 task만 사용)
+    # NOTE_COLUMN이 MAP_REDUCE_MIN_TOKENS보다 긴 행만 MAP_CHUNK_TOKENS 단위 청크로 나눠 요약한 뒤 합침
+    MAP_REDUCE_MIN_TOKENS: Optional[int] = None
+    MAP_CHUNK_TOKENS = MAP_CHUNK_TOKENS
+
+    # 전/후처리 정규식 레지스트리 (있으면 summarize 후 패턴별 호출 시간을 metrics['patterns']에 기록)
+    PATTERNS: Optional[PatternRegistry] = None
+
+    def __init__(
+        self,
+        api_key: str,
+        cascade_model_name: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+    ):
+        self.api_key = api_key
+
+        # 기본 설정 복사 (api_base, rpm 등은 config로 덮어쓸 수 있음)
+        self.config = self.DEFAULT_MODEL_CONFIG.copy()
+        self.config.update(config or {})
+
+        # model_name만 클래스별 설정으로 업데이트
+        self.config['model_name'] = self.get_model_name()
+
+        # LLM 인스턴스 생성 (모델별 rate limiter는 _invoke에서 직접 획득)
+        self._rate_limiters: Dict[str, Any] = {}
+        self.llm = self._create_llm(self.config['model_name'])
+
+        # 프롬프트 템플릿 설정 (정적 system prompt는 서버 prefix cache를 위해 앞에 고정)
+        self.prompt_template = self.build_prompt(self.get_prompt_template(), self.get_system_prompt())
+        # (rate limiter와 토큰 예산은 _invoke에서 적용되므로 chain을 직접 호출하면 적용되지 않음)
+        self.chain = self.prompt_template | self.llm
+
+        # cascade 설정 (summarize(cascade=True)에서 처음 사용할 때 chain 생성)
+        self.cascade_model_name = cascade_model_name or self.get_cascade_model_name()
+        self.cascade_chain = None
+        self.cascade_prompt = None
+        self.cascade_llm = None
+
+        # packing 프롬프트 (지원하는 task만)
+        packed_template = self.get_packed_prompt_template()
+        self.packed_prompt = (self.build_prompt(packed_template, self.get_system_prompt())
+                              if packed_template is not None else None)
+
+        # map-reduce 청크 요약 프롬프트 (지원하는 task만)
+        map_template = self.get_map_prompt_template()
+        self.map_prompt = (self.build_prompt(map_template, self.get_map_system_prompt())
+                           if map_template is not None else None)
+
+        # 토큰 사용량 기록 및 예산
+        self.token_usage: List[Dict[str, Any]] = []
+        self.token_budget: Optional[int] = None
+        self._tokens_reserved = 0
+        self._budget_exhausted = False
+        self._budget_released: Optional[asyncio.Condition] = None
+        # 서버가 보고한 prompt 토큰 / 추정치 (예약 시 추정치 보정)
+        self._prompt_token_ratio = 1.0
+
+        # context guard 통계
+        self.context_stats = {'truncated_rows': 0, 'overflow_retries': 0}
+        self.packing_stats = {'packs': 0, 'packed_items': 0, 'individual_reruns': 0}
+        self.map_reduce_stats = {'rows': 0, 'chunks': 0, 'map_requests': 0, 'cache_hits': 0, 'reused_chunks': 0}
+        # 청크 해시 -> 요약 (캐시 적중 + 이번 실행), 새로 만든 요약, 진행 중인 청크 호출
+        self._chunk_summaries: Dict[str, str] = {}
+        self._chunk_fresh: Dict[str, str] = {}
+        self._chunk_tasks: Dict[str, asyncio.Future] = {}
+
+        # /completions prompt 배열 전송 (transport='completions')
+        self._completions_client = None
+        self.transport_stats = {'requests': 0, 'failed_requests': 0, 'fallback_rows': 0}
+
+        # 결과 저장소 (유사 중복 재사용 행 -> 원본 행은 archive 저장 시 원본 행의 출력으로 기록)
+        self._raw_archive: List[Dict[str, Any]] = []
+        self._reused_rows: Dict[str, str] = {}
+        self.section_index: Dict[str, Any] = {}
+        self.results: List[str] = []
+
+        # metric 저장소
+        self.metrics: Dict[str, Any] = {}
+
+    def _create_llm(self, model_name: str):
+        """
+        모델명으로 LLM 인스턴스를 생성합니다.
+        rate limiter는 LLM에서 떼어 _invoke에서 직접 획득합니다. (획득한 뒤에 토큰 예산을 예약하기 위함)
+        """
+        custom_config = ModelConfig(
+            model_name=model_name,
+            api_base=self.config['api_base'],
+            api_key=self.api_key,
+            max_tokens=self.config['max_tokens'],
+            seed=self.config['seed'],
+            provider="openai"
+        )
+        llm = LLMFactory.create_llm(
+            custom_config,
+            temperature=self.config['temperature'],
+            rpm=self.config['rpm']
+        )
+        rate_limiter = getattr(llm, 'rate_limiter', None)
+        if rate_limiter is not None:
+            self._rate_limiters[model_name] = rate_limiter
+            llm.rate_limiter = None
+        return llm
+
+    async def _acquire_rate_limit(self, model_name: str):
+        """모델의 rate limiter에서 요청 한 건을 허가받을 때까지 기다립니다."""
+        rate_limiter = self._rate_limiters.get(model_name)
+        if rate_limiter is not None:
+            await rate_limiter.aacquire()
+
+    def get_model_name(self) -> str:
+        """
+        사용할 모델명을 반환합니다.
+        상속 클래스에서 이 메서드를 오버라이드하여 특정 모델을 설정할 수 있습니다.
+        """
+        return self.DEFAULT_MODEL_CONFIG['model_name']
+
+    def get_system_prompt(self) -> Optional[str]:
+        """
+        모든 행에 공통인 정적 지시문/few-shot 예시를 반환합니다.
+        지정하면 system 메시지로 분리되어 매 호출마다 byte 단위로 동일한 prefix가 되므로
+        vLLM 등 서버의 prefix(KV) cache를 재사용할 수 있습니다.
+        템플릿 변수로 해석되지 않으므로 중괄호를 그대로 써도 됩니다.
+        """
+        return None
+
+    def build_prompt(self, template: str, system_prompt: Optional[str] = None) -> ChatPromptTemplate:
+        """정적 prefix(system)와 행별 템플릿(user)으로 프롬프트를 구성합니다."""
+        if system_prompt is None:
+            return ChatPromptTemplate.from_template(template)
+        return ChatPromptTemplate.from_messages([
+            SystemMessage(content=system_prompt),
+            HumanMessagePromptTemplate.from_template(template),
+        ])
+
+    def get_cascade_model_name(self) -> Optional[str]:
+        """
+        cascade 1차 호출에 사용할 (더 빠른) 모델명을 반환합니다.
+        None이면 기본 모델을 그대로 사용하고 축약 프롬프트만 적용합니다.
+        """
+        return None
+
+    def get_cascade_prompt_template(self) -> Optional[str]:
+        """
+        cascade 1차 호출용 축약 프롬프트를 반환합니다.
+        None이면 기본 프롬프트를 그대로 사용합니다.
+        """
+        return None
+
+    def get_packed_prompt_template(self) -> Optional[str]:
+        """
+        여러 행을 한 번에 처리하는 packing 프롬프트를 반환합니다. ({items}, {count} 변수 사용)
+        None이면 packing 모드를 지원하지 않습니다.
+        """
+        return None
+
+    def get_map_prompt_template(self) -> Optional[str]:
+        """
+        map-reduce의 청크 요약 프롬프트를 반환합니다. ({user_input} 변수에 노트 청크)
+        None이면 map-reduce 모드를 지원하지 않습니다.
+        """
+        return None
+
+    def get_map_system_prompt(self) -> Optional[str]:
+        """청크 요약 프롬프트의 정적 system prompt (None이면 사용 안 함)"""
+        return None
+
+    def format_reduce_input(self, data: Any, vars: Dict[str, Any], summaries: List[str]) -> Dict[str, Any]:
+        """청크 요약 목록을 기본 프롬프트 변수로 합칩니다. (기본: user_input을 청크 요약으로 대체)"""
+        parts = [f"Part {i}/{len(summaries)}: {summary}" for i, summary in enumerate(summaries, 1)]
+        return dict(vars, user_input='\n\n'.join(parts))
+
+    def format_packed_items(self, items: List[Tuple[str, Dict[str, Any]]]) -> str:
+        """(행 ID, 전처리 결과) 목록을 packing 프롬프트의 {items} 문자열로 변환합니다."""
+        raise NotImplementedError
+
+    def parse_packed_result(self, raw: str, ids: List[str]) -> Dict[str, str]:
+        """packing 응답을 행 ID별 원본 출력으로 분리합니다. 누락된 ID는 포함하지 않습니다."""
+        raise NotImplementedError
+
+    async def validate_packed_item(self, inputs: Dict[str, Any], raw: str) -> bool:
+        """packing 응답에서 분리한 한 행의 출력이 유효한지 검증 (실패 시 개별 재호출)"""
+        return bool(raw and raw.strip())
+
+    @abstractmethod
+    async def preprocess_data(self, data: Any) -> Dict[str, Any]:
+        """데이터 전처리 메서드"""
+        pass
+
+    @abstractmethod
+    def get_prompt_template(self) -> str:
+        """사용자가 구현해야 하는 프롬프트 템플릿 메서드"""
+        pass
+
+    @abstractmethod
+    async def postprocess_result(self, result: Any) -> str:
+        """데이터 후처리 메서드"""
+        pass
+
+    async def validate_result(self, inputs: Dict[str, Any], raw: str, result: str) -> bool:
+        """
+        cascade 1차 결과가 충분한지 검증합니다.
+        False를 반환하면 해당 행은 기본 모델로 재호출(escalation)됩니다.
+        """
+        return bool(raw and raw.strip())
+
+    def prepare_batch(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        행 단위 preprocess_data 전에 DataFrame 전체에 한 번 적용하는 벡터화 단계 (선택 구현)
+        여러 행에 공통인 컬럼 연산을 미리 계산해 새 컬럼으로 추가할 때 사용합니다.
+        기본 구현은 NOTE_COMPRESSOR가 있으면 NOTE_COLUMN을 압축합니다. (오버라이드 시 super() 호출)
+        """
+        if self.NOTE_COMPRESSOR is not None and self.NOTE_COLUMN in data.columns:
+            data = data.assign(**{self.NOTE_COLUMN: self.NOTE_COMPRESSOR.compress_series(data[self.NOTE_COLUMN])})
+        return data
+
+    def load_section_index(self, file_path: str, cache_dir: Optional[str] = None):
+        """
+        데이터셋 CSV의 NOTE_COLUMN 섹션 오프셋 sidecar를 만들거나 읽어 전처리에 사용합니다.
+        전처리는 prepare_batch에서 압축한 노트를 보므로, NOTE_COMPRESSOR가 있으면 압축한 노트로 인덱싱하고
+        압축기 설정/코드 해시로 sidecar를 구분합니다.
+        """
+        if self.NOTE_COLUMN is None:
+            raise ValueError(f"{type(self).__name__}: NOTE_COLUMN이 지정되지 않았습니다.")
+        compressor = self.NOTE_COMPRESSOR
+        variant = ''
+        if compressor is not None:
+            variant = hashlib.sha1(f"{code_hash(type(compressor))}:{compressor!r}".encode('utf-8')).hexdigest()[:8]
+        self.section_index = build_section_index(
+            file_path, self.NOTE_COLUMN, cache_dir=cache_dir,
+            transform=compressor.compress if compressor is not None else None, variant=variant)
+
+    def note_sections(self, data: Any, text: str) -> NoteSections:
+        """행의 노트 섹션 (sidecar 인덱스가 있으면 재사용, 없으면 한 번 인덱싱)"""
+        key = data.get('sample_id') if hasattr(data, 'get') else None
+        return note_sections(text, self.section_index.get(str(key)) if key is not None else None)
+
+    def preprocess_code_hash(self) -> str:
+        """
+        전처리 코드와 설정의 해시: preprocess_data/prepare_batch(기본 구현, note_sections 포함)와
+        PREPROCESS_DEPENDENCIES 메서드 소스, 클래스 모듈이 import하는 로컬 헬퍼 모듈(labs, section_packer 등) 소스,
+        PREPROCESS_SETTINGS 값
+        """
+        cls = type(self)
+        # 이 모듈은 전처리에 쓰이는 기본 구현 메서드만 포함 (요청/캐시 코드 변경으로 전처리 캐시가 무효화되지 않도록)
+        helpers = local_modules(sys.modules[cls.__module__], skip=[__name__])
+        digest = code_hash(cls.preprocess_data, cls.prepare_batch,
+                           DatathonProcessor.prepare_batch, DatathonProcessor.note_sections,
+                           *[getattr(cls, name) for name in self.PREPROCESS_DEPENDENCIES], *helpers)
+        if not self.PREPROCESS_SETTINGS:
+            return digest
+        settings = json.dumps({name: getattr(self, name) for name in self.PREPROCESS_SETTINGS},
+                              sort_keys=True, default=str)
+        return hashlib.sha1(f"{digest}:{settings}".encode('utf-8')).hexdigest()[:16]
+
+    async def preprocess_all(self, data: pd.DataFrame, cache_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        모든 행을 전처리합니다. cache_path가 있으면 (행 내용 해시, 전처리 코드 해시)로
+        결과를 디스크에 캐시해, 같은 데이터/코드로 다시 실행할 때 전처리를 건너뜁니다.
+        """
+        return await self._preprocess_rows(self._prepared_rows(data), cache_path)
+
+    def _prepared_rows(self, data: pd.DataFrame) -> List[pd.Series]:
+        """prepare_batch를 한 번 적용한 행 목록 (전처리와 map-reduce 대상 선택이 같은 행을 공유)"""
+        return [row for _, row in self.prepare_batch(data).iterrows()]
+
+    async def _preprocess_rows(self, rows: List[pd.Series], cache_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """prepare_batch를 거친 행을 전처리합니다. (preprocess_all 참고)"""
+        if not cache_path:
+            return await tqdm_asyncio.gather(*[self.preprocess_data(row) for row in rows])
+
+        stage = f"{type(self).__name__}.preprocess_data"
+        current = self.preprocess_code_hash()
+        hashes = [row_hash(row) for row in rows]
+        with StageCache(cache_path) as cache:
+            cache.invalidate(stage, current)
+            cached = cache.get_many(stage, current, hashes)
+
+            missing = {h: row for h, row in zip(hashes, rows) if h not in cached}
+            if missing:
+                computed = await tqdm_asyncio.gather(*[self.preprocess_data(row) for row in missing.values()])
+                fresh = dict(zip(missing, computed))
+                cache.put_many(stage, current, fresh)
+                cached.update(fresh)
+
+            self.metrics['preprocess_cache'] = {'task': type(self).__name__, 'rows': len(rows), **cache.stats}
+        return [cached[h] for h in hashes]
+
+    def _build_cascade_chain(self):
+        """cascade 1차 호출용 chain을 생성합니다."""
+        cascade_template = self.get_cascade_prompt_template()
+        if self.cascade_model_name is None and cascade_template is None:
+            raise ValueError(
+                f"{type(self).__name__}: cascade 모드에는 cascade 모델명 또는 축약 프롬프트가 필요합니다.")
+
+        if self.cascade_model_name and self.cascade_model_name != self.config['model_name']:
+            cascade_llm = self._create_llm(self.cascade_model_name)
+        else:
+            # 같은 모델이면 rate limiter를 공유하도록 기존 인스턴스 재사용
+            cascade_llm = self.llm
+
+        self.cascade_prompt = (ChatPromptTemplate.from_template(cascade_template)
+                               if cascade_template is not None else self.prompt_template)
+        self.cascade_llm = cascade_llm
+        return self.cascade_prompt | cascade_llm
+
+    def _tokens_spent(self) -> int:
+        """현재 실행에서 사용한 prompt + completion 토큰 합계"""
+        return sum(r['prompt_tokens'] + r['completion_tokens'] for r in self.token_usage)
+
+    def _reset_token_budget(self, token_budget: Optional[int]):
+        """실행 단위 토큰 사용량 기록과 예산 상태를 초기화합니다."""
+        self.token_usage = []
+        self.token_budget = token_budget
+        self._tokens_reserved = 0
+        self._budget_exhausted = False
+        self._budget_released = asyncio.Condition()
+        self._prompt_token_ratio = 1.0
+
+    def _reservation(self, estimated_prompt: int, requests: int = 1) -> int:
+        """요청에 예약할 토큰: 보정한 프롬프트 추정치(+ 추정 오차 여유분) + 요청마다 최대 completion(max_tokens)"""
+        prompt = estimated_prompt * self._prompt_token_ratio * (1 + self.CONTEXT_SAFETY_MARGIN)
+        return int(prompt + 0.5) + requests * self.config['max_tokens']
+
+    def _record_usage(self, model_name: str, usage: Optional[Tuple[int, int]], estimated_prompt: int,
+                      estimated_completion: int, cached_tokens: int):
+        """요청 한 건의 토큰 사용량을 기록하고, 서버 보고치로 프롬프트 추정 비율을 보정합니다."""
+        if usage is not None and estimated_prompt:
+            self._prompt_token_ratio = max(self._prompt_token_ratio, usage[0] / estimated_prompt)
+        self.token_usage.append({
+            'model': model_name,
+            'prompt_tokens': usage[0] if usage is not None else estimated_prompt,
+            'completion_tokens': usage[1] if usage is not None else estimated_completion,
+            'cached_tokens': cached_tokens,
+            'estimated': usage is None,
+        })
+
+    async def _reserve_tokens(self, estimated_prompt: int, requests: int = 1) -> int:
+        """
+        토큰 예산이 있으면 보낼 요청의 토큰(_reservation)을 예약해 동시 호출로 인한 초과를 방지하고 예약량을 반환합니다.
+        남은 예산이 모자라면 진행 중인 요청의 사용량이 돌아와 예약이 풀릴 때까지 기다리고,
+        진행 중인 요청이 없는데도 모자라면 TokenBudgetExceeded를 발생시켜 이후 요청을 모두 중단합니다.
+        첫 사용량이 돌아와 프롬프트 추정치가 보정되기 전에는 한 요청만 보냅니다.
+        """
+        if self.token_budget is None:
+            return 0
+        if self._budget_released is None:
+            self._budget_released = asyncio.Condition()
+        async with self._budget_released:
+            while not self._budget_exhausted:
+                # 기다리는 동안 보정된 추정 비율을 반영하도록 매번 다시 계산
+                tokens = self._reservation(estimated_prompt, requests)
+                calibrating = not self.token_usage and self._tokens_reserved
+                if not calibrating and self._tokens_spent() + self._tokens_reserved + tokens <= self.token_budget:
+                    self._tokens_reserved += tokens
+                    return tokens
+                if not self._tokens_reserved:
+                    self._budget_exhausted = True
+                    self._budget_released.notify_all()
+                    break
+                await self._budget_released.wait()
+        raise TokenBudgetExceeded(f"{type(self).__name__}: 토큰 예산 {self.token_budget} 소진")
+
+    async def _release_tokens(self, tokens: int):
+        """예약을 풉니다. (사용량을 기록한 뒤 호출해야 예산 합계가 줄어들지 않음)"""
+        if self.token_budget is None:
+            return
+        async with self._budget_released:
+            self._tokens_reserved -= tokens
+            self._budget_released.notify_all()
+
+    def get_context_limit(self, model_name: Optional[str] = None) -> int:
+        """프롬프트에 쓸 수 있는 토큰 수 (모델 context - max_tokens - 여유분)"""
+        model_name = model_name or self.config['model_name']
+        context_window = self.config.get('context_window') or get_profile(model_name)['context_window']
+        usable = context_window - self.config['max_tokens']
+        return int(usable * (1 - self.CONTEXT_SAFETY_MARGIN))
+
+    def _split_sections(self, text: str) -> List[Tuple[int, str]]:
+        """SECTION_PRIORITY 라벨 기준으로 user_input을 (우선순위, 본문) 목록으로 분할"""
+        lowest = len(self.SECTION_PRIORITY)
+        if not self.SECTION_PRIORITY:
+            return [(lowest, text)]
+
+        labels = '|'.join(re.escape(label) for label in self.SECTION_PRIORITY)
+        starts = [m.start() for m in re.finditer(rf'(?:{labels})(?:\s*\d+)?:', text)]
+        if not starts or starts[0] != 0:
+            starts = [0] + starts
+
+        sections = []
+        for start, end in zip(starts, starts[1:] + [len(text)]):
+            chunk = text[start:end]
+            rank = next((i for i, label in enumerate(self.SECTION_PRIORITY) if chunk.startswith(label)), lowest)
+            sections.append((rank, chunk))
+        return sections
+
+    def shrink_user_input(self, text: str, max_tokens: int, model_name: Optional[str] = None) -> str:
+        """
+        user_input을 max_tokens 이하로 줄입니다.
+        우선순위가 가장 낮은 섹션부터 뒷부분을 잘라내고, 그래도 넘치면 섹션을 제거합니다.
+        """
+        sections = [list(s) for s in self._split_sections(text)]
+
+        def total():
+            return sum(estimate_tokens(chunk, model_name) for _, chunk in sections)
+
+        while sections and total() > max_tokens:
+            excess = total() - max_tokens
+            victim = max(range(len(sections)), key=lambda i: (sections[i][0], i))
+            chunk = sections[victim][1]
+            keep_tokens = estimate_tokens(chunk, model_name) - excess
+            # 남는 분량이 너무 적으면 섹션 통째로 제거 (마지막 섹션은 잘라서라도 유지)
+            # 매 반복마다 섹션이 짧아지거나 제거되므로 항상 종료됨
+            if keep_tokens < 32 and len(sections) > 1:
+                sections.pop(victim)
+                continue
+            body = chunk[:-len(self.TRUNCATION_MARKER)] if chunk.endswith(self.TRUNCATION_MARKER) else chunk
+            keep_chars = min(chars_for_tokens(max(keep_tokens, 0), model_name), len(body) - 1)
+            if keep_chars <= 0:
+                sections.pop(victim)
+                continue
+            cut = body[:keep_chars]
+            if ' ' in cut:
+                cut = cut.rsplit(' ', 1)[0]
+            sections[victim][1] = cut.rstrip() + self.TRUNCATION_MARKER
+
+        return ''.join(chunk for _, chunk in sections).strip()
+
+    def _fit_context(self, vars: Dict[str, Any], prompt, model_name: str, limit: int):
+        """렌더링한 프롬프트가 limit을 넘으면 user_input을 축약한 vars와 메시지를 반환"""
+        messages = prompt.format_messages(**vars)
+        estimated = estimate_prompt_tokens(messages, model_name)
+        if estimated <= limit or 'user_input' not in vars:
+            return vars, messages, estimated
+
+        user_input = str(vars['user_input'])
+        static_tokens = estimated - estimate_tokens(user_input, model_name)
+        shrunk = self.shrink_user_input(user_input, max(limit - static_tokens, 0), model_name)
+        vars = dict(vars, user_input=shrunk)
+        messages = prompt.format_messages(**vars)
+        return vars, messages, estimate_prompt_tokens(messages, model_name)
+
+    def _overflow_retry_limit(self, error: BaseException, estimated_prompt: int) -> int:
+        """
+        context 초과로 거절된 프롬프트(추정 estimated_prompt 토큰)를 다시 보낼 때의 토큰 한도
+        동일 요청 재시도 금지: 서버가 알려준 길이 또는 추정치의 75%로 줄임
+        """
+        lengths = reported_lengths(error)
+        if not lengths:
+            return int(estimated_prompt * 0.75)
+        max_context, requested = lengths
+        ratio = (max_context - self.config['max_tokens']) / max(requested - self.config['max_tokens'], 1)
+        return int(estimated_prompt * min(ratio, 0.9) * (1 - self.CONTEXT_SAFETY_MARGIN))
+
+    @staticmethod
+    async def _send(llm, messages):
+        """
+        LLM 한 번 호출
+        langevaluate LLMFactory는 ainvoke를 모든 예외를 잡아 같은 프롬프트로 재시도한 뒤 빈 응답을 돌려주는 함수로 바꾸므로,
+        context 초과를 _invoke에서 처리할 수 있도록 먼저 chat 모델 클래스의 ainvoke를 직접 호출합니다.
+        context 초과가 아닌 오류(rate limit, 연결 오류 등)는 래퍼의 재시도로 다시 보내고,
+        래퍼가 재시도 끝에 context 초과 오류를 담은 빈 응답을 돌려주면 그 오류를 다시 발생시킵니다.
+        """
+        try:
+            return await type(llm).ainvoke(llm, messages)
+        except Exception as e:
+            if is_context_overflow(e):
+                raise
+        response = await llm.ainvoke(messages)
+        error = (getattr(response, 'answer_metadata', None) or {}).get('error')
+        if isinstance(error, BaseException) and is_context_overflow(error):
+            raise error
+        return response
+
+    async def _invoke(self, vars: Dict[str, Any], prompt=None, llm=None, model_name: Optional[str] = None):
+        """
+        프롬프트를 렌더링해 LLM을 호출하고 토큰 사용량을 기록합니다.
+        프롬프트가 모델 context를 넘으면 섹션 우선순위에 따라 user_input을 줄여서 보내고,
+        그래도 서버가 context 초과로 거절하면 한 번 더 줄여서 재시도합니다.
+        토큰 예산이 설정되어 있으면 rate limiter를 통과한 뒤 프롬프트 + max_tokens를 예약하고,
+        사용량이 돌아오면 실제 사용량을 기록한 뒤 예약을 풉니다.
+        남은 예산으로 보낼 수 없는 호출은 보내지 않고 TokenBudgetExceeded를 발생시킵니다.
+        """
+        prompt = prompt or self.prompt_template
+        llm = llm or self.llm
+        model_name = model_name or self.config['model_name']
+
+        limit = self.get_context_limit(model_name)
+        fitted, messages, estimated_prompt = self._fit_context(vars, prompt, model_name, limit)
+        if fitted is not vars:
+            self.context_stats['truncated_rows'] += 1
+
+        await self._acquire_rate_limit(model_name)
+        reserved = await self._reserve_tokens(estimated_prompt)
+        try:
+            try:
+                response = await self._send(llm, messages)
+            except Exception as e:
+                if not is_context_overflow(e):
+                    raise
+                # 줄인 프롬프트로 한 번만 재시도
+                retry_limit = self._overflow_retry_limit(e, estimated_prompt)
+                retry_vars, retry_messages, retry_estimate = self._fit_context(fitted, prompt, model_name, retry_limit)
+                if retry_vars is fitted or retry_messages == messages:
+                    raise
+                self.context_stats['overflow_retries'] += 1
+                await self._acquire_rate_limit(model_name)
+                response = await self._send(llm, retry_messages)
+                # 사용량 보정은 실제로 보낸(줄인) 프롬프트의 추정치 기준
+                estimated_prompt = retry_estimate
+            self._record_usage(model_name, extract_usage(response), estimated_prompt,
+                               estimate_tokens(str(response.content), model_name), extract_cached_tokens(response))
+        finally:
+            await self._release_tokens(reserved)
+        return response
+
+    async def _run_cascade(self, vars: Dict[str, Any], key: Optional[str] = None) -> Tuple[str, bool, float, float]:
+        """한 행을 cascade로 처리합니다. (결과, escalation 여부, 1차 지연, 2차 지연)"""
+        fast_model = self.cascade_model_name or self.config['model_name']
+        start = time.perf_counter()
+        response = await self._invoke(vars, self.cascade_prompt, self.cascade_llm, fast_model)
+        fast_latency = time.perf_counter() - start
+
+        result = await self.postprocess_result(response.content)
+        if await self.validate_result(vars, response.content, result):
+            self._archive_raw(key, response.content, self.cascade_prompt, fast_model)
+            return result, False, fast_latency, 0.0
+
+        start = time.perf_counter()
+        response = await self._invoke(vars)
+        primary_latency = time.perf_counter() - start
+
+        self._archive_raw(key, response.content, self.prompt_template, self.config['model_name'])
+        return await self.postprocess_result(response.content), True, fast_latency, primary_latency
+
+    def _record_cascade_metrics(self, outcomes: List[Tuple[str, bool, float, float]]):
+        """escalation 비율과 지연 절감 추정치를 metrics에 기록합니다."""
+        rows = len(outcomes)
+        escalated = sum(1 for _, esc, _, _ in outcomes if esc)
+        fast_total = sum(fast for _, _, fast, _ in outcomes)
+        primary_total = sum(primary for _, _, _, primary in outcomes)
+
+        # 기본 모델 평균 지연은 escalation된 행에서 측정한 값으로 추정
+        avg_primary = primary_total / escalated if escalated else None
+        baseline = avg_primary * rows if avg_primary is not None else None
+
+        self.metrics['cascade'] = {
+            'task': type(self).__name__,
+            'rows': rows,
+            'escalated': escalated,
+            'escalation_rate': escalated / rows if rows else 0.0,
+            'fast_latency_s': fast_total,
+            'primary_latency_s': primary_total,
+            'estimated_baseline_latency_s': baseline,
+            'estimated_savings_s': baseline - (fast_total + primary_total) if baseline is not None else None,
+        }
+
+    def _get_completions_client(self) -> CompletionsClient:
+        """prompt 배열 전송용 클라이언트 (rate limiter는 chat LLM과 공유하며 _run_prompt_array에서 획득)"""
+        if self._completions_client is None:
+            model_name = self.config['model_name']
+            if model_name not in self._rate_limiters:
+                self._rate_limiters[model_name] = InMemoryRateLimiter(requests_per_second=self.config['rpm'] / 60)
+            self._completions_client = CompletionsClient(
+                api_base=self.config['api_base'],
+                api_key=self.api_key,
+                model_name=model_name,
+                max_tokens=self.config['max_tokens'],
+                temperature=self.config['temperature'],
+                seed=self.config['seed'],
+            )
+        return self._completions_client
+
+    async def _run_prompt_array(self, batch: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Optional[str]]:
+        """
+        K개 행의 chat 프롬프트를 raw 프롬프트로 렌더링해 /completions 한 번으로 처리합니다.
+        choice.index로 행을 매핑하며, 응답이 빠진 행은 chat 경로로 개별 재호출합니다.
+        서버가 context 초과로 거절하면 가장 긴 프롬프트 기준 한도로 줄여 한 번 더 보내고,
+        그래도 실패하면(다른 오류 포함) 모든 행을 chat 경로로 개별 호출합니다.
+        """
+        model_name = self.config['model_name']
+        limit = self.get_context_limit(model_name)
+        fitted_vars, prompts, estimates = [], [], []
+        for _, vars in batch:
+            fitted, messages, estimated = self._fit_context(vars, self.prompt_template, model_name, limit)
+            if fitted is not vars:
+                self.context_stats['truncated_rows'] += 1
+            fitted_vars.append(fitted)
+            prompts.append(render_raw_prompt(messages, model_name))
+            estimates.append(estimated)
+
+        client = self._get_completions_client()
+        await self._acquire_rate_limit(model_name)
+        try:
+            reserved = await self._reserve_tokens(sum(estimates), len(batch))
+        except TokenBudgetExceeded:
+            return {key: None for key, _ in batch}
+        try:
+            try:
+                texts, usage = await client.complete(prompts)
+            except Exception as e:
+                if not is_context_overflow(e):
+                    raise
+                # 어느 프롬프트가 넘쳤는지 알 수 없으므로 가장 긴 프롬프트가 넘친 것으로 보고 한도를 계산
+                retry_limit = self._overflow_retry_limit(e, max(estimates))
+                retried = [self._fit_context(vars, self.prompt_template, model_name, retry_limit)
+                           for vars in fitted_vars]
+                if all(retry_vars is vars for (retry_vars, _, _), vars in zip(retried, fitted_vars)):
+                    raise
+                self.context_stats['overflow_retries'] += 1
+                prompts = [render_raw_prompt(messages, model_name) for _, messages, _ in retried]
+                estimates = [estimated for _, _, estimated in retried]
+                await self._acquire_rate_limit(model_name)
+                texts, usage = await client.complete(prompts)
+            self.transport_stats['requests'] += 1
+
+            # 요청 단위 usage를 행별 추정치 비율로 나눠 기록
+            completion_estimates = [estimate_tokens(t or '', model_name) for t in texts]
+            prompt_scale = usage['prompt_tokens'] / sum(estimates) if usage['prompt_tokens'] else 1.0
+            completion_scale = (usage['completion_tokens'] / max(sum(completion_estimates), 1)
+                                if usage['completion_tokens'] else 1.0)
+            cached_share = usage['cached_tokens'] / len(batch)
+            for estimated, completion in zip(estimates, completion_estimates):
+                reported = (int(estimated * prompt_scale + 0.5), int(completion * completion_scale + 0.5))
+                self._record_usage(model_name, reported if usage['prompt_tokens'] else None,
+                                   estimated, completion, int(cached_share + 0.5))
+        except Exception:
+            self.transport_stats['failed_requests'] += 1
+            texts = [None] * len(batch)
+        finally:
+            await self._release_tokens(reserved)
+
+        async def resolve(key, vars, text):
+            if text is not None:
+                self._archive_raw(key, text, self.prompt_template, model_name)
+                return await self.postprocess_result(text)
+            self.transport_stats['fallback_rows'] += 1
+            try:
+                response = await self._invoke(vars)
+            except TokenBudgetExceeded:
+                return None
+            self._archive_raw(key, response.content, self.prompt_template, model_name)
+            return await self.postprocess_result(response.content)
+
+        results = await asyncio.gather(*[resolve(key, vars, text) for (key, vars), text in zip(batch, texts)])
+        return {key: result for (key, _), result in zip(batch, results)}
+
+    def plan_packs(
+        self,
+        items: List[Tuple[str, Dict[str, Any]]],
+        prompt_token_budget: Optional[int] = None,
+    ) -> List[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        프롬프트 토큰 예산에 맞춰 행들을 pack 단위로 나눕니다.
+        pack 크기는 PACK_MAX_ITEMS, 프롬프트 예산(기본: 모델 context 한도),
+        출력 예산(max_tokens / PACK_OUTPUT_TOKENS_PER_ITEM) 중 가장 먼저 닿는 한도로 결정됩니다.
+        """
+        model_name = self.config['model_name']
+        limit = self.get_context_limit(model_name)
+        if prompt_token_budget is not None:
+            limit = min(limit, prompt_token_budget)
+        max_items = max(1, min(self.PACK_MAX_ITEMS,
+                               self.config['max_tokens'] // self.PACK_OUTPUT_TOKENS_PER_ITEM))
+        static = estimate_prompt_tokens(
+            self.packed_prompt.format_messages(items='', count=max_items), model_name)
+
+        packs, current, used = [], [], static
+        for item in items:
+            cost = estimate_tokens(self.format_packed_items([item]), model_name)
+            if current and (len(current) >= max_items or used + cost > limit):
+                packs.append(current)
+                current, used = [], static
+            current.append(item)
+            used += cost
+        if current:
+            packs.append(current)
+        return packs
+
+    async def _run_pack(self, pack: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Optional[str]]:
+        """pack 하나를 한 번에 호출하고, 누락/불량 항목만 개별 재호출합니다."""
+        ids = [key for key, _ in pack]
+
+        async def run_single(key, vars):
+            try:
+                response = await self._invoke(vars)
+            except TokenBudgetExceeded:
+                return None
+            self._archive_raw(key, response.content, self.prompt_template, self.config['model_name'])
+            return await self.postprocess_result(response.content)
+
+        if len(pack) == 1:
+            return {ids[0]: await run_single(*pack[0])}
+
+        try:
+            response = await self._invoke(
+                {'items': self.format_packed_items(pack), 'count': len(pack)}, self.packed_prompt)
+        except TokenBudgetExceeded:
+            return {key: None for key in ids}
+        parsed = self.parse_packed_result(str(response.content), ids)
+        self.packing_stats['packs'] += 1
+        self.packing_stats['packed_items'] += len(pack)
+
+        async def resolve(key, vars):
+            raw = parsed.get(key)
+            if raw is not None and await self.validate_packed_item(vars, raw):
+                self._archive_raw(key, raw, self.packed_prompt, self.config['model_name'])
+                return await self.postprocess_result(raw)
+            self.packing_stats['individual_reruns'] += 1
+            return await run_single(key, vars)
+
+        results = await asyncio.gather(*[resolve(key, vars) for key, vars in pack])
+        return dict(zip(ids, results))
+
+    def prompt_hash(self, prompt) -> str:
+        """프롬프트 템플릿(변수 자리 포함) 내용의 해시. 프롬프트가 바뀌면 값이 달라집니다."""
+        return hashlib.sha1(prompt.pretty_repr().encode('utf-8')).hexdigest()[:16]
+
+    def _archive_raw(self, key: Optional[str], raw: Any, prompt, model_name: str):
+        """후처리 전 모델 원본 출력을 (sample_id, 프롬프트 해시, 모델) 단위로 보관"""
+        if key is None or raw is None:
+            return
+        self._raw_archive.append({
+            'sample_id': key,
+            'prompt_hash': self.prompt_hash(prompt),
+            'model': model_name,
+            'raw': str(raw),
+            'reused_from': '',
+        })
+
+    def _save_raw_archive(self, archive_path: str):
+        """
+        원본 출력 archive를 저장합니다. 기존 archive와 합쳐 같은 키는 최신 값으로 덮어씁니다.
+        유사 중복으로 결과를 재사용한 행은 원본 행의 출력을 reused_from과 함께 기록합니다.
+        기본은 Parquet(pyarrow 필요), .feather 경로는 Feather, .csv/.csv.gz 경로는 CSV로 저장합니다.
+        """
+        archive = pd.DataFrame(self._raw_archive, columns=ARCHIVE_COLUMNS)
+        if os.path.exists(archive_path):
+            archive = pd.concat([self._load_raw_archive(archive_path), archive], ignore_index=True)
+        if self._reused_rows:
+            sources = (archive[archive['reused_from'] == '']
+                       .drop_duplicates('sample_id', keep='last').set_index('sample_id'))
+            reused = [{**sources.loc[source].to_dict(), 'sample_id': key, 'reused_from': source}
+                      for key, source in self._reused_rows.items() if source in sources.index]
+            archive = pd.concat([archive, pd.DataFrame(reused, columns=ARCHIVE_COLUMNS)], ignore_index=True)
+        archive = archive.drop_duplicates(['sample_id', 'prompt_hash', 'model'], keep='last')
+        archive = archive.reset_index(drop=True)
+        if archive_path.endswith(('.csv', '.csv.gz')):
+            archive.to_csv(archive_path, index=False)
+        elif archive_path.endswith('.feather'):
+            archive.to_feather(archive_path)
+        else:
+            archive.to_parquet(archive_path, index=False)
+
+    def _load_raw_archive(self, archive_path: str) -> pd.DataFrame:
+        """archive를 읽습니다. (reused_from이 없는 이전 archive는 빈 문자열로 채움)"""
+        if archive_path.endswith(('.csv', '.csv.gz')):
+            archive = pd.read_csv(archive_path, dtype=str, keep_default_na=False)
+        elif archive_path.endswith('.feather'):
+            archive = pd.read_feather(archive_path)
+        else:
+            archive = pd.read_parquet(archive_path)
+        return archive.reindex(columns=ARCHIVE_COLUMNS, fill_value='')
+
+    async def postprocess_results(self, raws: List[Optional[str]]) -> List[str]:
+        """
+        원본 출력 목록에 postprocess_result를 적용합니다.
+        동일한 원본 출력은 한 번만 후처리하며, 서브클래스에서 벡터화된 구현으로 교체할 수 있습니다.
+        """
+        unique = list(dict.fromkeys(r for r in raws if r is not None))
+        processed = await asyncio.gather(*[self.postprocess_result(r) for r in unique])
+        lookup = dict(zip(unique, processed))
+        fallback = await self.postprocess_result(None) if None in raws else None
+        return [lookup[r] if r is not None else fallback for r in raws]
+
+    async def replay(self, archive_path: str, data: Optional[pd.DataFrame] = None) -> List[str]:
+        """
+        LLM을 다시 호출하지 않고 archive된 원본 출력에 후처리만 다시 적용합니다.
+        data를 주면 그 순서대로 (archive에 없는 행은 기본값), 없으면 archive 순서대로 반환합니다.
+        현재 프롬프트와 해시가 다른 출력을 쓰게 되면 경고합니다.
+        """
+        archive = self._load_raw_archive(archive_path)
+        current = {self.prompt_hash(p) for p in (self.prompt_template, self.cascade_prompt, self.packed_prompt)
+                   if p is not None}
+
+        # 한 행에 여러 출력이 있으면 현재 프롬프트로 만든 것 -> 최근 것 순으로 선택
+        archive = archive.assign(_current=archive['prompt_hash'].isin(current), _order=range(len(archive)))
+        archive = archive.sort_values(['_current', '_order']).drop_duplicates('sample_id', keep='last')
+
+        if data is None:
+            archive = archive.sort_values('_order')
+            keys = list(archive['sample_id'])
+        else:
+            keys = self._row_keys(data)
+            archive = archive[archive['sample_id'].isin(keys)]
+
+        stale = int((~archive['_current']).sum())
+        if stale:
+            warnings.warn(f"{type(self).__name__}: {stale}/{len(archive)}개 행의 원본 출력이 "
+                          f"현재 프롬프트와 다른 프롬프트 해시로 생성되었습니다.")
+
+        raws = dict(zip(archive['sample_id'], archive['raw']))
+        results = await self.postprocess_results([raws.get(key) for key in keys])
+
+        self.metrics['replay'] = {
+            'task': type(self).__name__,
+            'rows': len(keys),
+            'archived': sum(1 for key in keys if key in raws),
+            'stale_prompt_rows': stale,
+        }
+        return results
+
+    def _map_reduce_rows(self, rows: List[pd.Series], keys: List[str], skip: Iterable[str]) -> Dict[str, Any]:
+        """prepare_batch를 거친 행 중 NOTE_COLUMN(압축 후)이 MAP_REDUCE_MIN_TOKENS보다 긴 행 {key: 행}"""
+        if self.MAP_REDUCE_MIN_TOKENS is None:
+            return {}
+        skip = set(skip)
+        model_name = self.config['model_name']
+        selected = {}
+        for key, row in zip(keys, rows):
+            note = row.get(self.NOTE_COLUMN)
+            if key not in skip and isinstance(note, str) and \
+                    estimate_tokens(note, model_name) > self.MAP_REDUCE_MIN_TOKENS:
+                selected[key] = row
+        return selected
+
+    def _map_stage_hash(self) -> str:
+        """청크 요약 캐시의 코드 해시 (청크 프롬프트와 모델이 바뀌면 이전 요약은 무효화)"""
+        payload = f"{self.prompt_hash(self.map_prompt)}:{self.config['model_name']}"
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+    async def _summarize_chunk(self, chunk: str) -> str:
+        """청크 하나를 요약합니다. 같은 청크는 캐시/진행 중인 호출 결과를 재사용합니다."""
+        key = chunk_key(chunk)
+        if key in self._chunk_summaries:
+            # 디스크 캐시 적중은 cache_hits로 따로 집계하고, 이번 실행에서 만든 요약의 재사용만 셈
+            if key in self._chunk_fresh:
+                self.map_reduce_stats['reused_chunks'] += 1
+            return self._chunk_summaries[key]
+        if key in self._chunk_tasks:
+            self.map_reduce_stats['reused_chunks'] += 1
+            return await self._chunk_tasks[key]
+
+        async def run():
+            self.map_reduce_stats['map_requests'] += 1
+            response = await self._invoke({'user_input': chunk}, self.map_prompt)
+            summary = str(response.content).strip()
+            self._chunk_summaries[key] = summary
+            self._chunk_fresh[key] = summary
+            return summary
+
+        self._chunk_tasks[key] = asyncio.ensure_future(run())
+        return await self._chunk_tasks[key]
+
+    async def _map_reduce_vars(self, row: Any, vars: Dict[str, Any], chunks: List[str]) -> Dict[str, Any]:
+        """청크를 동시에 요약(map)하고 요약 목록을 기본 프롬프트 입력으로 합침(reduce 입력)"""
+        summaries = await asyncio.gather(*[self._summarize_chunk(chunk) for chunk in chunks])
+        return self.format_reduce_input(row, vars, [summary for summary in summaries if summary])
+
+    def _dedup_text(self, vars: Dict[str, Any]) -> str:
+        """유사 중복 판정에 쓰는 전처리 결과 텍스트"""
+        return "\n".join(str(v) for v in vars.values())
+
+    def _plan_reuse(
+        self,
+        keys: List[str],
+        preprocessed_data: List[Dict[str, Any]],
+        threshold: float,
+        done: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Tuple[str, float]]:
+        """완료되지 않은 행 중 앞선 행(또는 체크포인트 완료 행)과 유사 중복인 행 -> (재사용할 행, 유사도)"""
+        done = done or {}
+        items = [(key, self._dedup_text(vars)) for key, vars in zip(keys, preprocessed_data) if key not in done]
+        sources = [(key, self._dedup_text(vars)) for key, vars in zip(keys, preprocessed_data) if key in done]
+        return plan_reuse(items, threshold, sources=sources)
+
+    async def plan_near_duplicates(
+        self,
+        data: pd.DataFrame,
+        threshold: float = 0.9,
+        preprocess_cache: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        LLM을 호출하지 않고 summarize(dedup_threshold=threshold)에서 결과를 재사용할 행을 미리 확인합니다.
+        (sample_id, reuse_from, similarity) 형식으로 반환하며 metrics['dedup']에 재사용 비율을 기록합니다.
+        """
+        keys = self._row_keys(data)
+        preprocessed_data = await self.preprocess_all(data, preprocess_cache)
+        reuse = self._plan_reuse(keys, preprocessed_data, threshold)
+        self._record_dedup_metrics(len(keys), reuse, threshold, dry_run=True)
+        return pd.DataFrame(
+            [(key, source, round(similarity, 4)) for key, (source, similarity) in reuse.items()],
+            columns=['sample_id', 'reuse_from', 'similarity'],
+        )
+
+    def _record_dedup_metrics(self, rows: int, reuse: Dict[str, Tuple[str, float]], threshold: float,
+                              dry_run: bool = False):
+        self.metrics['dedup'] = {
+            'task': type(self).__name__,
+            'rows': rows,
+            'reused': len(reuse),
+            'reuse_rate': round(len(reuse) / rows, 4) if rows else 0.0,
+            'threshold': threshold,
+            'dry_run': dry_run,
+        }
+
+    def _record_pattern_metrics(self):
+        """PATTERNS 패턴별 호출 수/시간을 metrics에 기록합니다. (카운터는 클래스 단위 누적, PATTERNS.reset()으로 초기화)"""
+        if self.PATTERNS is not None:
+            self.metrics['patterns'] = {'task': type(self).__name__, 'patterns': self.PATTERNS.stats()}
+
+    def _record_token_metrics(self, skipped: int):
+        """토큰 사용량을 task/모델별로 집계해 metrics에 기록합니다."""
+        self.metrics['tokens'] = {
+            'task': type(self).__name__,
+            **summarize_usage(self.token_usage),
+            'budget': self.token_budget,
+            'budget_exhausted': self._budget_exhausted,
+            'skipped_rows': skipped,
+        }
+
+    def _row_keys(self, data: pd.DataFrame) -> List[str]:
+        """체크포인트용 행 식별자 (sample_id가 없으면 index 사용)"""
+        if 'sample_id' in data.columns:
+            return [str(v) for v in data['sample_id']]
+        return [str(v) for v in data.index]
+
+    def _load_checkpoint(self, checkpoint_path: Optional[str]) -> Dict[str, str]:
+        """이전 실행에서 완료된 행의 결과를 불러옵니다."""
+        if not checkpoint_path or not os.path.exists(checkpoint_path):
+            return {}
+        done = pd.read_csv(checkpoint_path, dtype=str, keep_default_na=False)
+        return dict(zip(done['sample_id'], done['target']))
+
+    def _save_checkpoint(self, checkpoint_path: str, keys: List[str], results: List[Optional[str]]):
+        """완료된 행만 sample_id, target 형식으로 저장합니다."""
+        done = [(k, r) for k, r in zip(keys, results) if r is not None]
+        pd.DataFrame(done, columns=['sample_id', 'target']).to_csv(checkpoint_path, index=False)
+
+    async def summarize(
+        self,
+        data: pd.DataFrame,
+        cascade: bool = False,
+        token_budget: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        pack: bool = False,
+        pack_token_budget: Optional[int] = None,
+        transport: str = 'chat',
+        prompt_array_size: int = 8,
+        archive_path: Optional[str] = None,
+        preprocess_cache: Optional[str] = None,
+        dedup_threshold: Optional[float] = None,
+        map_reduce: bool = False,
+        chunk_cache: Optional[str] = None,
+    ) -> List[Optional[str]]:
+        """
+        단일 입력과 배치 입력을 모두 처리하는 통합 메서드
+        cascade=True이면 빠른 모델/축약 프롬프트로 먼저 처리하고
+        validate_result를 통과하지 못한 행만 기본 모델로 재호출합니다.
+        token_budget에 도달하면 남은 행은 호출하지 않고 None으로 반환하며,
+        checkpoint_path가 있으면 완료된 행을 CHECKPOINT_EVERY행마다(그리고 끝날 때) 저장하고 다음 실행에서 이어서 처리합니다.
+        pack=True이면 여러 행을 한 요청에 묶어 보내고 (pack_token_budget으로 pack 크기 조절),
+        응답에서 누락되거나 형식이 잘못된 행만 개별로 재호출합니다.
+        transport='completions'이면 행별 chat 프롬프트를 raw 프롬프트로 렌더링해
+        prompt_array_size개씩 /completions 한 요청으로 보냅니다.
+        archive_path가 있으면 후처리 전 원본 출력을 저장해 replay()로 후처리만 다시 돌릴 수 있습니다.
+        (기본 Parquet, .feather는 Feather, .csv/.csv.gz는 CSV. 유사 중복 재사용 행도 reused_from과 함께 기록)
+        preprocess_cache(SQLite 파일 경로)가 있으면 전처리 결과를 캐시해 재실행 시 재사용합니다.
+        dedup_threshold가 있으면 전처리 결과가 앞선 행과 유사 중복(MinHash 추정 Jaccard 기준)인 행은
+        호출하지 않고 해당 행의 결과를 재사용합니다. 적용 범위는 plan_near_duplicates()로 미리 확인할 수 있습니다.
+        map_reduce=True이면 노트가 MAP_REDUCE_MIN_TOKENS보다 긴 행은 잘라낸 입력 대신 노트 전체를
+        섹션 경계 청크로 나눠 동시에 요약(map)한 뒤, 청크 요약들로 기본 프롬프트를 한 번 더 호출(reduce)합니다.
+        chunk_cache(SQLite 파일 경로)가 있으면 청크 요약을 청크 해시로 캐시해 겹치는 노트/재실행에서 재사용합니다.
+        """
+        if transport not in ('chat', 'completions'):
+            raise ValueError(f"지원하지 않는 transport입니다: {transport}")
+        if transport == 'completions' and (pack or cascade):
+            raise ValueError("completions transport는 cascade/pack 모드와 함께 사용할 수 없습니다.")
+        if pack and self.packed_prompt is None:
+            raise ValueError(f"{type(self).__name__}: packing 모드를 지원하지 않습니다.")
+        if pack and cascade:
+            raise ValueError("cascade와 pack 모드는 동시에 사용할 수 없습니다.")
+        if map_reduce and self.map_prompt is None:
+            raise ValueError(f"{type(self).__name__}: map-reduce 모드를 지원하지 않습니다.")
+        if map_reduce and (pack or transport != 'chat'):
+            raise ValueError("map-reduce 모드는 chat transport의 행 단위 호출에서만 사용할 수 있습니다.")
+
+        keys = self._row_keys(data)
+        done = self._load_checkpoint(checkpoint_path)
+
+        # 데이터 전처리 (prepare_batch는 한 번만 적용해 map-reduce 대상 선택에도 사용)
+        rows = self._prepared_rows(data)
+        preprocessed_data = await self._preprocess_rows(rows, preprocess_cache)
+
+        self._reset_token_budget(token_budget)
+        self.context_stats = {'truncated_rows': 0, 'overflow_retries': 0}
+        self.packing_stats = {'packs': 0, 'packed_items': 0, 'individual_reruns': 0}
+        self.transport_stats = {'requests': 0, 'failed_requests': 0, 'fallback_rows': 0}
+        self.map_reduce_stats = {'rows': 0, 'chunks': 0, 'map_requests': 0, 'cache_hits': 0, 'reused_chunks': 0}
+        self._raw_archive = []
+        self._reused_rows = {}
+
+        if cascade and self.cascade_chain is None:
+            self.cascade_chain = self._build_cascade_chain()
+        cascade_outcomes = []
+
+        reuse = self._plan_reuse(keys, preprocessed_data, dedup_threshold, done) if dedup_threshold else {}
+
+        # map-reduce 대상 행의 청크와 캐시된 청크 요약 준비
+        map_rows = self._map_reduce_rows(rows, keys, [*done, *reuse]) if map_reduce else {}
+        model_name = self.config['model_name']
+        row_chunks = {key: chunk_note(row[self.NOTE_COLUMN], self.MAP_CHUNK_TOKENS, model_name)
+                      for key, row in map_rows.items()}
+        self._chunk_summaries, self._chunk_fresh, self._chunk_tasks = {}, {}, {}
+        chunk_store = StageCache(chunk_cache) if row_chunks and chunk_cache else None
+        if chunk_store is not None:
+            map_stage, map_hash = f"{type(self).__name__}.map_chunk", self._map_stage_hash()
+            chunk_store.invalidate(map_stage, map_hash)
+            self._chunk_summaries = chunk_store.get_many(
+                map_stage, map_hash, [chunk_key(c) for chunks in row_chunks.values() for c in chunks])
+            self.map_reduce_stats['cache_hits'] = len(self._chunk_summaries)
+
+        async def run_row(key, vars):
+            if key in done:
+                return done[key]
+            if key in reuse:
+                return None
+            try:
+                if key in row_chunks:
+                    vars = await self._map_reduce_vars(map_rows[key], vars, row_chunks[key])
+                if cascade:
+                    outcome = await self._run_cascade(vars, key)
+                    cascade_outcomes.append(outcome)
+                    return outcome[0]
+                response = await self._invoke(vars)
+            except TokenBudgetExceeded:
+                return None
+            self._archive_raw(key, response.content, self.prompt_template, self.config['model_name'])
+            return await self.postprocess_result(response.content)
+
+        # 완료된 행을 모아 두었다가 중간에 중단돼도 진행분이 남도록 주기적으로 체크포인트에 기록
+        progress, unsaved = dict(done), 0
+
+        def record(finished: Dict[str, Optional[str]]):
+            nonlocal unsaved
+            finished = {key: result for key, result in finished.items() if result is not None and key not in done}
+            progress.update(finished)
+            unsaved += len(finished)
+            if checkpoint_path and unsaved >= self.CHECKPOINT_EVERY:
+                self._save_checkpoint(checkpoint_path, list(progress), list(progress.values()))
+                unsaved = 0
+
+        async def checkpointed(coroutine):
+            finished = await coroutine
+            record(finished)
+            return finished
+
+        async def checkpointed_row(key, vars):
+            result = await run_row(key, vars)
+            record({key: result})
+            return result
+
+        pending = [(key, vars) for key, vars in zip(keys, preprocessed_data) if key not in done and key not in reuse]
+        if pack:
+            packs = self.plan_packs(pending, pack_token_budget)
+            resolved = dict(done)
+            for packed in await tqdm_asyncio.gather(*[checkpointed(self._run_pack(p)) for p in packs]):
+                resolved.update(packed)
+            results = [resolved.get(key) for key in keys]
+        elif transport == 'completions':
+            batches = [pending[i:i + prompt_array_size] for i in range(0, len(pending), prompt_array_size)]
+            resolved = dict(done)
+            for batch_results in await tqdm_asyncio.gather(
+                    *[checkpointed(self._run_prompt_array(b)) for b in batches]):
+                resolved.update(batch_results)
+            results = [resolved.get(key) for key in keys]
+        else:
+            # 각각을 별도의 coroutine으로 실행하며 progress bar 표시
+            results = await tqdm_asyncio.gather(
+                *[checkpointed_row(key, vars) for key, vars in zip(keys, preprocessed_data)])
+
+        if reuse:
+            resolved = dict(zip(keys, results))
+            results = [resolved[reuse[key][0]] if key in reuse else result for key, result in zip(keys, results)]
+            self._reused_rows = {key: source for key, (source, _) in reuse.items() if resolved[source] is not None}
+            self._record_dedup_metrics(len(keys), reuse, dedup_threshold)
+        if cascade:
+            self._record_cascade_metrics(cascade_outcomes)
+        if map_reduce:
+            if chunk_store is not None:
+                if self._chunk_fresh:
+                    chunk_store.put_many(map_stage, map_hash, self._chunk_fresh)
+                chunk_store.close()
+            self.map_reduce_stats['rows'] = len(row_chunks)
+            self.map_reduce_stats['chunks'] = sum(len(chunks) for chunks in row_chunks.values())
+            self.metrics['map_reduce'] = {
+                'task': type(self).__name__,
+                'min_tokens': self.MAP_REDUCE_MIN_TOKENS,
+                'chunk_tokens': self.MAP_CHUNK_TOKENS,
+                **self.map_reduce_stats,
+            }
+        if pack:
+            self.metrics['packing'] = {
+                'task': type(self).__name__,
+                **self.packing_stats,
+                'requests_saved': (self.packing_stats['packed_items'] - self.packing_stats['packs']
+                                   - self.packing_stats['individual_reruns']),
+            }
+        if transport == 'completions':
+            self.metrics['transport'] = {
+                'task': type(self).__name__,
+                'transport': transport,
+                'rows': len(pending),
+                **self.transport_stats,
+            }
+        self._record_token_metrics(sum(1 for r in results if r is None))
+        self.metrics['context_guard'] = {'task': type(self).__name__, **self.context_stats}
+        self._record_pattern_metrics()
+        if checkpoint_path:
+            self._save_checkpoint(checkpoint_path, keys, results)
+        if archive_path:
+            self._save_raw_archive(archive_path)
+
+        return results
+
+    async def summarize_stream(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        concurrency: int = 16,
+        queue_size: int = 64,
+        token_budget: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        archive_path: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[str, Optional[str]]]:
+        """
+        DataFrame chunk 이터레이터(예: dataset_cache.iter_csv_chunks)를 받아 행 단위로 처리하고
+        완료되는 순서대로 (sample_id, 결과)를 내보냅니다.
+        대기 행 queue 크기를 queue_size로 제한해 다음 chunk는 처리가 따라잡은 뒤에 읽으므로
+        메모리 사용량은 파일 크기가 아니라 chunk 크기에 비례합니다.
+        checkpoint_path가 있으면 완료된 행을 즉시 추가 기록하고, 재실행 시 해당 행을 건너뜁니다.
+        소비가 중간에 멈추면(break/예외) 남은 작업을 모두 취소하고 그때까지의 metrics를 기록합니다.
+        break 즉시 정리되도록 contextlib.aclosing으로 감싸서 순회하세요. 감싸지 않아도 완료 결과 queue를
+        concurrency 크기로 제한하므로 break 이후 추가 호출은 최대 2 * concurrency건입니다.
+        """
+        done = self._load_checkpoint(checkpoint_path)
+        write_header = not (checkpoint_path and os.path.exists(checkpoint_path))
+
+        self._reset_token_budget(token_budget)
+        self.context_stats = {'truncated_rows': 0, 'overflow_retries': 0}
+        self._raw_archive = []
+        self._reused_rows = {}
+        stream_stats = {'chunks': 0, 'rows': 0, 'resumed_rows': 0, 'skipped_rows': 0}
+
+        # 입력/결과 queue 모두 크기를 제한해 소비가 느리면 읽기와 호출도 함께 멈추도록 함
+        # (결과 queue가 크면 소비가 멈춘 뒤에도 그만큼 호출이 계속되므로 worker 수로 제한)
+        pending: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        finished: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        stop = object()
+
+        async def produce():
+            iterator = iter(chunks)
+            while True:
+                # 파일 읽기/파싱은 이벤트 루프를 막지 않도록 별도 스레드에서 수행
+                chunk = await asyncio.to_thread(next, iterator, None)
+                if chunk is None:
+                    break
+                stream_stats['chunks'] += 1
+                for key, (_, row) in zip(self._row_keys(chunk), self.prepare_batch(chunk).iterrows()):
+                    stream_stats['rows'] += 1
+                    if key in done:
+                        stream_stats['resumed_rows'] += 1
+                        continue
+                    await pending.put((key, row))
+            for _ in range(concurrency):
+                await pending.put(stop)
+
+        async def work():
+            while True:
+                item = await pending.get()
+                if item is stop:
+                    break
+                key, row = item
+                vars = await self.preprocess_data(row)
+                try:
+                    response = await self._invoke(vars)
+                except TokenBudgetExceeded:
+                    await finished.put((key, None))
+                    continue
+                self._archive_raw(key, response.content, self.prompt_template, self.config['model_name'])
+                await finished.put((key, await self.postprocess_result(response.content)))
+
+        # gather는 예외가 나도 나머지 작업을 취소하지 않으므로 작업을 직접 만들어 종료 시 모두 취소
+        workers = [asyncio.create_task(produce())] + [asyncio.create_task(work()) for _ in range(concurrency)]
+
+        async def run_all():
+            try:
+                await asyncio.gather(*workers)
+            except Exception as e:
+                await finished.put(e)
+                return
+            await finished.put(stop)
+
+        tasks = workers + [asyncio.create_task(run_all())]
+        try:
+            while True:
+                item = await finished.get()
+                if item is stop:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                key, result = item
+                if result is None:
+                    stream_stats['skipped_rows'] += 1
+                elif checkpoint_path:
+                    pd.DataFrame([(key, result)], columns=['sample_id', 'target']).to_csv(
+                        checkpoint_path, mode='a', header=write_header, index=False)
+                    write_header = False
+                yield key, result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            self.metrics['stream'] = {'task': type(self).__name__, **stream_stats}
+            self._record_token_metrics(stream_stats['skipped_rows'])
+            self.metrics['context_guard'] = {'task': type(self).__name__, **self.context_stats}
+            self._record_pattern_metrics()
+            if archive_path:
+                self._save_raw_archive(archive_path)
+
+    async def export_batch_requests(
+        self,
+        data: pd.DataFrame,
+        output_path: str,
+        preprocess_cache: Optional[str] = None,
+    ) -> int:
+        """
+        데이터셋의 모든 행을 전처리/프롬프트 렌더링해 OpenAI batch 형식 JSONL로 저장합니다.
+        각 줄의 custom_id는 sample_id이며, 저장한 요청 수를 반환합니다.
+        """
+        keys = self._row_keys(data)
+        preprocessed_data = await self.preprocess_all(data, preprocess_cache)
+
+        model_name = self.config['model_name']
+        limit = self.get_context_limit(model_name)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for key, vars in zip(keys, preprocessed_data):
+                _, messages, _ = self._fit_context(vars, self.prompt_template, model_name, limit)
+                request = {
+                    'custom_id': key,
+                    'method': 'POST',
+                    'url': '/v1/chat/completions',
+                    'body': {
+                        'model': model_name,
+                        'messages': to_openai_messages(messages),
+                        'max_tokens': self.config['max_tokens'],
+                        'temperature': self.config['temperature'],
+                        'seed': self.config['seed'],
+                    },
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + '\n')
+        return len(keys)
+
+    async def ingest_batch_results(
+        self,
+        data: pd.DataFrame,
+        results_path: str,
+        submission_path: Optional[str] = None,
+    ) -> List[str]:
+        """
+        batch 결과 JSONL을 읽어 postprocess_result를 적용하고 data 순서대로 결과를 반환합니다.
+        submission_path가 있으면 sample_id, target 형식의 제출 CSV로 저장합니다.
+        결과가 없거나 오류인 행은 postprocess_result의 기본값으로 채웁니다.
+        재시도로 같은 custom_id의 성공 결과가 함께 있으면 오류로 세지 않습니다.
+        """
+        outputs: Dict[str, Optional[str]] = {}
+        failed: Set[str] = set()
+        with open(results_path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get('response') or {}
+                body = response.get('body') or {}
+                choices = body.get('choices') or []
+                if record.get('error') or response.get('status_code', 200) != 200 or not choices:
+                    failed.add(str(record.get('custom_id')))
+                    continue
+                choice = choices[0]
+                outputs[str(record['custom_id'])] = (choice.get('message') or {}).get('content', choice.get('text'))
+
+        keys = self._row_keys(data)
+        results = await tqdm_asyncio.gather(*[self.postprocess_result(outputs.get(key)) for key in keys])
+
+        self.metrics['batch'] = {
+            'task': type(self).__name__,
+            'rows': len(keys),
+            'ingested': sum(1 for key in keys if key in outputs),
+            'missing': sum(1 for key in keys if key not in outputs),
+            'errors': len(failed - outputs.keys()),
+        }
+        if submission_path:
+            pd.DataFrame({'sample_id': data['sample_id'] if 'sample_id' in data.columns else keys,
+                          'target': results}).to_csv(submission_path, index=False)
+        return results
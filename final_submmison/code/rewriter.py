@@ -0,0 +1,72 @@
+"""
+다중 패턴 단일 패스 치환기
+후처리의 규칙 표(원문 -> 치환 문자열)를 접두사 트리 형태의 정규식 하나로 컴파일해 텍스트를 왼쪽부터 한 번만 훑습니다.
+규칙마다 str.replace로 전체를 다시 훑던 방식(O(규칙 수 x 길이))과 달리, 이미 치환된 결과가
+다른 규칙에 다시 걸리는 연쇄 치환도 생기지 않습니다. 규칙 표는 클래스/모듈 속성으로 한 번만 컴파일해 씁니다.
+"""
+import re
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    단어 목록을 접두사 트리 형태의 정규식으로 변환 (예: ['pt ', 'pt.'] -> 'pt(?:\\ |\\.)')
+    평면 alternation은 위치마다 모든 규칙을 차례로 시도하지만, 트리 형태는 공통 접두사를 한 번만 비교하므로
+    규칙 수가 늘어도 스캔 비용이 거의 늘지 않습니다. 한 단어가 다른 단어의 접두사이면 긴 쪽을 먼저 시도합니다.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+
+class Rewriter:
+    """
+    규칙 표를 컴파일한 치환기
+    같은 위치에서 여러 규칙이 맞으면 가장 긴 원문 규칙을 적용합니다. (예: 'w/o '가 'w/ '보다 우선)
+    ignore_case=True이면 대소문자를 무시하고 맞춘 뒤 규칙 표의 치환 문자열을 그대로 넣습니다.
+    """
+
+    def __init__(self, rules: Dict[str, str], ignore_case: bool = False):
+        self.rules = dict(rules)
+        self.ignore_case = ignore_case
+        self._priority = {self._key(source): i for i, source in enumerate(self.rules)}
+        self._values = {self._key(source): value for source, value in self.rules.items()}
+        sources = [self._key(source) for source in self.rules if source]
+        self._pattern = re.compile(trie_pattern(sources), re.IGNORECASE if ignore_case else 0) if sources else None
+
+    def _key(self, text: str) -> str:
+        return text.lower() if self.ignore_case else text
+
+    def _replace(self, match: 're.Match') -> str:
+        return self._values[self._key(match.group(0))]
+
+    def rewrite(self, text: str) -> str:
+        """모든 규칙을 한 번의 왼쪽->오른쪽 스캔으로 치환"""
+        if self._pattern is None or not text:
+            return text
+        return self._pattern.sub(self._replace, text)
+
+    def matches(self, text: str) -> Iterator[Tuple[str, str]]:
+        """텍스트에 나온 (원문 규칙, 치환 문자열)을 등장 순서대로 (겹치지 않는 가장 왼쪽-가장 긴 일치)"""
+        if self._pattern is None or not text:
+            return
+        for match in self._pattern.finditer(text):
+            key = self._key(match.group(0))
+            yield key, self._values[key]
+
+    def first(self, text: str) -> Optional[str]:
+        """텍스트에 나온 규칙 중 규칙 표 순서가 가장 앞선 규칙의 치환 문자열 (없으면 None)"""
+        found = min(self.matches(text), key=lambda item: self._priority[item[0]], default=None)
+        return found[1] if found is not None else None
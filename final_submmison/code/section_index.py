@@ -0,0 +1,223 @@
+"""
+퇴원 노트 섹션 오프셋 인덱스
+노트를 한 번만 훑어 섹션 헤더마다 (헤더, 시작, 본문 시작, 끝) 문자 오프셋을 기록합니다.
+TaskA('medical record')와 TaskC('hospital_course')가 같은 인덱스로 섹션을 바로 잘라 쓰며,
+데이터셋 옆(.dataset_cache)에 sidecar 파일로 저장해 다음 실행에서는 인덱싱도 건너뜁니다.
+전처리 전에 노트를 바꾸는 경우(NoteCompressor 압축 등) 같은 변환을 적용한 텍스트로 인덱스를 만들고,
+항목마다 노트 내용 해시를 두어 실제 노트와 다르면 다시 인덱싱합니다.
+"""
+import hashlib
+import json
+import pathlib
+import re
+import string
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from dataset_cache import DEFAULT_CACHE_DIR, cached_file_hash, load_csv_cached
+
+# 정규화된 섹션 이름 -> 헤더 패턴 (콜론 앞까지, 대소문자 무시)
+# 긴 헤더가 짧은 헤더를 포함하는 경우(Brief Hospital Course / Hospital Course)는 긴 쪽을 먼저 둠
+SECTION_HEADERS: Dict[str, str] = {
+    'Chief Complaint': r'Chief\s+Complaint',
+    'Service': r'Service',
+    'Allergies': r'Allergies',
+    'Major Surgical or Invasive Procedure': r'Major\s+Surgical\s+or\s+Invasive\s+Procedure',
+    'History of Present Illness': r'History\s+of\s+Present\s+Illness',
+    'Past Medical History': r'Past\s+Medical\s+History',
+    'Social History': r'Social\s+History',
+    'Family History': r'Family\s+History',
+    'Physical Exam': r'Physical\s+Exam',
+    'Pertinent Results': r'Pertinent\s+Results',
+    'Brief Hospital Course': r'Brief\s+Hospital\s+Course',
+    'Hospital Course': r'Hospital\s+Course',
+    'Assessment': r'(?:Assessment|Impression)(?:\s*and\s*Plan)?',
+    'A&P': r'A&P',
+    'Medications on Admission': r'Medications\s+on\s+Admission',
+    'Discharge Medications': r'Discharge\s+Medications',
+    'Discharge Disposition': r'Discharge\s+Disposition',
+    'Discharge Diagnosis': r'(?:Discharge|Primary|Principal|Final)\s*Diagnos[ei]s?',
+    'Diagnosis at Discharge': r'Diagnos[ei]s\s*(?:on\s*discharge|at\s*discharge)',
+    'Discharge Condition': r'Discharge\s+Condition',
+    'Discharge Instructions': r'Discharge\s+Instructions',
+    'Followup Instructions': r'Followup\s+Instructions',
+}
+
+# 헤더 끝 단어(소문자) -> 그 단어로 끝나는 섹션. 콜론 앞이 이 단어로 끝날 때만 해당 헤더 패턴을 확인
+HEADER_ENDINGS: Dict[str, List[str]] = {
+    'complaint': ['Chief Complaint'],
+    'service': ['Service'],
+    'allergies': ['Allergies'],
+    'procedure': ['Major Surgical or Invasive Procedure'],
+    'illness': ['History of Present Illness'],
+    'history': ['Past Medical History', 'Social History', 'Family History'],
+    'exam': ['Physical Exam'],
+    'results': ['Pertinent Results'],
+    'course': ['Brief Hospital Course', 'Hospital Course'],
+    'assessment': ['Assessment'],
+    'impression': ['Assessment'],
+    'plan': ['Assessment'],
+    'a&p': ['A&P'],
+    'admission': ['Medications on Admission'],
+    'medications': ['Discharge Medications'],
+    'disposition': ['Discharge Disposition'],
+    'diagnosis': ['Discharge Diagnosis'],
+    'diagnoses': ['Discharge Diagnosis'],
+    'diagnose': ['Discharge Diagnosis'],
+    'diagnosi': ['Discharge Diagnosis'],
+    'discharge': ['Diagnosis at Discharge'],
+    'condition': ['Discharge Condition'],
+    'instructions': ['Discharge Instructions', 'Followup Instructions'],
+}
+# 헤더 시작에서 콜론까지 최대 길이
+HEADER_WINDOW = 80
+
+_SECTION_NAMES = list(SECTION_HEADERS)
+_ENDING_WORDS = tuple(HEADER_ENDINGS)
+_ENDING_LENGTHS = sorted({len(word) for word in HEADER_ENDINGS})
+
+
+def _tail_pattern(names: List[str]) -> 're.Pattern':
+    """콜론 위치(검색 끝)에서 끝나는 헤더를 찾는 패턴 (ASCII 소문자로 바꾼 텍스트에 적용)"""
+    names = [name for name in _SECTION_NAMES if name in names]
+    branches = '|'.join(f"(?P<s{_SECTION_NAMES.index(name)}>{SECTION_HEADERS[name].lower()})" for name in names)
+    return re.compile(f"(?=[a-z&])(?:{branches})\\Z")
+
+
+_TAIL_PATTERNS = {word: _tail_pattern(names) for word, names in HEADER_ENDINGS.items()}
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# (섹션 이름, 헤더 시작, 본문 시작, 섹션 끝) - 문자 단위 오프셋
+Span = Tuple[str, int, int, int]
+# sidecar 항목: (노트 내용 해시, spans) - 해시가 다르면 노트가 바뀐 것으로 보고 다시 인덱싱
+IndexEntry = Tuple[str, List[Span]]
+
+
+def text_digest(text: str) -> str:
+    """sidecar 항목과 노트가 같은지 확인하는 내용 해시 (길이만 비교하면 길이가 같은 수정을 놓침)"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def index_sections(text: str) -> List[Span]:
+    """
+    노트를 한 번 훑어 섹션 오프셋 목록을 만듭니다. 섹션은 다음 헤더 직전에서 끝납니다.
+    콜론 위치만 순회하고, 콜론 앞 단어가 헤더 끝 단어일 때만 짧은 구간에서 헤더 패턴을 확인합니다.
+    """
+    lowered = text.translate(_ASCII_LOWER)
+    heads = []
+    position = lowered.find(':')
+    while position >= 0:
+        if lowered.endswith(_ENDING_WORDS, 0, position):
+            window = max(0, position - HEADER_WINDOW)
+            matches = []
+            for length in _ENDING_LENGTHS:
+                word = lowered[position - length:position]
+                if word in _TAIL_PATTERNS:
+                    match = _TAIL_PATTERNS[word].search(lowered, window, position)
+                    if match:
+                        matches.append(match)
+            if matches:
+                # 여러 헤더가 같은 콜론에서 끝나면 가장 앞에서 시작하는 헤더
+                match = min(matches, key=lambda m: m.start())
+                heads.append((_SECTION_NAMES[int(match.lastgroup[1:])], match.start(), position + 1))
+        position = lowered.find(':', position + 1)
+
+    return [
+        (name, start, body_start, heads[i + 1][1] if i + 1 < len(heads) else len(text))
+        for i, (name, start, body_start) in enumerate(heads)
+    ]
+
+
+class NoteSections:
+    """노트 한 건의 섹션 조회 (인덱스가 없으면 생성 시 한 번 인덱싱)"""
+
+    def __init__(self, text: str, spans: Optional[List[Span]] = None):
+        self.text = text
+        self.spans = index_sections(text) if spans is None else [tuple(s) for s in spans]
+        self._by_name: Dict[str, List[Span]] = {}
+        for span in self.spans:
+            self._by_name.setdefault(span[0], []).append(span)
+
+    def find(self, *names: str, literal: Union[str, Tuple[str, ...], None] = None) -> Optional[Span]:
+        """
+        주어진 섹션 중 노트에서 가장 먼저 나오는 헤더를 반환합니다.
+        literal(문자열 또는 튜플)을 주면 헤더 원문(콜론 포함)이 정확히 일치하는 것만 찾습니다.
+        """
+        literals = (literal,) if isinstance(literal, str) else literal
+        candidates = [span for name in names for span in self._by_name.get(name, ())
+                      if literals is None or self.text[span[1]:span[2]] in literals]
+        return min(candidates, key=lambda span: span[1]) if candidates else None
+
+    def section(self, *names: str, literal: Union[str, Tuple[str, ...], None] = None) -> Optional[str]:
+        """섹션 본문 (다음 헤더 직전까지)"""
+        span = self.find(*names, literal=literal)
+        return self.text[span[2]:span[3]] if span else None
+
+    def after(self, *names: str, literal: Union[str, Tuple[str, ...], None] = None) -> Optional[str]:
+        """헤더 뒤부터 노트 끝까지 (종료 조건은 호출하는 쪽에서 적용)"""
+        span = self.find(*names, literal=literal)
+        return self.text[span[2]:] if span else None
+
+
+def cut_at(text: str, *terminators: str) -> str:
+    """terminators 중 가장 먼저 나오는 위치 앞까지 자름 (정규식 lookahead 종료 조건 대체)"""
+    end = len(text)
+    for terminator in terminators:
+        position = text.find(terminator)
+        if 0 <= position < end:
+            end = position
+    return text[:end]
+
+
+def sidecar_path(file_path: Union[str, pathlib.Path], column: str,
+                 cache_dir: Optional[Union[str, pathlib.Path]] = None, variant: str = '') -> pathlib.Path:
+    """원본 CSV 내용 해시, 컬럼 이름, 노트 변환 구분자(variant)로 구분되는 sidecar 인덱스 경로"""
+    file_path = pathlib.Path(file_path)
+    cache_dir = pathlib.Path(cache_dir) if cache_dir else file_path.parent / DEFAULT_CACHE_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    digest = cached_file_hash(file_path, cache_dir)
+    return cache_dir / f"{file_path.stem}-{digest}.{_slug(column, variant)}.sections.json"
+
+
+def _slug(column: str, variant: str = '') -> str:
+    """sidecar 파일 이름의 컬럼/변환 부분"""
+    return re.sub(r'\W+', '_', column) + (f"-{variant}" if variant else '')
+
+
+def build_section_index(
+    file_path: Union[str, pathlib.Path],
+    column: str,
+    key_column: str = 'sample_id',
+    cache_dir: Optional[Union[str, pathlib.Path]] = None,
+    transform: Optional[Callable[[str], str]] = None,
+    variant: str = '',
+) -> Dict[str, IndexEntry]:
+    """
+    CSV의 노트 컬럼을 인덱싱해 sidecar 파일로 저장하고 {sample_id: (노트 내용 해시, spans)}를 반환합니다.
+    transform이 있으면 전처리와 같은 변환(예: NoteCompressor.compress)을 적용한 노트를 인덱싱하며,
+    variant는 변환 방식마다 다른 값이어야 합니다. 같은 원본/변환의 sidecar가 이미 있으면 그대로 읽습니다.
+    """
+    path = sidecar_path(file_path, column, cache_dir, variant)
+    if path.exists():
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    data = load_csv_cached(file_path, [key_column, column], cache_dir)
+    index = {}
+    for key, text in zip(data[key_column], data[column]):
+        if not isinstance(text, str):
+            continue
+        if transform is not None:
+            text = transform(text)
+        index[str(key)] = (text_digest(text), index_sections(text))
+    path.write_text(json.dumps(index), encoding='utf-8')
+    # 같은 원본/컬럼/변환의 이전 버전(원본 해시가 다른) sidecar 정리 (다른 변환의 sidecar는 유지)
+    for stale in path.parent.glob(f"{pathlib.Path(file_path).stem}-*.{_slug(column, variant)}.sections.json"):
+        if stale != path:
+            stale.unlink()
+    return index
+
+
+def note_sections(text: str, entry: Optional[IndexEntry] = None) -> NoteSections:
+    """sidecar 항목으로 NoteSections를 만듭니다. 항목이 없거나 노트 내용 해시가 다르면 다시 인덱싱"""
+    if entry is None or entry[0] != text_digest(text):
+        return NoteSections(text)
+    return NoteSections(text, entry[1])
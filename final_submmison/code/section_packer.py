@@ -0,0 +1,116 @@
+"""
+토큰 예산 기반 섹션 패킹
+추출한 섹션마다 (우선순위 가중치, 토큰 비용)을 매기고, 행별 입력 토큰 예산 안에서
+가중치 합이 최대가 되도록 섹션(전체/앞부분만/제외)을 고릅니다. (multiple-choice knapsack)
+고정 문자 수 제한 대신 예산을 쓰므로 짧은 노트는 섹션을 자르지 않고, 긴 노트는 중요한 섹션부터 남깁니다.
+"""
+import math
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from tokens import chars_for_tokens, estimate_tokens
+
+# 섹션을 앞부분만 남길 때 시도하는 비율 (남긴 비율 r의 가치는 sqrt(r) - 앞부분에 핵심 정보가 몰려 있음)
+TRUNCATION_FRACTIONS = (0.75, 0.5, 0.25)
+TRUNCATION_MARKER = ' ...'
+# DP 예산 칸 수 상한 (예산이 크면 토큰 단위를 키워 계산량을 고정)
+MAX_BUDGET_UNITS = 512
+
+
+class PackResult(NamedTuple):
+    sections: List[Tuple[str, str]]  # 선택된 (이름, 본문) - 원래 순서 유지
+    tokens: int  # 선택된 섹션의 추정 토큰 수 (구분자 포함)
+    dropped: List[str]  # 제외된 섹션 이름
+    truncated: List[str]  # 앞부분만 남긴 섹션 이름
+
+
+def priority_weights(priority: Sequence[str]) -> Dict[str, float]:
+    """우선순위 목록(높은 순)을 가중치로 변환 (1순위가 len(priority))"""
+    return {label: float(len(priority) - rank) for rank, label in enumerate(priority)}
+
+
+def section_weight(name: str, weights: Dict[str, float], default: float = 1.0) -> float:
+    """이름이 가중치 라벨로 시작하면 해당 가중치 (예: 'Key Labs 2' -> 'Key Labs')"""
+    return next((weight for label, weight in weights.items() if name.startswith(label)), default)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model_name: Optional[str] = None) -> str:
+    """text를 max_tokens 이하가 되도록 단어 경계에서 자르고 TRUNCATION_MARKER를 붙입니다."""
+    if estimate_tokens(text, model_name) <= max_tokens:
+        return text
+    keep_chars = max(chars_for_tokens(max_tokens - estimate_tokens(TRUNCATION_MARKER, model_name), model_name), 0)
+    cut = text[:keep_chars]
+    while cut and estimate_tokens(cut + TRUNCATION_MARKER, model_name) > max_tokens:
+        cut = cut[:-max(1, len(cut) // 20)]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip() + TRUNCATION_MARKER if cut.strip() else ''
+
+
+def pack_sections(
+    sections: List[Tuple[str, str]],
+    budget: int,
+    weights: Dict[str, float],
+    model_name: Optional[str] = None,
+    separator: str = ' ',
+    min_tokens: int = 24,
+) -> PackResult:
+    """
+    (이름, 본문) 섹션 목록에서 추정 토큰 합이 budget 이하이면서 가중치 합이 최대인 조합을 고릅니다.
+    각 섹션은 전체, TRUNCATION_FRACTIONS 비율만큼의 앞부분(min_tokens 이상일 때), 제외 중 하나를 택합니다.
+    """
+    separator_tokens = estimate_tokens(separator, model_name)
+    unit = max(1, math.ceil(budget / MAX_BUDGET_UNITS))
+    capacity = budget // unit
+
+    # 섹션별 선택지: (비용 칸 수, 실제 토큰 수, 가치, 본문, 잘림 여부)
+    options = []
+    for name, text in sections:
+        weight = section_weight(name, weights)
+        full_tokens = estimate_tokens(text, model_name) + separator_tokens
+        choices = [(math.ceil(full_tokens / unit), full_tokens, weight, text, False)]
+        for fraction in TRUNCATION_FRACTIONS:
+            target = int(full_tokens * fraction) - separator_tokens
+            if target < min_tokens:
+                break
+            cut = truncate_to_tokens(text, target, model_name)
+            if cut:
+                tokens = estimate_tokens(cut, model_name) + separator_tokens
+                choices.append((math.ceil(tokens / unit), tokens, weight * math.sqrt(fraction), cut, True))
+        options.append(choices)
+
+    # best[c] = 지금까지의 섹션으로 비용 c 이하에서 얻는 최대 가치, choice[i][c] = 섹션 i의 선택 (-1은 제외)
+    best = [0.0] * (capacity + 1)
+    choice = []
+    for choices in options:
+        updated = list(best)
+        picked = [-1] * (capacity + 1)
+        for j, (cost, _, value, _, _) in enumerate(choices):
+            for c in range(cost, capacity + 1):
+                candidate = best[c - cost] + value
+                if candidate > updated[c]:
+                    updated[c], picked[c] = candidate, j
+        best = updated
+        choice.append(picked)
+
+    # 역추적
+    selected: List[Optional[int]] = [None] * len(sections)
+    c = capacity
+    for i in range(len(sections) - 1, -1, -1):
+        j = choice[i][c]
+        if j >= 0:
+            selected[i] = j
+            c -= options[i][j][0]
+
+    packed, dropped, truncated, tokens = [], [], [], 0
+    for (name, _), choices, j in zip(sections, options, selected):
+        if j is None:
+            dropped.append(name)
+            continue
+        _, cost_tokens, _, text, was_cut = choices[j]
+        packed.append((name, text))
+        tokens += cost_tokens
+        if was_cut:
+            truncated.append(name)
+    if packed:
+        tokens -= separator_tokens
+    return PackResult(packed, tokens, dropped, truncated)
@@ -0,0 +1,134 @@
+"""
+파이프라인 단계 결과 디스크 캐시
+(행 내용 해시, 단계 함수 소스 해시)를 키로 결과를 SQLite 파일에 저장합니다.
+단계 코드가 바뀌면 코드 해시가 달라져 이전 결과는 자동으로 무효화되고,
+저장 항목 수가 max_entries를 넘으면 가장 오래 사용하지 않은 항목부터 삭제합니다.
+"""
+import hashlib
+import inspect
+import json
+import os
+import pathlib
+import sqlite3
+import sys
+import time
+import types
+from typing import Any, Callable, Dict, Iterable, List, Union
+
+
+def code_hash(*functions: Union[Callable, types.ModuleType]) -> str:
+    """함수/모듈 소스 코드 해시 (함수 소스를 얻을 수 없으면 바이트코드와 상수, 모듈은 이름으로 대체)"""
+    digest = hashlib.sha1()
+    for function in functions:
+        function = getattr(function, '__func__', function)
+        try:
+            digest.update(inspect.getsource(function).encode('utf-8'))
+        except (OSError, TypeError):
+            if isinstance(function, types.ModuleType):
+                digest.update(function.__name__.encode('utf-8'))
+                continue
+            code = function.__code__
+            digest.update(code.co_code)
+            digest.update(repr(code.co_consts).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def local_modules(root: types.ModuleType, skip: Iterable[str] = ()) -> List[types.ModuleType]:
+    """
+    root 모듈이 직접/간접으로 import하는 로컬 모듈(root와 같은 디렉터리의 .py) 목록 (이름순, root 제외)
+    skip에 있는 모듈은 결과와 탐색에서 모두 제외합니다.
+    """
+    directory = pathlib.Path(root.__file__).resolve().parent
+    seen, stack, found = {root.__name__, *skip}, [root], {}
+    while stack:
+        for value in list(vars(stack.pop()).values()):
+            if not isinstance(value, types.ModuleType):
+                value = sys.modules.get(getattr(value, '__module__', None) or '')
+            module = value
+            if module is None or module.__name__ in seen:
+                continue
+            seen.add(module.__name__)
+            path = getattr(module, '__file__', None)
+            if path and pathlib.Path(path).resolve().parent == directory:
+                found[module.__name__] = module
+                stack.append(module)
+    return [found[name] for name in sorted(found)]
+
+
+def row_hash(row: Any) -> str:
+    """행 내용 해시 (pandas Series/dict 모두 지원)"""
+    values = row.to_dict() if hasattr(row, 'to_dict') else dict(row)
+    payload = json.dumps(values, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class StageCache:
+    """단계별 결과 캐시. with StageCache(path) as cache: 형태로도 사용할 수 있습니다."""
+
+    def __init__(self, path: str, max_entries: int = 200000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'invalidated': 0, 'evicted': 0}
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " stage TEXT, code_hash TEXT, row_hash TEXT, value TEXT, last_used REAL,"
+            " PRIMARY KEY (stage, code_hash, row_hash))")
+        self._conn.commit()
+
+    def invalidate(self, stage: str, current_code_hash: str):
+        """같은 단계에서 현재 코드 해시와 다른 결과를 삭제"""
+        cursor = self._conn.execute(
+            "DELETE FROM entries WHERE stage = ? AND code_hash != ?", (stage, current_code_hash))
+        self.stats['invalidated'] += cursor.rowcount
+        self._conn.commit()
+
+    def get_many(self, stage: str, stage_code_hash: str, row_hashes: Iterable[str]) -> Dict[str, Any]:
+        """캐시된 결과를 {row_hash: value}로 반환하고 사용 시각을 갱신"""
+        row_hashes = list(dict.fromkeys(row_hashes))
+        found: Dict[str, Any] = {}
+        # SQLite 변수 개수 제한을 피하기 위해 나눠서 조회
+        for start in range(0, len(row_hashes), 500):
+            chunk = row_hashes[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT row_hash, value FROM entries WHERE stage = ? AND code_hash = ?"
+                f" AND row_hash IN ({placeholders})", (stage, stage_code_hash, *chunk))
+            for key, value in rows:
+                found[key] = json.loads(value)
+        if found:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE entries SET last_used = ? WHERE stage = ? AND code_hash = ? AND row_hash = ?",
+                [(now, stage, stage_code_hash, key) for key in found])
+            self._conn.commit()
+        self.stats['hits'] += len(found)
+        self.stats['misses'] += len(row_hashes) - len(found)
+        return found
+
+    def put_many(self, stage: str, stage_code_hash: str, values: Dict[str, Any]):
+        """결과를 저장하고 max_entries를 넘으면 오래된 항목부터 삭제"""
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+            [(stage, stage_code_hash, key, json.dumps(value, ensure_ascii=False), now)
+             for key, value in values.items()])
+        overflow = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM entries WHERE rowid IN"
+                " (SELECT rowid FROM entries ORDER BY last_used LIMIT ?)", (overflow,))
+            self.stats['evicted'] += overflow
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self) -> "StageCache":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,38 @@
+"""
+테스트 공통 설정
+코드 디렉터리를 import 경로에 추가하고, 로컬 mock LLM 서버(mock_server.MockLLMServer)에 연결한 processor를 만듭니다.
+processor/main 모듈을 쓰는 테스트는 langevaluate가 설치된 환경에서만 실행됩니다.
+"""
+import pathlib
+import sys
+
+import pytest
+
+CODE_DIR = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = CODE_DIR.parents[1] / "data"
+sys.path.insert(0, str(CODE_DIR))
+
+from mock_server import MockLLMServer  # noqa: E402
+
+
+@pytest.fixture
+def mock_llm():
+    """responder(prompt, model)를 받아 mock 서버를 띄움. 테스트가 끝나면 모두 종료"""
+    servers = []
+
+    def start(responder=None, **kwargs) -> MockLLMServer:
+        server = MockLLMServer(responder=responder, **kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def make_processor():
+    """mock 서버를 api_base로 쓰는 processor 생성 함수 (rate limit은 테스트 속도를 위해 충분히 크게)"""
+    def make(cls, server: MockLLMServer, config=None, **kwargs):
+        return cls("test-key", config={'api_base': server.base_url, 'rpm': 60000, **(config or {})}, **kwargs)
+    return make
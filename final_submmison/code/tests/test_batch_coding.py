@@ -0,0 +1,60 @@
+"""Task C 다중 레코드 ICD 코딩: JSON 응답 분리/복구와 누락 레코드 개별 재호출"""
+import asyncio
+import re
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("langevaluate")
+
+from main import TaskCProcessor  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def task_c():
+    return TaskCProcessor("test-key")
+
+
+@pytest.mark.parametrize("raw", [
+    '{"1": ["I214", "N179"], "2": ["R079"]}',
+    'Sure, here are the codes:\n{"1": ["I214", "N179"], "2": ["R079"]}',
+    # 끝의 쉼표로 JSON이 깨지면 줄 단위로 복구
+    '{"1": ["I214", "N179"], "2": ["R079"],}',
+    '"1": ["I214", "N179"]\n"2": ["R079"]',
+    '{"1": "I214, N179", "2": ["R079"], "3": ["Z00"]}',
+])
+def test_parse_mapping_and_malformed_json(task_c, raw):
+    assert task_c.parse_packed_result(raw, ["1", "2"]) == {"1": "I214, N179", "2": "R079"}
+
+
+def test_parse_truncated_json_keeps_complete_records(task_c):
+    parsed = task_c.parse_packed_result('{"1": ["I214"], "2": ["N17', ["1", "2"])
+    assert parsed["1"] == "I214"
+
+
+@pytest.mark.parametrize("raw", ["no json here", '["I214"]', "", "{}"])
+def test_parse_without_mapping_returns_nothing(task_c, raw):
+    assert task_c.parse_packed_result(raw, ["1"]) == {}
+
+
+def test_missing_records_are_coded_individually(mock_llm, make_processor):
+    def respond(prompt, model):
+        if "[[RECORD" not in prompt:
+            return "N179"
+        ids = re.findall(r"\[\[RECORD (\d+)\]\]", prompt)
+        # 마지막 레코드는 빠뜨리고 JSON도 끝의 쉼표로 깨뜨림
+        pairs = ", ".join(f'"{item_id}": ["I214"]' for item_id in ids[:-1])
+        return "{" + pairs + ",}"
+
+    server = mock_llm(respond)
+    processor = make_processor(TaskCProcessor, server)
+    data = pd.DataFrame({'sample_id': range(4),
+                         'hospital_course': [f"Patient {i} admitted with chest pain, ruled in for NSTEMI." for i in range(4)],
+                         'icd_version': [10] * 4})
+
+    results = asyncio.run(processor.summarize(data, pack=True))
+
+    assert results[:3] == ["I214"] * 3
+    assert results[3] == "N179"
+    assert processor.metrics['packing']['individual_reruns'] == 1
+    assert server.stats['requests'] == 2
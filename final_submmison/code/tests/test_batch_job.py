@@ -0,0 +1,84 @@
+"""오프라인 batch 작업: 요청 JSONL 생성, rpm 제한 실행과 재개, 결과 반영"""
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("langevaluate")
+
+from batch_job import run_batch  # noqa: E402
+from main import TaskBProcessor  # noqa: E402
+
+
+@pytest.fixture
+def data():
+    return pd.DataFrame({'sample_id': [10, 11, 12],
+                         'radiology report': [f"FINDINGS: Finding {i}." for i in range(3)]})
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_export_writes_one_chat_request_per_row(tmp_path, data):
+    processor = TaskBProcessor("offline")
+    path = tmp_path / "requests.jsonl"
+
+    assert asyncio.run(processor.export_batch_requests(data, str(path))) == 3
+
+    requests = read_jsonl(path)
+    assert [r['custom_id'] for r in requests] == ["10", "11", "12"]
+    body = requests[0]['body']
+    assert requests[0]['url'] == "/v1/chat/completions"
+    assert body['model'] == processor.config['model_name']
+    assert [m['role'] for m in body['messages']] == ["system", "user"]
+    assert "Finding 0" in body['messages'][-1]['content']
+
+
+def test_run_resumes_and_ingest_fills_failures(tmp_path, data, mock_llm):
+    server = mock_llm(lambda prompt, model: "IMPRESSION: Small effusion")
+    processor = TaskBProcessor("offline")
+    requests, results = tmp_path / "requests.jsonl", tmp_path / "results.jsonl"
+    asyncio.run(processor.export_batch_requests(data, str(requests)))
+
+    assert asyncio.run(run_batch(str(requests), str(results), "key", server.base_url, rpm=6000)) == 3
+    assert asyncio.run(run_batch(str(requests), str(results), "key", server.base_url, rpm=6000)) == 0
+    assert server.stats['requests'] == 3
+
+    # 한 행은 오류 결과로 바꾸고 한 행은 결과에서 제거
+    records = {r['custom_id']: r for r in read_jsonl(results)}
+    records["11"] = {'custom_id': "11", 'response': None, 'error': {'message': "timeout"}}
+    del records["12"]
+    results.write_text("\n".join(json.dumps(r) for r in records.values()) + "\n", encoding='utf-8')
+
+    submission = tmp_path / "submission.csv"
+    outputs = asyncio.run(processor.ingest_batch_results(data, str(results), str(submission)))
+
+    assert outputs == ["Small effusion.", "No acute findings.", "No acute findings."]
+    assert processor.metrics['batch'] == {'task': 'TaskBProcessor', 'rows': 3, 'ingested': 1, 'missing': 2, 'errors': 1}
+    saved = pd.read_csv(submission)
+    assert list(saved.columns) == ['sample_id', 'target']
+    assert list(saved['sample_id']) == [10, 11, 12]
+
+
+def test_failed_line_followed_by_success_is_not_an_error(tmp_path, data):
+    processor = TaskBProcessor("offline")
+    results = tmp_path / "results.jsonl"
+
+    def success(custom_id):
+        return {'custom_id': custom_id, 'error': None, 'response': {'status_code': 200, 'body': {
+            'choices': [{'message': {'content': "IMPRESSION: Small effusion"}}]}}}
+
+    def failure(custom_id):
+        return {'custom_id': custom_id, 'response': None, 'error': {'message': "timeout"}}
+
+    # "10"은 실패 후 재시도 성공, "11"은 두 번 모두 실패, "12"는 결과 없음
+    lines = [failure("10"), failure("11"), success("10"), failure("11")]
+    results.write_text("\n".join(json.dumps(line) for line in lines) + "\n", encoding='utf-8')
+
+    outputs = asyncio.run(processor.ingest_batch_results(data, str(results)))
+
+    assert outputs[0] == "Small effusion."
+    assert processor.metrics['batch'] == {'task': 'TaskBProcessor', 'rows': 3, 'ingested': 1, 'missing': 2, 'errors': 1}
@@ -0,0 +1,77 @@
+"""노트 압축: 머리말/저가치 섹션 제거, 압축한 노트 기준의 섹션 sidecar"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+import section_index
+from boilerplate import NoteCompressor
+from section_index import build_section_index, index_sections, note_sections
+
+NOTE = ("Name: ___ Unit No: ___\n"
+        "Admission Date: ___ Discharge Date: ___\n"
+        "Date of Birth: ___ Sex: F\n"
+        "Attending: ___.\n"
+        "Allergies: \nNo Known Allergies / Adverse Drug Reactions\n"
+        "Chief Complaint: abdominal pain\n"
+        "Medications on Admission: aspirin 81 mg daily\nlisinopril 10 mg\n"
+        "Physical ___:\nsoft abdomen\n"
+        "Brief Hospital Course: underwent cholecystectomy.\n"
+        "Discharge Instructions: call your doctor\n"
+        "Discharge Condition: stable")
+
+
+def test_compress_drops_boilerplate_and_low_value_sections():
+    compressed = NoteCompressor().compress(NOTE)
+
+    assert compressed == ("Sex: F\n"
+                          "Chief Complaint: abdominal pain\n"
+                          "Physical ___:\nsoft abdomen\n"
+                          "Brief Hospital Course: underwent cholecystectomy.\n"
+                          "Discharge Condition: stable")
+    assert NoteCompressor(drop_sections=(), drop_lines=[]).compress(NOTE) == NOTE
+    assert NoteCompressor().compress(None) is None
+
+
+def test_repr_reflects_settings():
+    assert repr(NoteCompressor()) == repr(NoteCompressor())
+    assert repr(NoteCompressor()) != repr(NoteCompressor(drop_sections=('Discharge Instructions',)))
+
+
+@pytest.fixture
+def note_csv(tmp_path):
+    path = tmp_path / "notes.csv"
+    pd.DataFrame({'sample_id': [1], 'medical record': [NOTE]}).to_csv(path, index=False)
+    return path
+
+
+def test_sidecar_built_over_compressed_notes(tmp_path, note_csv):
+    compressor = NoteCompressor()
+    index = build_section_index(note_csv, 'medical record', cache_dir=tmp_path,
+                                transform=compressor.compress, variant='c1')
+    compressed = compressor.compress(NOTE)
+
+    assert note_sections(compressed, index['1']).spans == index_sections(compressed)
+    # 압축 전 노트에는 맞지 않으므로 다시 인덱싱
+    assert note_sections(NOTE, index['1']).spans == index_sections(NOTE)
+    # 변환 방식별 sidecar는 따로 유지
+    build_section_index(note_csv, 'medical record', cache_dir=tmp_path, variant='')
+    assert sorted(p.name.split('.', 1)[1] for p in tmp_path.glob("notes-*.sections.json")) == [
+        "medical_record-c1.sections.json", "medical_record.sections.json"]
+
+
+def test_processor_uses_sidecar_for_compressed_notes(tmp_path, note_csv, monkeypatch):
+    pytest.importorskip("langevaluate")
+    from main import TaskAProcessor
+
+    processor = TaskAProcessor("test-key")
+    processor.load_section_index(str(note_csv), cache_dir=str(tmp_path))
+    row = processor.prepare_batch(pd.read_csv(note_csv)).iloc[0]
+    expected = asyncio.run(processor.preprocess_data(row))
+
+    # 전처리가 sidecar 오프셋을 그대로 쓰면 노트를 다시 인덱싱하지 않음
+    def fail(text):
+        raise AssertionError("압축한 노트의 sidecar 항목이 맞지 않아 다시 인덱싱함")
+
+    monkeypatch.setattr(section_index, 'index_sections', fail)
+    assert asyncio.run(processor.preprocess_data(row)) == expected
@@ -0,0 +1,57 @@
+"""cascade 모드: 1차 결과 검증과 escalation, Task B 부정 표현 판정"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("langevaluate")
+
+from main import TaskBProcessor  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def task_b():
+    return TaskBProcessor("test-key")
+
+
+@pytest.mark.parametrize("sentence, term, polarity", [
+    ("No pneumothorax.", "pneumothorax", False),
+    ("There is no evidence of pneumothorax", "pneumothorax", False),
+    ("Lungs are free of consolidation", "consolidation", False),
+    ("Negative  for mass", "mass", False),
+    ("Pneumothorax: no.", "pneumothorax", False),
+    ("Pleural effusion - none", "effusion", False),
+    # 단어 경계가 아닌 부정 표현 부분 문자열은 부정으로 보지 않음
+    ("Piano pneumothorax", "pneumothorax", True),
+    ("Techno effusion", "effusion", True),
+    ("Effusion, no change", "effusion", True),
+    ("Large left pleural effusion", "effusion", True),
+    ("Heart size is normal", "effusion", None),
+])
+def test_term_polarity(task_b, sentence, term, polarity):
+    assert task_b._term_polarity(sentence, term) is polarity
+
+
+def test_contradiction_uses_sentence_polarity(task_b):
+    findings = "Small right pleural effusion. No pneumothorax."
+    assert not task_b._contradicts_findings(findings, "1. Small right effusion.")
+    assert task_b._contradicts_findings(findings, "1. Right pneumothorax.")
+
+
+def test_cascade_escalates_only_invalid_rows(mock_llm, make_processor):
+    def respond(prompt, model):
+        # 축약 프롬프트(1차)는 FINDINGS와 모순된 답을, 기본 프롬프트는 부정 답을 반환
+        if "ADVANCED EXAMPLES" not in prompt and "sample 1" in prompt:
+            return "1. Pneumothorax."
+        return "1. No pneumothorax."
+
+    server = mock_llm(respond)
+    processor = make_processor(TaskBProcessor, server)
+    data = pd.DataFrame({'sample_id': [0, 1, 2],
+                         'radiology report': [f"FINDINGS: sample {i}. No pneumothorax." for i in range(3)]})
+
+    results = asyncio.run(processor.summarize(data, cascade=True))
+
+    assert results == ["1. No pneumothorax."] * 3
+    assert processor.metrics['cascade']['escalated'] == 1
+    assert server.stats['requests'] == 4
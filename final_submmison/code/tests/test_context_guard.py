@@ -0,0 +1,138 @@
+"""context 길이 guard: 섹션 우선순위 축약과 서버 context 초과 시 재시도"""
+import asyncio
+
+import pandas as pd
+import pytest
+from langchain_core.messages import AIMessage
+
+pytest.importorskip("langevaluate")
+
+from main import TaskAProcessor, TaskBProcessor  # noqa: E402
+from tokens import estimate_tokens  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def task_a():
+    return TaskAProcessor("test-key")
+
+
+def test_shrink_drops_lowest_priority_sections_first(task_a):
+    model_name = task_a.config['model_name']
+    text = ("Chief Complaint: chest pain. "
+            "Key Labs: " + "troponin 0.01 " * 40
+            + "Physical Examination: " + "lungs clear heart regular " * 60)
+
+    shrunk = task_a.shrink_user_input(text, 120, model_name)
+
+    assert estimate_tokens(shrunk, model_name) <= 120
+    assert shrunk.startswith("Chief Complaint: chest pain.")
+    assert "Physical Examination" not in shrunk
+    assert "Key Labs" in shrunk
+
+
+def test_shrink_keeps_short_input_unchanged(task_a):
+    text = "Chief Complaint: chest pain. Service: MEDICINE"
+    assert task_a.shrink_user_input(text, 500) == text
+
+
+def test_prompt_over_context_is_truncated_before_dispatch(mock_llm, make_processor):
+    server = mock_llm()
+    processor = make_processor(TaskBProcessor, server, config={'context_window': 2500, 'max_tokens': 500})
+    data = pd.DataFrame({'sample_id': [0], 'radiology report': ["FINDINGS: " + "Stable small effusion. " * 600]})
+
+    results = asyncio.run(processor.summarize(data))
+
+    assert results[0] is not None
+    assert processor.metrics['context_guard']['truncated_rows'] == 1
+    assert processor.metrics['context_guard']['overflow_retries'] == 0
+
+
+def test_server_overflow_is_retried_once_with_shorter_prompt(mock_llm, make_processor):
+    # 로컬 추정치는 context 안이지만 서버 토크나이저 기준으로는 넘치는 경우
+    server = mock_llm(max_model_len=2000)
+    processor = make_processor(TaskBProcessor, server, config={'context_window': 4000, 'max_tokens': 500})
+    data = pd.DataFrame({'sample_id': [0], 'radiology report': ["FINDINGS: " + "Stable small effusion. " * 250]})
+
+    results = asyncio.run(processor.summarize(data))
+
+    assert results[0] is not None
+    assert processor.metrics['context_guard']['overflow_retries'] == 1
+    assert server.stats['http_requests'] == 2
+
+
+def test_usage_after_overflow_retry_uses_retry_estimate(mock_llm, make_processor, monkeypatch):
+    server = mock_llm(max_model_len=2000)
+    processor = make_processor(TaskBProcessor, server, config={'context_window': 4000, 'max_tokens': 500})
+    estimates, recorded = [], []
+    fit_context, record_usage = processor._fit_context, processor._record_usage
+
+    def spy_fit(*args):
+        fitted = fit_context(*args)
+        estimates.append(fitted[2])
+        return fitted
+
+    def spy_record(model_name, usage, estimated_prompt, *args):
+        recorded.append(estimated_prompt)
+        return record_usage(model_name, usage, estimated_prompt, *args)
+
+    monkeypatch.setattr(processor, '_fit_context', spy_fit)
+    monkeypatch.setattr(processor, '_record_usage', spy_record)
+    data = pd.DataFrame({'sample_id': [0], 'radiology report': ["FINDINGS: " + "Stable small effusion. " * 250]})
+
+    asyncio.run(processor.summarize(data))
+
+    # 줄여서 다시 보낸 프롬프트의 추정치로 기록해 추정 비율이 과대 보정되지 않음
+    assert len(estimates) == 2 and estimates[1] < estimates[0]
+    assert recorded == [estimates[1]]
+    assert processor._prompt_token_ratio == pytest.approx(processor.token_usage[0]['prompt_tokens'] / estimates[1])
+
+
+def langevaluate_wrap(llm, max_retries=3):
+    """langevaluate LLMFactory.create_llm의 ainvoke 래퍼와 같은 동작 (모든 예외를 잡아 같은 입력으로 재시도, 대기 없음)"""
+    original_ainvoke = llm.ainvoke
+
+    async def wrapped_ainvoke(input_data, config=None, parse_json=False, **kwargs):
+        error = None
+        for _ in range(max_retries):
+            try:
+                return await original_ainvoke(input_data, config, **kwargs)
+            except Exception as e:
+                error = e
+        return AIMessage(content="", answer_metadata={'error': error})
+
+    object.__setattr__(llm, "ainvoke", wrapped_ainvoke)
+    return llm
+
+
+def test_overflow_is_retried_through_langevaluate_wrapper(mock_llm, make_processor):
+    server = mock_llm(max_model_len=2000)
+    processor = make_processor(TaskBProcessor, server, config={'context_window': 4000, 'max_tokens': 500})
+    langevaluate_wrap(processor.llm)
+    data = pd.DataFrame({'sample_id': [0], 'radiology report': ["FINDINGS: " + "Stable small effusion. " * 250]})
+
+    results = asyncio.run(processor.summarize(data))
+
+    # 래퍼가 같은 프롬프트를 다시 보내지 않고 줄인 프롬프트로 한 번만 재시도
+    assert results[0]
+    assert processor.metrics['context_guard']['overflow_retries'] == 1
+    assert server.stats['http_requests'] == 2
+
+
+def test_other_errors_use_langevaluate_wrapper_retries(mock_llm, make_processor, monkeypatch):
+    server = mock_llm(lambda prompt, model: "IMPRESSION: Stable effusion")
+    processor = make_processor(TaskBProcessor, server)
+    langevaluate_wrap(processor.llm)
+    # chat 모델 호출이 context 초과가 아닌 오류로 실패하면 래퍼(감싼 시점의 ainvoke)의 재시도로 다시 보냄
+    calls = []
+
+    async def unavailable(self, messages, *args, **kwargs):
+        calls.append(messages)
+        raise ConnectionError("temporarily unavailable")
+
+    monkeypatch.setattr(type(processor.llm), 'ainvoke', unavailable)
+    data = pd.DataFrame({'sample_id': [0], 'radiology report': ["FINDINGS: Stable small effusion."]})
+
+    assert asyncio.run(processor.summarize(data)) == ["Stable effusion."]
+    assert len(calls) == 1
+    assert processor.metrics['context_guard']['overflow_retries'] == 0
+    assert server.stats['http_requests'] == 1
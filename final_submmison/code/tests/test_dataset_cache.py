@@ -0,0 +1,63 @@
+"""task CSV 컬럼형 캐시: 원본과 같은 파싱 결과, 컬럼 선택, 원본 변경 시 재생성, chunk 읽기"""
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from conftest import DATA_DIR
+from dataset_cache import iter_csv_chunks, load_csv_cached, load_task_data
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "taskB_test.csv"
+    shutil.copy(DATA_DIR / "taskB_test.csv", path)
+    return path
+
+
+def test_cached_frame_matches_read_csv(csv_path, tmp_path):
+    cache_dir = tmp_path / "cache"
+    expected = pd.read_csv(csv_path)
+
+    pd.testing.assert_frame_equal(load_csv_cached(csv_path, cache_dir=cache_dir), expected)
+    assert len(list(cache_dir.glob("*.arrow"))) == 1
+    # 두 번째는 캐시에서 필요한 컬럼만 읽음
+    columns = ['sample_id', 'radiology report']
+    pd.testing.assert_frame_equal(load_csv_cached(csv_path, columns, cache_dir), expected[columns])
+
+
+def test_cache_is_rebuilt_when_the_source_changes(csv_path, tmp_path):
+    cache_dir = tmp_path / "cache"
+    load_csv_cached(csv_path, cache_dir=cache_dir)
+    first = next(cache_dir.glob("*.arrow"))
+
+    data = pd.read_csv(csv_path)
+    data.loc[0, 'radiology report'] = "FINDINGS: changed."
+    data.to_csv(csv_path, index=False)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    reloaded = load_csv_cached(csv_path, cache_dir=cache_dir)
+    assert reloaded.loc[0, 'radiology report'] == "FINDINGS: changed."
+    assert [p for p in cache_dir.glob("*.arrow")] != [first]
+    assert len(list(cache_dir.glob("*.arrow"))) == 1
+
+
+def test_chunks_cover_all_rows_with_and_without_cache(csv_path, tmp_path):
+    cache_dir = tmp_path / "cache"
+    expected = pd.read_csv(csv_path, usecols=['sample_id'])
+
+    for _ in range(2):  # 첫 번째는 CSV에서, 두 번째는 캐시에서 읽음
+        chunks = list(iter_csv_chunks(csv_path, chunksize=30, columns=['sample_id'], cache_dir=cache_dir))
+        assert [len(c) for c in chunks] == [30, 30, 30, 10]
+        assert pd.concat(chunks, ignore_index=True)['sample_id'].tolist() == expected['sample_id'].tolist()
+        load_csv_cached(csv_path, cache_dir=cache_dir)
+
+
+def test_load_task_data_uses_the_task_file_pattern(csv_path, tmp_path):
+    data = load_task_data('B', tmp_path, columns=['sample_id'], cache_dir=tmp_path / "cache")
+    assert list(data.columns) == ['sample_id'] and len(data) == 100
+    assert load_task_data('A', tmp_path) is None
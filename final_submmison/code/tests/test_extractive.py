@@ -0,0 +1,64 @@
+"""추출 요약: 문장 분할, 중심성, 예산 안 선택, 보호 문장 우선, 원래 순서 유지"""
+import numpy as np
+import pytest
+
+from extractive import centrality, extract, is_protected, split_sentences
+from tokens import estimate_tokens
+
+NOTE = ("Patient admitted with chest pain. Chest pain resolved after rest. "
+        "The weather was pleasant. Troponin peaked at 2.3 and chest pain recurred. "
+        "Started on heparin drip for chest pain. Family visited in the afternoon. "
+        "Chest pain was attributed to demand ischemia.")
+
+
+def test_split_sentences():
+    assert split_sentences("First line. Second line.\n\n- item one\n- item two\n1. numbered") == [
+        "First line.", "Second line.", "- item one", "- item two", "1. numbered"]
+    assert split_sentences("vitals 98.6 stable. ok") == ["vitals 98.6 stable. ok"]
+
+
+@pytest.mark.parametrize("sentence, protected", [
+    ("Troponin peaked at 2.3", True),
+    ("Started on heparin drip", True),
+    ("Underwent cholecystectomy", True),
+    ("Family visited", False),
+])
+def test_is_protected(sentence, protected):
+    assert is_protected(sentence) is protected
+
+
+@pytest.mark.parametrize("method", ['textrank', 'tfidf'])
+def test_centrality_ranks_connected_sentences_first(method):
+    sentences = split_sentences(NOTE)
+    scores = centrality(sentences, method)
+
+    assert scores.shape == (len(sentences),)
+    assert np.all(np.isfinite(scores))
+    outlier = sentences.index("The weather was pleasant.")
+    assert scores[outlier] == scores.min()
+
+
+def test_centrality_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        centrality(["a b", "c d"], method='lexrank')
+
+
+def test_extract_keeps_budget_order_and_protected_sentences():
+    budget = estimate_tokens(NOTE) // 2
+    result = extract(NOTE, budget)
+    kept = split_sentences(result.text)
+
+    assert result.tokens_after <= budget
+    assert result.kept == len(kept) < result.sentences
+    # 원래 순서 유지
+    original = split_sentences(NOTE)
+    assert [original.index(s) for s in kept] == sorted(original.index(s) for s in kept)
+    # 보호 문장(수치/약물)이 먼저 채워짐
+    assert "Troponin peaked at 2.3 and chest pain recurred." in kept
+    assert "Started on heparin drip for chest pain." in kept
+
+
+def test_extract_leaves_short_text_unchanged():
+    result = extract(NOTE, estimate_tokens(NOTE))
+    assert result.text == NOTE
+    assert result.kept == result.sentences
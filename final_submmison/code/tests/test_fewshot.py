@@ -0,0 +1,70 @@
+"""few-shot 검색: BM25 순위, 토큰 예산/개수 제한, 저장한 인덱스 재사용, 행별 예시 선택"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+from fewshot import Example, FewShotIndex, build_index, format_example, tokenize
+
+DOCUMENTS = [
+    "acute pancreatitis lipase elevated abdominal pain",
+    "pneumonia cough fever infiltrate antibiotics",
+    "pancreatitis alcohol lipase fluids",
+    "hip fracture fall orthopedics repair",
+]
+
+
+def examples(tokens=(10, 10, 10, 10)):
+    return [Example(str(i), document, f"summary {i}", count)
+            for i, (document, count) in enumerate(zip(DOCUMENTS, tokens))]
+
+
+def test_tokenize_drops_stopwords_and_non_word_tokens():
+    assert tokenize("The patient was given IV fluids, a 2L bolus") == ['given', 'iv', 'fluids', 'bolus']
+
+
+def test_select_ranks_by_bm25(tmp_path):
+    index = FewShotIndex(build_index(tmp_path / "index", DOCUMENTS, examples()))
+
+    assert len(index) == 4 and index.meta['documents'] == 4
+    assert [e.key for e in index.select("lipase pancreatitis", 100, max_examples=4)] == ['2', '0']
+    assert index.select("lipase", 100, max_examples=1)[0].key in {'0', '2'}
+    # 일치하는 용어가 없으면 예시 없음
+    assert index.select("unrelated words", 100) == []
+    assert index.scores("").tolist() == [0.0] * 4
+
+
+def test_select_respects_budget_and_exclude(tmp_path):
+    index = FewShotIndex(build_index(tmp_path / "index", DOCUMENTS, examples(tokens=(30, 10, 80, 10))))
+
+    # 1순위(80 토큰)가 예산을 넘으면 건너뛰고 다음 후보를 사용
+    assert [e.key for e in index.select("lipase pancreatitis", 50)] == ['0']
+    assert index.select("lipase pancreatitis", 20) == []
+    assert [e.key for e in index.select("lipase pancreatitis", 200, exclude={'2'})] == ['0']
+
+
+def test_index_reopens_from_disk(tmp_path):
+    path = build_index(tmp_path / "index", DOCUMENTS, examples(), meta={'source': 'train.csv'})
+
+    assert FewShotIndex.exists(path) and not FewShotIndex.exists(tmp_path / "missing")
+    reopened = FewShotIndex(path)
+    assert reopened.meta['source'] == 'train.csv'
+    assert reopened.examples == examples()
+
+
+def test_processor_keeps_train_example_with_same_sample_id(tmp_path):
+    pytest.importorskip("langevaluate")
+    from main import TaskAProcessor
+
+    train = tmp_path / "train.csv"
+    pd.DataFrame({'sample_id': [1, 2],
+                  'medical record': ["Chief Complaint: pancreatitis lipase", "Chief Complaint: hip fracture"],
+                  'target': ["Treated pancreatitis.", "Repaired hip."]}).to_csv(train, index=False)
+    processor = TaskAProcessor("test-key")
+    assert asyncio.run(processor.load_fewshot_index(str(train), cache_dir=str(tmp_path / "cache")))
+
+    # test 행의 sample_id가 train 예시와 같아도(1) 내용이 비슷한 예시는 선택됨
+    row = processor.prepare_batch(pd.DataFrame({'sample_id': [1], 'medical record': ["pancreatitis lipase"]})).iloc[0]
+    vars = asyncio.run(processor.preprocess_data(row))
+    assert format_example(processor.fewshot_index.examples[0].record, "Treated pancreatitis.") in vars['examples']
+    assert "Repaired hip." not in vars['examples']
@@ -0,0 +1,78 @@
+"""키워드 사전 매처: 기존 'term in sentence.lower()' 루프와 같은 선택/점수, 겹치는 용어, 문장 경계"""
+import random
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DATA_DIR
+from keywords import KeywordMatcher
+
+# 서로 접두사/부분 문자열이 되는 용어를 일부러 포함
+TERMS = ['liver', 'liver failure', 'fail', 'failure', 'ure', 'renal', 'acute', 'acute renal failure', 'mi', 'a']
+FILLER = ['patient', 'with', 'İstanbul', 'LIVER', 'Failure', 'and', 'miami', '.', 'history', 'of']
+
+
+def loop_scores(sentences, weights):
+    """기존 방식: 문장마다 용어 수만큼 부분 문자열 검사"""
+    return [sum(weight for term, weight in weights.items() if term in sentence.lower()) for sentence in sentences]
+
+
+def overlapping_count(text, term):
+    return sum(1 for i in range(len(text)) if text.startswith(term, i))
+
+
+def random_sentences(rng, count=8):
+    vocabulary = TERMS + FILLER
+    return [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 12))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_scores_match_substring_loop(seed):
+    rng = random.Random(seed)
+    weights = {term: rng.choice([1, 2, 0.5]) for term in TERMS}
+    matcher = KeywordMatcher(weights)
+    sentences = random_sentences(rng)
+
+    assert matcher.score_sentences(sentences).tolist() == pytest.approx(loop_scores(sentences, weights))
+    assert matcher.sentence_counts(sentences).any(axis=1).tolist() == [
+        any(term in s.lower() for term in TERMS) for s in sentences]
+    assert [matcher.contains_any(s) for s in sentences] == [any(term in s.lower() for term in TERMS)
+                                                            for s in sentences]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_counts_include_overlapping_occurrences(seed):
+    rng = random.Random(seed)
+    matcher = KeywordMatcher(TERMS)
+    text = " ".join(random_sentences(rng, 1))
+
+    assert matcher.counts(text).tolist() == [overlapping_count(text.lower(), term) for term in matcher.terms]
+    # 문장별 행렬의 합은 문장 경계를 넘는 일치 없이 전체 횟수와 같음
+    sentences = random_sentences(rng)
+    assert matcher.sentence_counts(sentences).sum(axis=0).tolist() == [
+        sum(overlapping_count(s.lower(), term) for s in sentences) for term in matcher.terms]
+
+
+def test_no_match_across_sentence_boundary():
+    matcher = KeywordMatcher(['liver failure'])
+    assert matcher.sentence_counts(["history of liver", "failure noted"]).tolist() == [[0], [0]]
+
+
+def test_empty_inputs():
+    assert KeywordMatcher([]).sentence_counts(["a"]).shape == (1, 0)
+    assert KeywordMatcher(['a']).sentence_counts([]).shape == (0, 1)
+    assert not KeywordMatcher(['a']).contains_any("")
+    assert repr(KeywordMatcher(['B', 'b'])) == "KeywordMatcher({'b': 1.0}, ignore_case=True)"
+
+
+def test_task_c_priority_terms_match_loop_on_notes():
+    pytest.importorskip("langevaluate")
+    from main import TaskCProcessor
+
+    matcher = TaskCProcessor.PRIORITY_TERMS
+    weights = dict(zip(matcher.terms, matcher.weights))
+    for note in pd.read_csv(DATA_DIR / "taskC_test.csv")['hospital_course'].dropna():
+        sentences = [s.strip() for s in re.split(r"[.!?]+", note) if s.strip()]
+        assert np.allclose(matcher.score_sentences(sentences), loop_scores(sentences, weights))
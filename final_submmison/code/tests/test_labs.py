@@ -0,0 +1,52 @@
+"""검사 수치 표: 검사 줄 파싱, 혈액 외 검체 제외, 첫/가장 비정상/마지막 값 압축"""
+import pytest
+
+from labs import LabValue, deviation, lab_table, parse_labs
+
+RESULTS = """Pertinent Results:
+___ 07:00AM BLOOD WBC-5.1 RBC-4.23* Hgb-12.9* Hct-38.0
+  Plt Ct-250
+___ 07:00AM BLOOD Glucose-98 UREA N-18 Creat-1.0 Na-140 K-4.0
+___ 08:15PM URINE Color-Yellow Glucose-300
+___ 05:30AM BLOOD WBC-15.2* Creat-2.4*# TotBili-<0.2
+___ 06:10AM BLOOD WBC-8.0 Creat-1.3* INR(PT)-1.1
+
+Brief Hospital Course: uneventful
+"""
+
+
+def test_parse_labs_reads_blocks_and_continuations():
+    values = parse_labs(RESULTS)
+
+    assert [(v.analyte, v.text, v.time) for v in values[:5]] == [
+        ('WBC', '5.1', '07:00AM'), ('Hgb', '12.9', '07:00AM'), ('Hct', '38.0', '07:00AM'),
+        ('Plt', '250', '07:00AM'), ('Glucose', '98', '07:00AM')]
+    assert values[1].flagged and not values[0].flagged
+    # 소변 검사 줄은 제외
+    assert [v.value for v in values if v.analyte == 'Glucose'] == [98.0]
+    assert [v.text for v in values if v.analyte == 'TBili'] == ['<0.2']
+    assert [v.text for v in values if v.analyte == 'INR'] == ['1.1']
+    assert [v.text for v in values if v.analyte == 'BUN'] == ['18']
+
+
+def test_lab_table_keeps_first_worst_last():
+    table = lab_table(parse_labs(RESULTS))
+    entries = dict(entry.split(' ', 1) for entry in table.split('; '))
+
+    assert entries['WBC'] == "5.1->8.0 (worst 15.2H) K/uL"
+    assert entries['Cr'] == "1.0->1.3H (worst 2.4H) mg/dL"
+    assert entries['Hgb'] == "12.9L g/dL"
+    assert entries['INR'] == "1.1"
+    # LAB_ANALYTES 순서
+    assert table.startswith("WBC ")
+    assert list(entries).index('Na') < list(entries).index('Cr')
+
+
+def test_worst_is_omitted_when_it_is_an_endpoint():
+    values = [LabValue('K', v, str(v), 'mEq/L', f"{i}:00AM", False) for i, v in enumerate([3.0, 3.8, 4.2])]
+    assert lab_table(values) == "K 3.0L->4.2 mEq/L"
+
+
+@pytest.mark.parametrize("value, expected", [(5.0, 0.0), (12.0, 1 / 7), (2.5, 1.5 / 7)])
+def test_deviation_is_relative_to_range_width(value, expected):
+    assert deviation(LabValue('WBC', value, str(value), 'K/uL', '', False)) == pytest.approx(expected)
@@ -0,0 +1,73 @@
+"""긴 노트 map-reduce: 섹션 경계 청크, prepare_batch 1회 적용, 청크 요약 캐시 재사용"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+from map_reduce import chunk_note, section_pieces
+from section_index import index_sections
+from tokens import estimate_tokens
+
+SECTIONS = ["Chief Complaint", "History of Present Illness", "Past Medical History", "Physical Exam",
+            "Pertinent Results", "Brief Hospital Course"]
+
+
+def long_note(words=80):
+    return "\n".join(f"{name}:\n" + " ".join(f"{name.split()[0].lower()}{i}" for i in range(words))
+                     for name in SECTIONS)
+
+
+def test_section_pieces_rejoin_to_note():
+    note = "Name: ___\n" + long_note(5)
+    pieces = section_pieces(note)
+
+    assert "".join(pieces) == note
+    assert [piece.split(":")[0] for piece in pieces[1:]] == SECTIONS
+
+
+def test_chunks_respect_limit_and_section_starts():
+    note = long_note()
+    chunks = chunk_note(note, max_tokens=300)
+    starts = {note[start:body].rstrip(':') for _, start, body, _ in index_sections(note)}
+
+    assert all(estimate_tokens(chunk) <= 300 for chunk in chunks)
+    # 섹션이 상한보다 짧으면 청크는 섹션 헤더에서 시작
+    assert all(chunk.split(":")[0] in starts for chunk in chunks)
+    assert " ".join(chunks).split() == note.split()
+
+
+def test_oversized_section_is_split_by_words():
+    note = "Brief Hospital Course:\n" + " ".join(f"w{i}" for i in range(2000))
+    chunks = chunk_note(note, max_tokens=200)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 200 for chunk in chunks)
+    assert " ".join(chunks).split() == note.split()
+
+
+def test_summarize_prepares_rows_once_and_reuses_cached_chunks(tmp_path, mock_llm, make_processor, monkeypatch):
+    pytest.importorskip("langevaluate")
+    from main import TaskAProcessor
+
+    server = mock_llm(lambda prompt, model: "part summary" if "NOTE PART" in prompt else "Course summary.")
+    processor = make_processor(TaskAProcessor, server)
+    monkeypatch.setattr(processor, 'MAP_REDUCE_MIN_TOKENS', 300)
+    monkeypatch.setattr(processor, 'MAP_CHUNK_TOKENS', 300)
+    calls = []
+    prepare_batch = processor.prepare_batch
+    monkeypatch.setattr(processor, 'prepare_batch', lambda data: calls.append(len(data)) or prepare_batch(data))
+    data = pd.DataFrame({'sample_id': [1, 2], 'medical record': [long_note(), "Chief Complaint: cough"]})
+    chunk_cache = str(tmp_path / "chunks.sqlite")
+
+    results = asyncio.run(processor.summarize(data, map_reduce=True, chunk_cache=chunk_cache))
+
+    assert results == ["Course summary."] * 2
+    assert calls == [2]
+    stats = processor.metrics['map_reduce']
+    assert stats['rows'] == 1 and stats['chunks'] > 1
+    assert stats['map_requests'] == stats['chunks']
+    assert server.stats['requests'] == stats['chunks'] + 2
+
+    asyncio.run(processor.summarize(data, map_reduce=True, chunk_cache=chunk_cache))
+    stats = processor.metrics['map_reduce']
+    assert stats['cache_hits'] == stats['chunks'] and stats['map_requests'] == 0
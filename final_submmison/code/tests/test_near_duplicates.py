@@ -0,0 +1,85 @@
+"""MinHash/LSH 유사 중복 재사용: 보호 용어, 연쇄 재사용 방지, checkpoint 행 재사용"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+from near_duplicates import NearDuplicateIndex, guard_counts, lsh_bands, plan_reuse
+
+BASE = ("FINDINGS: The cardiomediastinal silhouette is within normal limits. There is no focal consolidation, "
+        "pleural effusion or pneumothorax. The osseous structures are intact. Study compared with [**2101-1-1**].")
+
+
+def test_redaction_and_case_differences_are_reused():
+    other = BASE.replace("[**2101-1-1**]", "___").upper()
+    reuse = plan_reuse([("a", BASE), ("b", other)], threshold=0.9)
+
+    assert reuse == {"b": ("a", 1.0)}
+
+
+@pytest.mark.parametrize("before, after", [
+    ("The osseous", "The left osseous"),
+    ("There is no focal", "There is focal"),
+    ("structures are intact", "structures are unchanged"),
+])
+def test_guard_term_differences_are_not_reused(before, after):
+    changed = BASE.replace(before, after)
+    assert guard_counts(changed) != guard_counts(BASE)
+
+    assert plan_reuse([("a", BASE), ("b", changed)], threshold=0.5) == {}
+
+
+def test_left_right_swap_is_not_reused():
+    # taskB_train에서 0.875로 유사했던 좌/우 하지 DVT 검사와 같은 형태
+    left, right = BASE + " Left leg DVT.", BASE + " Right leg DVT."
+    assert plan_reuse([("a", left), ("b", right)], threshold=0.5) == {}
+
+
+def test_reused_rows_do_not_become_sources():
+    words = BASE.split()
+    chain = [("r0", BASE)]
+    text = words
+    for i in range(1, 6):
+        text = text[:-3 * i] + ["extra"] * (3 * i)
+        chain.append((f"r{i}", " ".join(text)))
+
+    reuse = plan_reuse(chain, threshold=0.8)
+
+    assert reuse
+    assert all(source not in reuse for source, _ in reuse.values())
+
+
+def test_sources_are_only_reuse_targets():
+    reuse = plan_reuse([("new", BASE)], threshold=0.9, sources=[("done", BASE)])
+    assert reuse == {"new": ("done", 1.0)}
+    assert plan_reuse([], sources=[("done", BASE)]) == {}
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8, 0.9, 0.95])
+def test_lsh_boundary_is_just_below_threshold(threshold):
+    bands, rows = lsh_bands(64, threshold)
+
+    assert bands * rows == 64
+    assert (1 / bands) ** (1 / rows) <= threshold
+
+
+def test_index_rejects_invalid_threshold():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(threshold=0)
+
+
+def test_summarize_copies_results_for_near_duplicates(mock_llm, make_processor):
+    pytest.importorskip("langevaluate")
+    from main import TaskBProcessor
+
+    server = mock_llm(lambda prompt, model: "IMPRESSION: No acute process")
+    processor = make_processor(TaskBProcessor, server)
+    data = pd.DataFrame({'sample_id': [1, 2, 3],
+                         'radiology report': [BASE, BASE.replace("[**2101-1-1**]", "___"),
+                                              BASE.replace("There is no focal", "There is focal")]})
+
+    results = asyncio.run(processor.summarize(data, dedup_threshold=0.9))
+
+    assert results == ["No acute process."] * 3
+    assert server.stats['requests'] == 2
+    assert processor.metrics['dedup']['reused'] == 1
@@ -0,0 +1,84 @@
+"""Task B 다중 샘플 packing: 응답 분리와 누락/불량 항목 개별 재호출"""
+import asyncio
+import re
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("langevaluate")
+
+from main import TaskBProcessor  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def task_b():
+    return TaskBProcessor("test-key")
+
+
+def test_parse_splits_items_by_id(task_b):
+    raw = ("[[ITEM 1]]\n1. No pneumothorax.\n[[END 1]]\n"
+           "[[ITEM 2]]\nSmall effusion.\n[[END 2]]")
+    assert task_b.parse_packed_result(raw, ["1", "2"]) == {"1": "1. No pneumothorax.", "2": "Small effusion."}
+
+
+def test_parse_without_end_markers_stops_at_next_item(task_b):
+    raw = "[[ITEM 1]]\nFirst impression.\n[[ITEM 2]]\nSecond impression.\n"
+    assert task_b.parse_packed_result(raw, ["1", "2"]) == {"1": "First impression.", "2": "Second impression."}
+
+
+def test_parse_ignores_unknown_duplicate_and_trailing_text(task_b):
+    raw = ("Here are the impressions:\n"
+           "[[ITEM  7 ]]\nSeventh.\n[[END 7]]\nextra chatter\n"
+           "[[ITEM 9]]\nNot requested.\n[[END 9]]\n"
+           "[[ITEM 7]]\nDuplicate.\n[[END 7]]")
+    assert task_b.parse_packed_result(raw, ["7", "8"]) == {"7": "Seventh."}
+
+
+def test_parse_unclosed_markers(task_b):
+    assert task_b.parse_packed_result("[[ITEM 1 no close\ntext", ["1"]) == {}
+    assert task_b.parse_packed_result("[[ITEM 1]]\nText [[END 1", ["1"]) == {"1": "Text [[END 1"}
+
+
+def test_packed_prompt_round_trips_through_parser(task_b):
+    items = [("3", {"user_input": "Clear lungs."}), ("4", {"user_input": "Left effusion."})]
+    formatted = task_b.format_packed_items(items)
+    parsed = task_b.parse_packed_result(formatted, ["3", "4"])
+    assert parsed == {"3": "FINDINGS: Clear lungs.", "4": "FINDINGS: Left effusion."}
+
+
+def test_missing_and_invalid_items_are_rerun_individually(mock_llm, make_processor):
+    def respond(prompt, model):
+        if "[[ITEM" not in prompt:
+            return "1. Individually generated impression."
+        ids = re.findall(r"\[\[ITEM (\d+)\]\]", prompt.split("with nothing else:")[1])
+        # 0번은 누락, 1번은 FINDINGS를 되풀이, 나머지는 정상
+        blocks = []
+        for item_id in ids:
+            if item_id == "0":
+                continue
+            text = "FINDINGS: copied." if item_id == "1" else f"1. Impression {item_id}."
+            blocks.append(f"[[ITEM {item_id}]]\n{text}\n[[END {item_id}]]")
+        return "\n".join(blocks)
+
+    server = mock_llm(respond)
+    processor = make_processor(TaskBProcessor, server)
+    data = pd.DataFrame({'sample_id': range(5),
+                         'radiology report': [f"FINDINGS: Finding {i}." for i in range(5)]})
+
+    results = asyncio.run(processor.summarize(data, pack=True))
+
+    assert results[0] == results[1] == "1. Individually generated impression."
+    assert results[2:] == ["1. Impression 2.", "1. Impression 3.", "1. Impression 4."]
+    assert processor.metrics['packing']['packs'] == 1
+    assert processor.metrics['packing']['individual_reruns'] == 2
+    assert server.stats['requests'] == 3
+
+
+def test_plan_packs_respects_item_and_prompt_limits(task_b):
+    items = [(str(i), {"user_input": "Mild atelectasis. " * 20}) for i in range(25)]
+    packs = task_b.plan_packs(items)
+    assert [len(p) for p in packs] == [10, 10, 5]
+
+    small = task_b.plan_packs(items, prompt_token_budget=1200)
+    assert sum(len(p) for p in small) == 25
+    assert max(len(p) for p in small) < 10
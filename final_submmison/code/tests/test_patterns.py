@@ -0,0 +1,82 @@
+"""정규식 레지스트리: 속성 접근, 호출 카운터/통계, 명시적 자체 점검 (시간 값 자체는 검사하지 않음)"""
+import re
+
+import pytest
+
+from conftest import CODE_DIR
+from patterns import PatternRegistry, TimedPattern
+
+
+@pytest.fixture
+def registry():
+    return PatternRegistry('Test', {'word': r'\w+', 'header': (r'^labs:', re.IGNORECASE | re.MULTILINE)},
+                           inputs=['Labs: '])
+
+
+def test_attribute_access_and_repr(registry):
+    assert isinstance(registry.word, TimedPattern)
+    assert registry['header'] is registry.header
+    assert [timed.name for timed in registry] == ['word', 'header'] and len(registry) == 2
+    assert registry.header.pattern.flags & re.IGNORECASE
+    assert "TimedPattern('word', '\\\\w+', flags=32)" in repr(registry)
+    with pytest.raises(AttributeError, match="missing"):
+        registry.missing
+
+
+def test_methods_match_re_and_count_calls(registry):
+    text = "Labs: wbc 12\nlabs: hgb 9"
+    word = re.compile(r'\w+')
+
+    assert registry.word.findall(text) == word.findall(text)
+    assert registry.word.sub('x', text) == word.sub('x', text)
+    assert registry.word.split(text, 1) == word.split(text, 1)
+    assert registry.word.search(text).group(0) == 'Labs'
+    assert registry.word.match(" x") is None and registry.word.fullmatch("wbc")
+    assert [m.start() for m in registry.header.finditer(text)] == [0, 13]
+
+    stats = registry.stats()
+    assert stats['word']['calls'] == 6 and stats['header']['calls'] == 1
+    assert stats['word']['max_chars'] == len(text)
+    assert stats['word']['worst_us_per_kb'] is None
+
+    registry.reset()
+    assert all(stat['calls'] == 0 and stat['total_ms'] == 0 for stat in registry.stats().values())
+
+
+def test_finditer_records_once_when_stopped_early(registry):
+    # 순회를 중간에 멈춰도 제너레이터가 닫힐 때 한 번 기록
+    for _ in registry.word.finditer("a b c"):
+        break
+    assert registry.word.calls == 1
+
+
+# 짧은 입력의 시간 측정은 잡음이 커서 기준 초과 경고가 날 수 있음 (결과 형식만 검사)
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_self_test_runs_only_when_called(registry):
+    assert registry.self_test_results == {}
+
+    results = registry.self_test(chars=50, repeat=1)
+    assert set(results) == {'word', 'header'}
+    assert all({'input', 'us_per_kb', 'growth', 'superlinear', 'over_budget'} <= set(r) for r in results.values())
+    assert registry.self_test_results is results
+    # 점검용 호출은 카운터에 포함되지 않음
+    assert registry.word.calls == 0
+    assert registry.stats()['word']['worst_us_per_kb'] == results['word']['us_per_kb']
+
+
+def test_task_registries_skip_self_test_at_import():
+    pytest.importorskip("langevaluate")
+    from main import TaskAProcessor, TaskBProcessor, TaskCProcessor
+
+    for cls in (TaskAProcessor, TaskBProcessor, TaskCProcessor):
+        assert cls.PATTERNS.self_test_results == {}
+
+
+def test_etc_scripts_compile_patterns_without_code_imports():
+    # etc/ 스크립트는 code/ 모듈(patterns.py)을 import할 수 없으므로 각자 클래스 정의 시 컴파일한 패턴을 사용
+    for path in sorted((CODE_DIR.parents[1] / "etc").glob("submit_*.py")):
+        source = path.read_text(encoding='utf-8')
+        assert 'CompiledPatterns({' in source, path.name
+        assert not re.search(r'^\s*from (patterns|keywords) import', source, re.M), path.name
+        assert not re.search(r'^ {4,}import (re|pandas as pd)$', source, re.M), path.name
+        assert not re.search(r'\bre\.(search|match|fullmatch|findall|finditer|split|sub)\(', source), path.name
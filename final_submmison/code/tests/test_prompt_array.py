@@ -0,0 +1,88 @@
+"""/completions prompt 배열 전송: 행 매핑, context 초과 재시도, 실패 시 행별 chat 호출"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("langevaluate")
+
+from completions import LLAMA3_SYSTEM_HEADER  # noqa: E402
+from main import TaskBProcessor  # noqa: E402
+
+
+def reports(findings):
+    return pd.DataFrame({'sample_id': range(len(findings)),
+                         'radiology report': [f"FINDINGS: {text}" for text in findings]})
+
+
+def echo_finding(prompt, model):
+    """프롬프트의 마지막 FINDINGS 앞부분을 IMPRESSION으로 되돌려줌 (행 매핑 확인용)"""
+    finding = prompt.rsplit("FINDINGS: ", 1)[1].split(".", 1)[0]
+    return f"1. {finding}."
+
+
+def test_rows_map_back_in_order(mock_llm, make_processor):
+    server = mock_llm(echo_finding)
+    processor = make_processor(TaskBProcessor, server)
+    data = reports([f"Finding {i}. Otherwise normal." for i in range(7)])
+
+    results = asyncio.run(processor.summarize(data, transport='completions', prompt_array_size=3))
+
+    assert results == [f"1. Finding {i}." for i in range(7)]
+    assert processor.metrics['transport']['requests'] == 3
+    assert processor.metrics['transport']['fallback_rows'] == 0
+    assert server.stats['http_requests'] == 3
+
+
+def test_context_overflow_shrinks_and_retries_the_array(mock_llm, make_processor):
+    server = mock_llm(echo_finding, max_model_len=2200)
+    processor = make_processor(TaskBProcessor, server, config={'max_tokens': 300})
+    data = reports(["Short one. Normal.", "Long one. " + "Stable small effusion. " * 250, "Short two. Normal."])
+
+    results = asyncio.run(processor.summarize(data, transport='completions', prompt_array_size=3))
+
+    assert results == ["1. Short one.", "1. Long one.", "1. Short two."]
+    assert processor.metrics['context_guard']['overflow_retries'] == 1
+    assert processor.metrics['transport']['failed_requests'] == 0
+    assert processor.metrics['transport']['requests'] == 1
+    assert server.stats['http_requests'] == 2
+
+
+def test_failed_array_falls_back_to_chat_per_row(mock_llm, make_processor):
+    def respond(prompt, model):
+        if LLAMA3_SYSTEM_HEADER in prompt:
+            raise ValueError("completions endpoint unavailable for this model")
+        return echo_finding(prompt, model)
+
+    server = mock_llm(respond)
+    processor = make_processor(TaskBProcessor, server)
+    data = reports([f"Finding {i}. Normal." for i in range(4)])
+
+    results = asyncio.run(processor.summarize(data, transport='completions', prompt_array_size=4))
+
+    assert results == [f"1. Finding {i}." for i in range(4)]
+    assert processor.metrics['transport']['failed_requests'] == 1
+    assert processor.metrics['transport']['fallback_rows'] == 4
+    assert len(processor.token_usage) == 4
+
+
+def test_rate_limit_is_acquired_once_per_array_request(mock_llm, make_processor, monkeypatch):
+    server = mock_llm(echo_finding)
+    processor = make_processor(TaskBProcessor, server)
+    acquired = []
+    acquire = processor._acquire_rate_limit
+
+    async def counting(model_name):
+        acquired.append(model_name)
+        await acquire(model_name)
+
+    monkeypatch.setattr(processor, '_acquire_rate_limit', counting)
+    data = reports([f"Finding {i}. Normal." for i in range(6)])
+
+    asyncio.run(processor.summarize(data, transport='completions', prompt_array_size=3))
+
+    # 클라이언트는 따로 획득하지 않고 chat LLM과 같은 limiter를 processor에서 요청마다 한 번 획득
+    assert acquired == [processor.config['model_name']] * 2
+    assert server.stats['http_requests'] == 2
+    assert processor._completions_client is not None
+    assert not hasattr(processor._completions_client, 'rate_limiter')
@@ -0,0 +1,37 @@
+"""정적 system prompt 분리: 행마다 같은 prefix와 서버 prefix cache 재사용"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("langevaluate")
+
+from main import TaskAProcessor, TaskBProcessor, TaskCProcessor  # noqa: E402
+
+
+@pytest.mark.parametrize("cls", [TaskAProcessor, TaskBProcessor, TaskCProcessor])
+def test_static_instructions_are_a_fixed_system_message(cls):
+    processor = cls("test-key")
+    first = processor.prompt_template.format_messages(user_input="first row")
+    second = processor.prompt_template.format_messages(user_input="second {row} with braces")
+
+    assert first[0].type == "system"
+    assert first[0].content == second[0].content
+    assert "first row" not in first[0].content
+    assert "second {row} with braces" in second[-1].content
+
+
+def test_later_rows_hit_the_server_prefix_cache(mock_llm, make_processor):
+    server = mock_llm()
+    processor = make_processor(TaskBProcessor, server)
+    data = pd.DataFrame({'sample_id': [0, 1, 2],
+                         'radiology report': [f"FINDINGS: Finding number {i}." for i in range(3)]})
+
+    # 첫 행이 cache를 채운 뒤 다음 행을 보내도록 한 행씩 실행
+    cached = []
+    for i in range(len(data)):
+        asyncio.run(processor.summarize(data.iloc[[i]]))
+        cached.append(processor.metrics['tokens']['cached_prompt_tokens'])
+
+    assert cached[0] == 0
+    assert all(tokens > len(processor.get_system_prompt().split()) for tokens in cached[1:])
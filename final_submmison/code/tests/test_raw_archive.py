@@ -0,0 +1,72 @@
+"""원본 출력 archive와 후처리 replay"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("langevaluate")
+
+from main import TaskBProcessor  # noqa: E402
+from processor import ARCHIVE_COLUMNS  # noqa: E402
+
+FINDINGS = ["Small left pleural effusion.", "Small left pleural effusion.", "Right lower lobe consolidation."]
+
+
+@pytest.fixture
+def data():
+    return pd.DataFrame({'sample_id': [0, 1, 2], 'radiology report': [f"FINDINGS: {f}" for f in FINDINGS]})
+
+
+def run(processor, data, **kwargs):
+    return asyncio.run(processor.summarize(data, **kwargs))
+
+
+@pytest.mark.parametrize("name", ["raw", "raw.parquet", "raw.feather", "raw.csv", "raw.csv.gz"])
+def test_archive_round_trips_and_replays_without_calls(tmp_path, data, mock_llm, make_processor, name):
+    server = mock_llm(lambda prompt, model: "impression: " + prompt.rsplit("FINDINGS: ", 1)[1].split("\n")[0])
+    processor = make_processor(TaskBProcessor, server)
+    path = str(tmp_path / name)
+
+    results = run(processor, data, archive_path=path)
+    requests = server.stats['requests']
+    replayed = asyncio.run(processor.replay(path, data))
+
+    assert replayed == results
+    assert server.stats['requests'] == requests
+    assert processor.metrics['replay']['archived'] == 3
+    assert processor.metrics['replay']['stale_prompt_rows'] == 0
+    if not name.startswith("raw."):
+        # 확장자가 없으면 Parquet으로 저장
+        assert pd.read_parquet(path).columns.tolist() == ARCHIVE_COLUMNS
+
+
+def test_reused_rows_are_archived_with_their_source(tmp_path, data, mock_llm, make_processor):
+    server = mock_llm()
+    processor = make_processor(TaskBProcessor, server)
+    path = str(tmp_path / "raw.parquet")
+
+    run(processor, data, archive_path=path, dedup_threshold=0.9)
+
+    archive = pd.read_parquet(path).set_index('sample_id')
+    assert server.stats['requests'] == 2
+    assert sorted(archive.index) == ["0", "1", "2"]
+    assert archive.loc["1", 'reused_from'] == "0"
+    assert archive.loc["1", 'raw'] == archive.loc["0", 'raw']
+    assert archive.loc["0", 'reused_from'] == archive.loc["2", 'reused_from'] == ""
+
+
+def test_archive_merges_with_previous_runs_and_legacy_files(tmp_path, data, mock_llm, make_processor):
+    server = mock_llm(lambda prompt, model: "IMPRESSION: Updated")
+    processor = make_processor(TaskBProcessor, server)
+    path = tmp_path / "raw.csv"
+    legacy = pd.DataFrame({'sample_id': ["2", "9"], 'prompt_hash': [processor.prompt_hash(processor.prompt_template)] * 2,
+                           'model': [processor.config['model_name']] * 2, 'raw': ["Old", "Kept"]})
+    legacy.to_csv(path, index=False)
+
+    run(processor, data.iloc[:2], archive_path=str(path))
+
+    archive = processor._load_raw_archive(str(path)).set_index('sample_id')
+    assert archive.columns.tolist() == ARCHIVE_COLUMNS[1:]
+    assert archive.loc["9", 'raw'] == "Kept"
+    assert archive.loc["0", 'raw'] == "IMPRESSION: Updated"
+    assert asyncio.run(processor.replay(str(path), data)) == ["Updated.", "Updated.", "Old."]
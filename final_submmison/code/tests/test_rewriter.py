@@ -0,0 +1,104 @@
+"""단일 패스 치환기: 기존 규칙별 str.replace/키워드 루프와 같은 결과, 가장 긴 규칙 우선, 연쇄 치환 없음"""
+import random
+import re
+
+import pandas as pd
+import pytest
+
+from conftest import DATA_DIR
+from rewriter import Rewriter, trie_pattern
+
+# Task A 후처리 규칙 표 (main.TaskAProcessor.MEDICAL_CORRECTIONS / CLINICAL_ENHANCEMENTS와 같은 내용)
+MEDICAL_CORRECTIONS = {
+    'pt ': 'patient ', 'w/ ': 'with ', 'w/o ': 'without ', 'h/o ': 'history of ', 'pt.': 'patient',
+    'dx ': 'diagnosis ', 'tx ': 'treatment ', 'meds ': 'medications ', 'labs ': 'laboratory studies ',
+}
+CLINICAL_ENHANCEMENTS = {
+    'was given': 'received', 'got better': 'showed clinical improvement',
+    'felt better': 'reported symptomatic improvement', 'went home': 'was discharged home',
+    'came in': 'presented to the hospital',
+}
+FALLBACK_CODES = {
+    "CHEST PAIN": "R079", "DYSPNEA": "R0600", "SYNCOPE": "R531", "NAUSEA": "R11",
+    "DIARRHEA": "K5900", "FEVER": "R5090", "HEADACHE": "R51", "CONFUSION": "R410",
+}
+FILLER = ['the', 'patient', 'apt', 'script', 'was', 'given', 'home', 'better', 'in', 'labs', 'Pt', '\n', ',', '.']
+
+
+def replace_loop(text, *tables):
+    """기존 Task A 후처리: 규칙마다 전체 텍스트를 다시 훑는 str.replace"""
+    for table in tables:
+        for source, target in table.items():
+            text = text.replace(source, target)
+    return text
+
+
+def keyword_loop(text, mapping):
+    """기존 Task C fallback: 키워드마다 포함 여부 확인"""
+    for keyword, code in mapping.items():
+        if keyword in text:
+            return code
+    return None
+
+
+def random_text(rng, vocabulary, words=40):
+    return "".join(rng.choice(vocabulary) + rng.choice([" ", "", " ", "."]) for _ in range(words))
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_task_a_rewriter_matches_replace_loop(seed):
+    rng = random.Random(seed)
+    rewriter = Rewriter({**MEDICAL_CORRECTIONS, **CLINICAL_ENHANCEMENTS})
+    vocabulary = [s.strip() for s in [*MEDICAL_CORRECTIONS, *CLINICAL_ENHANCEMENTS]] + FILLER
+    text = random_text(rng, vocabulary)
+
+    assert rewriter.rewrite(text) == replace_loop(text, MEDICAL_CORRECTIONS, CLINICAL_ENHANCEMENTS)
+
+
+def test_task_a_rewriter_matches_replace_loop_on_notes():
+    rewriter = Rewriter({**MEDICAL_CORRECTIONS, **CLINICAL_ENHANCEMENTS})
+    notes = [n for n in pd.read_csv(DATA_DIR / "taskA_test.csv")['medical record'] if isinstance(n, str)]
+
+    for note in notes:
+        assert rewriter.rewrite(note) == replace_loop(note, MEDICAL_CORRECTIONS, CLINICAL_ENHANCEMENTS)
+
+
+def test_task_a_table_matches_main():
+    pytest.importorskip("langevaluate")
+    from main import TaskAProcessor
+
+    assert TaskAProcessor.MEDICAL_CORRECTIONS == MEDICAL_CORRECTIONS
+    assert TaskAProcessor.CLINICAL_ENHANCEMENTS == CLINICAL_ENHANCEMENTS
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_task_c_first_matches_keyword_loop(seed):
+    rng = random.Random(seed)
+    rewriter = Rewriter(FALLBACK_CODES)
+    text = " ".join(rng.sample(list(FALLBACK_CODES) + ["PAIN", "CHEST", "FEVERISH", "NORMAL"] * 3, rng.randint(0, 6)))
+
+    assert rewriter.first(text) == keyword_loop(text, FALLBACK_CODES)
+
+
+def test_longest_rule_wins_and_replacements_do_not_cascade():
+    rewriter = Rewriter({'a': 'b', 'b': 'c', 'ab': 'X'})
+
+    assert rewriter.rewrite("ab a b") == "X b c"
+    # 규칙별 루프는 'a'->'b' 결과가 다시 'b'->'c'에 걸림
+    assert replace_loop("ab a b", {'a': 'b', 'b': 'c', 'ab': 'X'}) == "cc c c"
+
+
+def test_ignore_case_uses_table_replacement():
+    rewriter = Rewriter({'came in': 'presented'}, ignore_case=True)
+    assert rewriter.rewrite("Came In today, CAME IN again") == "presented today, presented again"
+    assert list(rewriter.matches("CAME IN")) == [('came in', 'presented')]
+
+
+def test_trie_pattern_matches_same_words_as_alternation():
+    words = ['pt ', 'pt.', 'p', 'w/', 'w/o ', 'a|b', '(x)']
+    pattern = re.compile(trie_pattern(words))
+    for word in words:
+        assert pattern.fullmatch(word)
+    assert not pattern.fullmatch('pt')
+    assert pattern.match('w/o x').group(0) == 'w/o '
+    assert Rewriter({}).rewrite("text") == "text"
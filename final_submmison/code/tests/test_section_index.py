@@ -0,0 +1,108 @@
+"""섹션 오프셋 인덱스: 헤더 인식, 섹션 조회, sidecar 생성과 재사용"""
+
+import pandas as pd
+import pytest
+
+import section_index
+from section_index import NoteSections, build_section_index, cut_at, index_sections, note_sections, text_digest
+
+NOTE = ("Name: ___\n"
+        "Chief Complaint: chest pain\n"
+        "History of Present Illness: 60M with pain.\n"
+        "Brief Hospital Course: admitted, stented.\n"
+        "DISCHARGE DIAGNOSIS: CAD\n"
+        "Followup Instructions: clinic")
+
+
+def test_index_sections_offsets():
+    spans = index_sections(NOTE)
+
+    assert [name for name, *_ in spans] == ['Chief Complaint', 'History of Present Illness',
+                                            'Brief Hospital Course', 'Discharge Diagnosis',
+                                            'Followup Instructions']
+    for (name, start, body_start, end), next_span in zip(spans, spans[1:] + [None]):
+        assert NOTE[body_start - 1] == ':'
+        assert end == (next_span[1] if next_span else len(NOTE))
+    # 긴 헤더(Brief Hospital Course)를 짧은 헤더(Hospital Course)보다 우선
+    brief = spans[2]
+    assert NOTE[brief[1]:brief[2]] == "Brief Hospital Course:"
+
+
+def test_note_sections_lookup():
+    sections = NoteSections(NOTE)
+
+    assert sections.section('Chief Complaint') == " chest pain\n"
+    assert sections.section('Hospital Course', 'Brief Hospital Course') == " admitted, stented.\n"
+    assert sections.section('Discharge Diagnosis', literal="Discharge Diagnosis:") is None
+    assert sections.section('Discharge Diagnosis', literal=("DISCHARGE DIAGNOSIS:",)) == " CAD\n"
+    assert cut_at(sections.after('History of Present Illness'), "Brief", "DISCHARGE") == " 60M with pain.\n"
+    assert sections.find('Physical Exam') is None
+
+
+@pytest.fixture
+def note_csv(tmp_path):
+    path = tmp_path / "notes.csv"
+    pd.DataFrame({'sample_id': [1, 2, 3],
+                  'medical record': [NOTE, "Allergies: none\nService: MEDICINE", float('nan')]}).to_csv(path, index=False)
+    return path
+
+
+def test_sidecar_is_built_once_and_reused(tmp_path, note_csv, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    index = build_section_index(note_csv, 'medical record', cache_dir=cache_dir)
+
+    assert set(index) == {'1', '2'}
+    assert section_index.sidecar_path(note_csv, 'medical record', cache_dir).exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("sidecar가 있으면 CSV를 다시 읽지 않아야 함")
+
+    monkeypatch.setattr(section_index, 'load_csv_cached', fail)
+    reused = build_section_index(note_csv, 'medical record', cache_dir=cache_dir)
+    assert set(reused) == {'1', '2'}
+    assert note_sections(NOTE, reused['1']).spans == index_sections(NOTE)
+
+
+def test_sidecar_rebuilds_when_source_changes(tmp_path, note_csv):
+    cache_dir = tmp_path / "cache"
+    build_section_index(note_csv, 'medical record', cache_dir=cache_dir)
+    pd.DataFrame({'sample_id': [7], 'medical record': [NOTE]}).to_csv(note_csv, index=False)
+
+    index = build_section_index(note_csv, 'medical record', cache_dir=cache_dir)
+
+    assert set(index) == {'7'}
+    assert len(list(cache_dir.glob("notes-*.medical_record.sections.json"))) == 1
+
+
+@pytest.mark.parametrize("old, new", [
+    ("chest pain", "dyspnea"),
+    # 길이가 같은 수정도 내용 해시로 감지
+    ("Chief Complaint: chest pain\n", "Chief Complaint\n: chest pain"),
+])
+def test_stale_entry_is_reindexed(old, new):
+    entry = (text_digest(NOTE), index_sections(NOTE))
+    edited = NOTE.replace(old, new)
+
+    assert note_sections(edited, entry).spans == index_sections(edited)
+
+
+def test_cleanup_keeps_sidecars_of_other_variants(tmp_path, note_csv, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    build_section_index(note_csv, 'medical record', cache_dir=cache_dir)
+    build_section_index(note_csv, 'medical record', cache_dir=cache_dir, transform=str.upper, variant='upper')
+
+    def fail(*args, **kwargs):
+        raise AssertionError("변환 방식이 다른 sidecar가 서로 지워져 다시 만들어짐")
+
+    # 변환 방식이 번갈아 쓰여도 각자의 sidecar를 그대로 읽음
+    with monkeypatch.context() as patch:
+        patch.setattr(section_index, 'load_csv_cached', fail)
+        assert set(build_section_index(note_csv, 'medical record', cache_dir=cache_dir)) == {'1', '2'}
+        upper = build_section_index(note_csv, 'medical record', cache_dir=cache_dir, variant='upper')
+    assert upper['1'][0] == text_digest(NOTE.upper())
+
+    # 원본이 바뀌면 같은 변환의 이전 버전만 정리
+    pd.DataFrame({'sample_id': [7], 'medical record': [NOTE]}).to_csv(note_csv, index=False)
+    build_section_index(note_csv, 'medical record', cache_dir=cache_dir, transform=str.upper, variant='upper')
+    assert len(list(cache_dir.glob("notes-*.medical_record-upper.sections.json"))) == 1
+    assert len(list(cache_dir.glob("notes-*.medical_record.sections.json"))) == 1
@@ -0,0 +1,102 @@
+"""섹션 패킹: 작은 입력에서 전수 탐색과 같은 최적 가치, 예산 상한, 순서 유지"""
+import itertools
+import math
+import random
+
+import pytest
+
+from section_packer import (TRUNCATION_FRACTIONS, pack_sections, priority_weights, section_weight,
+                            truncate_to_tokens)
+from tokens import estimate_tokens
+
+PRIORITY = ['Chief Complaint', 'Key Labs', 'History', 'Exam', 'Other']
+WEIGHTS = priority_weights(PRIORITY)
+
+
+def random_sections(rng, count):
+    names = rng.sample(PRIORITY, count)
+    return [(name, " ".join(f"word{rng.randrange(1000)}" for _ in range(rng.randint(5, 80)))) for name in names]
+
+
+def choices(name, text, min_tokens=24, separator_tokens=None):
+    """pack_sections와 같은 선택지 (토큰 수, 가치) - 제외는 (0, 0)"""
+    separator_tokens = estimate_tokens(' ') if separator_tokens is None else separator_tokens
+    weight = section_weight(name, WEIGHTS)
+    full = estimate_tokens(text) + separator_tokens
+    options = [(0, 0.0), (full, weight)]
+    for fraction in TRUNCATION_FRACTIONS:
+        target = int(full * fraction) - separator_tokens
+        if target < min_tokens:
+            break
+        cut = truncate_to_tokens(text, target)
+        if cut:
+            options.append((estimate_tokens(cut) + separator_tokens, weight * math.sqrt(fraction)))
+    return options
+
+
+def brute_force(sections, budget):
+    best = 0.0
+    for combo in itertools.product(*(choices(name, text) for name, text in sections)):
+        if sum(tokens for tokens, _ in combo) <= budget:
+            best = max(best, sum(value for _, value in combo))
+    return best
+
+
+def packed_value(sections, result):
+    original = dict(sections)
+    value = 0.0
+    for name, text in result.sections:
+        weight = section_weight(name, WEIGHTS)
+        if text == original[name]:
+            value += weight
+            continue
+        for fraction in TRUNCATION_FRACTIONS:
+            full = estimate_tokens(original[name]) + estimate_tokens(' ')
+            if truncate_to_tokens(original[name], int(full * fraction) - estimate_tokens(' ')) == text:
+                value += weight * math.sqrt(fraction)
+                break
+    return value
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_pack_matches_brute_force(seed):
+    rng = random.Random(seed)
+    sections = random_sections(rng, rng.randint(1, 4))
+    budget = rng.randint(10, 300)
+
+    result = pack_sections(sections, budget, WEIGHTS)
+
+    assert packed_value(sections, result) == pytest.approx(brute_force(sections, budget))
+    assert result.tokens <= budget
+    assert [name for name, _ in result.sections] == [name for name, _ in sections if name not in result.dropped]
+
+
+def test_large_budget_uses_coarse_units_but_stays_under_budget():
+    rng = random.Random(7)
+    sections = [(name, " ".join(f"token{rng.randrange(10 ** 6)}" for _ in range(900))) for name in PRIORITY]
+    budget = 3000
+
+    result = pack_sections(sections, budget, WEIGHTS)
+
+    assert 0 < result.tokens <= budget
+    assert estimate_tokens(" ".join(text for _, text in result.sections)) <= budget
+    # 가장 중요한 섹션은 남김
+    assert result.sections[0][0] == 'Chief Complaint'
+
+
+def test_short_note_is_kept_whole():
+    sections = [('Chief Complaint', "chest pain"), ('History', "60M with CAD")]
+    result = pack_sections(sections, 200, WEIGHTS)
+
+    assert result.sections == sections
+    assert result.dropped == [] and result.truncated == []
+    assert result.tokens == estimate_tokens("chest pain") + estimate_tokens(' ') + estimate_tokens("60M with CAD")
+
+
+def test_truncate_to_tokens_respects_limit():
+    text = " ".join(f"word{i}" for i in range(200))
+    cut = truncate_to_tokens(text, 40)
+
+    assert cut.endswith(" ...")
+    assert estimate_tokens(cut) <= 40
+    assert text.startswith(cut[:-len(" ...")])
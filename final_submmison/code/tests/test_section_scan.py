@@ -0,0 +1,66 @@
+"""단일 패스 섹션 스캐너: 기존 헤더 alternation 정규식과 같은 오프셋, Task C 부분 정리"""
+import asyncio
+import re
+
+import pandas as pd
+import pytest
+
+from conftest import DATA_DIR
+from section_index import SECTION_HEADERS, index_sections
+
+_NAMES = list(SECTION_HEADERS)
+# 스캐너 도입 전 index_sections가 쓰던 전체 헤더 alternation
+LEGACY_HEADER = re.compile(
+    '|'.join(f"(?P<s{i}>{pattern}):" for i, pattern in enumerate(SECTION_HEADERS.values())), re.IGNORECASE)
+
+
+def legacy_index(text):
+    matches = list(LEGACY_HEADER.finditer(text))
+    return [(_NAMES[int(m.lastgroup[1:])], m.start(), m.end(),
+             matches[i + 1].start() if i + 1 < len(matches) else len(text))
+            for i, m in enumerate(matches)]
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "no headers: here",
+    "Brief Hospital Course: a\nHospital Course: b",
+    "DISCHARGE DIAGNOSES: x\nPrimary diagnosis: y\nDiagnosis at discharge: z",
+    "Assessment and Plan: a\nImpression: b\nA&P: c",
+    "Discharge Medications: a\nMedications on Admission: b",
+    "History of Present Illness:: twice: colons",
+    "Followup Instructions:Discharge Instructions:Discharge Condition:",
+    "Chief\nComplaint: split header",
+])
+def test_scanner_matches_legacy_on_edge_cases(text):
+    assert index_sections(text) == legacy_index(text)
+
+
+@pytest.mark.parametrize("file_name, column", [
+    ("taskA_test.csv", "medical record"),
+    ("taskC_test.csv", "hospital_course"),
+])
+def test_scanner_matches_legacy_on_task_notes(file_name, column):
+    notes = [note for note in pd.read_csv(DATA_DIR / file_name)[column] if isinstance(note, str)]
+
+    assert notes
+    for note in notes:
+        assert index_sections(note) == legacy_index(note)
+
+
+def test_task_c_bounded_cleaning_matches_full_cleaning():
+    pytest.importorskip("langevaluate")
+    from main import TaskCProcessor
+
+    processor = TaskCProcessor("test-key")
+    history = "\n".join(f"Line {i} ___ [**Hospital 12**]   with   spaces" for i in range(200))
+    note = f"History of Present Illness: {history}\nHospital Course: short course"
+
+    def clean(raw):
+        raw = processor.PATTERNS.redacted.sub(" ", raw)
+        raw = processor.PATTERNS.deid_marker.sub(" ", raw)
+        return processor.PATTERNS.whitespace.sub(" ", raw).strip()
+
+    expected = clean(note.split("Illness:", 1)[1])[:400]
+    vars = asyncio.run(processor.preprocess_data(pd.Series({'sample_id': 1, 'hospital_course': note})))
+    assert f"HISTORY: {expected}" in vars['user_input']
@@ -0,0 +1,119 @@
+"""전처리 단계 캐시: 저장/조회, 코드 해시 무효화, 헬퍼 모듈 변경 감지"""
+import asyncio
+import importlib
+import sys
+import textwrap
+
+import pandas as pd
+import pytest
+
+from stage_cache import StageCache, code_hash, row_hash
+
+
+def test_entries_are_scoped_by_stage_and_code_hash(tmp_path):
+    with StageCache(str(tmp_path / "cache.sqlite")) as cache:
+        cache.put_many("stage", "v1", {"a": {"user_input": "x"}, "b": [1, 2]})
+        assert cache.get_many("stage", "v1", ["a", "b", "c"]) == {"a": {"user_input": "x"}, "b": [1, 2]}
+        assert cache.get_many("stage", "v2", ["a"]) == {}
+        assert cache.get_many("other", "v1", ["a"]) == {}
+
+        cache.invalidate("stage", "v2")
+        assert cache.stats['invalidated'] == 2
+        assert cache.get_many("stage", "v1", ["a"]) == {}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    with StageCache(str(tmp_path / "cache.sqlite"), max_entries=2) as cache:
+        cache.put_many("stage", "v1", {"a": 1})
+        cache.put_many("stage", "v1", {"b": 2})
+        cache.get_many("stage", "v1", ["a"])
+        cache.put_many("stage", "v1", {"c": 3})
+        assert cache.get_many("stage", "v1", ["a", "b", "c"]) == {"a": 1, "c": 3}
+        assert cache.stats['evicted'] == 1
+
+
+def test_row_hash_depends_on_content_only():
+    assert row_hash(pd.Series({'a': 1, 'b': 'x'})) == row_hash({'b': 'x', 'a': 1})
+    assert row_hash({'a': 1}) != row_hash({'a': 2})
+
+
+def test_code_hash_changes_with_source():
+    def first(x):
+        return x + 1
+
+    def second(x):
+        return x + 2
+
+    assert code_hash(first) == code_hash(first)
+    assert code_hash(first) != code_hash(second)
+
+
+HELPER = """
+def clean(text):
+    return text.{method}()
+"""
+
+TASK = """
+import helper_stage
+from processor import DatathonProcessor
+
+
+class HelperTask(DatathonProcessor):
+    def get_prompt_template(self):
+        return "{user_input}"
+
+    async def preprocess_data(self, data):
+        return {'user_input': helper_stage.clean(data['text'])}
+
+    async def postprocess_result(self, result):
+        return result
+"""
+
+
+@pytest.fixture
+def helper_task(tmp_path, monkeypatch):
+    """헬퍼 모듈(helper_stage)을 import하는 임시 task 모듈 (헬퍼 소스를 바꿔 쓰는 함수와 함께 반환)"""
+    pytest.importorskip("langevaluate")
+    package = tmp_path / "pkg"
+    package.mkdir()
+    (package / "task_stage.py").write_text(textwrap.dedent(TASK), encoding='utf-8')
+
+    def write_helper(method):
+        (package / "helper_stage.py").write_text(HELPER.format(method=method), encoding='utf-8')
+        if "helper_stage" in sys.modules:
+            importlib.reload(sys.modules["helper_stage"])
+
+    write_helper("upper")
+    monkeypatch.syspath_prepend(str(package))
+    module = importlib.import_module("task_stage")
+    yield module.HelperTask("test-key"), write_helper
+    for name in ("task_stage", "helper_stage"):
+        sys.modules.pop(name, None)
+
+
+def test_changing_a_helper_module_invalidates_the_cache(tmp_path, helper_task):
+    processor, write_helper = helper_task
+    data = pd.DataFrame({'sample_id': [0, 1], 'text': ["Alpha", "Beta"]})
+    path = str(tmp_path / "preprocess.sqlite")
+
+    assert asyncio.run(processor.preprocess_all(data, path)) == [{'user_input': "ALPHA"}, {'user_input': "BETA"}]
+    before = processor.preprocess_code_hash()
+    asyncio.run(processor.preprocess_all(data, path))
+    assert processor.metrics['preprocess_cache']['hits'] == 2
+
+    write_helper("lower")
+
+    assert processor.preprocess_code_hash() != before
+    assert asyncio.run(processor.preprocess_all(data, path)) == [{'user_input': "alpha"}, {'user_input': "beta"}]
+    assert processor.metrics['preprocess_cache']['hits'] == 0
+    assert processor.metrics['preprocess_cache']['invalidated'] == 2
+
+
+def test_task_hash_covers_preprocessing_helpers():
+    pytest.importorskip("langevaluate")
+    from main import TaskAProcessor
+    from stage_cache import local_modules
+
+    modules = {m.__name__ for m in local_modules(sys.modules[TaskAProcessor.__module__], skip=['processor'])}
+    assert {'labs', 'triage', 'boilerplate', 'section_index', 'section_packer', 'extractive', 'tokens'} <= modules
+    assert not {'processor', 'stage_cache', 'mock_server'} & modules
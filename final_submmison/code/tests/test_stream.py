@@ -0,0 +1,81 @@
+"""스트리밍 처리: chunk 단위 처리와 checkpoint 재개, 소비 중단 시 작업 취소와 metrics 기록"""
+import asyncio
+import contextlib
+import time
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("langevaluate")
+
+from main import TaskBProcessor  # noqa: E402
+
+CONCURRENCY = 2
+
+
+def chunks(rows, size):
+    data = pd.DataFrame({'sample_id': range(rows),
+                         'radiology report': [f"FINDINGS: Finding {i}." for i in range(rows)]})
+    return [data.iloc[start:start + size] for start in range(0, rows, size)]
+
+
+def slow_responder(prompt, model):
+    time.sleep(0.01)
+    return "IMPRESSION: Small effusion"
+
+
+def test_stream_yields_every_row_and_resumes(tmp_path, mock_llm, make_processor):
+    server = mock_llm(slow_responder)
+    processor = make_processor(TaskBProcessor, server)
+    checkpoint = tmp_path / "checkpoint.csv"
+
+    async def collect():
+        return [item async for item in processor.summarize_stream(chunks(6, 4), concurrency=CONCURRENCY,
+                                                                  checkpoint_path=str(checkpoint))]
+
+    results = asyncio.run(collect())
+    assert sorted(results) == [(str(i), "Small effusion.") for i in range(6)]
+    assert processor.metrics['stream'] == {'task': 'TaskBProcessor', 'chunks': 2, 'rows': 6,
+                                           'resumed_rows': 0, 'skipped_rows': 0}
+
+    assert asyncio.run(collect()) == []
+    assert processor.metrics['stream']['resumed_rows'] == 6
+    assert server.stats['requests'] == 6
+
+
+@pytest.mark.parametrize("closing", [True, False])
+def test_break_cancels_pending_work(mock_llm, make_processor, closing):
+    server = mock_llm(slow_responder)
+    processor = make_processor(TaskBProcessor, server)
+
+    async def consume_five():
+        stream = processor.summarize_stream(chunks(40, 10), concurrency=CONCURRENCY)
+        received = 0
+        async with (contextlib.aclosing(stream) if closing else contextlib.nullcontext(stream)) as rows:
+            async for _ in rows:
+                received += 1
+                if received == 5:
+                    break
+        del stream, rows
+        # aclosing 없이 break한 경우에도 generator 정리 후 추가 호출이 없는지 확인
+        await asyncio.sleep(0.3)
+
+    asyncio.run(consume_five())
+    assert server.stats['requests'] <= 5 + 2 * CONCURRENCY
+    assert 'stream' in processor.metrics
+
+
+def test_consumer_error_records_metrics(mock_llm, make_processor):
+    server = mock_llm(slow_responder)
+    processor = make_processor(TaskBProcessor, server)
+
+    async def fail_midway():
+        async with contextlib.aclosing(processor.summarize_stream(chunks(20, 5), concurrency=CONCURRENCY)) as rows:
+            async for _ in rows:
+                raise RuntimeError("consumer failed")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(fail_midway())
+    assert processor.metrics['stream']['task'] == 'TaskBProcessor'
+    assert 'context_guard' in processor.metrics
+    assert server.stats['requests'] <= 1 + 2 * CONCURRENCY
@@ -0,0 +1,50 @@
+"""etc/submit_developed_2.py 키워드 스캔: 로컬 KeywordSet이 기존 'term in s.lower()' 루프와 같은 선택/점수"""
+import importlib.util
+import random
+import re
+
+import pandas as pd
+import pytest
+
+from conftest import CODE_DIR, DATA_DIR
+
+pytest.importorskip("langevaluate")
+
+SCRIPT = CODE_DIR.parents[1] / "etc" / "submit_developed_2.py"
+# 접두사/부분 문자열/겹치는 용어와 대소문자를 일부러 섞음
+TERMS = ['mass', 'massive', 'ass', 'fall', 'fallot', 'lot', 'renal failure', 'failure', 'a']
+FILLER = ['patient', 'Mass', 'FALL', 'with', 'lotus', 'renal', 'İ', '.', 'history']
+
+
+@pytest.fixture(scope="module")
+def script():
+    spec = importlib.util.spec_from_file_location("submit_developed_2", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def old_found(sentence, terms):
+    return {term for term in terms if term in sentence.lower()}
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_keyword_set_matches_substring_loop(script, seed):
+    rng = random.Random(seed)
+    terms = rng.sample(TERMS, rng.randint(1, len(TERMS)))
+    keywords = script.KeywordSet(terms)
+    vocabulary = TERMS + FILLER
+    for _ in range(10):
+        sentence = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 10)))
+        assert keywords.found(sentence) == old_found(sentence, terms)
+        assert keywords.contains_any(sentence) == any(term in sentence.lower() for term in terms)
+
+
+def test_task_lexicons_match_loops_on_reports(script):
+    reports = pd.read_csv(DATA_DIR / "taskB_test.csv")['radiology report'].dropna()
+    lexicons = [script.TaskAProcessor.PRIORITY_KEYWORDS, script.TaskBProcessor.MEDICAL_TERMS,
+                script.TaskBProcessor.PRIORITY_TERMS, script.TaskCProcessor.PRIORITY_TERMS]
+    for report in reports:
+        for sentence in re.split(r'[.!?]+', report):
+            for keywords in lexicons:
+                assert keywords.found(sentence) == old_found(sentence, keywords.terms)
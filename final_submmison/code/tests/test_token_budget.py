@@ -0,0 +1,94 @@
+"""토큰 사용량 기록과 실행 토큰 예산 상한"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("langevaluate")
+
+from conftest import DATA_DIR  # noqa: E402
+from main import TaskBProcessor  # noqa: E402
+
+LONG_IMPRESSION = "1. " + " ".join(["Mild bibasilar atelectasis without focal consolidation."] * 30)
+
+
+@pytest.fixture(scope="module")
+def reports():
+    return pd.read_csv(DATA_DIR / "taskB_test.csv").head(40)
+
+
+def spent(server):
+    return server.stats['prompt_tokens'] + server.stats['completion_tokens']
+
+
+@pytest.mark.parametrize("max_tokens", [2000, 400])
+def test_budget_is_a_hard_ceiling(mock_llm, make_processor, reports, max_tokens):
+    server = mock_llm(lambda prompt, model: LONG_IMPRESSION)
+    processor = make_processor(TaskBProcessor, server, config={'max_tokens': max_tokens})
+
+    results = asyncio.run(processor.summarize(reports, token_budget=10000))
+
+    tokens = processor.metrics['tokens']
+    assert spent(server) <= 10000
+    assert tokens['budget_exhausted']
+    assert 0 < sum(r is not None for r in results) < len(reports)
+    assert tokens['skipped_rows'] == sum(r is None for r in results)
+    assert server.stats['requests'] == len(processor.token_usage)
+
+
+def test_unused_reservation_is_released(mock_llm, make_processor, reports):
+    # 행마다 prompt + max_tokens를 예약하면 전체 예약은 예산을 크게 넘지만, 실제 사용량은 예산 안에 들어옴
+    server = mock_llm(lambda prompt, model: "1. No acute cardiopulmonary process.")
+    processor = make_processor(TaskBProcessor, server)
+
+    results = asyncio.run(processor.summarize(reports, token_budget=60000))
+
+    assert all(r is not None for r in results)
+    assert not processor.metrics['tokens']['budget_exhausted']
+    assert spent(server) <= 60000
+    assert processor._tokens_reserved == 0
+
+
+def test_usage_is_recorded_per_row(mock_llm, make_processor, reports):
+    server = mock_llm()
+    processor = make_processor(TaskBProcessor, server)
+
+    asyncio.run(processor.summarize(reports.head(5)))
+
+    assert len(processor.token_usage) == 5
+    assert not any(record['estimated'] for record in processor.token_usage)
+    assert sum(r['prompt_tokens'] for r in processor.token_usage) == server.stats['prompt_tokens']
+    assert processor.metrics['tokens']['budget'] is None
+
+
+def test_checkpoint_is_flushed_while_running(tmp_path, mock_llm, make_processor, reports, monkeypatch):
+    server = mock_llm(lambda prompt, model: "IMPRESSION: No acute process")
+    processor = make_processor(TaskBProcessor, server)
+    monkeypatch.setattr(processor, 'CHECKPOINT_EVERY', 2)
+    checkpoint = tmp_path / "checkpoint.csv"
+    postprocess = processor.postprocess_result
+    finished = []
+
+    async def crash_on_fifth_row(text):
+        # 다섯 번째 행에서 중단되고 나머지 행은 끝나지 않은 채 취소됨
+        if len(finished) >= 4:
+            finished.append(None)
+            if len(finished) == 5:
+                raise RuntimeError("중간 중단")
+            await asyncio.Event().wait()
+        finished.append(text)
+        return await postprocess(text)
+
+    monkeypatch.setattr(processor, 'postprocess_result', crash_on_fifth_row)
+    with pytest.raises(RuntimeError):
+        asyncio.run(processor.summarize(reports.head(8), checkpoint_path=str(checkpoint)))
+
+    # 끝까지 실행되지 않았어도 완료된 행이 기록되어 다음 실행에서 건너뜀
+    saved = pd.read_csv(checkpoint, dtype=str)
+    assert len(saved) == 4
+    monkeypatch.setattr(processor, 'postprocess_result', postprocess)
+    requests = server.stats['requests']
+    results = asyncio.run(processor.summarize(reports.head(8), checkpoint_path=str(checkpoint)))
+    assert server.stats['requests'] - requests == 4
+    assert all(r is not None for r in results)
+    assert len(pd.read_csv(checkpoint)) == 8
@@ -0,0 +1,54 @@
+"""트리아지 헤더: 벡터화된 헤더 문자열, 결측/없는 컬럼 처리, 재원 기간"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from triage import length_of_stay, triage_header
+
+
+@pytest.fixture
+def data():
+    return pd.DataFrame({
+        'admission_type': ['EW EMER.', None, ''],
+        'admission_location': ['EMERGENCY ROOM', None, None],
+        'discharge_location': ['HOME', None, None],
+        'chiefcomplaint': ['Chest pain', None, '  '],
+        'acuity': [2.0, np.nan, np.nan],
+        'heartrate': [88.4, np.nan, 'n/a'],
+        'sbp': [130, np.nan, 120],
+        'dbp': [80, np.nan, np.nan],
+        'resprate': [18, np.nan, np.nan],
+        'o2sat': [97, np.nan, np.nan],
+        'temperature': [98.64, np.nan, np.nan],
+        'pain': ['5', None, None],
+        'admittime': ['2180-05-06 22:23:00', None, '2180-01-02 00:00:00'],
+        'dischtime': ['2180-05-09 10:23:00', None, '2180-01-01 00:00:00'],
+    })
+
+
+def test_triage_header_formats_every_field(data):
+    header = triage_header(data)
+
+    assert header.iloc[0] == ("Triage: EW EMER. via EMERGENCY ROOM | ED CC: Chest pain | ESI 2 | "
+                              "HR 88, BP 130/80, RR 18, SpO2 97%, T 98.6, pain 5 | LOS 2.5 d -> HOME")
+    # 정보가 없거나 공백/비수치/짝이 없는 BP/음수 재원 기간뿐이면 빈 헤더
+    assert header.iloc[1] == ""
+    assert header.iloc[2] == ""
+
+
+def test_missing_columns_are_skipped():
+    header = triage_header(pd.DataFrame({'chiefcomplaint': ['Fever'], 'o2sat': [91]}), label=None)
+    assert header.tolist() == ["ED CC: Fever | SpO2 91%"]
+
+
+def test_length_of_stay(data):
+    stay = length_of_stay(data)
+
+    assert stay.iloc[0] == 2.5
+    assert stay.iloc[1:].isna().all()
+    assert length_of_stay(pd.DataFrame({'admittime': ['2180-01-01']})).isna().all()
+
+
+def test_row_header_matches_batch_header(data):
+    batch = triage_header(data)
+    assert [triage_header(data.iloc[[i]]).iloc[0] for i in range(len(data))] == batch.tolist()
@@ -0,0 +1,174 @@
+"""토큰 사용량 추정 및 집계 유틸리티"""
+import re
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# 영문 임상 텍스트 기준 평균 문자 수 / 토큰
+CHARS_PER_TOKEN = 4.0
+
+# 모델별 토크나이저 보정값
+# chars_per_token: ASCII 문자 기준 평균 문자 수 / 토큰 (taskA/C 노트 샘플로 보정)
+# non_ascii_per_token: 한글 등 비ASCII 문자 1자당 토큰 수
+# message_overhead: chat template이 추가하는 헤더/특수 토큰 수
+MODEL_PROFILES: Dict[str, Dict[str, float]] = {
+    'meta-llama/Llama-3.1-8B-Instruct': {
+        'context_window': 131072,
+        'chars_per_token': 3.9,
+        'non_ascii_per_token': 1.5,
+        'message_overhead': 30,
+    },
+    'LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct-AWQ': {
+        'context_window': 32768,
+        'chars_per_token': 3.6,
+        'non_ascii_per_token': 0.9,
+        'message_overhead': 20,
+    },
+}
+
+DEFAULT_PROFILE: Dict[str, float] = {
+    'context_window': 8192,
+    'chars_per_token': CHARS_PER_TOKEN,
+    'non_ascii_per_token': 1.5,
+    'message_overhead': 20,
+}
+
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
+
+# 서버가 반환하는 context 초과 오류 메시지 패턴 (vLLM / OpenAI 호환)
+CONTEXT_OVERFLOW_PATTERNS = re.compile(
+    r"maximum context length|context_length_exceeded|context length|prompt is too long|too many tokens",
+    re.IGNORECASE,
+)
+_REPORTED_LENGTHS = re.compile(
+    r"maximum context length is (\d+) tokens.*?(?:requested|resulted in) (\d+) tokens",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def get_profile(model_name: Optional[str] = None) -> Dict[str, float]:
+    """모델별 토크나이저 보정값 (미등록 모델은 보수적인 기본값)"""
+    return MODEL_PROFILES.get(model_name, DEFAULT_PROFILE)
+
+
+def token_cost(text: str, model_name: Optional[str] = None) -> float:
+    """반올림 전 토큰 추정치 (이어 붙인 텍스트의 추정치는 조각별 값의 합과 같음)"""
+    if not text:
+        return 0.0
+    profile = get_profile(model_name)
+    non_ascii = len(_NON_ASCII.findall(text))
+    ascii_chars = len(text) - non_ascii
+    return ascii_chars / profile['chars_per_token'] + non_ascii * profile['non_ascii_per_token']
+
+
+def estimate_tokens(text: str, model_name: Optional[str] = None) -> int:
+    """usage 정보가 없을 때 사용하는 로컬 토큰 추정치"""
+    if not text:
+        return 0
+    return max(1, int(token_cost(text, model_name) + 0.5))
+
+
+def estimate_prompt_tokens(messages: Iterable[Any], model_name: Optional[str] = None) -> int:
+    """chat 메시지 목록의 프롬프트 토큰 추정치 (chat template 오버헤드 포함)"""
+    profile = get_profile(model_name)
+    total = 0
+    for message in messages:
+        total += estimate_tokens(str(message.content), model_name) + int(profile['message_overhead'])
+    return total
+
+
+def chars_for_tokens(tokens: int, model_name: Optional[str] = None) -> int:
+    """토큰 수에 해당하는 대략적인 문자 수"""
+    return max(0, int(tokens * get_profile(model_name)['chars_per_token']))
+
+
+def calibrate_profile(model_name: str, texts: Iterable[str], tokenizer: Any = None) -> Dict[str, float]:
+    """
+    실제 토크나이저로 샘플 텍스트를 토큰화해 chars_per_token을 보정합니다.
+    tokenizer를 주지 않으면 transformers의 AutoTokenizer를 사용합니다.
+    """
+    if tokenizer is None:
+        try:
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError("토크나이저 보정에는 transformers 패키지가 필요합니다.") from e
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    ascii_chars, token_count = 0, 0
+    for text in texts:
+        if not isinstance(text, str) or not text:
+            continue
+        ascii_chars += len(text) - len(_NON_ASCII.findall(text))
+        token_count += len(tokenizer.encode(text, add_special_tokens=False))
+
+    profile = dict(get_profile(model_name))
+    if token_count:
+        profile['chars_per_token'] = round(ascii_chars / token_count, 3)
+    MODEL_PROFILES[model_name] = profile
+    return profile
+
+
+def is_context_overflow(error: BaseException) -> bool:
+    """예외가 서버 측 context 길이 초과 오류인지 판별"""
+    return bool(CONTEXT_OVERFLOW_PATTERNS.search(str(error)))
+
+
+def reported_lengths(error: BaseException) -> Optional[Tuple[int, int]]:
+    """오류 메시지에서 (최대 context, 요청 토큰 수)를 추출합니다."""
+    match = _REPORTED_LENGTHS.search(str(error))
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def extract_usage(response: Any) -> Optional[Tuple[int, int]]:
+    """
+    LLM 응답에서 (prompt_tokens, completion_tokens)를 추출합니다.
+    langchain의 usage_metadata와 OpenAI 형식 token_usage를 모두 지원하며,
+    정보가 없으면 None을 반환합니다.
+    """
+    usage = getattr(response, 'usage_metadata', None)
+    if usage and usage.get('input_tokens') is not None:
+        return int(usage.get('input_tokens', 0)), int(usage.get('output_tokens', 0))
+
+    metadata = getattr(response, 'response_metadata', None) or {}
+    token_usage = metadata.get('token_usage') or metadata.get('usage')
+    if token_usage and token_usage.get('prompt_tokens') is not None:
+        return int(token_usage.get('prompt_tokens', 0)), int(token_usage.get('completion_tokens', 0))
+
+    return None
+
+
+def extract_cached_tokens(response: Any) -> int:
+    """서버 prefix cache에서 재사용된 프롬프트 토큰 수 (정보가 없으면 0)"""
+    usage = getattr(response, 'usage_metadata', None) or {}
+    details = usage.get('input_token_details') or {}
+    if details.get('cache_read') is not None:
+        return int(details['cache_read'])
+
+    metadata = getattr(response, 'response_metadata', None) or {}
+    token_usage = metadata.get('token_usage') or metadata.get('usage') or {}
+    details = token_usage.get('prompt_tokens_details') or {}
+    return int(details.get('cached_tokens') or 0)
+
+
+def summarize_usage(records: list) -> Dict[str, Any]:
+    """행 단위 사용량 기록을 모델별/전체 합계로 집계합니다."""
+    by_model: Dict[str, Dict[str, int]] = {}
+    for record in records:
+        stats = by_model.setdefault(record['model'], {
+            'calls': 0, 'prompt_tokens': 0, 'cached_prompt_tokens': 0,
+            'completion_tokens': 0, 'estimated_calls': 0})
+        stats['calls'] += 1
+        stats['prompt_tokens'] += record['prompt_tokens']
+        stats['cached_prompt_tokens'] += record.get('cached_tokens', 0)
+        stats['completion_tokens'] += record['completion_tokens']
+        stats['estimated_calls'] += int(record['estimated'])
+
+    prompt_total = sum(s['prompt_tokens'] for s in by_model.values())
+    completion_total = sum(s['completion_tokens'] for s in by_model.values())
+    return {
+        'by_model': by_model,
+        'prompt_tokens': prompt_total,
+        'cached_prompt_tokens': sum(s['cached_prompt_tokens'] for s in by_model.values()),
+        'completion_tokens': completion_total,
+        'total_tokens': prompt_total + completion_total,
+    }
@@ -0,0 +1,99 @@
+"""
+구조화된 입원/트리아지 컬럼 -> 한 줄 헤더
+taskA 데이터의 admission_type, chiefcomplaint, acuity, 활력징후(o2sat, heartrate, ...), admittime/dischtime 컬럼을
+DataFrame 전체에 대해 한 번의 pandas 연산으로 'Triage: ...' 헤더 문자열로 만듭니다. (재원 기간 포함)
+노트 본문에서 'VS:'/admission_type 문자열을 정규식으로 찾던 행 단위 처리를 대체합니다.
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+TRIAGE_COLUMNS: List[str] = [
+    'admission_type', 'admission_location', 'discharge_location', 'chiefcomplaint', 'acuity',
+    'heartrate', 'sbp', 'dbp', 'resprate', 'o2sat', 'temperature', 'pain', 'admittime', 'dischtime',
+]
+SEPARATOR = ' | '
+
+
+def _text(data: pd.DataFrame, column: str, template: str = '{}') -> pd.Series:
+    """문자열 컬럼 -> template 적용 문자열 (결측/빈 값은 '')"""
+    if column not in data.columns:
+        return pd.Series('', index=data.index)
+    values = data[column].astype('string').str.strip()
+    values = values.mask(values.str.len() == 0)
+    prefix, _, suffix = template.partition('{}')
+    return (prefix + values + suffix).fillna('').astype(object)
+
+
+def _number(data: pd.DataFrame, column: str, decimals: int = 0) -> pd.Series:
+    """수치 컬럼 -> 소수점 decimals 자리 문자열 (결측/비수치는 '')"""
+    if column not in data.columns:
+        return pd.Series('', index=data.index)
+    values = pd.to_numeric(data[column], errors='coerce')
+    if decimals == 0:
+        text = values.round().astype('Int64').astype('string')
+    else:
+        text = values.round(decimals).astype('string')
+    return text.fillna('').astype(object)
+
+
+def _join(parts: List[pd.Series], separator: str) -> pd.Series:
+    """빈 문자열을 건너뛰며 열 방향으로 이어 붙임"""
+    joined = pd.Series('', index=parts[0].index, dtype=object)
+    for part in parts:
+        filled = (part != '').to_numpy()
+        needs_separator = filled & (joined != '').to_numpy()
+        joined = joined + np.where(needs_separator, separator, '') + part
+    return joined
+
+
+def _labelled(label: str, values: pd.Series, suffix: str = '') -> pd.Series:
+    return pd.Series(np.where(values != '', label + values + suffix, ''), index=values.index, dtype=object)
+
+
+def length_of_stay(data: pd.DataFrame) -> pd.Series:
+    """admittime ~ dischtime 재원 기간 (일, 소수점 1자리). 계산할 수 없으면 NaN"""
+    if 'admittime' not in data.columns or 'dischtime' not in data.columns:
+        return pd.Series(np.nan, index=data.index)
+    admit = pd.to_datetime(data['admittime'], errors='coerce')
+    discharge = pd.to_datetime(data['dischtime'], errors='coerce')
+    days = (discharge - admit).dt.total_seconds() / 86400
+    return days.where(days >= 0).round(1)
+
+
+def triage_header(data: pd.DataFrame, label: Optional[str] = 'Triage') -> pd.Series:
+    """
+    행마다 '입원 유형 via 경로 | ED CC | ESI | 활력징후 | LOS -> 퇴원 장소' 헤더를 만듭니다.
+    없는 컬럼과 결측값은 건너뛰고, 정보가 하나도 없으면 빈 문자열입니다.
+    """
+    blood_pressure = _number(data, 'sbp')
+    diastolic = _number(data, 'dbp')
+    blood_pressure = pd.Series(
+        np.where((blood_pressure != '') & (diastolic != ''), blood_pressure + '/' + diastolic, ''),
+        index=data.index, dtype=object)
+    vitals = _join([
+        _labelled('HR ', _number(data, 'heartrate')),
+        _labelled('BP ', blood_pressure),
+        _labelled('RR ', _number(data, 'resprate')),
+        _labelled('SpO2 ', _number(data, 'o2sat'), '%'),
+        _labelled('T ', _number(data, 'temperature', 1)),
+        _labelled('pain ', _text(data, 'pain')),
+    ], ', ')
+
+    admission = _join([_text(data, 'admission_type'), _text(data, 'admission_location', 'via {}')], ' ')
+    stay = length_of_stay(data)
+    stay = pd.Series(np.where(stay.notna(), 'LOS ' + stay.astype('string').fillna('') + ' d', ''),
+                     index=data.index, dtype=object)
+    disposition = _join([stay, _text(data, 'discharge_location', '-> {}')], ' ')
+
+    header = _join([
+        admission,
+        _text(data, 'chiefcomplaint', 'ED CC: {}'),
+        _labelled('ESI ', _number(data, 'acuity')),
+        vitals,
+        disposition,
+    ], SEPARATOR)
+    if label:
+        header = pd.Series(np.where(header != '', f"{label}: " + header, ''), index=data.index, dtype=object)
+    return header